@@ -0,0 +1,70 @@
+"""
+Membership rate tier cache
+
+MembershipThrottle har bir request'da foydalanuvchi tier'ini biladi,
+Profile qatorini o'qimasdan:
+
+1. Process ichidagi LRU (qisqa TTL)
+2. Shared cache (Redis)
+3. DB - faqat hammasi bo'sh bo'lsa, bitta ``values_list`` query
+
+Profile save/delete'da local va shared yozuv bekor qilinadi
+(accounts/signals.py). Boshqa worker'lardagi local yozuv ``LOCAL_TTL``
+ichida eskiradi.
+
+JWT claim ishlatilmaydi: token umri davomida ``invalidate_tier`` unga
+yetib bormaydi (downgrade qilingan user premium limitda qolardi).
+"""
+
+from django.core.cache import cache
+
+from utils.cache import LocalLRUCache
+from .models import Profile
+
+
+TIER_PREMIUM = 'premium'
+TIER_FREE = 'free'
+
+LOCAL_TTL = 30
+SHARED_TTL = 300
+CACHE_KEY = 'membership_tier:{user_id}'
+
+_local_tiers = LocalLRUCache(maxsize=10000, ttl=LOCAL_TTL)
+
+
+def tier_for(is_premium, membership_type):
+    """is_premium ustun - aks holda membership_type (free/basic)"""
+    if is_premium:
+        return TIER_PREMIUM
+    return membership_type or TIER_FREE
+
+
+def _load_tier(user_id):
+    row = Profile.objects.filter(user_id=user_id).values_list(
+        'is_premium', 'membership_type'
+    ).first()
+    return tier_for(*row) if row else TIER_FREE
+
+
+def get_tier(user_id):
+    tier = _local_tiers.get(user_id)
+    if tier is not None:
+        return tier
+
+    key = CACHE_KEY.format(user_id=user_id)
+    tier = cache.get(key)
+    if tier is None:
+        tier = _load_tier(user_id)
+        cache.set(key, tier, SHARED_TTL)
+
+    _local_tiers.set(user_id, tier)
+    return tier
+
+
+def get_request_tier(request):
+    return get_tier(request.user.pk)
+
+
+def invalidate_tier(user_id):
+    _local_tiers.delete(user_id)
+    cache.delete(CACHE_KEY.format(user_id=user_id))
@@ -4,12 +4,14 @@ Handles automatic email notifications for user-related events
 """
 
 import logging
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
 
 from emails.services import EmailService
 from .models import Profile
+from .membership import invalidate_tier
 
 logger = logging.getLogger(__name__)
 
@@ -51,3 +53,11 @@ def send_welcome_email_on_registration(sender, instance, created, **kwargs):
         logger.error(
             f"Error sending welcome email to {instance.username}: {str(e)}"
         )
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def invalidate_membership_tier(sender, instance, **kwargs):
+    """Throttle tier cache - commit'dan keyin (eski qiymat qayta cache'lanmasin)"""
+    user_id = instance.user_id
+    transaction.on_commit(lambda: invalidate_tier(user_id))
@@ -1,7 +1,10 @@
 """
 Analytics and Statistics Logic
 """
+import math
+from bisect import bisect_left, bisect_right
 from decimal import Decimal
+from functools import cached_property
 
 from django.db.models import (
     Count,
@@ -14,28 +17,110 @@ from django.db.models import (
     DecimalField,
     ExpressionWrapper,
     Value,
+    Case,
+    When,
+    IntegerField,
 )
 from django.db.models.functions import Coalesce
+from django.conf import settings
+from django.utils import timezone
 
+from .cache_tags import tagged_cache, BOOKS_LIST_TAG
 from .models import Book, Author, Genre
 
 
 DECIMAL_ZERO = Value(Decimal("0.00"))
 
 
-class BookAnalytics:
-    """Book analytics utility class"""
+# Bucket chegaralari: [low, high) - SQL'da Q filter (conditional aggregation),
+# Python'da snapshot delta'lari uchun (books/stats_snapshot.py)
+PRICE_BUCKETS = {
+    "budget": (None, 30),
+    "moderate": (30, 50),
+    "premium": (50, 70),
+    "luxury": (70, None),
+}
+
+STOCK_STATUS_BUCKETS = {
+    "out_of_stock": (0, 1),
+    "low_stock": (1, 5),
+    "in_stock": (5, None),
+}
+
+STOCK_ANALYSIS_BUCKETS = {
+    "out_of_stock": (0, 1),
+    "critical": (1, 3),
+    "low": (3, 6),
+    "normal": (6, 11),
+    "high": (11, None),
+}
+
+# (ustun prefiksi, Book maydoni, bucket'lar)
+BOOK_BUCKETS = (
+    ("price_", "price", PRICE_BUCKETS),
+    ("status_", "stock", STOCK_STATUS_BUCKETS),
+    ("analysis_", "stock", STOCK_ANALYSIS_BUCKETS),
+)
 
-    # =========================
-    # DASHBOARD
-    # =========================
-    @staticmethod
-    def get_dashboard_stats():
-        """
-        Get complete dashboard statistics
-        """
-        overview = Book.objects.aggregate(
+
+def bucket_q(field, bounds):
+    low, high = bounds
+    condition = Q()
+    if low is not None:
+        condition &= Q(**{f"{field}__gte": low})
+    if high is not None:
+        condition &= Q(**{f"{field}__lt": high})
+    return condition
+
+
+def in_bucket(value, bounds):
+    low, high = bounds
+    return (low is None or value >= low) and (high is None or value < high)
+
+
+def _bucket_counts():
+    return {
+        f"{prefix}{name}": Count("id", filter=bucket_q(field, bounds))
+        for prefix, field, buckets in BOOK_BUCKETS
+        for name, bounds in buckets.items()
+    }
+
+
+def _top_by(rows, field):
+    """Bitta natija ro'yxatidan top-1 (Python'da, qayta query yo'q)"""
+    return max(rows, key=lambda row: getattr(row, field)) if rows else None
+
+
+def _average(total, count, places=Decimal("0.01")):
+    return (Decimal(total) / count).quantize(places) if count else Decimal("0.00")
+
+
+class AnalyticsResult:
+    """
+    Bitta so'rov uchun umumiy analytics natijasi
+
+    Har bir model uchun bitta conditional aggregation va har bir o'lchov
+    (genre, author) uchun bitta grouped query - faqat kerak bo'lganda va
+    faqat bir marta bajariladi. Dashboard, distribution, performance va
+    recommendations bo'limlari shu obyektdan o'qiydi.
+
+    Usage:
+        result = AnalyticsResult()
+        BookAnalytics.get_dashboard_stats(result)
+        BookAnalytics.get_recommendations(result)  # qo'shimcha query yo'q
+    """
+
+    @cached_property
+    def generated_at(self):
+        """Natija qaysi vaqt holatini ko'rsatadi"""
+        return timezone.now()
+
+    @cached_property
+    def books(self):
+        """Book jadvali bo'yicha barcha hisoblar - bitta query"""
+        return Book.objects.aggregate(
             total_books=Count("id"),
+            price_sum=Sum("price"),
             avg_price=Avg("price"),
             min_price=Min("price"),
             max_price=Max("price"),
@@ -44,27 +129,220 @@ class BookAnalytics:
                 Sum(F("price") * F("stock")),
                 output_field=DecimalField(max_digits=14, decimal_places=2),
             ),
+            **_bucket_counts(),
         )
 
-        authors_stats = Author.objects.aggregate(
-            total_authors=Count("id"),
-            authors_with_books=Count(
+    @cached_property
+    def authors(self):
+        return Author.objects.aggregate(
+            total=Count("id", distinct=True),
+            with_books=Count(
                 "id", filter=Q(books__isnull=False), distinct=True
             ),
         )
 
-        genres_stats = Genre.objects.aggregate(
-            total_genres=Count("id"),
-            genres_with_books=Count(
+    @cached_property
+    def genres(self):
+        return Genre.objects.aggregate(
+            total=Count("id", distinct=True),
+            with_books=Count(
                 "id", filter=Q(books__isnull=False), distinct=True
             ),
         )
 
-        stock_status = Book.objects.aggregate(
-            out_of_stock=Count("id", filter=Q(stock=0)),
-            low_stock=Count("id", filter=Q(stock__gt=0, stock__lt=5)),
-            in_stock=Count("id", filter=Q(stock__gte=5)),
+    @cached_property
+    def genre_rows(self):
+        return list(BookAnalytics.get_books_by_genre())
+
+    @cached_property
+    def author_rows(self):
+        return list(BookAnalytics.get_books_by_author())
+
+    def buckets(self, prefix, buckets):
+        return {name: self.books[f"{prefix}{name}"] for name in buckets}
+
+
+class SnapshotAnalyticsResult(AnalyticsResult):
+    """
+    AnalyticsResult - materialized snapshot jadvallaridan
+
+    Book jadvali skan qilinmaydi: katalog statistikasi BookStatsSnapshot
+    qatoridan, janr/muallif bo'limlari rollup jadvallaridan -
+    O(janrlar + mualliflar), katalog hajmiga bog'liq emas.
+    ``generated_at`` - snapshot oxirgi yangilangan vaqt (staleness).
+    """
+
+    @cached_property
+    def snapshot(self):
+        from .stats_snapshot import get_snapshot
+        return get_snapshot()
+
+    @cached_property
+    def generated_at(self):
+        return self.snapshot.updated_at
+
+    @cached_property
+    def books(self):
+        snapshot = self.snapshot
+        stats = {
+            field: getattr(snapshot, field)
+            for field in ("total_books", "price_sum", "min_price", "max_price",
+                          "total_stock", "total_value")
+        }
+        stats.update(
+            (f"{prefix}{name}", getattr(snapshot, f"{prefix}{name}"))
+            for prefix, _, buckets in BOOK_BUCKETS
+            for name in buckets
+        )
+        stats["avg_price"] = (
+            _average(snapshot.price_sum, snapshot.total_books)
+            if snapshot.total_books else None
+        )
+        return stats
+
+    @cached_property
+    def authors(self):
+        return Author.objects.aggregate(
+            total=Count("id"),
+            with_books=Count("id", filter=Q(stats__book_count__gt=0)),
+        )
+
+    @cached_property
+    def genres(self):
+        return Genre.objects.aggregate(
+            total=Count("id"),
+            with_books=Count("id", filter=Q(stats__book_count__gt=0)),
+        )
+
+    @cached_property
+    def genre_rows(self):
+        rows = list(
+            Genre.objects.filter(stats__book_count__gt=0)
+            .annotate(
+                book_count=F("stats__book_count"),
+                price_sum=F("stats__price_sum"),
+                min_price=F("stats__min_price"),
+                max_price=F("stats__max_price"),
+                total_stock=F("stats__total_stock"),
+                total_value=F("stats__total_value"),
+            )
+            .order_by("-book_count")
+        )
+        for row in rows:
+            row.avg_price = _average(row.price_sum, row.book_count)
+        return rows
+
+    @cached_property
+    def author_rows(self):
+        rows = list(
+            Author.objects.filter(stats__book_count__gt=0)
+            .annotate(
+                book_count=F("stats__book_count"),
+                price_sum=F("stats__price_sum"),
+                total_stock=F("stats__total_stock"),
+                total_pages=F("stats__total_pages"),
+                total_value=F("stats__total_value"),
+            )
+            .order_by("-book_count")
         )
+        for row in rows:
+            row.avg_price = _average(row.price_sum, row.book_count)
+            row.avg_pages = row.total_pages / row.book_count
+        return rows
+
+
+# =========================
+# HISTOGRAM ENGINE
+# =========================
+HISTOGRAM_FIELDS = ("price", "stock", "pages")
+HISTOGRAM_STRATEGIES = ("width", "quantile")
+MAX_HISTOGRAM_BINS = 100
+
+
+def _parse_edges(raw):
+    """'0,30,50' -> [Decimal] (o'suvchi, kamida 2 ta)"""
+    try:
+        edges = [Decimal(part.strip()) for part in raw.split(",") if part.strip()]
+    except ArithmeticError:
+        raise ValueError("bins must be an integer or comma-separated numbers")
+    if not all(edge.is_finite() for edge in edges):
+        raise ValueError("Bin edges must be finite numbers")
+    if len(edges) < 2 or len(edges) > MAX_HISTOGRAM_BINS + 1:
+        raise ValueError(f"Provide between 2 and {MAX_HISTOGRAM_BINS + 1} bin edges")
+    if any(low >= high for low, high in zip(edges, edges[1:])):
+        raise ValueError("Bin edges must be strictly increasing")
+    return edges
+
+
+def _lookup(field, op, edge):
+    """
+    Integer maydonlar uchun kasr chegaralar: v < 2.5 <=> v < 3, v <= 2.5 <=> v <= 2
+    """
+    if field != "price":
+        edge = math.ceil(edge) if op == "lt" else math.floor(edge)
+    return {f"{field}__{op}": edge}
+
+
+def _bucket_case(field, edges):
+    """
+    Bucket indeksi: -1 (chegaradan past), 0..n-1, n (yuqori)
+
+    Bucket'lar [low, high), oxirgisi [low, high] (numpy.histogram kabi).
+    """
+    last = len(edges) - 1
+    whens = [When(**_lookup(field, "lt", edges[0]), then=Value(-1))]
+    whens += [
+        When(**_lookup(field, "lt", edge), then=Value(index))
+        for index, edge in enumerate(edges[1:-1])
+    ]
+    whens.append(When(**_lookup(field, "lte", edges[-1]), then=Value(last - 1)))
+    return Case(*whens, default=Value(last), output_field=IntegerField())
+
+
+def _histogram_payload(field, strategy, edges, counts, total):
+    last = len(edges) - 1
+    return {
+        "field": field,
+        "strategy": strategy,
+        "total": total,
+        "buckets": [
+            {
+                "min": float(edges[index]),
+                "max": float(edges[index + 1]),
+                "count": counts.get(index, 0),
+            }
+            for index in range(last)
+        ],
+        "underflow": counts.get(-1, 0),
+        "overflow": counts.get(last, 0),
+    }
+
+
+class BookAnalytics:
+    """Book analytics utility class"""
+
+    @staticmethod
+    def result():
+        """
+        Endpoint'lar uchun per-request natija
+
+        ANALYTICS_USE_SNAPSHOTS (default True) - materialized snapshot'lar,
+        aks holda jonli querylar.
+        """
+        if getattr(settings, "ANALYTICS_USE_SNAPSHOTS", True):
+            return SnapshotAnalyticsResult()
+        return AnalyticsResult()
+
+    # =========================
+    # DASHBOARD
+    # =========================
+    @staticmethod
+    def get_dashboard_stats(result=None):
+        """
+        Get complete dashboard statistics
+        """
+        result = result or AnalyticsResult()
+        overview = result.books
 
         return {
             "overview": {
@@ -76,14 +354,14 @@ class BookAnalytics:
                 "total_value": float(overview["total_value"] or 0),
             },
             "authors": {
-                "total": authors_stats["total_authors"],
-                "with_books": authors_stats["authors_with_books"],
+                "total": result.authors["total"],
+                "with_books": result.authors["with_books"],
             },
             "genres": {
-                "total": genres_stats["total_genres"],
-                "with_books": genres_stats["genres_with_books"],
+                "total": result.genres["total"],
+                "with_books": result.genres["with_books"],
             },
-            "stock_status": stock_status,
+            "stock_status": result.buckets("status_", STOCK_STATUS_BUCKETS),
         }
 
     # =========================
@@ -192,37 +470,18 @@ class BookAnalytics:
     # PRICE DISTRIBUTION
     # =========================
     @staticmethod
-    def get_price_distribution():
-        return {
-            "budget": Book.objects.filter(price__lt=30).count(),
-            "moderate": Book.objects.filter(
-                price__gte=30, price__lt=50
-            ).count(),
-            "premium": Book.objects.filter(
-                price__gte=50, price__lt=70
-            ).count(),
-            "luxury": Book.objects.filter(price__gte=70).count(),
-        }
+    def get_price_distribution(result=None):
+        result = result or AnalyticsResult()
+        return result.buckets("price_", PRICE_BUCKETS)
 
     # =========================
     # STOCK ANALYSIS
     # =========================
     @staticmethod
-    def get_stock_analysis():
+    def get_stock_analysis(result=None):
+        result = result or AnalyticsResult()
         return {
-            "status": {
-                "out_of_stock": Book.objects.filter(stock=0).count(),
-                "critical": Book.objects.filter(
-                    stock__gte=1, stock__lte=2
-                ).count(),
-                "low": Book.objects.filter(
-                    stock__gte=3, stock__lte=5
-                ).count(),
-                "normal": Book.objects.filter(
-                    stock__gte=6, stock__lte=10
-                ).count(),
-                "high": Book.objects.filter(stock__gt=10).count(),
-            },
+            "status": result.buckets("analysis_", STOCK_ANALYSIS_BUCKETS),
             "needs_restock": Book.objects.filter(stock__lt=5)
             .select_related("author")
             .order_by("stock")[:20],
@@ -230,6 +489,112 @@ class BookAnalytics:
             .order_by("-stock")[:10],
         }
 
+    # =========================
+    # HISTOGRAM
+    # =========================
+    @staticmethod
+    def get_histogram(field="price", bins="10", strategy="width"):
+        """
+        Istalgan sonli Book maydoni uchun histogram (tagged cache bilan)
+
+        bins: bucket soni ("10") yoki chegaralar ("0,30,50,70,100")
+        strategy: "width" (teng kenglik) yoki "quantile" (bins soni bo'lsa)
+
+        Natija Book yozuvlari bekor qiladigan ``BOOKS_LIST_TAG`` ostida
+        saqlanadi.
+        """
+        if field not in HISTOGRAM_FIELDS:
+            raise ValueError(f"field must be one of: {', '.join(HISTOGRAM_FIELDS)}")
+        if strategy not in HISTOGRAM_STRATEGIES:
+            raise ValueError(f"strategy must be one of: {', '.join(HISTOGRAM_STRATEGIES)}")
+
+        bins = str(bins).strip()
+        if bins.isdigit():
+            bin_count = int(bins)
+            if not 1 <= bin_count <= MAX_HISTOGRAM_BINS:
+                raise ValueError(f"bins must be between 1 and {MAX_HISTOGRAM_BINS}")
+            edges = None
+            key = f"{field}:{strategy}:{bin_count}"
+        else:
+            edges = _parse_edges(bins)
+            bin_count = None
+            strategy = "edges"
+            key = f"{field}:edges:{','.join(str(edge) for edge in edges)}"
+
+        def compute():
+            if edges is not None:
+                return BookAnalytics._edge_histogram(field, edges, "edges")
+            if strategy == "quantile":
+                return BookAnalytics._quantile_histogram(field, bin_count)
+            return BookAnalytics._width_histogram(field, bin_count)
+
+        return tagged_cache.get_or_set(
+            f"analytics:histogram:{key}",
+            lambda: {**compute(), "generated_at": timezone.now()},
+            tags=[BOOKS_LIST_TAG],
+            timeout=600,
+        )
+
+    @staticmethod
+    def _edge_histogram(field, edges, strategy):
+        """Barcha bucket'lar bitta CASE WHEN grouped query bilan"""
+        counts = {
+            row["bucket"]: row["count"]
+            for row in Book.objects.order_by()
+            .annotate(bucket=_bucket_case(field, edges))
+            .values("bucket")
+            .annotate(count=Count("id"))
+        }
+        return _histogram_payload(field, strategy, edges, counts, sum(counts.values()))
+
+    @staticmethod
+    def _width_histogram(field, bin_count):
+        """Teng kenglikdagi bucket'lar: min/max + bitta grouped query"""
+        bounds = Book.objects.aggregate(low=Min(field), high=Max(field))
+        if bounds["low"] is None:
+            return _histogram_payload(field, "width", [Decimal(0), Decimal(0)], {}, 0)
+
+        low, high = Decimal(bounds["low"]), Decimal(bounds["high"])
+        if low == high:
+            edges = [low, high]
+        else:
+            width = (high - low) / bin_count
+            edges = [low + width * index for index in range(bin_count)] + [high]
+        return BookAnalytics._edge_histogram(field, edges, "width")
+
+    @staticmethod
+    def _quantile_histogram(field, bin_count):
+        """
+        Quantile bucket'lar: bitta ustun (values_list) o'qiladi, chegaralar va
+        hisoblar Python'da (bisect)
+        """
+        values = [
+            Decimal(value) for value in
+            Book.objects.order_by(field).values_list(field, flat=True)
+        ]
+        if not values:
+            return _histogram_payload(field, "quantile", [Decimal(0), Decimal(0)], {}, 0)
+
+        # Nearest-rank quantile'lar; takrorlangan chegaralar birlashtiriladi
+        edges = []
+        for index in range(bin_count + 1):
+            edge = values[round(index * (len(values) - 1) / bin_count)]
+            if not edges or edge > edges[-1]:
+                edges.append(edge)
+        if len(edges) == 1:
+            edges.append(edges[0])
+
+        counts = {}
+        last = len(edges) - 1
+        for index in range(last):
+            low = bisect_left(values, edges[index])
+            high = (
+                bisect_right(values, edges[index + 1]) if index == last - 1
+                else bisect_left(values, edges[index + 1])
+            )
+            counts[index] = high - low
+        return _histogram_payload(field, "quantile", edges, counts, len(values))
+
     # =========================
     # TOP BOOKS
     # =========================
@@ -267,51 +632,36 @@ class BookAnalytics:
     # PERFORMANCE
     # =========================
     @staticmethod
-    def get_genre_performance():
-        genres = BookAnalytics.get_books_by_genre()
-
-        if not genres.exists():
-            return {
-                "most_books": None,
-                "highest_value": None,
-                "most_expensive": None,
-                "most_stock": None,
-            }
+    def get_genre_performance(result=None):
+        rows = (result or AnalyticsResult()).genre_rows
 
         return {
-            "most_books": genres.order_by("-book_count").first(),
-            "highest_value": genres.order_by("-total_value").first(),
-            "most_expensive": genres.order_by("-avg_price").first(),
-            "most_stock": genres.order_by("-total_stock").first(),
+            "most_books": _top_by(rows, "book_count"),
+            "highest_value": _top_by(rows, "total_value"),
+            "most_expensive": _top_by(rows, "avg_price"),
+            "most_stock": _top_by(rows, "total_stock"),
         }
 
     @staticmethod
-    def get_author_performance():
-        authors = BookAnalytics.get_books_by_author()
-
-        if not authors.exists():
-            return {
-                "most_productive": None,
-                "highest_value": None,
-                "most_pages": None,
-                "most_expensive": None,
-            }
+    def get_author_performance(result=None):
+        rows = (result or AnalyticsResult()).author_rows
 
         return {
-            "most_productive": authors.order_by("-book_count").first(),
-            "highest_value": authors.order_by("-total_value").first(),
-            "most_pages": authors.order_by("-total_pages").first(),
-            "most_expensive": authors.order_by("-avg_price").first(),
+            "most_productive": _top_by(rows, "book_count"),
+            "highest_value": _top_by(rows, "total_value"),
+            "most_pages": _top_by(rows, "total_pages"),
+            "most_expensive": _top_by(rows, "avg_price"),
         }
 
     # =========================
     # RECOMMENDATIONS
     # =========================
     @staticmethod
-    def get_recommendations():
+    def get_recommendations(result=None):
+        result = result or AnalyticsResult()
         recommendations = []
 
-        out_of_stock = Book.objects.filter(stock=0).count()
+        out_of_stock = result.books["status_out_of_stock"]
         if out_of_stock > 0:
             recommendations.append(
                 {
@@ -321,9 +671,7 @@ class BookAnalytics:
                 }
             )
 
-        low_stock = Book.objects.filter(
-            stock__gt=0, stock__lt=5
-        ).count()
+        low_stock = result.books["status_low_stock"]
         if low_stock > 0:
             recommendations.append(
                 {
@@ -333,8 +681,8 @@ class BookAnalytics:
                 }
             )
 
-        expensive = Book.objects.filter(price__gte=70).count()
-        total = Book.objects.count()
+        expensive = result.books["price_luxury"]
+        total = result.books["total_books"]
         if total and expensive > total * 0.3:
             recommendations.append(
                 {
@@ -344,7 +692,7 @@ class BookAnalytics:
                 }
             )
 
-        genre_perf = BookAnalytics.get_genre_performance()
+        genre_perf = BookAnalytics.get_genre_performance(result)
         if genre_perf["highest_value"]:
             recommendations.append(
                 {
@@ -357,7 +705,7 @@ class BookAnalytics:
                 }
             )
 
-        author_perf = BookAnalytics.get_author_performance()
+        author_perf = BookAnalytics.get_author_performance(result)
         if author_perf["most_productive"]:
             recommendations.append(
                 {
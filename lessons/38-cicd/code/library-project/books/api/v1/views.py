@@ -2,6 +2,8 @@
 V1 API Views
 """
 from rest_framework import generics
+from books.conditional import book_response
+from books.mixins import CachedListMixin
 from books.models import Book, Author
 from rest_framework.response import Response
 from .serializers import (
@@ -12,13 +14,14 @@ from .serializers import (
 from .pagination import V1Pagination
 
 
-class BookListAPIView(generics.ListCreateAPIView):
+class BookListAPIView(CachedListMixin, generics.ListCreateAPIView):
     """
     V1: Book List and Create
-    GET: List all books
+    GET: List all books (render qilingan body cache'da, books/list_cache.py)
     POST: Create new book
     """
-    queryset = Book.objects.select_related('author').all()
+    queryset = Book.objects.all()
+    select_related_fields = ['author']
     pagination_class = V1Pagination
     
     def get_serializer_class(self):
@@ -36,6 +39,10 @@ class BookDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
     """
     queryset = Book.objects.select_related('author').all()
     serializer_class = BookSerializerV1
+    
+    def retrieve(self, request, *args, **kwargs):
+        """ETag/304 - bitta PK lookup, body cache'da"""
+        return book_response(request, kwargs['pk'], lambda: self.get_serializer(self.get_object()).data)
 
 
 class AuthorListAPIView(generics.ListCreateAPIView):
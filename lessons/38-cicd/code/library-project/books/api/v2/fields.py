@@ -0,0 +1,74 @@
+"""
+V2 API Fields
+Annotation-driven computed fields
+"""
+from rest_framework import serializers
+
+
+class AnnotatedField(serializers.ReadOnlyField):
+    """
+    Qiymati queryset annotation'idan olinadigan read-only maydon.
+
+    Maydon o'ziga kerakli aggregate'ni e'lon qiladi, view esa uni
+    AnnotatedQuerysetMixin orqali queryset'ga qo'shadi - sahifadagi
+    obyektlar soniga bog'liq bo'lmagan querylar.
+    Annotation bo'lmasa (masalan, nested yoki yangi yaratilgan obyekt)
+    shu aggregate bitta obyekt uchun alohida hisoblanadi.
+
+    Usage:
+        review_count = AnnotatedField(Count('reviews', distinct=True))
+        average_rating = AnnotatedField(Avg('reviews__rating'), precision=2)
+    """
+
+    def __init__(self, aggregate, annotation=None, precision=None, empty=0, **kwargs):
+        self.aggregate = aggregate
+        self.annotation = annotation
+        self.precision = precision
+        self.empty = empty
+        super().__init__(**kwargs)
+
+    def bind(self, field_name, parent):
+        super().bind(field_name, parent)
+        if self.annotation is None:
+            self.annotation = field_name
+
+    def get_attribute(self, instance):
+        if self.annotation in instance.__dict__:
+            return instance.__dict__[self.annotation]
+        return self.compute(instance)
+
+    def compute(self, instance):
+        """Fallback: annotation'siz obyekt uchun bitta aggregate query"""
+        if instance.pk is None:
+            return None
+        manager = type(instance)._default_manager
+        return manager.filter(pk=instance.pk).aggregate(value=self.aggregate)['value']
+
+    def to_representation(self, value):
+        if not value:
+            return self.empty
+        if self.precision is not None:
+            return round(value, self.precision)
+        return value
+
+
+class AnnotatedSerializerMixin:
+    """
+    Serializer'dagi AnnotatedField'larni queryset annotation'lariga aylantiradi
+    """
+
+    @classmethod
+    def get_annotations(cls):
+        """{annotation nomi: aggregate} - e'lon qilingan maydonlardan"""
+        annotations = {}
+        for field_name, field in cls._declared_fields.items():
+            if isinstance(field, AnnotatedField):
+                annotations[field.annotation or field_name] = field.aggregate
+        return annotations
+
+    @classmethod
+    def annotate_queryset(cls, queryset):
+        annotations = cls.get_annotations()
+        if annotations:
+            queryset = queryset.annotate(**annotations)
+        return queryset
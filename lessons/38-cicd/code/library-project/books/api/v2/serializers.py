@@ -5,12 +5,13 @@ Enhanced with nested objects and computed fields
 from rest_framework import serializers
 from books.models import Book, Author, Genre, Review
 from datetime import date
-from django.db.models import Avg
+from django.db.models import Count
+from .fields import AnnotatedField, AnnotatedSerializerMixin
 
 
-class AuthorSerializerV2(serializers.ModelSerializer):
+class AuthorSerializerV2(AnnotatedSerializerMixin, serializers.ModelSerializer):
     """V2: Enhanced author serializer with book count"""
-    book_count = serializers.SerializerMethodField()
+    book_count = AnnotatedField(Count('books', distinct=True))
     
     class Meta:
         model = Author
@@ -24,10 +25,6 @@ class AuthorSerializerV2(serializers.ModelSerializer):
             'updated_at'
         ]
         read_only_fields = ['created_at', 'updated_at']
-    
-    def get_book_count(self, obj):
-        """Count books by this author"""
-        return obj.books.count()
 
 
 class GenreSerializerV2(serializers.ModelSerializer):
@@ -42,8 +39,9 @@ class BookListSerializerV2(serializers.ModelSerializer):
     """V2: Optimized list serializer"""
     author_name = serializers.CharField(source='author.name', read_only=True)
     genre_names = serializers.SerializerMethodField()
-    average_rating = serializers.SerializerMethodField()
-    review_count = serializers.SerializerMethodField()
+    # Denormalized summary (books/ratings.py) - reviews jadvali o'qilmaydi
+    average_rating = serializers.FloatField(source='rating_avg', read_only=True)
+    review_count = serializers.IntegerField(source='rating_count', read_only=True)
     
     class Meta:
         model = Book
@@ -61,16 +59,6 @@ class BookListSerializerV2(serializers.ModelSerializer):
     def get_genre_names(self, obj):
         """Get list of genre names"""
         return [genre.name for genre in obj.genres.all()]
-    
-    def get_average_rating(self, obj):
-        """Calculate average rating from reviews"""
-        result = obj.reviews.aggregate(avg_rating=Avg('rating'))
-        avg = result['avg_rating']
-        return round(avg, 2) if avg else 0
-    
-    def get_review_count(self, obj):
-        """Count reviews for this book"""
-        return obj.reviews.count()
 
 
 class BookDetailSerializerV2(serializers.ModelSerializer):
@@ -89,8 +77,9 @@ class BookDetailSerializerV2(serializers.ModelSerializer):
         write_only=True
     )
     age_years = serializers.SerializerMethodField()
-    average_rating = serializers.SerializerMethodField()
-    review_count = serializers.SerializerMethodField()
+    # Denormalized summary (books/ratings.py) - reviews jadvali o'qilmaydi
+    average_rating = serializers.FloatField(source='rating_avg', read_only=True)
+    review_count = serializers.IntegerField(source='rating_count', read_only=True)
     
     class Meta:
         model = Book
@@ -122,16 +111,6 @@ class BookDetailSerializerV2(serializers.ModelSerializer):
             return delta.days // 365
         return None
     
-    def get_average_rating(self, obj):
-        """Calculate average rating from reviews"""
-        result = obj.reviews.aggregate(avg_rating=Avg('rating'))
-        avg = result['avg_rating']
-        return round(avg, 2) if avg else 0
-    
-    def get_review_count(self, obj):
-        """Count reviews for this book"""
-        return obj.reviews.count()
-    
 class ReviewSerializerV2(serializers.ModelSerializer):
     """V2: Review serializer"""
     book_title = serializers.CharField(source='book.title', read_only=True)
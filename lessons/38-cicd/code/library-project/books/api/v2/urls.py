@@ -20,6 +20,8 @@ urlpatterns = [
     
     # Metrics (Admin only)
     path('metrics/', views.APIMetricsView.as_view(), name='api-metrics'),
+    path('metrics/versions/', views.APIVersionUsageView.as_view(), name='api-version-usage'),
+    path('metrics/list-cache/', views.ListCacheMetricsView.as_view(), name='list-cache-metrics'),
     # Error Testing Endpoint
     path('test-errors/', views.ErrorTestAPIView.as_view(), name='test-errors'),
 ]
\ No newline at end of file
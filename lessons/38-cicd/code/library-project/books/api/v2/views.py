@@ -10,10 +10,15 @@ from rest_framework.response import Response
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Avg, Count, Max, Min, Sum
+from django.db.models import Avg, Count, Max, Min, Q, Sum
 from datetime import date
 
 from books.models import Book, Author, Genre, Review
+from books.conditional import book_response
+from books.filters import FullTextSearchFilter
+from books.mixins import AnnotatedQuerysetMixin, CachedListMixin
+from books.api_metrics import API_VERSIONS, recorder
+from books.list_cache import list_cache_metrics
 from books.exceptions import (
     BookNotAvailableError,
     ISBNAlreadyExistsError,
@@ -34,20 +39,23 @@ from .pagination import V2Pagination
 logger = logging.getLogger(__name__)
 
 
-class BookListAPIView(generics.ListCreateAPIView):
+class BookListAPIView(CachedListMixin, generics.ListCreateAPIView):
     """
     V2: Enhanced Book List with filtering, search, ordering
     """
-    queryset = Book.objects.select_related('author').prefetch_related('genres').all()
+    queryset = Book.objects.all()
+    select_related_fields = ['author']
+    prefetch_related_fields = ['genres']
+    cache_timeout = 120
     pagination_class = V2Pagination
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
+        FullTextSearchFilter,
         filters.OrderingFilter
     ]
     filterset_fields = ['author', 'genres', 'language']
     search_fields = ['title', 'description', 'isbn_number']
-    ordering_fields = ['title', 'price', 'published_date']
+    ordering_fields = ['title', 'price', 'published_date', 'rating_avg', 'rating_count']
     ordering = ['-created_at']
     
     def get_serializer_class(self):
@@ -66,7 +74,14 @@ class BookListAPIView(generics.ListCreateAPIView):
         )
         
         try:
+            # Render qilingan body cache'da, ETag/304 (books/list_cache.py)
             response = super().list(request, *args, **kwargs)
+            if response.status_code == status.HTTP_304_NOT_MODIFIED:
+                logger.info("Books list not modified")
+                return response
+            if not hasattr(response, 'data'):
+                logger.info("Books list served from cache")
+                return response
             
             logger.info(
                 f"Books listed successfully: {response.data.get('pagination', {}).get('count', 0)} results",
@@ -188,9 +203,7 @@ class BookDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
     """
     V2: Enhanced Book Detail with nested objects
     """
-    queryset = Book.objects.select_related('author').prefetch_related(
-        'genres', 'reviews'
-    ).all()
+    queryset = Book.objects.select_related('author').prefetch_related('genres').all()
     serializer_class = BookDetailSerializerV2
     
     def retrieve(self, request, *args, **kwargs):
@@ -203,18 +216,18 @@ class BookDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
         )
         
         try:
-            instance = self.get_object()
-            serializer = self.get_serializer(instance)
+            # ETag/304: bitta PK lookup, body ETag bo'yicha cache'da (books/conditional.py)
+            response = book_response(request, book_id, lambda: {
+                'version': 'v2',
+                'data': self.get_serializer(self.get_object()).data
+            })
             
             logger.info(
-                f"Book retrieved: {instance.title}",
-                extra={'book_id': book_id, 'title': instance.title}
+                f"Book retrieved: ID={book_id} ({response.status_code})",
+                extra={'book_id': book_id, 'status': response.status_code}
             )
             
-            return Response({
-                'version': 'v2',
-                'data': serializer.data
-            })
+            return response
             
         except Exception as e:
             logger.error(
@@ -302,13 +315,16 @@ class BookStatisticsAPIView(APIView):
         try:
             from books.models import Review
             
-            # Book statistics
+            # Book statistics (rating summary - denormalized ustunlardan)
             book_stats = Book.objects.aggregate(
                 total_books=Count('id'),
                 average_price=Avg('price'),
                 max_price=Max('price'),
                 min_price=Min('price'),
                 total_pages=Sum('pages'),
+                with_reviews=Count('id', filter=Q(rating_count__gt=0)),
+                total_reviews=Sum('rating_count'),
+                rating_sum=Sum('rating_sum'),
             )
             
             # Author statistics
@@ -320,18 +336,13 @@ class BookStatisticsAPIView(APIView):
             # Genre statistics
             genre_count = Genre.objects.count()
             
-            # Review statistics
+            # Review statistics (faqat min/max reviews jadvalidan)
             review_stats = Review.objects.aggregate(
-                total_reviews=Count('id'),
-                average_rating=Avg('rating'),
                 max_rating=Max('rating'),
                 min_rating=Min('rating'),
             )
-            
-            # Books with reviews
-            books_with_reviews = Book.objects.annotate(
-                review_count=Count('reviews')
-            ).filter(review_count__gt=0).count()
+            total_reviews = book_stats['total_reviews'] or 0
+            average_rating = book_stats['rating_sum'] / total_reviews if total_reviews else 0
             
             statistics = {
                 'version': 'v2',
@@ -342,7 +353,7 @@ class BookStatisticsAPIView(APIView):
                         'max_price': float(book_stats['max_price']) if book_stats['max_price'] else 0,
                         'min_price': float(book_stats['min_price']) if book_stats['min_price'] else 0,
                         'total_pages': book_stats['total_pages'] or 0,
-                        'with_reviews': books_with_reviews,
+                        'with_reviews': book_stats['with_reviews'],
                     },
                     'authors': {
                         'total': author_count,
@@ -352,8 +363,8 @@ class BookStatisticsAPIView(APIView):
                         'total': genre_count,
                     },
                     'reviews': {
-                        'total': review_stats['total_reviews'] or 0,
-                        'average_rating': round(float(review_stats['average_rating']), 2) if review_stats['average_rating'] else 0,
+                        'total': total_reviews,
+                        'average_rating': round(average_rating, 2),
                         'max_rating': review_stats['max_rating'] or 0,
                         'min_rating': review_stats['min_rating'] or 0,
                     }
@@ -373,22 +384,22 @@ class BookStatisticsAPIView(APIView):
                 exc_info=True
             )
             raise
-class AuthorListAPIView(generics.ListCreateAPIView):
+class AuthorListAPIView(CachedListMixin, AnnotatedQuerysetMixin, generics.ListCreateAPIView):
     """
     V2: Enhanced Author List with search
     """
-    queryset = Author.objects.prefetch_related('books').all()
+    queryset = Author.objects.all()
     serializer_class = AuthorSerializerV2
     pagination_class = V2Pagination
     filter_backends = [filters.SearchFilter]
     search_fields = ['name', 'email', 'bio']
 
 
-class AuthorDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
+class AuthorDetailAPIView(AnnotatedQuerysetMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     V2: Enhanced Author Detail
     """
-    queryset = Author.objects.prefetch_related('books').all()
+    queryset = Author.objects.all()
     serializer_class = AuthorSerializerV2
     
     def retrieve(self, request, *args, **kwargs):
@@ -405,14 +416,13 @@ class AuthorBooksAPIView(generics.ListAPIView):
     """
     V2: List all books by specific author
     """
+    queryset = Book.objects.select_related('author').prefetch_related('genres')
     serializer_class = BookListSerializerV2
     pagination_class = V2Pagination
     
     def get_queryset(self):
         author_id = self.kwargs['pk']
-        return Book.objects.filter(author_id=author_id).select_related(
-            'author'
-        ).prefetch_related('genres')
+        return super().get_queryset().filter(author_id=author_id)
     
     def list(self, request, *args, **kwargs):
         """Custom response with author info"""
@@ -458,28 +468,66 @@ class APIMetricsView(APIView):
     
     def get(self, request):
         """Get API usage statistics"""
-        from django.core.cache import cache
-        from datetime import date, timedelta
-        
-        today = date.today()
-        metrics = {}
-        
-        # Get last 7 days metrics
-        for i in range(7):
-            day = today - timedelta(days=i)
-            v1_key = f'api_usage:v1:{day}'
-            v2_key = f'api_usage:v2:{day}'
-            
-            metrics[str(day)] = {
-                'v1': cache.get(v1_key, 0),
-                'v2': cache.get(v2_key, 0)
-            }
+        usage = recorder.usage(days=7)
+        metrics = {
+            day: {version: counts['requests'] for version, counts in versions.items()}
+            for day, versions in usage.items()
+        }
         
         return Response({
             'version': 'v2',
             'metrics': metrics,
             'message': 'Last 7 days API usage'
         })
+
+
+class APIVersionUsageView(APIView):
+    """
+    Admin only: API version usage - requests va unique users (kunlik + jami)
+    
+    unique_users faqat kunlik (HyperLogLog, ~0.8% xato) - kunlar bo'yicha
+    qo'shib bo'lmaydi, shuning uchun totals'da yo'q.
+    
+    Query params:
+        days: 1-7 (default 7)
+    """
+    permission_classes = [IsAdminUser]
+    
+    def get(self, request):
+        try:
+            days = min(max(int(request.query_params.get('days', 7)), 1), 7)
+        except ValueError:
+            days = 7
+        
+        usage = recorder.usage(days=days)
+        totals = {version: 0 for version in API_VERSIONS}
+        for versions in usage.values():
+            for version, counts in versions.items():
+                totals[version] += counts['requests']
+        
+        total = sum(totals.values())
+        return Response({
+            'days': days,
+            'usage': usage,
+            'totals': {
+                version: {
+                    'requests': requests,
+                    'share': round(requests / total * 100, 2) if total else 0,
+                }
+                for version, requests in totals.items()
+            },
+        })
+
+
+class ListCacheMetricsView(APIView):
+    """
+    Admin only: list response cache - har bir view uchun hit/miss/refresh/wait/
+    not_modified (barcha worker'lar) va hit_ratio
+    """
+    permission_classes = [IsAdminUser]
+    
+    def get(self, request):
+        return Response({'views': list_cache_metrics.report()})
     
 class BookReviewsAPIView(generics.ListCreateAPIView):
     """
@@ -0,0 +1,213 @@
+"""
+API version usage metrics
+
+APIVersionMetricsMiddleware har bir request'da cache'ga yozmaydi: hisoblar
+worker ichida yig'iladi (``VersionMetricsRecorder``) va ``flush_interval``
+soniyada yoki ``max_pending`` ta request'da bir marta sink'ga yoziladi.
+
+- Redis (django-redis): bitta pipeline - ``INCRBY`` (request soni) va
+  ``PFADD`` (unique user'lar, HyperLogLog - version/kun uchun ~12KB,
+  user soniga bog'liq emas, ~0.8% xato).
+- Boshqa cache backend'lar (test, development LocMemCache): soni
+  ``cache.add``/``cache.incr`` bilan, unique user'lar process ichida.
+
+Key'lar: ``api_usage:{version}:{day}`` va ``api_users:{version}:{day}``.
+Flush qilinmagan hisoblar worker to'xtaganda yo'qolishi mumkin
+(``atexit`` da flush qilinadi) - metrika, kritik emas.
+"""
+from collections import Counter, defaultdict
+from datetime import date, timedelta
+from threading import Lock
+import atexit
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from utils.cache import LocalLRUCache
+
+
+logger = logging.getLogger(__name__)
+
+API_VERSIONS = ('v1', 'v2')
+METRICS_TTL = 86400 * 7  # 7 kun saqlanadi
+
+
+def usage_key(version, day):
+    return f'api_usage:{version}:{day}'
+
+
+def users_key(version, day):
+    return f'api_users:{version}:{day}'
+
+
+# ============================================================================
+# SINKS
+# ============================================================================
+
+class RedisMetricsSink:
+    """INCRBY + PFADD - bitta pipeline, bitta round-trip"""
+
+    def __init__(self, alias='default'):
+        from django_redis import get_redis_connection
+
+        self.cache = caches[alias]
+        self.client = get_redis_connection(alias)
+
+    def write(self, counts, users):
+        pipe = self.client.pipeline(transaction=False)
+        for key, amount in counts.items():
+            key = self.cache.make_key(key)
+            pipe.incrby(key, amount)
+            pipe.expire(key, METRICS_TTL)
+        for key, user_ids in users.items():
+            key = self.cache.make_key(key)
+            pipe.pfadd(key, *user_ids)
+            pipe.expire(key, METRICS_TTL)
+        pipe.execute()
+
+    def read(self, keys):
+        """{usage key: (requests, unique users)}"""
+        pipe = self.client.pipeline(transaction=False)
+        for key in keys:
+            pipe.get(self.cache.make_key(usage_key(*key)))
+            pipe.pfcount(self.cache.make_key(users_key(*key)))
+        values = pipe.execute()
+        return {
+            key: (int(values[i * 2] or 0), int(values[i * 2 + 1] or 0))
+            for i, key in enumerate(keys)
+        }
+
+
+class LocalMetricsSink:
+    """Cache add/incr + process ichidagi user to'plamlari (test/development)"""
+
+    def __init__(self, alias='default'):
+        self.cache = caches[alias]
+        self._users = LocalLRUCache(maxsize=len(API_VERSIONS) * 8, ttl=METRICS_TTL)
+        self._lock = Lock()
+
+    def write(self, counts, users):
+        for key, amount in counts.items():
+            if not self.cache.add(key, amount, timeout=METRICS_TTL):
+                try:
+                    self.cache.incr(key, amount)
+                except ValueError:
+                    # add va incr orasida key muddati tugadi
+                    self.cache.set(key, amount, timeout=METRICS_TTL)
+        with self._lock:
+            for key, user_ids in users.items():
+                known = self._users.get(key)
+                if known is None:
+                    known = set()
+                    self._users.set(key, known)
+                known.update(user_ids)
+
+    def read(self, keys):
+        return {
+            key: (
+                self.cache.get(usage_key(*key), 0),
+                len(self._users.get(users_key(*key)) or ()),
+            )
+            for key in keys
+        }
+
+
+def create_sink(alias='default'):
+    cache = caches[alias]
+    if type(cache).__module__.startswith('django_redis'):
+        return RedisMetricsSink(alias)
+    return LocalMetricsSink(alias)
+
+
+# ============================================================================
+# RECORDER - per-worker buffer
+# ============================================================================
+
+class VersionMetricsRecorder:
+    """
+    Request'larni xotirada yig'ib, davriy ravishda sink'ga yozadi
+
+    ``record()`` faqat lock ostida Counter/set yangilaydi; sink'ga yozish
+    lock'dan tashqarida, ``flush_interval`` da bir marta.
+    """
+
+    def __init__(self, sink=None, flush_interval=None, max_pending=None, clock=time.monotonic):
+        self._sink = sink
+        self.flush_interval = (
+            getattr(settings, 'API_METRICS_FLUSH_INTERVAL', 10)
+            if flush_interval is None else flush_interval
+        )
+        self.max_pending = (
+            getattr(settings, 'API_METRICS_FLUSH_MAX_PENDING', 1000)
+            if max_pending is None else max_pending
+        )
+        self.clock = clock
+        self._lock = Lock()
+        self._reset()
+
+    @property
+    def sink(self):
+        if self._sink is None:
+            self._sink = create_sink()
+        return self._sink
+
+    def _reset(self):
+        self._counts = Counter()
+        self._users = defaultdict(set)
+        self._pending = 0
+        self._last_flush = self.clock()
+
+    def record(self, version, user_id=None):
+        day = date.today()
+        with self._lock:
+            self._counts[usage_key(version, day)] += 1
+            if user_id is not None:
+                self._users[users_key(version, day)].add(user_id)
+            self._pending += 1
+            due = (
+                self._pending >= self.max_pending
+                or self.clock() - self._last_flush >= self.flush_interval
+            )
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            counts, users = self._counts, self._users
+            self._reset()
+        if not counts and not users:
+            return
+        try:
+            self.sink.write(counts, users)
+        except Exception as exc:
+            # Metrika request'ni buzmasligi kerak - bu batch tashlab yuboriladi
+            logger.warning(f'API metrics flush failed: {exc}')
+
+    def usage(self, days=7, versions=API_VERSIONS):
+        """
+        {day: {version: {'requests': n, 'unique_users': n}}} - oxirgi ``days`` kun
+
+        Avval shu worker'ning buffer'i flush qilinadi.
+        """
+        self.flush()
+        today = date.today()
+        keys = [
+            (version, today - timedelta(days=offset))
+            for offset in range(days)
+            for version in versions
+        ]
+        values = self.sink.read(keys)
+
+        usage = {}
+        for (version, day), (requests, unique_users) in values.items():
+            usage.setdefault(str(day), {})[version] = {
+                'requests': requests,
+                'unique_users': unique_users,
+            }
+        return usage
+
+
+recorder = VersionMetricsRecorder()
+atexit.register(recorder.flush)
@@ -7,4 +7,11 @@ class BooksConfig(AppConfig):
 
     def ready(self):
         """Import signals when app is ready"""
-        import books.signals 
\ No newline at end of file
+        import books.signals
+        import books.checks
+        import books.autocomplete
+        import books.search_backends
+        import books.hot_cache
+
+        from books.counting import track_counted_models
+        track_counted_models()
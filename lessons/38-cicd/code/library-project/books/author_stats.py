@@ -0,0 +1,178 @@
+"""
+Incremental author statistics
+
+``Author.total_books`` va ``Author.available_books`` har bir Book yozuvida
+COUNT(*) bilan qayta hisoblanmaydi. Buning o'rniga eski va yangi qiymatlardan
+delta hisoblanadi va ``F()`` bilan qo'shiladi.
+
+Transaction ichida delta'lar yig'iladi va commit paytida har bir muallif
+uchun bitta UPDATE bajariladi (10k kitob import - bir nechta UPDATE).
+Transaction yoki savepoint rollback bo'lsa, uning delta'lari tashlab
+yuboriladi (har bir savepoint - alohida batch).
+
+Drift bo'lsa: ``python manage.py recompute_author_stats``
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from .models import Author, Book
+
+
+class AuthorStatsBatch:
+    """Bitta transaction davomida yig'ilgan delta'lar"""
+
+    def __init__(self, using):
+        self.using = using
+        self.deltas = defaultdict(lambda: [0, 0])  # author_id -> [total, available]
+        self.flushed = False
+
+    def add(self, author_id, total=0, available=0):
+        delta = self.deltas[author_id]
+        delta[0] += total
+        delta[1] += available
+
+    def flush(self):
+        """Har bir muallif uchun bitta UPDATE"""
+        self.flushed = True
+
+        for author_id, (total, available) in self.deltas.items():
+            if not total and not available:
+                continue
+            Author.objects.using(self.using).filter(pk=author_id).update(
+                total_books=F('total_books') + total,
+                available_books=F('available_books') + available,
+            )
+
+
+def transaction_batch(using, factory, attr):
+    """
+    Joriy transaction / savepoint uchun batch (``factory(using)``)
+
+    Har bir savepoint darajasi o'z batch'iga ega, uning flush() i shu
+    savepoint ichida on_commit ga bir marta qo'shiladi. Savepoint rollback
+    bo'lsa Django callback'ni (va delta'larni) tashlab yuboradi; release
+    bo'lsa callback tashqi transaction'ga o'tadi va commit'da ishlaydi.
+    Tashqi darajadagi batch savepoint ichida ishlatilmaydi - aks holda
+    rollback qilingan delta'lar ham commit'da yozilib ketardi.
+
+    Batch'lar connection'da ``attr`` nomi bilan saqlanadi
+    (``{savepoint_ids: batch}``).
+    """
+    connection = transaction.get_connection(using)
+    batches = getattr(connection, attr, None)
+    if batches is None:
+        batches = {}
+        setattr(connection, attr, batches)
+
+    key = tuple(connection.savepoint_ids)
+    batch = batches.get(key)
+    pending = [entry[1] for entry in connection.run_on_commit]
+    if batch is None or batch.flushed or batch.flush not in pending:
+        # Flush bo'lgan yoki rollback'da tashlangan batch'lar
+        for stale in [k for k, b in batches.items() if b.flushed or b.flush not in pending]:
+            del batches[stale]
+        batch = factory(using)
+        batches[key] = batch
+        transaction.on_commit(batch.flush, using=using)
+
+    return batch
+
+
+def _current_batch(using):
+    return transaction_batch(using, AuthorStatsBatch, '_author_stats_batch')
+
+
+def record_author_stats_delta(author_id, total=0, available=0, using='default'):
+    """Delta'ni yozish - autocommit rejimida darhol, aks holda commit'da"""
+    if not author_id or (not total and not available):
+        return
+
+    connection = transaction.get_connection(using)
+    if not connection.in_atomic_block:
+        batch = AuthorStatsBatch(using)
+        batch.add(author_id, total, available)
+        batch.flush()
+        return
+
+    _current_batch(using).add(author_id, total, available)
+
+
+def _tracked_state(instance, update_fields=None):
+    """(eski, yangi) (author_id, is_available) juftligi"""
+    new_author = instance.author_id
+    new_available = bool(instance.is_available)
+    old_author = instance.get_loaded_value('author_id', new_author)
+    old_available = bool(instance.get_loaded_value('is_available', new_available))
+
+    # update_fields da yo'q maydonlar DB'da o'zgarmaydi
+    if update_fields is not None:
+        if 'author' not in update_fields and 'author_id' not in update_fields:
+            new_author = old_author
+        if 'is_available' not in update_fields:
+            new_available = old_available
+
+    return (old_author, old_available), (new_author, new_available)
+
+
+def book_saved(instance, created, update_fields=None, using='default'):
+    """Book post_save - delta hisoblash"""
+    if created:
+        record_author_stats_delta(
+            instance.author_id, total=1, available=int(bool(instance.is_available)), using=using
+        )
+        return
+
+    (old_author, old_available), (new_author, new_available) = _tracked_state(
+        instance, update_fields
+    )
+
+    if old_author != new_author:
+        record_author_stats_delta(old_author, total=-1, available=-int(old_available), using=using)
+        record_author_stats_delta(new_author, total=1, available=int(new_available), using=using)
+    elif old_available != new_available:
+        record_author_stats_delta(
+            new_author, available=int(new_available) - int(old_available), using=using
+        )
+
+
+def book_deleted(instance, using='default'):
+    """Book post_delete - delta hisoblash"""
+    author_id = instance.get_loaded_value('author_id', instance.author_id)
+    available = instance.get_loaded_value('is_available', instance.is_available)
+    record_author_stats_delta(author_id, total=-1, available=-int(bool(available)), using=using)
+
+
+def recompute_author_stats(batch_size=500):
+    """
+    Barcha mualliflar statistikasini qayta hisoblash (drift repair)
+
+    Bitta grouped aggregate query, so'ng faqat farq qilgan mualliflar
+    bulk_update qilinadi. Tuzatilgan mualliflar sonini qaytaradi.
+    """
+    counts = {
+        row['author_id']: (row['total'], row['available'])
+        for row in Book.objects.filter(author__isnull=False)
+        .order_by()
+        .values('author_id')
+        .annotate(
+            total=Count('id'),
+            available=Count('id', filter=Q(is_available=True)),
+        )
+    }
+
+    drifted = []
+    for author in Author.objects.only('id', 'total_books', 'available_books').iterator(
+        chunk_size=batch_size
+    ):
+        total, available = counts.get(author.id, (0, 0))
+        if author.total_books != total or author.available_books != available:
+            author.total_books = total
+            author.available_books = available
+            drifted.append(author)
+
+    Author.objects.bulk_update(
+        drifted, ['total_books', 'available_books'], batch_size=batch_size
+    )
+    return len(drifted)
@@ -0,0 +1,327 @@
+"""
+In-process autocomplete - sorted array prefix index
+
+BookViewSet.autocomplete eng ko'p chaqiriladigan endpoint (har bir
+klavish). Har safar ES completion suggester'iga borish o'rniga har bir
+worker xotirasida kitob nomlari indeksi saqlanadi:
+
+- ``_keys``: normalizatsiya qilingan nomlar (casefold, diakritikasiz,
+  bitta bo'sh joy) + ``\\x00`` + book id - saralangan ro'yxat; prefix
+  diapazoni ikki ``bisect`` bilan topiladi
+- ``_weights``: mashhurlik - borrow soni (BorrowHistory)
+- diapazoni ``MEMO_SCAN_THRESHOLD`` dan katta prefix'lar ('a' - minglab
+  nom) uchun eng og'ir ``CANDIDATES`` ta kitob qurish paytida bolalar
+  natijasidan (pastdan yuqoriga) hisoblanadi; qolgan prefix'lar - kichik
+  diapazon skani. Borrow yoki yangi kitob memo'dagi top'larga joyida
+  qo'shiladi; top'dan kitob chiqsa (delete, rename) faqat shu prefix'lar
+  memo'si o'chiriladi va keyingi so'rovda qayta hisoblanadi
+
+Indeks birinchi so'rovda quriladi va ``AUTOCOMPLETE_REFRESH_INTERVAL``
+soniyada fon thread'ida qayta quriladi (boshqa worker'lardagi
+o'zgarishlar uchun). Shu worker'dagi Book/BorrowHistory yozuvlari signal
+orqali darhol qo'llanadi. Prefix topilmasa - ES fuzzy fallback (view'da).
+"""
+from bisect import bisect_left, bisect_right
+from heapq import nlargest
+from threading import Lock, RLock, Thread
+import logging
+import time
+import unicodedata
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count
+from django.db.models.signals import post_delete, post_save
+
+from .models import Book, BorrowHistory
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LIMIT = 5
+CANDIDATES = 16           # prefix uchun saqlanadigan top kitoblar (bir xil nomlar takrori uchun zaxira)
+MEMO_SCAN_THRESHOLD = 64  # bundan katta diapazonlar top'i memo'lanadi
+KEY_SEPARATOR = '\x00'
+KEY_END = '\U0010ffff'
+
+
+def normalize_title(title):
+    """'  Ōliy  MATEMATIKA ' -> 'oliy matematika'"""
+    decomposed = unicodedata.normalize('NFKD', title or '')
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(stripped.casefold().split())
+
+
+def _sort_key(book_id, title):
+    return f'{normalize_title(title)}{KEY_SEPARATOR}{book_id}'
+
+
+class AutocompleteIndex:
+    """
+    Usage:
+        index = AutocompleteIndex()
+        index.build([(1, 'Python Crash Course', 12), ...])
+        index.suggest('pyth')  # ['Python Crash Course', ...]
+    """
+
+    def __init__(self, refresh_interval=None, clock=time.monotonic):
+        self.refresh_interval = refresh_interval
+        self.clock = clock
+        self._lock = RLock()
+        self._refresh_lock = Lock()
+        self._built_at = None
+        self._reset()
+
+    def _reset(self):
+        self._keys = []
+        self._ids = []
+        self._weights = []
+        self._titles = {}   # book_id -> (sort key, asl nom)
+        self._memo = {}     # prefix -> top CANDIDATES book id'lari
+
+    def clear(self):
+        with self._lock:
+            self._reset()
+            self._built_at = None
+
+    @property
+    def is_built(self):
+        return self._built_at is not None
+
+    def __len__(self):
+        return len(self._keys)
+
+    # ------------------------------------------------------------------
+    # BUILD
+    # ------------------------------------------------------------------
+
+    def build(self, rows):
+        """rows: (book_id, title, weight) - to'liq qayta qurish"""
+        entries = sorted((_sort_key(book_id, title), book_id, title, weight) for book_id, title, weight in rows)
+        keys = [entry[0] for entry in entries]
+        ids = [entry[1] for entry in entries]
+        weights = [entry[3] for entry in entries]
+        titles = {entry[1]: (entry[0], entry[2]) for entry in entries}
+        memo = {}
+        if keys:
+            _precompute(keys, ids, weights, 0, len(keys), 0, memo)
+
+        with self._lock:
+            self._keys, self._ids, self._weights, self._titles = keys, ids, weights, titles
+            self._memo = memo
+            self._built_at = self.clock()
+
+    def build_from_db(self):
+        rows = (
+            Book.objects.order_by()
+            .annotate(borrows=Count('borrow_history'))
+            .values_list('id', 'title', 'borrows')
+        )
+        self.build(rows.iterator(chunk_size=5000))
+
+    def ensure_built(self):
+        """Birinchi so'rovda qurish; muddati o'tganda fon thread'ida yangilash"""
+        if not self.is_built:
+            with self._refresh_lock:
+                if not self.is_built:
+                    self.build_from_db()
+            return
+
+        if self.refresh_interval and self.clock() - self._built_at >= self.refresh_interval:
+            if self._refresh_lock.acquire(blocking=False):
+                Thread(target=self._background_refresh, daemon=True).start()
+
+    def _background_refresh(self):
+        try:
+            self.build_from_db()
+        except Exception as e:
+            logger.warning(f"Autocomplete index refresh failed: {e}")
+        finally:
+            # Thread'ning o'z connection'i - request_finished yopmaydi, CONN_MAX_AGE'da qolib ketadi
+            connection.close()
+            self._refresh_lock.release()
+
+    # ------------------------------------------------------------------
+    # QUERY
+    # ------------------------------------------------------------------
+
+    def suggest(self, query, limit=DEFAULT_LIMIT):
+        """Prefix bo'yicha eng mashhur ``limit`` ta nom (takrorlarsiz)"""
+        prefix = normalize_title(query)
+        if not prefix:
+            return []
+
+        with self._lock:
+            if limit * 3 > CANDIDATES:
+                book_ids = self._scan(prefix, limit * 3)
+            else:
+                book_ids = self._memo.get(prefix)
+                if book_ids is None:
+                    book_ids = self._scan(prefix, CANDIDATES, memoize=True)
+
+            results, seen = [], set()
+            for book_id in book_ids:
+                key, title = self._titles[book_id]
+                normalized = key.partition(KEY_SEPARATOR)[0]
+                if normalized not in seen:
+                    seen.add(normalized)
+                    results.append(title)
+                    if len(results) == limit:
+                        break
+            return results
+
+    def _scan(self, prefix, count, memoize=False):
+        lo = bisect_left(self._keys, prefix)
+        hi = bisect_right(self._keys, prefix + KEY_END, lo)
+        weights = self._weights
+        positions = nlargest(count, range(lo, hi), key=lambda i: (weights[i], -i))
+        book_ids = tuple(self._ids[i] for i in positions)
+        if memoize and hi - lo > MEMO_SCAN_THRESHOLD:
+            self._memo[prefix] = book_ids
+        return book_ids
+
+    # ------------------------------------------------------------------
+    # INCREMENTAL UPDATES
+    # ------------------------------------------------------------------
+
+    def _invalidate(self, key):
+        """Kitob kalitining barcha prefix'lari memo'sini o'chirish"""
+        normalized = key.partition(KEY_SEPARATOR)[0]
+        for end in range(1, len(normalized) + 1):
+            self._memo.pop(normalized[:end], None)
+
+    def _rank(self, book_id):
+        key = self._titles[book_id][0]
+        position = bisect_left(self._keys, key)
+        return (self._weights[position], -position)
+
+    def _promote(self, book_id):
+        """
+        Og'irligi oshgan (yoki yangi) kitobni memo'dagi top'larga qo'shish -
+        'a' kabi katta prefix'lar qayta skan qilinmaydi
+        """
+        key = self._titles[book_id][0]
+        normalized = key.partition(KEY_SEPARATOR)[0]
+        rank = self._rank(book_id)
+        for end in range(1, len(normalized) + 1):
+            prefix = normalized[:end]
+            top = self._memo.get(prefix)
+            if top is None:
+                continue
+            if book_id in top or len(top) < CANDIDATES or rank > self._rank(top[-1]):
+                candidates = set(top)
+                candidates.add(book_id)
+                self._memo[prefix] = tuple(nlargest(CANDIDATES, candidates, key=self._rank))
+
+    def _remove(self, book_id):
+        entry = self._titles.pop(book_id, None)
+        if entry is None:
+            return 0
+        key = entry[0]
+        position = bisect_left(self._keys, key)
+        weight = self._weights[position]
+        del self._keys[position], self._ids[position], self._weights[position]
+        # Top'dan chiqqan kitob o'rniga kim kelishi noma'lum - faqat shu memo'lar o'chiriladi
+        normalized = key.partition(KEY_SEPARATOR)[0]
+        for end in range(1, len(normalized) + 1):
+            top = self._memo.get(normalized[:end])
+            if top is not None and book_id in top:
+                del self._memo[normalized[:end]]
+        return weight
+
+    def upsert(self, book_id, title, weight=None):
+        """Yangi yoki nomi o'zgargan kitob; weight=None - oldingisini saqlash"""
+        with self._lock:
+            key = _sort_key(book_id, title)
+            current = self._titles.get(book_id)
+            if current == (key, title) and weight is None:
+                return
+            old_weight = self._remove(book_id)
+            weight = old_weight if weight is None else weight
+
+            position = bisect_left(self._keys, key)
+            self._keys.insert(position, key)
+            self._ids.insert(position, book_id)
+            self._weights.insert(position, weight)
+            self._titles[book_id] = (key, title)
+            self._promote(book_id)
+
+    def remove(self, book_id):
+        with self._lock:
+            self._remove(book_id)
+
+    def add_weight(self, book_id, delta=1):
+        with self._lock:
+            entry = self._titles.get(book_id)
+            if entry is None:
+                return
+            position = bisect_left(self._keys, entry[0])
+            self._weights[position] += delta
+            if delta > 0:
+                self._promote(book_id)
+            else:
+                self._invalidate(entry[0])
+
+
+def _precompute(keys, ids, weights, lo, hi, depth, memo):
+    """
+    [lo, hi) - ``keys[lo][:depth]`` prefix'li diapazon. Top pozitsiyalarni
+    qaytaradi; diapazoni katta prefix'lar top'ini ``memo`` ga yozadi.
+    Bolalar (keyingi belgi bo'yicha guruhlar) top'laridan birlashtiriladi.
+    """
+    def rank(i):
+        return (weights[i], -i)
+
+    if hi - lo <= MEMO_SCAN_THRESHOLD:
+        return nlargest(CANDIDATES, range(lo, hi), key=rank)
+
+    candidates = []
+    position = lo
+    while position < hi:
+        key = keys[position]
+        char = key[depth]
+        if char == KEY_SEPARATOR:
+            # Nom shu prefix'da tugaydi (bir xil nomli nashrlar) - bolalari yo'q
+            child_hi = bisect_right(keys, key[:depth] + KEY_SEPARATOR + KEY_END, position, hi)
+            candidates.extend(nlargest(CANDIDATES, range(position, child_hi), key=rank))
+        else:
+            child_hi = bisect_left(keys, key[:depth] + chr(ord(char) + 1), position, hi)
+            candidates.extend(_precompute(keys, ids, weights, position, child_hi, depth + 1, memo))
+        position = child_hi
+
+    top = nlargest(CANDIDATES, candidates, key=rank)
+    if depth:
+        memo[keys[lo][:depth]] = tuple(ids[i] for i in top)
+    return top
+
+
+autocomplete_index = AutocompleteIndex(
+    refresh_interval=getattr(settings, 'AUTOCOMPLETE_REFRESH_INTERVAL', 300),
+)
+
+
+# ============================================================================
+# SIGNALS - shu worker'dagi yozuvlar commit'dan keyin darhol
+# ============================================================================
+
+def _book_saved(sender, instance, **kwargs):
+    if autocomplete_index.is_built:
+        book_id, title = instance.pk, instance.title
+        transaction.on_commit(lambda: autocomplete_index.upsert(book_id, title))
+
+
+def _book_deleted(sender, instance, **kwargs):
+    if autocomplete_index.is_built:
+        book_id = instance.pk
+        transaction.on_commit(lambda: autocomplete_index.remove(book_id))
+
+
+def _borrow_created(sender, instance, created, **kwargs):
+    if created and autocomplete_index.is_built:
+        book_id = instance.book_id
+        transaction.on_commit(lambda: autocomplete_index.add_weight(book_id))
+
+
+post_save.connect(_book_saved, sender=Book, dispatch_uid='autocomplete_book_saved')
+post_delete.connect(_book_deleted, sender=Book, dispatch_uid='autocomplete_book_deleted')
+post_save.connect(_borrow_created, sender=BorrowHistory, dispatch_uid='autocomplete_borrow_created')
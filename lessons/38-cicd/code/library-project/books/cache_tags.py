@@ -0,0 +1,155 @@
+"""
+Tag-based cache invalidation
+
+Har bir cache yozuvi bir nechta tag (masalan ``book:5``, ``author:2``,
+``books:list``) ostida saqlanadi. Har bir tag o'zining "generation" raqamiga
+ega va u cache key ichiga qo'shiladi. Invalidation - bu faqat tag raqamini
+oshirish (``INCR``), shuning uchun Book yozilganda Redis ``KEYS`` scan
+qilinmaydi: har bir yozuv uchun operatsiyalar soni o'zgarmas.
+
+Eski yozuvlar o'chirilmaydi - ular endi hech qachon o'qilmaydi va TTL
+tugaganda o'z-o'zidan yo'qoladi.
+
+Django cache API ustida ishlaydi: production'da django-redis, test va
+development'da LocMemCache.
+"""
+import logging
+import time
+
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+
+# Tag nomlari
+BOOK_TAG = 'book:{id}'
+AUTHOR_TAG = 'author:{id}'
+BOOKS_LIST_TAG = 'books:list'
+BOOKS_SEARCH_TAG = 'books:search'
+# Book representation'iga ta'sir qiladigan har qanday yozuv (list cache key/ETag, books/list_cache.py)
+BOOKS_COLLECTION_TAG = 'books:collection'
+GENRES_TAG = 'genres'
+MODEL_TAG = 'model:{label}'
+
+TAG_VERSION_PREFIX = 'tagver'
+
+
+def book_tag(book_id):
+    return BOOK_TAG.format(id=book_id)
+
+
+def author_tag(author_id):
+    return AUTHOR_TAG.format(id=author_id)
+
+
+def model_tag(model):
+    """Butun jadval uchun tag (masalan, paginator count cache'i)"""
+    return MODEL_TAG.format(label=model._meta.label_lower)
+
+
+class TaggedCache:
+    """
+    Generation counter asosidagi cache
+
+    Usage:
+        tagged_cache.get_or_set(
+            'books:list:optimized:page=2',
+            lambda: list(queryset),
+            tags=[BOOKS_LIST_TAG],
+            timeout=300,
+        )
+        tagged_cache.invalidate(book_tag(5), BOOKS_LIST_TAG)
+    """
+
+    def __init__(self, alias='default', backend=None):
+        self.alias = alias
+        self.backend = backend
+        self.listeners = []
+
+    def add_listener(self, callback):
+        """``callback(tags)`` - har bir invalidate'dan keyin (masalan L1 cache, books/hot_cache.py)"""
+        self.listeners.append(callback)
+
+    @property
+    def cache(self):
+        if self.backend is not None:
+            return self.backend
+        return caches[self.alias]
+
+    @staticmethod
+    def _version_key(tag):
+        return f'{TAG_VERSION_PREFIX}:{tag}'
+
+    @staticmethod
+    def _fresh_version():
+        """
+        Yangi tag raqami - vaqtga asoslangan (nanosekund), shuning uchun
+        version key evict bo'lib qayta yaratilsa ham eski yozuvlar "tirilmaydi"
+        """
+        return time.time_ns()
+
+    def get_versions(self, tags):
+        """Barcha tag raqamlarini bitta get_many bilan olish"""
+        keys = [self._version_key(tag) for tag in tags]
+        versions = self.cache.get_many(keys)
+
+        for key in keys:
+            if key not in versions:
+                fresh = self._fresh_version()
+                # add() - boshqa worker allaqachon yaratgan bo'lsa, uni buzmaydi
+                if not self.cache.add(key, fresh, timeout=None):
+                    fresh = self.cache.get(key, fresh)
+                versions[key] = fresh
+
+        return [versions[key] for key in keys]
+
+    def make_key(self, key, tags):
+        """Tag raqamlarini key ichiga qo'shish"""
+        tags = sorted(tags)
+        if not tags:
+            return key
+        versions = self.get_versions(tags)
+        stamp = '.'.join(str(v) for v in versions)
+        return f'{key}|{stamp}'
+
+    def get(self, key, tags, default=None):
+        return self.cache.get(self.make_key(key, tags), default)
+
+    def set(self, key, value, tags, timeout=300):
+        self.cache.set(self.make_key(key, tags), value, timeout=timeout)
+
+    def get_or_set(self, key, factory, tags, timeout=300):
+        """Cache'dan olish, bo'lmasa factory() natijasini saqlash"""
+        versioned_key = self.make_key(key, tags)
+        value = self.cache.get(versioned_key)
+
+        if value is None:
+            value = factory()
+            self.cache.set(versioned_key, value, timeout=timeout)
+
+        return value
+
+    def invalidate(self, *tags):
+        """
+        Tag'larni bekor qilish - har bir tag uchun bitta INCR
+
+        Redis'da INCR atomic, shuning uchun parallel yozuvlar raqamni
+        yo'qotmaydi.
+        """
+        for tag in set(tags):
+            key = self._version_key(tag)
+            try:
+                self.cache.incr(key)
+            except ValueError:
+                # Tag hali yaratilmagan yoki evict bo'lgan
+                self.cache.set(key, self._fresh_version(), timeout=None)
+
+        for listener in self.listeners:
+            try:
+                listener(set(tags))
+            except Exception as e:
+                # Yozuv muvaffaqiyatli - listener xatosi uni buzmasligi kerak
+                logger.warning(f"Cache invalidation listener failed: {e}")
+
+
+tagged_cache = TaggedCache()
@@ -0,0 +1,104 @@
+"""
+System checks
+
+KeysetPagination ishlatadigan har bir view uchun ordering ustunlari index
+bilan qoplanganini startup paytida tekshiradi: index'siz seek har bir
+sahifada to'liq scan + sort bo'ladi.
+"""
+from django.core import checks
+from django.core.exceptions import FieldDoesNotExist
+from django.urls import URLPattern, URLResolver, get_resolver
+
+from .pagination import KeysetPagination
+
+
+def _iter_view_classes(patterns):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from _iter_view_classes(pattern.url_patterns)
+        elif isinstance(pattern, URLPattern):
+            view_class = getattr(pattern.callback, 'cls', None)
+            if view_class is not None:
+                yield view_class
+
+
+def _column(model, name):
+    """(ustun nomi, desc) - 'user' va 'user_id' bir xil ustun"""
+    desc = name.startswith('-')
+    name = name.lstrip('-')
+    if name == 'pk':
+        return model._meta.pk.name, desc
+    return model._meta.get_field(name).name, desc
+
+
+def _index_columns(model):
+    """Modelning barcha index'lari ustunlar ro'yxati sifatida"""
+    for index in model._meta.indexes:
+        yield [_column(model, name) for name in index.fields]
+    for field in model._meta.concrete_fields:
+        if field.primary_key or field.unique or field.db_index:
+            yield [(field.name, False)]
+    for fields in model._meta.unique_together:
+        yield [(name, False) for name in fields]
+
+
+def _covers(index, ordering):
+    """
+    ordering index ichida ketma-ket keladi (oldidagi ustunlar - equality
+    filter, masalan ``user``). B-tree ikkala yo'nalishda ham o'qiladi.
+    """
+    inverted = [(name, not desc) for name, desc in ordering]
+    size = len(ordering)
+    for start in range(len(index) - size + 1):
+        if index[start:start + size] in (ordering, inverted):
+            return True
+    return False
+
+
+def has_backing_index(model, ordering):
+    pk_name = model._meta.pk.name
+    columns = [_column(model, name) for name in ordering]
+    # Oxirgi pk tie-breaker - ordering ustunlari ichida kam takrorlanadi
+    while len(columns) > 1 and columns[-1][0] == pk_name:
+        columns.pop()
+    return any(_covers(index, columns) for index in _index_columns(model))
+
+
+@checks.register(checks.Tags.urls, checks.Tags.models)
+def check_keyset_pagination_indexes(app_configs=None, **kwargs):
+    errors = []
+    seen = set()
+
+    for view_class in _iter_view_classes(get_resolver().url_patterns):
+        pagination_class = getattr(view_class, 'pagination_class', None)
+        queryset = getattr(view_class, 'queryset', None)
+        if (
+            view_class in seen
+            or queryset is None
+            or not isinstance(pagination_class, type)
+            or not issubclass(pagination_class, KeysetPagination)
+        ):
+            continue
+        seen.add(view_class)
+
+        model = queryset.model
+        try:
+            covered = has_backing_index(model, pagination_class.ordering)
+        except FieldDoesNotExist as exc:
+            errors.append(checks.Error(
+                f'{pagination_class.__name__}.ordering: {exc}',
+                obj=view_class,
+                id='books.E002',
+            ))
+            continue
+
+        if not covered:
+            errors.append(checks.Error(
+                f'{view_class.__name__}: no index on {model._meta.label} backs keyset '
+                f'ordering {tuple(pagination_class.ordering)}',
+                hint='Add a models.Index with the ordering fields to Meta.indexes.',
+                obj=view_class,
+                id='books.E001',
+            ))
+
+    return errors
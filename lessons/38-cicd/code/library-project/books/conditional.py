@@ -0,0 +1,102 @@
+"""
+Conditional GET - ETag / Last-Modified for book endpoints
+
+Client'lar detail endpoint'larini so'rab turadi (polling). Har bir
+so'rovda kitobni nested author/genres bilan qayta serialize qilish o'rniga
+arzon versiya token'i hisoblanadi: ``updated_at`` (bitta PK lookup,
+``values_list``) + tagged_cache generation raqamlari: ``book:{id}`` (save,
+borrow, rating), ``author:{id}`` (muallif yozuvi) va ``genres`` (janr
+yozuvi) - bitta ``get_many``.
+
+List endpoint'lar - CachedListMixin (books/list_cache.py): ETag
+``books:collection`` generation'idan, body render qilingan baytlar.
+
+ETag = sha1(to'liq URL + renderer + versiyalar). ``If-None-Match``
+mos kelsa - 304, serializer chaqirilmaydi. Aks holda javob data'si shu ETag
+bo'yicha cache'dan olinadi (versiya o'zgarsa key ham o'zgaradi - eski
+yozuvlar TTL bilan yo'qoladi).
+
+``Last-Modified`` faqat ma'lumot uchun: related yozuvlar ``updated_at`` ni
+o'zgartirmaydi, shuning uchun ``If-Modified-Since`` bo'yicha 304 berilmaydi.
+
+Tag'lar commit'dan keyin bekor qilinadi (``books.models.invalidate_on_commit``,
+ratings): transaction ochiq paytda versiya oshsa, parallel request eski
+qatorni yangi ETag bilan cache'lab qo'yardi va u keyingi yozuvgacha qolardi.
+
+queryset.update() kabi signal'siz yozuvlar (masalan ``repair_book_ratings``)
+versiyani oshirmaydi - body cache ``CONDITIONAL_CACHE_TIMEOUT`` gacha eskiradi.
+Object-level permission'li view'larda ishlatilmaydi (304 yo'li get_object'siz).
+"""
+import hashlib
+
+from django.core.cache import cache
+from django.utils.http import http_date, parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from .cache_tags import tagged_cache, book_tag, author_tag, GENRES_TAG
+from .models import Book
+
+
+CONDITIONAL_CACHE_TIMEOUT = 300
+
+
+def make_etag(request, *versions):
+    """Representation'ni aniqlaydigan hamma narsa: URL, format, versiyalar"""
+    renderer = getattr(request, 'accepted_renderer', None)
+    # Host ham - sahifalash link'lari absolyut URL
+    parts = [request.build_absolute_uri(), getattr(renderer, 'format', ''), *versions]
+    digest = hashlib.sha1('|'.join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(request, etag):
+    header = request.headers.get('If-None-Match')
+    if not header:
+        return False
+    etags = parse_etags(header)
+    # W/"..." (masalan GZipMiddleware zaiflashtirgan) - weak comparison
+    return '*' in etags or etag in etags or f'W/{etag}' in etags
+
+
+def conditional_response(request, etag, build, last_modified=None, timeout=CONDITIONAL_CACHE_TIMEOUT):
+    """
+    304 (``build`` chaqirilmaydi) yoki ``build()`` data'si bilan 200
+
+    ``build`` - response data'sini qaytaradi (serializer.data yoki
+    sahifalangan dict); natija ETag bo'yicha cache'lanadi.
+    """
+    headers = {'ETag': etag}
+    if last_modified is not None:
+        headers['Last-Modified'] = http_date(last_modified.timestamp())
+
+    if etag_matches(request, etag):
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    key = f'conditional:{etag}'
+    data = cache.get(key)
+    if data is None:
+        data = build()
+        cache.set(key, data, timeout=timeout)
+    return Response(data, headers=headers)
+
+
+def book_response(request, book_id, build):
+    """
+    Book detail: bitta indexed lookup + bitta cache get_many
+
+    Kitob topilmasa (yoki pk noto'g'ri) - ``build()`` o'zi 404 beradi.
+    """
+    try:
+        row = Book.objects.filter(pk=book_id).values_list('updated_at', 'author_id').first()
+    except (TypeError, ValueError):
+        row = None
+    if row is None:
+        return Response(build())
+
+    updated_at, author_id = row
+    tags = [book_tag(book_id), GENRES_TAG]
+    if author_id:
+        tags.append(author_tag(author_id))
+    etag = make_etag(request, updated_at.isoformat(), *tagged_cache.get_versions(tags))
+    return conditional_response(request, etag, build, last_modified=updated_at)
@@ -0,0 +1,176 @@
+"""
+Count strategies for paginated responses
+
+Sahifalangan javobdagi jami son (``COUNT(*)``) katta jadvalda sahifaning
+o'zidan qimmatroq. Paginator'lar uchun uch xil strategiya:
+
+- ``exact``     - har safar ``COUNT(*)``
+- ``cached``    - aniq son cache'da; key filtrlangan querydan (SQL + params)
+                  hash, model yozilganda tag orqali bekor qilinadi
+- ``estimated`` - PostgreSQL: filtrsiz queryda ``pg_class.reltuples``,
+                  filtrlangan queryda ``EXPLAIN`` qatorlar bahosi;
+                  SQLite: ``sqlite_stat1`` (ANALYZE). Baho ``threshold``
+                  dan kichik bo'lsa yoki baho yo'q bo'lsa - cached aniq son.
+
+Har bir funksiya ``(count, is_exact)`` qaytaradi - client "about N results"
+ko'rsata oladi.
+
+Invalidation receiver'lari ``COUNTED_MODELS`` uchun ``BooksConfig.ready()``
+da ulanadi - birinchi ``cached_count`` kutilmaydi (aks holda hali count
+qilmagan worker'dagi yozuv boshqa worker'lar cache'ini bekor qilmaydi).
+Tag commit'dan keyin oshiriladi. queryset.update()/bulk yozuvlar signal
+yubormaydi - cached son ``timeout`` gacha eskirishi mumkin.
+"""
+import hashlib
+import json
+
+from django.core.exceptions import EmptyResultSet
+from django.apps import apps
+from django.db import DatabaseError, connections, transaction
+from django.db.models.signals import post_delete, post_save
+
+from .cache_tags import tagged_cache, model_tag
+
+
+COUNT_STRATEGIES = ('exact', 'cached', 'estimated')
+
+COUNT_CACHE_TIMEOUT = 300
+COUNT_ESTIMATE_THRESHOLD = 10000
+
+# Sahifalangan list endpoint'lari (cached/estimated strategiyalar)
+COUNTED_MODELS = ['books.Book', 'books.Author', 'books.Genre', 'books.Review', 'books.BookLog', 'books.BorrowHistory']
+
+
+# ============================================================================
+# WRITE TRACKING - model tag invalidation
+# ============================================================================
+
+def _invalidate_model_tag(sender, using='default', **kwargs):
+    # Commit'dan oldin bekor qilinsa parallel request eski sonni yangi versiya bilan cache'laydi
+    tag = model_tag(sender)
+    transaction.on_commit(lambda: tagged_cache.invalidate(tag), using=using)
+
+
+def track_model_writes(model):
+    """Model save/delete'da uning count cache'ini bekor qilish (bir marta ulanadi)"""
+    uid = f'counting:{model._meta.label_lower}'
+    post_save.connect(_invalidate_model_tag, sender=model, weak=False, dispatch_uid=uid)
+    post_delete.connect(_invalidate_model_tag, sender=model, weak=False, dispatch_uid=uid)
+
+
+def track_counted_models():
+    """BooksConfig.ready() - har bir worker'da, birinchi count'dan oldin"""
+    for label in COUNTED_MODELS:
+        track_model_writes(apps.get_model(label))
+
+
+# ============================================================================
+# STRATEGIES
+# ============================================================================
+
+def _compiled(queryset):
+    """(sql, params) - tartibsiz; bo'sh natijali queryset uchun None"""
+    try:
+        return queryset.order_by().query.sql_with_params()
+    except EmptyResultSet:
+        return None
+
+
+def exact_count(queryset):
+    return queryset.count(), True
+
+
+def cached_count(queryset, timeout=COUNT_CACHE_TIMEOUT):
+    compiled = _compiled(queryset)
+    if compiled is None:
+        return 0, True
+
+    model = queryset.model
+    track_model_writes(model)
+    digest = hashlib.sha1(repr(compiled).encode()).hexdigest()
+
+    count = tagged_cache.get_or_set(
+        f'count:{model._meta.label_lower}:{digest}',
+        queryset.count,
+        tags=[model_tag(model)],
+        timeout=timeout,
+    )
+    return count, True
+
+
+def _is_unfiltered(queryset):
+    query = queryset.query
+    return not query.where and not query.distinct and len(query.alias_map) <= 1
+
+
+def _postgres_estimate(queryset, connection):
+    with connection.cursor() as cursor:
+        if _is_unfiltered(queryset):
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+            # -1: jadval hali ANALYZE qilinmagan
+            return row[0] if row and row[0] >= 0 else None
+
+        sql, params = _compiled(queryset)
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+
+
+def _sqlite_estimate(queryset, connection):
+    """Faqat filtrsiz query - sqlite_stat1 ning birinchi soni jadval qatorlari"""
+    if not _is_unfiltered(queryset):
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1',
+            [queryset.model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    return int(row[0].split()[0]) if row else None
+
+
+ESTIMATORS = {
+    'postgresql': _postgres_estimate,
+    'sqlite': _sqlite_estimate,
+}
+
+
+def estimate_rows(queryset):
+    """Planner bahosi yoki None (baho yo'q / qo'llab-quvvatlanmaydi)"""
+    if _compiled(queryset) is None:
+        return 0
+    connection = connections[queryset.db]
+    estimator = ESTIMATORS.get(connection.vendor)
+    if estimator is None:
+        return None
+    try:
+        with transaction.atomic(using=queryset.db):
+            return estimator(queryset, connection)
+    except DatabaseError:
+        # masalan, sqlite_stat1 yo'q (ANALYZE ishlatilmagan)
+        return None
+
+
+def estimated_count(queryset, threshold=COUNT_ESTIMATE_THRESHOLD, timeout=COUNT_CACHE_TIMEOUT):
+    estimate = estimate_rows(queryset)
+    if estimate is None or estimate < threshold:
+        return cached_count(queryset, timeout=timeout)
+    return estimate, False
+
+
+def count_queryset(queryset, strategy='exact', threshold=COUNT_ESTIMATE_THRESHOLD,
+                   timeout=COUNT_CACHE_TIMEOUT):
+    """(count, is_exact)"""
+    if strategy == 'exact':
+        return exact_count(queryset)
+    if strategy == 'cached':
+        return cached_count(queryset, timeout=timeout)
+    if strategy == 'estimated':
+        return estimated_count(queryset, threshold=threshold, timeout=timeout)
+    raise ValueError(f"Unknown count strategy '{strategy}'. Choose from: {', '.join(COUNT_STRATEGIES)}")
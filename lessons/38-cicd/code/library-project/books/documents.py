@@ -3,6 +3,7 @@ Elasticsearch document definitions for Books app
 """
 from django_elasticsearch_dsl import Document, fields
 from django_elasticsearch_dsl.registries import registry
+from .cache_tags import tagged_cache, BOOKS_SEARCH_TAG
 from .models import Book, Author, Genre
 
 
@@ -10,6 +11,9 @@ from .models import Book, Author, Genre
 class BookDocument(Document):
     """Elasticsearch document for Book model"""
     
+    # search_after tie-breaker (_id bo'yicha saralash ES 8 da o'chirilgan)
+    id = fields.IntegerField()
+    
     # Author field
     author = fields.ObjectField(properties={
         'id': fields.IntegerField(),
@@ -66,6 +70,12 @@ class BookDocument(Document):
     def get_indexing_queryset(self):
         return self.get_queryset()
     
+    def update(self, thing, refresh=None, action='index', parallel=False, **kwargs):
+        """Index/delete'dan keyin cache'langan search natijalari bekor qilinadi"""
+        result = super().update(thing, refresh=refresh, action=action, parallel=parallel, **kwargs)
+        tagged_cache.invalidate(BOOKS_SEARCH_TAG)
+        return result
+    
     def get_instances_from_related(self, related_instance):
         if isinstance(related_instance, Author):
             return related_instance.books.all()
@@ -1,12 +1,110 @@
 """
-Excel Export Utilities
+Export Utilities - Excel, CSV, NDJSON
 """
+import csv
+import tempfile
+import zlib
+from collections import defaultdict
+
 from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
 from openpyxl.utils import get_column_letter
-from django.http import HttpResponse
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Avg, Sum, Min, Max
+from django.http import HttpResponse, FileResponse, StreamingHttpResponse
 from datetime import datetime
 
+from .models import Book
+
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+BOOK_HEADERS = [
+    'ID', 'Title', 'Author', 'ISBN', 'Price',
+    'Stock', 'Pages', 'Language', 'Published Date', 'Genres'
+]
+
+# Streaming export uchun ustunlar (values_list) va schema bo'yicha kengliklar
+BOOK_EXPORT_FIELDS = [
+    'id', 'title', 'author__name', 'isbn_number', 'price',
+    'stock', 'pages', 'language', 'published_date',
+]
+
+
+def _estimated_column_widths():
+    """
+    Ustun kengligini ma'lumotni qayta o'qimasdan, schema max_length dan
+    hisoblash (classic exportdagi auto-size bilan bir xil chegara: 50)
+    """
+    def width(field_name, fallback):
+        max_length = Book._meta.get_field(field_name).max_length
+        return min(max(max_length or fallback, len(field_name)) + 2, 50)
+
+    return [
+        10,                                     # ID
+        width('title', 30),                     # Title
+        min(Book._meta.get_field('author').related_model._meta.get_field('name').max_length + 2, 50),
+        width('isbn_number', 13),               # ISBN
+        14,                                     # Price
+        10,                                     # Stock
+        10,                                     # Pages
+        width('language', 12),                  # Language
+        16,                                     # Published Date
+        40,                                     # Genres
+    ]
+
+
+def iter_chunks(rows, chunk_size):
+    """Iterator'dan chunk_size uzunlikdagi ro'yxatlar"""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def genre_names_by_book(book_ids):
+    """{book_id: [genre nomlari]} - bitta query"""
+    genres = defaultdict(list)
+    for book_id, genre_name in Book.genres.through.objects.filter(
+        book_id__in=book_ids
+    ).order_by('genre__name').values_list('book_id', 'genre__name'):
+        genres[book_id].append(genre_name)
+    return genres
+
+
+def _thin_border():
+    side = Side(style='thin')
+    return Border(left=side, right=side, top=side, bottom=side)
+
+
+def _build_named_styles():
+    """
+    Streaming export uchun oldindan tayyorlangan uslublar
+
+    Har bir cell uchun Border/Alignment obyektlari yaratilmaydi - cell faqat
+    style nomini oladi.
+    """
+    header = NamedStyle(name='books_header')
+    header.font = Font(name='Arial', size=11, bold=True, color='FFFFFF')
+    header.fill = PatternFill(start_color='366092', end_color='366092', fill_type='solid')
+    header.alignment = Alignment(horizontal='center', vertical='center')
+
+    cell = NamedStyle(name='books_cell')
+    cell.border = _thin_border()
+    cell.alignment = Alignment(vertical='center')
+
+    price = NamedStyle(name='books_price')
+    price.border = _thin_border()
+    price.alignment = Alignment(vertical='center')
+    price.number_format = '$#,##0.00'
+
+    return [header, cell, price]
+
 
 class ExcelExporter:
     """Excel export utility class"""
@@ -29,10 +127,7 @@ class ExcelExporter:
         ws.title = "Books"
         
         # Define headers
-        headers = [
-            'ID', 'Title', 'Author', 'ISBN', 'Price', 
-            'Stock', 'Pages', 'Language', 'Published Date', 'Genres'
-        ]
+        headers = BOOK_HEADERS
         
         # Write headers
         ws.append(headers)
@@ -96,7 +191,7 @@ class ExcelExporter:
         
         # Create HTTP response
         response = HttpResponse(
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+            content_type=XLSX_CONTENT_TYPE
         )
         response['Content-Disposition'] = f'attachment; filename="{filename}"'
         
@@ -104,24 +199,103 @@ class ExcelExporter:
         return response
     
     @staticmethod
-    def _add_summary_sheet(wb, queryset):
-        """Add summary statistics sheet"""
-        from django.db.models import Count, Avg, Sum, Min, Max
+    def export_books_streaming(queryset, filename="books_export.xlsx", chunk_size=2000):
+        """
+        Export books to Excel - constant memory (write-only workbook)
+        
+        - qatorlar ``values_list(...).iterator(chunk_size)`` bilan o'qiladi
+        - janrlar har bir chunk uchun bitta query bilan
+        - uslublar oldindan tayyorlangan (NamedStyle), kenglik schema'dan
+        - fayl temp faylga yoziladi va FileResponse bilan stream qilinadi
+        
+        Args:
+            queryset: Book queryset
+            filename: Output filename
+            chunk_size: DB'dan bir martada o'qiladigan qatorlar soni
+            
+        Returns:
+            FileResponse (StreamingHttpResponse) with Excel file
+        """
+        wb = Workbook(write_only=True)
+        for style in _build_named_styles():
+            wb.add_named_style(style)
+        
+        ws = wb.create_sheet("Books")
+        for index, width in enumerate(_estimated_column_widths(), start=1):
+            ws.column_dimensions[get_column_letter(index)].width = width
+        ws.freeze_panes = 'A2'
+        
+        header_row = []
+        for title in BOOK_HEADERS:
+            cell = WriteOnlyCell(ws, value=title)
+            cell.style = 'books_header'
+            header_row.append(cell)
+        ws.append(header_row)
+        
+        for row in ExcelExporter.iter_book_rows(queryset, chunk_size=chunk_size):
+            cells = []
+            for index, value in enumerate(row):
+                cell = WriteOnlyCell(ws, value=value)
+                cell.style = 'books_price' if index == 4 else 'books_cell'
+                cells.append(cell)
+            ws.append(cells)
+        
+        ExcelExporter._add_summary_sheet(wb, queryset, write_only=True)
+        
+        # Temp fayl: katta export xotirada emas, diskda
+        output = tempfile.TemporaryFile(suffix='.xlsx')
+        wb.save(output)
+        output.seek(0)
+        
+        return FileResponse(
+            output,
+            as_attachment=True,
+            filename=filename,
+            content_type=XLSX_CONTENT_TYPE,
+        )
+    
+    @staticmethod
+    def iter_book_rows(queryset, chunk_size=2000):
+        """
+        Excel qatorlarini chunk'lab generatsiya qilish
         
+        Model obyektlari yaratilmaydi (values_list); har bir chunk uchun
+        janr nomlari bitta query bilan olinadi.
+        """
+        rows = queryset.order_by('id').values_list(*BOOK_EXPORT_FIELDS).distinct()
+        
+        for chunk in iter_chunks(rows.iterator(chunk_size=chunk_size), chunk_size):
+            genres = genre_names_by_book([row[0] for row in chunk])
+            
+            for book_id, title, author_name, isbn, price, stock, pages, language, published in chunk:
+                yield [
+                    book_id,
+                    title,
+                    author_name or 'N/A',
+                    isbn,
+                    float(price),
+                    stock,
+                    pages,
+                    language,
+                    published.strftime('%Y-%m-%d') if published else 'N/A',
+                    ', '.join(genres.get(book_id, [])) or 'N/A',
+                ]
+    
+    @staticmethod
+    def _add_summary_sheet(wb, queryset, write_only=False):
+        """Add summary statistics sheet"""
         ws = wb.create_sheet("Summary")
         
+        if write_only:
+            ExcelExporter._write_summary_rows(ws, queryset)
+            return
+        
         # Title
         ws['A1'] = "Books Export Summary"
         ws['A1'].font = Font(size=14, bold=True)
         
         # Statistics
-        stats = queryset.aggregate(
-            total=Count('id'),
-            avg_price=Avg('price'),
-            min_price=Min('price'),
-            max_price=Max('price'),
-            total_stock=Sum('stock'),
-        )
+        stats = ExcelExporter._summary_stats(queryset)
         
         ws['A3'] = "Report Date:"
         ws['B3'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -155,4 +329,158 @@ class ExcelExporter:
                 )
         
         ws.column_dimensions['A'].width = 20
-        ws.column_dimensions['B'].width = 20
\ No newline at end of file
+        ws.column_dimensions['B'].width = 20
+    
+    @staticmethod
+    def _summary_stats(queryset):
+        return queryset.aggregate(
+            total=Count('id'),
+            avg_price=Avg('price'),
+            min_price=Min('price'),
+            max_price=Max('price'),
+            total_stock=Sum('stock'),
+        )
+    
+    @staticmethod
+    def _write_summary_rows(ws, queryset):
+        """Summary sheet - write-only workbook uchun (append orqali)"""
+        stats = ExcelExporter._summary_stats(queryset)
+        ws.column_dimensions['A'].width = 20
+        ws.column_dimensions['B'].width = 20
+        
+        def row(label, value=None, price=False):
+            label_cell = WriteOnlyCell(ws, value=label)
+            label_cell.style = 'books_cell'
+            value_cell = WriteOnlyCell(ws, value=value)
+            value_cell.style = 'books_price' if price else 'books_cell'
+            return [label_cell, value_cell]
+        
+        title = WriteOnlyCell(ws, value="Books Export Summary")
+        title.font = Font(size=14, bold=True)
+        ws.append([title])
+        ws.append([])
+        ws.append(row("Report Date:", datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+        ws.append(row("Total Books:", stats['total']))
+        ws.append(row("Average Price:", float(stats['avg_price'] or 0), price=True))
+        ws.append(row("Min Price:", float(stats['min_price'] or 0), price=True))
+        ws.append(row("Max Price:", float(stats['max_price'] or 0), price=True))
+        ws.append(row("Total Stock:", stats['total_stock'] or 0))
+
+
+# ============================================================================
+# BULK EXPORT (CSV / NDJSON) - BI va nightly sync uchun
+# ============================================================================
+
+BULK_EXPORT_FIELDS = [
+    'id', 'title', 'author_id', 'author__name', 'isbn_number', 'price',
+    'stock', 'pages', 'language', 'is_available', 'published_date',
+    'created_at', 'updated_at',
+]
+
+BULK_EXPORT_COLUMNS = [
+    'id', 'title', 'author_id', 'author_name', 'isbn_number', 'price',
+    'stock', 'pages', 'language', 'is_available', 'published_date',
+    'created_at', 'updated_at', 'genres',
+]
+
+
+class _Echo:
+    """csv.writer uchun buffer - yozilgan qatorni qaytaradi"""
+
+    def write(self, value):
+        return value
+
+
+class BulkExporter:
+    """
+    Yuqori tezlikdagi CSV/NDJSON export
+    
+    - server-side cursor (``iterator``) dan to'g'ridan-to'g'ri stream
+    - model obyektlari yaratilmaydi (values_list)
+    - ixtiyoriy gzip (on-the-fly, zlib)
+    """
+    
+    FORMATS = {
+        'csv': ('text/csv', 'csv'),
+        'ndjson': ('application/x-ndjson', 'ndjson'),
+    }
+    
+    @staticmethod
+    def iter_records(queryset, chunk_size=2000):
+        """Har bir kitob uchun BULK_EXPORT_COLUMNS tartibidagi ro'yxat"""
+        rows = queryset.values_list(*BULK_EXPORT_FIELDS).distinct()
+        
+        for chunk in iter_chunks(rows.iterator(chunk_size=chunk_size), chunk_size):
+            genres = genre_names_by_book([row[0] for row in chunk])
+            for row in chunk:
+                yield list(row) + [genres.get(row[0], [])]
+    
+    @staticmethod
+    def iter_csv(records, chunk_size=2000):
+        writer = csv.writer(_Echo())
+        yield writer.writerow(BULK_EXPORT_COLUMNS)
+        
+        for chunk in iter_chunks(records, chunk_size):
+            yield ''.join(
+                writer.writerow(
+                    [
+                        value.isoformat() if hasattr(value, 'isoformat') else value
+                        for value in record[:-1]
+                    ] + ['|'.join(record[-1])]
+                )
+                for record in chunk
+            )
+    
+    @staticmethod
+    def iter_ndjson(records, chunk_size=2000):
+        encoder = DjangoJSONEncoder(ensure_ascii=False)
+        
+        for chunk in iter_chunks(records, chunk_size):
+            yield ''.join(
+                encoder.encode(dict(zip(BULK_EXPORT_COLUMNS, record))) + '\n'
+                for record in chunk
+            )
+    
+    @staticmethod
+    def gzip_stream(chunks):
+        """Matn chunk'larini gzip qilib stream qilish"""
+        compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+        for chunk in chunks:
+            data = compressor.compress(chunk.encode('utf-8'))
+            if data:
+                yield data
+        yield compressor.flush()
+    
+    @staticmethod
+    def export(queryset, file_format='csv', compress=False, filename='books_export', chunk_size=2000):
+        """
+        Export books as streaming CSV/NDJSON
+        
+        Args:
+            queryset: Book queryset (tartib chaqiruvchi tomonidan beriladi)
+            file_format: 'csv' yoki 'ndjson'
+            compress: True bo'lsa - gzip
+            filename: Fayl nomi (kengaytmasiz)
+            
+        Returns:
+            StreamingHttpResponse
+        """
+        content_type, extension = BulkExporter.FORMATS[file_format]
+        records = BulkExporter.iter_records(queryset, chunk_size=chunk_size)
+        
+        if file_format == 'csv':
+            chunks = BulkExporter.iter_csv(records, chunk_size=chunk_size)
+        else:
+            chunks = BulkExporter.iter_ndjson(records, chunk_size=chunk_size)
+        
+        filename = f'{filename}.{extension}'
+        if compress:
+            chunks = BulkExporter.gzip_stream(chunks)
+            content_type = 'application/gzip'
+            filename += '.gz'
+        else:
+            chunks = (chunk.encode('utf-8') for chunk in chunks)
+        
+        response = StreamingHttpResponse(chunks, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
@@ -4,8 +4,11 @@ FilterSet classes for Book, Author, and Genre models
 """
 
 from django_filters import rest_framework as filters
+from django.conf import settings
 from django.db.models import Count, Avg
+from rest_framework.filters import SearchFilter
 from .models import Book, Author, Genre
+from .search_backends import get_database_backend
 
 
 # ==================== BOOK FILTERS ====================
@@ -283,4 +286,21 @@ class GenreFilter(filters.FilterSet):
     
     class Meta:
         model = Genre
-        fields = []
\ No newline at end of file
+        fields = []
+
+
+# ==================== FULL-TEXT SEARCH ====================
+
+class FullTextSearchFilter(SearchFilter):
+    """
+    ?search=... - BOOK_SEARCH_BACKEND='database' bo'lsa DB full-text index
+    (books/search_backends.py), aks holda oddiy SearchFilter (icontains OR'lari)
+
+    Tartib o'zgarmaydi - OrderingFilter'da.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        query = ' '.join(self.get_search_terms(request))
+        if query and getattr(settings, 'BOOK_SEARCH_BACKEND', 'elasticsearch') == 'database':
+            return get_database_backend(queryset.db).filter_queryset(queryset, query)
+        return super().filter_queryset(request, queryset, view)
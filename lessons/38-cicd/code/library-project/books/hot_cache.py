@@ -0,0 +1,331 @@
+"""
+Two-tier cache for hot Book objects (Book.get_cached / get_all_cached)
+
+Oldin ``get_cached`` Redis'ga prefetch qilingan genres bilan butun model
+instance'ni pickle qilardi, ``get_all_cached`` esa butun katalogni bitta
+ro'yxat sifatida - har bir hit'da hamma kitob unpickle bo'lardi.
+
+- L1: worker ichidagi ``LocalLRUCache`` - encoded baytlar, ``HOT_CACHE_MAX_BYTES``
+  bo'yicha eviction. Hit'da Redis'ga murojaat yo'q
+- L2: shared cache (Redis) - o'sha baytlar, tagged_cache orqali (tag
+  generation'lari key ichida - invalidation L2 uchun darhol to'g'ri)
+- Encoding: msgpack, qatorlar positional (field nomlari payload'da emas -
+  ularning digest'i key ichida); author/genre'lar katalog ichida bir martadan
+  (dedup). Decimal/date/datetime - ext type. Instance'lar ``from_db`` bilan
+  quriladi: ``book.author`` va ``book.genres.all()`` query'siz
+- Invalidation: tagged_cache.invalidate() listener'i - o'z worker'idagi L1
+  darhol tozalanadi, boshqa worker'larga Redis pub/sub orqali (commit'dan
+  keyin) yuboriladi. Pub/sub "fire and forget" - subscriber uzilsa L1
+  ishlatilmaydi, qayta ulanganda tozalanadi; ``HOT_CACHE_TTL`` - oxirgi chegara
+
+L1'da instance emas, bayt saqlanadi: hajmi aniq, caller obyektni o'zgartirsa
+cache buzilmaydi.
+"""
+from collections import defaultdict
+from datetime import date, datetime
+from decimal import Decimal
+from threading import Lock, Thread
+import hashlib
+import logging
+import os
+import time
+
+import msgpack
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from utils.cache import LocalLRUCache
+from .cache_tags import tagged_cache
+
+
+logger = logging.getLogger(__name__)
+
+CODEC_VERSION = 1
+INVALIDATION_CHANNEL = 'hot_cache:invalidate'
+RECONNECT_DELAY = 1.0
+
+EXT_DECIMAL = 1
+EXT_DATE = 2
+EXT_DATETIME = 3
+
+
+# ============================================================================
+# CODEC
+# ============================================================================
+
+def _pack_default(value):
+    if isinstance(value, Decimal):
+        return msgpack.ExtType(EXT_DECIMAL, str(value).encode())
+    # datetime - date'ning subclass'i, birinchi tekshiriladi
+    if isinstance(value, datetime):
+        return msgpack.ExtType(EXT_DATETIME, value.isoformat().encode())
+    if isinstance(value, date):
+        return msgpack.ExtType(EXT_DATE, value.isoformat().encode())
+    raise TypeError(f'Cannot encode {type(value).__name__}')
+
+
+def _ext_hook(code, data):
+    if code == EXT_DECIMAL:
+        return Decimal(data.decode())
+    if code == EXT_DATETIME:
+        return datetime.fromisoformat(data.decode())
+    if code == EXT_DATE:
+        return date.fromisoformat(data.decode())
+    return msgpack.ExtType(code, data)
+
+
+def _attnames(model):
+    return [field.attname for field in model._meta.concrete_fields]
+
+
+def _row(instance):
+    return [getattr(instance, attname) for attname in _attnames(type(instance))]
+
+
+class LazyGenresCache(dict):
+    """
+    ``book._prefetched_objects_cache`` - genres queryset'i birinchi
+    ``book.genres.all()`` da quriladi (related manager + rel filter har bir
+    kitob uchun decode vaqtining ko'p qismi edi)
+    """
+
+    def __init__(self, book, genres):
+        super().__init__()
+        self.book = book
+        self.genres = genres
+
+    def __contains__(self, key):
+        # prefetch_related_objects() qayta query qilmasin
+        return key == 'genres' or super().__contains__(key)
+
+    def __missing__(self, key):
+        if key != 'genres':
+            raise KeyError(key)
+        # prefetch_related natijasi kabi (django prefetch_one_level)
+        manager = self.book.genres
+        queryset = manager._apply_rel_filters(manager.model._default_manager.get_queryset())
+        queryset._result_cache = self.genres
+        queryset._prefetch_done = True
+        self[key] = queryset
+        return queryset
+
+
+class BookCodec:
+    """
+    Book ro'yxati <-> msgpack baytlari
+
+    Payload: ``[authors {pk: row}, genres {pk: row}, [[book row, genre ids], ...]]``
+    """
+
+    @staticmethod
+    def models():
+        from .models import Author, Book, Genre
+        return Book, Author, Genre
+
+    _schema = None
+
+    @classmethod
+    def schema(cls):
+        """Field nomlari digest'i - migratsiyadan keyin eski yozuvlar o'qilmaydi (key'da)"""
+        if cls._schema is None:
+            names = '|'.join(','.join(_attnames(model)) for model in cls.models())
+            cls._schema = hashlib.sha1(f'{CODEC_VERSION}|{names}'.encode()).hexdigest()[:8]
+        return cls._schema
+
+    @staticmethod
+    def encode(books):
+        """``books`` - select_related('author') + prefetch_related('genres')"""
+        authors, genres, rows = {}, {}, []
+        for book in books:
+            if book.author_id is not None and book.author_id not in authors:
+                authors[book.author_id] = _row(book.author)
+            genre_ids = []
+            for genre in book.genres.all():
+                if genre.pk not in genres:
+                    genres[genre.pk] = _row(genre)
+                genre_ids.append(genre.pk)
+            rows.append([_row(book), genre_ids])
+        return msgpack.packb([authors, genres, rows], default=_pack_default, use_bin_type=True)
+
+    @classmethod
+    def decode(cls, data):
+        Book, Author, Genre = cls.models()
+        authors, genres, rows = msgpack.unpackb(data, ext_hook=_ext_hook, strict_map_key=False)
+
+        author_fields, genre_fields, book_fields = _attnames(Author), _attnames(Genre), _attnames(Book)
+        authors = {pk: Author.from_db(DEFAULT_DB_ALIAS, author_fields, row) for pk, row in authors.items()}
+        genres = {pk: Genre.from_db(DEFAULT_DB_ALIAS, genre_fields, row) for pk, row in genres.items()}
+        author_field = Book._meta.get_field('author')
+
+        books = []
+        for row, genre_ids in rows:
+            book = Book.from_db(DEFAULT_DB_ALIAS, book_fields, row)
+            if book.author_id is not None:
+                author_field.set_cached_value(book, authors[book.author_id])
+            book._prefetched_objects_cache = LazyGenresCache(book, [genres[pk] for pk in genre_ids])
+            books.append(book)
+        return books
+
+
+# ============================================================================
+# INVALIDATION BUS
+# ============================================================================
+
+class LocalInvalidationBus:
+    """LocMemCache - bitta process, L1'ni listener'ning o'zi tozalaydi"""
+
+    ready = True
+
+    def publish(self, tags):
+        pass
+
+
+class RedisInvalidationBus:
+    """PUBLISH / SUBSCRIBE - har bir worker'da bitta daemon subscriber thread"""
+
+    def __init__(self, on_message, alias='default', channel=INVALIDATION_CHANNEL):
+        from django_redis import get_redis_connection
+
+        self.client = get_redis_connection(alias)
+        self.channel = caches[alias].make_key(channel)
+        self.on_message = on_message
+        # Obuna tasdiqlanguncha L1 ishlatilmaydi - xabarlar o'tkazib yuborilishi mumkin
+        self.ready = False
+        Thread(target=self._listen, name='hot-cache-invalidation', daemon=True).start()
+
+    def publish(self, tags):
+        message = '\n'.join(sorted(tags))
+        # Commit'dan oldin boshqa worker DB'dan eski qatorni o'qib L1'ga qo'ymasin
+        transaction.on_commit(lambda: self._publish(message))
+
+    def _publish(self, message):
+        try:
+            self.client.publish(self.channel, message)
+        except Exception as e:
+            logger.warning(f"Hot cache invalidation publish failed: {e}")
+
+    def _listen(self):
+        while True:
+            pubsub = self.client.pubsub()
+            try:
+                pubsub.subscribe(self.channel)
+                while True:
+                    # listen() SOCKET_TIMEOUT'da uziladi - get_message(timeout) poll qiladi
+                    message = pubsub.get_message(timeout=1.0)
+                    if message is None:
+                        continue
+                    if message['type'] == 'subscribe':
+                        # Uzilish paytidagi xabarlar yo'qolgan - hammasini tashlaymiz
+                        self.on_message(None)
+                        self.ready = True
+                    elif message['type'] == 'message':
+                        self.on_message(set(message['data'].decode().split('\n')))
+            except Exception as e:
+                self.ready = False
+                logger.warning(f"Hot cache invalidation subscriber disconnected: {e}")
+                time.sleep(RECONNECT_DELAY)
+            finally:
+                pubsub.close()
+
+
+def create_bus(on_message, alias='default'):
+    cache = caches[alias]
+    if type(cache).__module__.startswith('django_redis'):
+        return RedisInvalidationBus(on_message, alias)
+    return LocalInvalidationBus()
+
+
+# ============================================================================
+# TWO-TIER CACHE
+# ============================================================================
+
+class TwoTierCache:
+    """
+    L1 (LocalLRUCache, bayt hajmi bo'yicha) + L2 (tagged_cache)
+
+    Usage:
+        data = hot_cache.get_or_set('book:5', lambda: encode(...), tags=[book_tag(5)])
+        hot_cache.evict({book_tag(5)})   # odatda tagged_cache listener'i
+    """
+
+    def __init__(self, tagged=None, maxbytes=None, ttl=None, maxsize=100000):
+        self.tagged = tagged or tagged_cache
+        self.local = LocalLRUCache(
+            maxsize=maxsize,
+            ttl=getattr(settings, 'HOT_CACHE_TTL', 60) if ttl is None else ttl,
+            maxbytes=getattr(settings, 'HOT_CACHE_MAX_BYTES', 32 * 1024 * 1024) if maxbytes is None else maxbytes,
+        )
+        self._keys_by_tag = defaultdict(set)
+        self._epoch = 0
+        self._lock = Lock()
+        self._bus = None
+        self._pid = None
+
+    @property
+    def bus(self):
+        # fork'dan keyin (gunicorn --preload) subscriber thread yangi process'da yo'q
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self.local.clear()
+                    self._keys_by_tag.clear()
+                    self._bus = create_bus(self.evict, self.tagged.alias)
+                    self._pid = os.getpid()
+        return self._bus
+
+    def get_or_set(self, key, factory, tags, timeout=300):
+        """``factory()`` - bayt qaytaradi; faqat L1 va L2 miss'da"""
+        use_local = self.bus.ready
+        if use_local:
+            data = self.local.get(key)
+            if data is not None:
+                return data
+
+        epoch = self._epoch
+        data = self.tagged.get_or_set(key, factory, tags=tags, timeout=timeout)
+        if use_local:
+            with self._lock:
+                # O'qish paytida invalidation keldi - L2 qiymati eski bo'lishi mumkin
+                if epoch == self._epoch:
+                    self.local.set(key, data)
+                    for tag in tags:
+                        self._keys_by_tag[tag].add(key)
+        return data
+
+    def evict(self, tags):
+        """L1'dan tag'larga tegishli key'lar; ``None`` - hammasi"""
+        with self._lock:
+            self._epoch += 1
+            if tags is None:
+                self._keys_by_tag.clear()
+                self.local.clear()
+                return
+            keys = set()
+            for tag in tags:
+                keys |= self._keys_by_tag.pop(tag, set())
+        for key in keys:
+            self.local.delete(key)
+
+    def on_invalidate(self, tags):
+        """tagged_cache listener'i: o'z L1 - darhol, boshqa worker'lar - pub/sub"""
+        self.evict(tags)
+        self.bus.publish(tags)
+
+
+hot_cache = TwoTierCache()
+tagged_cache.add_listener(hot_cache.on_invalidate)
+
+
+def cached_books(key, factory, tags, timeout=300):
+    """
+    ``factory()`` - Book ro'yxati (author + genres bilan); natija har
+    chaqiruvda yangi instance'lar
+    """
+    data = hot_cache.get_or_set(
+        f'hot:{BookCodec.schema()}:{key}',
+        lambda: BookCodec.encode(factory()),
+        tags=tags,
+        timeout=timeout,
+    )
+    return BookCodec.decode(data)
@@ -0,0 +1,305 @@
+"""
+Bulk Import Utilities
+
+Kitoblarni chunk'lab import qilish:
+- har bir chunk uchun mualliflar va janrlar bitta ``in_bulk`` bilan
+- ISBN dublikatlari bitta query bilan
+- ``bulk_create`` (kitoblar va M2M through qatorlari)
+- BookLog / author stats / cache invalidation - chunk uchun bir marta
+- har bir qator uchun alohida xato xabari
+
+Streaming rejim: CSV yoki NDJSON fayl qatorma-qator o'qiladi, butun
+payload xotiraga yuklanmaydi.
+"""
+import csv
+import io
+import json
+import re
+from collections import Counter
+from decimal import Decimal, InvalidOperation
+
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, transaction
+from django.utils.dateparse import parse_date
+
+from . import indexing, stats_snapshot
+from .author_stats import record_author_stats_delta
+from .cache_tags import tagged_cache, author_tag, BOOKS_COLLECTION_TAG, BOOKS_LIST_TAG, BOOKS_SEARCH_TAG
+from .models import Book, Author, Genre, BookLog
+
+
+REQUIRED_FIELDS = ['title', 'author', 'isbn_number', 'price']
+
+# clean_fields'da tekshirilmaydi: author - in_bulk bilan topilgan (FK validatsiyasi query qiladi)
+UNCHECKED_FIELDS = ['author']
+
+
+# ============================================================================
+# STREAMING READERS
+# ============================================================================
+
+def iter_csv_rows(uploaded_file):
+    """CSV faylni qatorma-qator o'qish (header: title,author,isbn_number,...)"""
+    text = io.TextIOWrapper(uploaded_file.file, encoding='utf-8-sig', newline='')
+    for row in csv.DictReader(text):
+        yield {key: value for key, value in row.items() if key and value not in ('', None)}
+
+
+def iter_ndjson_rows(uploaded_file):
+    """NDJSON: har bir qatorda bitta JSON obyekt"""
+    for line in uploaded_file:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            yield ValueError(f"Invalid JSON: {e}")
+
+
+STREAM_READERS = {
+    'csv': iter_csv_rows,
+    'ndjson': iter_ndjson_rows,
+    'jsonl': iter_ndjson_rows,
+}
+
+
+# ============================================================================
+# IMPORTER
+# ============================================================================
+
+class BookBulkImporter:
+    """
+    Batched book importer
+
+    Usage:
+        importer = BookBulkImporter(chunk_size=500)
+        importer.run(rows)
+        importer.created_ids, importer.errors
+    """
+
+    def __init__(self, chunk_size=500):
+        self.chunk_size = chunk_size
+        self.created_ids = []
+        self.errors = []
+        self._seen_isbns = set()
+
+    @property
+    def imported(self):
+        return len(self.created_ids)
+
+    def run(self, rows):
+        """rows - istalgan iterable (list, generator)"""
+        chunk = []
+        for row_number, row in enumerate(rows, start=1):
+            chunk.append((row_number, row))
+            if len(chunk) >= self.chunk_size:
+                self._process_chunk(chunk)
+                chunk = []
+
+        if chunk:
+            self._process_chunk(chunk)
+
+        return self
+
+    # ----------------------------------------------------------------------
+    # Chunk processing
+    # ----------------------------------------------------------------------
+
+    @staticmethod
+    def _to_int(value):
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+
+    @classmethod
+    def _genre_ids(cls, value):
+        if value in (None, ''):
+            return []
+        if isinstance(value, str):
+            value = [part for part in re.split(r'[;,|\s]+', value) if part]
+        if not isinstance(value, (list, tuple)):
+            value = [value]
+        return [cls._to_int(genre_id) for genre_id in value]
+
+    def _add_error(self, row_number, message):
+        self.errors.append(f"Book #{row_number}: {message}")
+
+    def _process_chunk(self, chunk):
+        rows = []
+        author_ids, genre_ids, isbns = set(), set(), []
+
+        for row_number, row in chunk:
+            if isinstance(row, Exception):
+                self._add_error(row_number, str(row))
+                continue
+            if not isinstance(row, dict):
+                self._add_error(row_number, "Row must be an object")
+                continue
+
+            rows.append((row_number, row))
+            author_ids.add(self._to_int(row.get('author')))
+            genre_ids.update(self._genre_ids(row.get('genres')))
+            if row.get('isbn_number'):
+                isbns.append(str(row['isbn_number']))
+
+        if not rows:
+            return
+
+        # Har bir chunk uchun 3 ta lookup query
+        authors = Author.objects.in_bulk([pk for pk in author_ids if pk is not None])
+        genres = Genre.objects.in_bulk([pk for pk in genre_ids if pk is not None])
+        existing_isbns = set(
+            Book.objects.filter(isbn_number__in=isbns).values_list('isbn_number', flat=True)
+        )
+
+        pending = []
+        for row_number, row in rows:
+            try:
+                book, book_genre_ids = self._build_book(row, authors, genres, existing_isbns)
+            except ValueError as e:
+                self._add_error(row_number, str(e))
+                continue
+            pending.append((row_number, book, book_genre_ids))
+
+        if pending:
+            self._save(pending)
+
+    def _build_book(self, row, authors, genres, existing_isbns):
+        """Bitta qatorni tekshirish va Book obyekt yaratish (saqlamasdan)"""
+        missing = [field for field in REQUIRED_FIELDS if row.get(field) in (None, '')]
+        if missing:
+            raise ValueError(f"Missing required fields: {', '.join(missing)}")
+
+        author_id = self._to_int(row['author'])
+        author = authors.get(author_id)
+        if author is None:
+            raise ValueError(f"Author with ID {row['author']} not found")
+
+        book_genre_ids = self._genre_ids(row.get('genres'))
+        unknown = [genre_id for genre_id in book_genre_ids if genre_id not in genres]
+        if unknown:
+            raise ValueError(f"Genre not found: {', '.join(str(g) for g in unknown)}")
+
+        isbn = str(row['isbn_number'])
+        if isbn in existing_isbns or isbn in self._seen_isbns:
+            raise ValueError(f"Book with ISBN {isbn} already exists")
+
+        try:
+            price = Decimal(str(row['price']))
+            stock = int(row.get('stock', 0))
+            pages = int(row.get('pages', 0))
+        except (InvalidOperation, TypeError, ValueError):
+            raise ValueError("Invalid price, stock or pages value")
+
+        published_date = row.get('published_date') or None
+        if isinstance(published_date, str):
+            published_date = parse_date(published_date)
+            if published_date is None:
+                raise ValueError("Invalid published_date (expected YYYY-MM-DD)")
+
+        self._seen_isbns.add(isbn)
+
+        book = Book(
+            title=row['title'],
+            author=author,
+            isbn_number=isbn,
+            description=row.get('description', ''),
+            price=price,
+            stock=stock,
+            pages=pages,
+            language=row.get('language', 'English'),
+            published_date=published_date,
+        )
+        # max_length / max_digits - aks holda PostgreSQL DataError butun chunk'ni to'xtatadi
+        try:
+            book.clean_fields(exclude=UNCHECKED_FIELDS)
+        except ValidationError as e:
+            raise ValueError('; '.join(
+                f"{field}: {' '.join(messages)}" for field, messages in e.message_dict.items()
+            ))
+        return book, book_genre_ids
+
+    def _save(self, pending):
+        """Chunk'ni bitta transaction'da saqlash"""
+        try:
+            with transaction.atomic():
+                books = Book.objects.bulk_create([book for _, book, _ in pending])
+                books_with_genres = [
+                    (book, genre_ids) for book, (_, _, genre_ids) in zip(books, pending)
+                ]
+                self._create_genre_links(books_with_genres)
+                self._after_create(books_with_genres)
+        except DatabaseError:
+            # Parallel import ISBN'ni band qilgan bo'lishi mumkin (yoki DB qatorni
+            # rad etdi) - qatorma-qator, xato faqat o'sha qatorga yoziladi
+            self._save_individually(pending)
+            return
+
+        self.created_ids.extend(book.pk for book in books)
+
+    def _save_individually(self, pending):
+        for row_number, book, genre_ids in pending:
+            try:
+                with transaction.atomic():
+                    book.pk = None
+                    Book.objects.bulk_create([book])
+                    self._create_genre_links([(book, genre_ids)])
+                    self._after_create([(book, genre_ids)])
+            except DatabaseError as e:
+                self._add_error(row_number, str(e))
+                continue
+            self.created_ids.append(book.pk)
+
+    @staticmethod
+    def _create_genre_links(books_with_genres):
+        through = Book.genres.through
+        links = [
+            through(book_id=book.pk, genre_id=genre_id)
+            for book, genre_ids in books_with_genres
+            for genre_id in set(genre_ids)
+        ]
+        if links:
+            through.objects.bulk_create(links)
+
+    @staticmethod
+    def _after_create(books_with_genres):
+        """
+        bulk_create post_save yubormaydi - log, author stats, analytics
+        snapshot, search index navbati va cache invalidation shu yerda chunk
+        uchun bir marta
+        """
+        books = [book for book, _ in books_with_genres]
+        BookLog.objects.bulk_create([
+            BookLog(
+                book_title=book.title,
+                book_id=book.pk,
+                action='created',
+                details={
+                    'stock': book.stock,
+                    'price': str(book.price),
+                    'is_available': book.is_available,
+                    'bulk_import': True,
+                },
+            )
+            for book in books
+        ])
+
+        totals = Counter(book.author_id for book in books)
+        available = Counter(book.author_id for book in books if book.is_available)
+        for author_id, total in totals.items():
+            record_author_stats_delta(author_id, total=total, available=available[author_id])
+        stats_snapshot.books_created(books_with_genres)
+
+        book_ids = [book.pk for book in books]
+        tags = [BOOKS_LIST_TAG, BOOKS_COLLECTION_TAG, BOOKS_SEARCH_TAG] + [
+            author_tag(author_id) for author_id in totals if author_id
+        ]
+
+        def after_commit():
+            # QueuedSignalProcessor post_save'siz kitoblarni ko'rmaydi
+            indexing.enqueue_books(book_ids)
+            tagged_cache.invalidate(*tags)
+
+        transaction.on_commit(after_commit)
@@ -0,0 +1,257 @@
+"""
+Elasticsearch indexing - queue va bulk reindex
+
+Queue (``QueuedSignalProcessor``):
+    django_elasticsearch_dsl'ning RealTimeSignalProcessor'i har bir Book,
+    Author yoki Genre save'ida request ichida index'laydi - mashhur muallif
+    nomini o'zgartirish uning barcha kitoblarini HTTP javobdan oldin
+    serialize qiladi. Bu processor faqat o'zgargan kitob ID'larini
+    ``SearchIndexQueue`` jadvaliga yozadi (commit'dan keyin, bitta upsert;
+    takroriy ID'lar bitta qatorga birlashadi). ``process_search_queue``
+    worker'i ularni ``batch_size`` tadan o'qiydi: bitta select/prefetch
+    query, bitta bulk request. DB'da topilmagan ID - ES'dan delete.
+
+Reindex (``reindex_books``):
+    Yangi vaqt belgili index (``books-20250101120000000000``) quriladi,
+    ``parallel_bulk`` bilan to'ldiriladi va ``books`` alias'i bitta
+    ``_aliases`` request'da yangi index'ga o'tkaziladi - search yarim
+    qurilgan index'ni ko'rmaydi. ``since`` bilan - faqat ``updated_at``
+    bo'yicha o'zgargan kitoblar joriy alias'ga yoziladi.
+"""
+from itertools import islice
+import time
+
+from django.db import transaction
+from django.utils import timezone
+from django_elasticsearch_dsl.signals import RealTimeSignalProcessor
+from elasticsearch.helpers import parallel_bulk
+
+from .cache_tags import tagged_cache, BOOKS_SEARCH_TAG
+from .documents import BookDocument
+from .models import Book, SearchIndexQueue
+
+
+QUEUE_BATCH_SIZE = 500
+REINDEX_CHUNK_SIZE = 500
+REINDEX_THREADS = 4
+
+
+class ReindexError(Exception):
+    pass
+
+
+# ============================================================================
+# QUEUE
+# ============================================================================
+
+def enqueue_books(book_ids, using='default'):
+    """Kitob ID'larini navbatga qo'shish (transaction commit'idan keyin)"""
+    book_ids = {int(book_id) for book_id in book_ids if book_id is not None}
+    if not book_ids:
+        return
+
+    def write():
+        now = timezone.now()
+        SearchIndexQueue.objects.using(using).bulk_create(
+            [SearchIndexQueue(book_id=book_id, queued_at=now) for book_id in book_ids],
+            update_conflicts=True,
+            unique_fields=['book_id'],
+            update_fields=['queued_at'],
+        )
+
+    transaction.on_commit(write, using=using)
+
+
+def related_book_ids(instance):
+    """Instance o'zgarganda qayta index'lanadigan kitob ID'lari (query bilan, obyektlarsiz)"""
+    if isinstance(instance, Book):
+        return [instance.pk]
+    if isinstance(instance, tuple(BookDocument.django.related_models)):
+        books = BookDocument().get_instances_from_related(instance)
+        if books is not None:
+            return list(books.values_list('pk', flat=True))
+    return []
+
+
+class QueuedSignalProcessor(RealTimeSignalProcessor):
+    """
+    Book/Author/Genre o'zgarishlarini navbatga yozadi - request ichida ES'ga
+    murojaat yo'q.
+
+    settings: ELASTICSEARCH_DSL_SIGNAL_PROCESSOR = 'books.indexing.QueuedSignalProcessor'
+    """
+
+    def _watched(self, sender):
+        return sender is Book or sender in BookDocument.django.related_models
+
+    def handle_save(self, sender, instance, **kwargs):
+        if self._watched(sender):
+            enqueue_books(related_book_ids(instance), using=instance._state.db or 'default')
+
+    def handle_pre_delete(self, sender, instance, **kwargs):
+        # Genre o'chirilganda M2M qatorlari m2m_changed'siz yo'qoladi - ID'lar hozir olinadi.
+        # Book (va Author kaskadi) post_delete'da navbatga tushadi.
+        if self._watched(sender) and not isinstance(instance, Book):
+            enqueue_books(related_book_ids(instance), using=instance._state.db or 'default')
+
+    def handle_delete(self, sender, instance, **kwargs):
+        if sender is Book:
+            enqueue_books([instance.pk], using=instance._state.db or 'default')
+
+    def handle_m2m_changed(self, sender, instance, action, model=None, pk_set=None, **kwargs):
+        if action not in ('post_add', 'post_remove', 'pre_clear'):
+            return
+        if isinstance(instance, Book):
+            book_ids = [instance.pk]
+        elif model is Book and pk_set:
+            book_ids = pk_set
+        elif action == 'pre_clear' and self._watched(type(instance)):
+            book_ids = related_book_ids(instance)
+        else:
+            return
+        enqueue_books(book_ids, using=instance._state.db or 'default')
+
+
+def process_index_queue(batch_size=QUEUE_BATCH_SIZE):
+    """
+    Navbatdan bitta batch: (indexed, deleted, failed)
+
+    Batch ishlanayotganda qayta navbatga tushgan ID'lar (``queued_at``
+    yangilangan) o'chirilmaydi - keyingi batch'da yana index'lanadi.
+    Xato bergan ID'lar ham navbatda qoladi.
+    """
+    started = timezone.now()
+    book_ids = list(
+        SearchIndexQueue.objects.filter(queued_at__lte=started)
+        .order_by('queued_at')
+        .values_list('book_id', flat=True)[:batch_size]
+    )
+    if not book_ids:
+        return 0, 0, 0
+
+    document = BookDocument()
+    books = document.get_queryset().filter(pk__in=book_ids)
+    actions = [
+        document._prepare_action(book, 'index')
+        for book in books
+        if document.should_index_object(book)
+    ]
+    indexed_ids = {action['_id'] for action in actions}
+    actions += [
+        {'_op_type': 'delete', '_index': document._index._name, '_id': book_id}
+        for book_id in book_ids
+        if book_id not in indexed_ids
+    ]
+
+    # Bitta bulk request; delete uchun 404 (index'da yo'q) - xato emas
+    _, errors = document.bulk(actions, chunk_size=len(actions), raise_on_error=False)
+    failed_ids = set()
+    for error in errors:
+        op, item = next(iter(error.items()))
+        if not (op == 'delete' and item.get('status') == 404):
+            failed_ids.add(int(item['_id']))
+
+    SearchIndexQueue.objects.filter(
+        book_id__in=[book_id for book_id in book_ids if book_id not in failed_ids],
+        queued_at__lte=started,
+    ).delete()
+    tagged_cache.invalidate(BOOKS_SEARCH_TAG)
+
+    deleted = len(actions) - len(indexed_ids)
+    return len(indexed_ids) - len(failed_ids & indexed_ids), deleted, len(failed_ids)
+
+
+# ============================================================================
+# BULK REINDEX
+# ============================================================================
+
+def reindex_books(since=None, chunk_size=REINDEX_CHUNK_SIZE, thread_count=REINDEX_THREADS,
+                  keep_old=False, progress=None):
+    """
+    Kitoblarni ``parallel_bulk`` bilan index'lash
+
+    since=None: yangi index + atomic alias swap (eski index'lar o'chiriladi,
+    ``keep_old`` bo'lmasa). since berilsa: faqat ``updated_at >= since``
+    kitoblar joriy alias'ga.
+
+    ``progress(indexed, elapsed)`` har bir chunk'dan keyin chaqiriladi.
+    {'index', 'indexed', 'failed', 'seconds'} qaytaradi.
+    """
+    document = BookDocument()
+    client = document._get_connection()
+    alias = document._index._name
+
+    queryset = document.get_queryset().order_by('pk')
+    if since is not None:
+        queryset = queryset.filter(updated_at__gte=since)
+        target = alias
+    else:
+        target = f'{alias}-{timezone.now():%Y%m%d%H%M%S%f}'
+        index = document._index.clone(name=target)
+        # Qurish paytida refresh o'chiriladi - segmentlar bulk oxirida bir marta
+        index.settings(refresh_interval='-1')
+        index.create(using=client)
+
+    started = time.perf_counter()
+    indexed = failed = 0
+    try:
+        books = queryset.iterator(chunk_size=chunk_size)
+        window = chunk_size * thread_count
+        while True:
+            # DB o'qish va serialize - shu thread'da (parallel_bulk action'larni
+            # pool thread'ida iteratsiya qiladi, DB connection esa thread'ga bog'liq)
+            actions = [
+                {**document._prepare_action(book, 'index'), '_index': target}
+                for book in islice(books, window)
+                if document.should_index_object(book)
+            ]
+            if not actions:
+                break
+            for ok, _ in parallel_bulk(
+                client, actions,
+                thread_count=thread_count,
+                chunk_size=chunk_size,
+                raise_on_error=False,
+            ):
+                if ok:
+                    indexed += 1
+                else:
+                    failed += 1
+            if progress is not None:
+                progress(indexed, time.perf_counter() - started)
+
+        if since is None:
+            if failed:
+                raise ReindexError(f'{failed} documents failed, alias {alias} not switched')
+            client.indices.put_settings(index=target, settings={'index': {'refresh_interval': None}})
+            client.indices.refresh(index=target)
+            _switch_alias(client, alias, target, keep_old)
+    except Exception:
+        if since is None:
+            client.indices.delete(index=target, ignore_unavailable=True)
+        raise
+
+    tagged_cache.invalidate(BOOKS_SEARCH_TAG)
+    return {
+        'index': target,
+        'indexed': indexed,
+        'failed': failed,
+        'seconds': time.perf_counter() - started,
+    }
+
+
+def _switch_alias(client, alias, target, keep_old):
+    """Alias'ni bitta atomic ``_aliases`` request bilan yangi index'ga o'tkazish"""
+    actions = [{'add': {'index': target, 'alias': alias}}]
+    old_indices = []
+    if client.indices.exists_alias(name=alias):
+        old_indices = [name for name in client.indices.get_alias(name=alias) if name != target]
+        actions += [{'remove': {'index': name, 'alias': alias}} for name in old_indices]
+    elif client.indices.exists(index=alias):
+        # Alias'siz eski o'rnatish: ``books`` - oddiy index, swap bilan birga o'chiriladi
+        actions.append({'remove_index': {'index': alias}})
+
+    client.indices.update_aliases(actions=actions)
+
+    if old_indices and not keep_old:
+        client.indices.delete(index=','.join(old_indices), ignore_unavailable=True)
@@ -0,0 +1,248 @@
+"""
+Read-through list response cache (CachedListMixin, books/mixins.py)
+
+List endpoint'lar har so'rovda queryset + DRF serializer + JSON renderer'dan
+o'tadi. Bu yerda tayyor (render qilingan) baytlar cache'lanadi - hit'da
+serializer ham renderer ham ishlamaydi, ``HttpResponse`` qaytadi.
+
+Key (canonical):
+- view nomi + scheme/host (pagination link'lari absolyut URL) + renderer format
+- query params - key va qiymat bo'yicha tartiblangan (``?b=2&a=1`` == ``?a=1&b=2``)
+- ``cache_per_user`` bo'lsa user id (natijasi user'ga bog'liq view'lar)
+- ``cache_tags`` generation'lari (books/cache_tags.py) - yozuvda key o'zgaradi,
+  eski yozuvlar TTL bilan yo'qoladi
+
+Key digest'i ETag ham bo'ladi: ``If-None-Match`` mos kelsa 304 - DB va
+body cache'ga murojaat yo'q.
+
+Stampede himoyasi:
+- probabilistic early refresh (XFetch): ``now - delta * beta * ln(rand) >= expires``
+  - expiry yaqinlashgan sari bitta-yarimta request oldindan qayta hisoblaydi,
+  qolganlar eski qiymatni oladi (``delta`` - oxirgi recompute vaqti)
+- miss'da bitta recompute lock (``cache.add``); lock'ni ololmaganlar
+  ``cache_lock_wait`` gacha kutadi, keyin o'zi hisoblaydi
+
+Faqat JSON renderer va 200 javoblar cache'lanadi (browsable API HTML'i
+user/CSRF token'ga bog'liq).
+
+Metrikalar (hit/miss/refresh/wait/not_modified) worker ichida yig'iladi va
+``flush_interval`` da cache counter'lariga qo'shiladi (``atexit`` da ham) -
+books/api_metrics.py dagi kabi, kritik emas.
+"""
+from collections import Counter
+from threading import Lock
+from urllib.parse import urlencode
+import atexit
+import hashlib
+import logging
+import math
+import random
+import time
+
+from django.core.cache import caches
+from django.http import HttpResponse
+from rest_framework import status
+
+from .cache_tags import tagged_cache
+from .conditional import etag_matches
+
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'list_cache'
+EVENTS = ('hit', 'miss', 'refresh', 'wait', 'not_modified')
+
+
+def view_cache_name(view_class):
+    return getattr(view_class, 'cache_name', None) or f'{view_class.__module__}.{view_class.__qualname__}'
+
+
+def canonical_params(query_params):
+    """Tartiblangan ``k=v`` lar - parametrlar tartibi key'ga ta'sir qilmaydi"""
+    return urlencode(sorted(
+        (key, value) for key in query_params for value in query_params.getlist(key)
+    ))
+
+
+class ListCacheMetrics:
+    """Per-view hit/miss counter'lari - worker ichida batch, cache'ga flush"""
+
+    def __init__(self, alias='default', flush_interval=10, clock=time.monotonic):
+        self.alias = alias
+        self.flush_interval = flush_interval
+        self.clock = clock
+        self.views = set()
+        self._lock = Lock()
+        self._pending = Counter()
+        self._flushed_at = clock()
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    @staticmethod
+    def make_key(view, event):
+        return f'{KEY_PREFIX}:metrics:{view}:{event}'
+
+    def register(self, view):
+        self.views.add(view)
+
+    def record(self, view, event):
+        with self._lock:
+            self._pending[(view, event)] += 1
+            due = self.clock() - self._flushed_at >= self.flush_interval
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+            self._flushed_at = self.clock()
+        for (view, event), amount in pending.items():
+            key = self.make_key(view, event)
+            try:
+                self.cache.add(key, 0, timeout=None)
+                self.cache.incr(key, amount)
+            except Exception as e:
+                logger.warning(f"List cache metrics flush failed: {e}")
+                return
+
+    def report(self):
+        """{view: {event: count, ..., 'hit_ratio': float}} - barcha worker'lar"""
+        self.flush()
+        keys = {
+            self.make_key(view, event): (view, event)
+            for view in sorted(self.views) for event in EVENTS
+        }
+        values = self.cache.get_many(list(keys))
+        report = {}
+        for key, (view, event) in keys.items():
+            report.setdefault(view, dict.fromkeys(EVENTS, 0))[event] = values.get(key, 0)
+        for counts in report.values():
+            # wait - alohida natija emas: kutgan request keyin hit yoki miss bo'ladi
+            served = counts['hit'] + counts['not_modified']
+            computed = counts['miss'] + counts['refresh']
+            counts['hit_ratio'] = round(served / (served + computed), 4) if served + computed else 0.0
+        return report
+
+
+class ListResponseCache:
+    """
+    Render qilingan list javoblari - read-through, stampede himoyasi bilan
+
+    Entry: ``(content, content_type, expires_at, delta)`` - pickled
+    Response emas, faqat baytlar.
+    """
+
+    def __init__(self, alias='default', metrics=None, clock=time.time, rand=random.random, sleep=time.sleep):
+        self.alias = alias
+        self.metrics = metrics or ListCacheMetrics(alias)
+        self.clock = clock
+        self.rand = rand
+        self.sleep = sleep
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def make_key(self, view, request):
+        """(cache key, ETag) - ikkalasi bitta digest'dan"""
+        parts = [
+            request.build_absolute_uri('/'),
+            request.accepted_renderer.format,
+            canonical_params(request.query_params),
+        ]
+        if view.cache_per_user:
+            parts.append(f'user:{request.user.pk or "anonymous"}')
+        if view.cache_tags:
+            parts.extend(tagged_cache.get_versions(view.cache_tags))
+        digest = hashlib.sha1('|'.join(str(part) for part in parts).encode()).hexdigest()
+        return f'{KEY_PREFIX}:{view_cache_name(type(view))}:{digest}', f'"{digest}"'
+
+    def should_refresh(self, entry, beta):
+        """XFetch: -ln(rand) ~ Exp(1); delta katta bo'lsa ertaroq"""
+        _, _, expires_at, delta = entry
+        if beta <= 0:
+            return False
+        return self.clock() - delta * beta * math.log(1.0 - self.rand()) >= expires_at
+
+    def respond(self, view, request, compute):
+        """
+        ``compute()`` - DRF list (Response, render qilinmagan); faqat
+        miss/refresh'da chaqiriladi
+        """
+        renderer = getattr(request, 'accepted_renderer', None)
+        if request.method != 'GET' or getattr(renderer, 'format', None) != 'json':
+            return compute()
+
+        name = view_cache_name(type(view))
+        key, etag = self.make_key(view, request)
+        if etag_matches(request, etag):
+            self.metrics.record(name, 'not_modified')
+            response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+            response['ETag'] = etag
+            return response
+
+        entry = self.cache.get(key)
+        if entry is not None:
+            if self.should_refresh(entry, view.cache_refresh_beta) and self._acquire(key, view):
+                self.metrics.record(name, 'refresh')
+                return self._compute(view, request, compute, key, etag, 'REFRESH')
+            self.metrics.record(name, 'hit')
+            return self._cached(entry, etag)
+
+        locked = self._acquire(key, view)
+        if not locked:
+            # Boshqa request hisoblayapti - tayyor bo'lishini kutamiz
+            self.metrics.record(name, 'wait')
+            entry = self._wait(key, view.cache_lock_wait)
+            if entry is not None:
+                self.metrics.record(name, 'hit')
+                return self._cached(entry, etag)
+        self.metrics.record(name, 'miss')
+        return self._compute(view, request, compute, key, etag, 'MISS', locked=locked)
+
+    def _acquire(self, key, view):
+        return self.cache.add(f'{key}:lock', 1, timeout=view.cache_lock_timeout)
+
+    def _wait(self, key, timeout, interval=0.05):
+        deadline = self.clock() + timeout
+        while self.clock() < deadline:
+            self.sleep(interval)
+            entry = self.cache.get(key)
+            if entry is not None:
+                return entry
+        return None
+
+    def _cached(self, entry, etag):
+        content, content_type, _, _ = entry
+        response = HttpResponse(content, content_type=content_type)
+        response['ETag'] = etag
+        response['X-Cache'] = 'HIT'
+        return response
+
+    def _compute(self, view, request, compute, key, etag, state, locked=True):
+        started = self.clock()
+        try:
+            response = compute()
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            # accepted_renderer/renderer_context - dispatch'dagi kabi
+            response = view.finalize_response(request, response)
+            response.render()
+            delta = self.clock() - started
+            timeout = view.cache_timeout
+            entry = (response.content, response['Content-Type'], self.clock() + timeout, delta)
+            self.cache.set(key, entry, timeout=timeout)
+        finally:
+            if locked:
+                self.cache.delete(f'{key}:lock')
+        response['ETag'] = etag
+        response['X-Cache'] = state
+        return response
+
+
+list_cache_metrics = ListCacheMetrics()
+list_response_cache = ListResponseCache(metrics=list_cache_metrics)
+
+atexit.register(list_cache_metrics.flush)
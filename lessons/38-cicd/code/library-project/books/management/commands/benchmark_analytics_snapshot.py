@@ -0,0 +1,102 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from books.analytics import BookAnalytics, AnalyticsResult, SnapshotAnalyticsResult
+from books.models import Book, Author, Genre
+from books.stats_snapshot import rebuild_stats_snapshots
+from decimal import Decimal
+import time
+
+
+BENCHMARK_PREFIX = 'Benchmark Analytics'
+
+
+def _dashboard(result):
+    """complete_analytics bilan bir xil bo'limlar"""
+    BookAnalytics.get_dashboard_stats(result)
+    BookAnalytics.get_price_distribution(result)
+    BookAnalytics.get_genre_performance(result)
+    BookAnalytics.get_author_performance(result)
+    BookAnalytics.get_recommendations(result)
+
+
+class Command(BaseCommand):
+    help = 'Compare live vs snapshot analytics dashboard latency on a large catalog'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--books', type=int, default=1000000)
+        parser.add_argument('--authors', type=int, default=2000)
+        parser.add_argument('--genres', type=int, default=50)
+        parser.add_argument('--iterations', type=int, default=5)
+        parser.add_argument('--keep', action='store_true', help='Keep generated books')
+
+    def _seed(self, count, author_count, genre_count):
+        authors = Author.objects.bulk_create([
+            Author(name=f'{BENCHMARK_PREFIX} Author {i}') for i in range(author_count)
+        ])
+        genres = Genre.objects.bulk_create([
+            Genre(name=f'{BENCHMARK_PREFIX} {i}') for i in range(genre_count)
+        ])
+        through = Book.genres.through
+
+        existing = Book.objects.filter(title__startswith=BENCHMARK_PREFIX).count()
+        for start in range(existing, count, 10000):
+            books = Book.objects.bulk_create([
+                Book(
+                    title=f'{BENCHMARK_PREFIX} {i}',
+                    isbn_number=f'A{i:012d}',
+                    price=Decimal(10 + i % 90),
+                    stock=i % 25,
+                    pages=100 + i % 500,
+                    author=authors[i % author_count],
+                )
+                for i in range(start, min(start + 10000, count))
+            ])
+            through.objects.bulk_create([
+                through(book_id=book.pk, genre_id=genres[book.pk % genre_count].pk)
+                for book in books
+            ])
+
+    def _time(self, factory, iterations):
+        timings = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            _dashboard(factory())
+            timings.append(time.perf_counter() - start)
+        return min(timings) * 1000, sum(timings) / len(timings) * 1000
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Seeding {options['books']} books...")
+        start = time.perf_counter()
+        self._seed(options['books'], options['authors'], options['genres'])
+        self.stdout.write(f'  seeded in {time.perf_counter() - start:.1f}s')
+
+        try:
+            start = time.perf_counter()
+            counts = rebuild_stats_snapshots()
+            rebuild_seconds = time.perf_counter() - start
+
+            live = self._time(AnalyticsResult, options['iterations'])
+            snapshot = self._time(SnapshotAnalyticsResult, options['iterations'])
+
+            self.stdout.write(self.style.SUCCESS('\nAnalytics Dashboard Benchmark:'))
+            self.stdout.write(f"  books: {counts['books']}, genres: {counts['genres']}, authors: {counts['authors']}")
+            self.stdout.write(f'  snapshot rebuild: {rebuild_seconds:.2f}s')
+            self.stdout.write(f'{"mode":>10} {"min (ms)":>10} {"avg (ms)":>10}')
+            self.stdout.write(f'{"live":>10} {live[0]:>10.1f} {live[1]:>10.1f}')
+            self.stdout.write(f'{"snapshot":>10} {snapshot[0]:>10.1f} {snapshot[1]:>10.1f}')
+        finally:
+            if not options['keep']:
+                # Signal'larsiz tez o'chirish
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f'DELETE FROM {Book.genres.through._meta.db_table} WHERE book_id IN '
+                        f'(SELECT id FROM {Book._meta.db_table} WHERE title LIKE %s)',
+                        [f'{BENCHMARK_PREFIX}%']
+                    )
+                    cursor.execute(
+                        f'DELETE FROM {Book._meta.db_table} WHERE title LIKE %s',
+                        [f'{BENCHMARK_PREFIX}%']
+                    )
+                Genre.objects.filter(name__startswith=BENCHMARK_PREFIX).delete()
+                Author.objects.filter(name__startswith=BENCHMARK_PREFIX).delete()
+                rebuild_stats_snapshots()
@@ -0,0 +1,93 @@
+from django.core.management.base import BaseCommand
+from books.autocomplete import AutocompleteIndex
+import random
+import time
+import tracemalloc
+
+
+WORDS = [
+    'python', 'django', 'history', 'modern', 'guide', 'art', 'of', 'the', 'introduction', 'to',
+    'advanced', 'practical', 'learning', 'data', 'science', 'world', 'war', 'love', 'secret',
+    'garden', 'ocean', 'night', 'city', 'dream', 'stars', 'empire', 'machine', 'theory', 'stories',
+    'o\'zbek', 'adabiyoti', 'tarixi', 'ilm', 'kitobi', 'zamonaviy', 'dasturlash', 'asoslari',
+]
+
+
+class Command(BaseCommand):
+    help = 'Autocomplete prefix index: build time, memory and p50/p99 query latency'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--titles', type=int, default=100000)
+        parser.add_argument('--queries', type=int, default=20000)
+        parser.add_argument('--from-db', action='store_true', help='Use real Book titles instead of synthetic ones')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def _synthetic_rows(self, count, rng):
+        for book_id in range(1, count + 1):
+            title = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(2, 6))).title()
+            yield book_id, f'{title} {book_id}', rng.randint(0, 500)
+
+    def _percentile(self, values, pct):
+        return values[min(int(len(values) * pct / 100), len(values) - 1)]
+
+    def _build(self, options, rng):
+        index = AutocompleteIndex()
+        if options['from_db']:
+            index.build_from_db()
+        else:
+            index.build(list(self._synthetic_rows(options['titles'], rng)))
+        return index
+
+    def handle(self, *args, **options):
+        # Xotira alohida build'da o'lchanadi - tracemalloc build'ni sekinlashtiradi
+        tracemalloc.start()
+        measured = self._build(options, random.Random(options['seed']))
+        memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del measured
+
+        rng = random.Random(options['seed'])
+        start = time.perf_counter()
+        index = self._build(options, rng)
+        build_seconds = time.perf_counter() - start
+
+        titles = [title for _, title in index._titles.values()]
+        if not titles:
+            self.stdout.write(self.style.WARNING('No titles to benchmark'))
+            return
+
+        queries = []
+        for _ in range(options['queries']):
+            title = rng.choice(titles)
+            queries.append(title[:rng.randint(1, min(len(title), 12))])
+
+        timings = []
+        for query in queries:
+            start = time.perf_counter()
+            index.suggest(query)
+            timings.append((time.perf_counter() - start) * 1e6)
+        timings.sort()
+
+        # Borrow'dan keyingi birinchi so'rov - memo joyida yangilangan bo'lishi kerak
+        updated = []
+        for book_id in rng.sample(list(index._titles), min(200, len(titles))):
+            title = index._titles[book_id][1]
+            index.add_weight(book_id)
+            start = time.perf_counter()
+            index.suggest(title[:rng.randint(1, 3)])
+            updated.append((time.perf_counter() - start) * 1e6)
+        updated.sort()
+
+        count = len(titles)
+        self.stdout.write(self.style.SUCCESS(f'\nAutocomplete Benchmark ({count} titles, {len(queries)} queries):'))
+        self.stdout.write(f'Build: {build_seconds:.2f}s, memo prefixes: {len(index._memo)}')
+        self.stdout.write(
+            f'Memory: {memory / 1024 / 1024:.1f} MB '
+            f'({memory / count * 100000 / 1024 / 1024:.1f} MB per 100k titles)'
+        )
+        self.stdout.write(f'{"":>18} {"p50 (us)":>10} {"p99 (us)":>10} {"max (us)":>10}')
+        for label, values in (('prefix query', timings), ('after borrow', updated)):
+            self.stdout.write(
+                f'{label:>18} {self._percentile(values, 50):>10.1f} '
+                f'{self._percentile(values, 99):>10.1f} {values[-1]:>10.1f}'
+            )
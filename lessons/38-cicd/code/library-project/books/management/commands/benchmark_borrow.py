@@ -0,0 +1,87 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection
+from books.models import Book, Author, BookLog, BorrowHistory
+from books.signals import borrow_book
+from decimal import Decimal
+import threading
+import time
+
+
+class Command(BaseCommand):
+    help = 'Concurrent borrow stress test: checks oversell and reports borrows/sec'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--borrows', type=int, default=50, help='Borrow attempts per thread')
+        parser.add_argument('--stock', type=int, default=200)
+
+    def handle(self, *args, **options):
+        threads_count = options['threads']
+        attempts = options['borrows']
+        stock = options['stock']
+
+        author = Author.objects.create(name='Benchmark Author')
+        book = Book.objects.create(
+            title='Benchmark Book',
+            isbn_number=f'9{int(time.time() * 1000) % 10**12:012d}',
+            price=Decimal('1.00'),
+            stock=stock,
+            author=author,
+        )
+        users = [
+            User.objects.create(username=f'benchmark_borrow_{book.id}_{i}')
+            for i in range(threads_count)
+        ]
+
+        lock = threading.Lock()
+        counters = {'success': 0, 'rejected': 0, 'retried': 0}
+        barrier = threading.Barrier(threads_count)
+
+        def worker(user):
+            barrier.wait()
+            try:
+                for _ in range(attempts):
+                    try:
+                        borrow_book(book.id, user)
+                        key = 'success'
+                    except ValueError:
+                        key = 'rejected'
+                    except OperationalError:
+                        key = 'retried'
+                    with lock:
+                        counters[key] += 1
+            finally:
+                connection.close()
+
+        try:
+            workers = [threading.Thread(target=worker, args=(user,)) for user in users]
+            start = time.perf_counter()
+            for thread in workers:
+                thread.start()
+            for thread in workers:
+                thread.join()
+            elapsed = time.perf_counter() - start
+
+            book.refresh_from_db()
+            histories = BorrowHistory.objects.filter(book=book).count()
+            oversold = book.stock < 0 or histories > stock
+
+            self.stdout.write(self.style.SUCCESS('\nBorrow Stress Test Results:'))
+            self.stdout.write(f'Threads: {threads_count}, attempts: {threads_count * attempts}, stock: {stock}')
+            self.stdout.write(
+                f'Borrowed: {counters["success"]}, rejected: {counters["rejected"]}, '
+                f'lock errors: {counters["retried"]}'
+            )
+            self.stdout.write(f'Final stock: {book.stock}, history rows: {histories}')
+            self.stdout.write(f'Throughput: {counters["success"] / elapsed:.1f} borrows/sec ({elapsed:.2f}s)')
+
+            if oversold:
+                self.stdout.write(self.style.ERROR('OVERSELL DETECTED'))
+            else:
+                self.stdout.write(self.style.SUCCESS('No oversell'))
+        finally:
+            BookLog.objects.filter(book_id=book.id).delete()
+            book.delete()
+            author.delete()
+            User.objects.filter(pk__in=[user.pk for user in users]).delete()
@@ -0,0 +1,69 @@
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand
+from books.cache_tags import TaggedCache, BOOKS_LIST_TAG, book_tag
+import fnmatch
+import time
+
+
+class Command(BaseCommand):
+    help = 'Compare KEYS-pattern invalidation with tag-based invalidation'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=str, default='1000,10000,100000',
+            help='Comma-separated number of cached list keys'
+        )
+        parser.add_argument('--repeat', type=int, default=100)
+
+    def _pattern_delete(self, cache, pattern):
+        """Eski usul: KEYS pattern + DELETE (O(N) butun keyspace bo'yicha)"""
+        try:
+            from django_redis import get_redis_connection
+            redis_conn = get_redis_connection('default')
+            keys = redis_conn.keys(pattern)
+            if keys:
+                redis_conn.delete(*keys)
+        except (ImportError, NotImplementedError):
+            # LocMemCache - ichki dict bo'yicha scan
+            keys = [
+                key for key in list(cache._cache)
+                if fnmatch.fnmatch(key, f'*{pattern}')
+            ]
+            for key in keys:
+                cache._cache.pop(key, None)
+                cache._expire_info.pop(key, None)
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',')]
+        repeat = options['repeat']
+        cache = caches['default']
+        if isinstance(cache, LocMemCache):
+            # Default LocMemCache 300 ta key'dan keyin cull qiladi
+            cache = LocMemCache('benchmark', {'OPTIONS': {'MAX_ENTRIES': max(sizes) * 2}})
+        tagged = TaggedCache(backend=cache)
+
+        self.stdout.write(self.style.SUCCESS('\nCache Invalidation Benchmark:'))
+        self.stdout.write(f'{"keys":>10} {"KEYS scan (ms)":>16} {"tag INCR (ms)":>16}')
+
+        for size in sizes:
+            cache.clear()
+
+            # Eski usul: har bir list sahifasi alohida key
+            cache.set_many({f'books:list:optimized:{i}': i for i in range(size)}, timeout=600)
+            start = time.perf_counter()
+            self._pattern_delete(cache, 'books:list:optimized:*')
+            scan_ms = (time.perf_counter() - start) * 1000
+
+            # Yangi usul: shu key'lar tag ostida
+            cache.clear()
+            stamp = tagged.make_key('', [BOOKS_LIST_TAG])
+            cache.set_many({f'books:list:optimized:{i}{stamp}': i for i in range(size)}, timeout=600)
+            start = time.perf_counter()
+            for i in range(repeat):
+                tagged.invalidate(book_tag(i), BOOKS_LIST_TAG)
+            tag_ms = (time.perf_counter() - start) * 1000 / repeat
+
+            self.stdout.write(f'{size:>10} {scan_ms:>16.3f} {tag_ms:>16.3f}')
+
+        cache.clear()
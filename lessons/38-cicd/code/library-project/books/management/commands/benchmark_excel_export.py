@@ -0,0 +1,113 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from books.exports import ExcelExporter
+from books.models import Book, Author
+from decimal import Decimal
+import multiprocessing
+import resource
+import time
+
+
+BENCHMARK_PREFIX = 'Benchmark Export'
+
+
+def _current_rss_kb():
+    with open('/proc/self/statm') as statm:
+        pages = int(statm.read().split()[1])
+    return pages * resource.getpagesize() // 1024
+
+
+def _run_export(mode, queue):
+    """Alohida process: peak RSS faqat shu export uchun o'lchanadi"""
+    connection.close()
+    baseline = _current_rss_kb()
+    queryset = Book.objects.filter(title__startswith=BENCHMARK_PREFIX)
+
+    start = time.perf_counter()
+    if mode == 'classic':
+        response = ExcelExporter.export_books(queryset)
+        size = len(response.content)
+    else:
+        response = ExcelExporter.export_books_streaming(queryset)
+        size = sum(len(chunk) for chunk in response.streaming_content)
+        response.close()
+    elapsed = time.perf_counter() - start
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put((elapsed, max(peak - baseline, 0) / 1024, size / 1024 / 1024))
+
+
+class Command(BaseCommand):
+    help = 'Compare classic and streaming Excel export: wall time and peak RSS'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=str, default='10000,100000,500000')
+        parser.add_argument(
+            '--skip-classic-above', type=int, default=100000,
+            help='Classic export is skipped for larger sizes (too slow)'
+        )
+        parser.add_argument('--keep', action='store_true', help='Keep generated books')
+
+    def _seed(self, count):
+        author, _ = Author.objects.get_or_create(name=f'{BENCHMARK_PREFIX} Author')
+        existing = Book.objects.filter(title__startswith=BENCHMARK_PREFIX).count()
+        books = (
+            Book(
+                title=f'{BENCHMARK_PREFIX} {i}',
+                isbn_number=f'B{i:012d}',
+                price=Decimal('19.99'),
+                stock=i % 20,
+                pages=100 + i % 500,
+                author=author,
+            )
+            for i in range(existing, count)
+        )
+        batch = []
+        for book in books:
+            batch.append(book)
+            if len(batch) >= 5000:
+                Book.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            Book.objects.bulk_create(batch)
+
+    def _measure(self, mode):
+        context = multiprocessing.get_context('fork')
+        queue = context.Queue()
+        connection.close()
+        process = context.Process(target=_run_export, args=(mode, queue))
+        process.start()
+        result = queue.get()
+        process.join()
+        return result
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['rows'].split(',')]
+
+        self.stdout.write(self.style.SUCCESS('\nExcel Export Benchmark:'))
+        self.stdout.write(
+            f'{"rows":>8} {"mode":>10} {"time (s)":>10} {"peak RSS (MB)":>14} {"file (MB)":>10}'
+        )
+
+        try:
+            # Kichikdan kattaga: har safar faqat yetishmagan qatorlar qo'shiladi
+            for size in sorted(sizes):
+                self._seed(size)
+
+                for mode in ('classic', 'streaming'):
+                    if mode == 'classic' and size > options['skip_classic_above']:
+                        self.stdout.write(f'{size:>8} {mode:>10} {"skipped":>10}')
+                        continue
+                    elapsed, peak_mb, file_mb = self._measure(mode)
+                    self.stdout.write(
+                        f'{size:>8} {mode:>10} {elapsed:>10.2f} {peak_mb:>14.1f} {file_mb:>10.2f}'
+                    )
+        finally:
+            if not options['keep']:
+                # Signal'larsiz tez o'chirish (benchmark kitoblarida bog'liq qatorlar yo'q)
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f'DELETE FROM {Book._meta.db_table} WHERE title LIKE %s',
+                        [f'{BENCHMARK_PREFIX}%']
+                    )
+                Author.objects.filter(name=f'{BENCHMARK_PREFIX} Author').delete()
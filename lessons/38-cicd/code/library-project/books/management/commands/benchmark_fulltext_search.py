@@ -0,0 +1,101 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Q
+from books.models import Book
+from books.search_backends import get_database_backend
+from decimal import Decimal
+import random
+import time
+
+
+ISBN_PREFIX = 'X'  # benchmark kitoblari (haqiqiy ISBN raqam bilan boshlanadi)
+RARE_WORD = 'zephyrine'
+
+WORDS = [
+    'python', 'django', 'history', 'modern', 'guide', 'art', 'of', 'the', 'introduction', 'to',
+    'advanced', 'practical', 'learning', 'data', 'science', 'world', 'war', 'love', 'secret',
+    'garden', 'ocean', 'night', 'city', 'dream', 'stars', 'empire', 'machine', 'theory', 'stories',
+    'adabiyoti', 'tarixi', 'ilm', 'kitobi', 'zamonaviy', 'dasturlash', 'asoslari', 'network',
+    'design', 'patterns', 'cooking', 'travel', 'music', 'painting', 'economics', 'politics',
+]
+
+QUERIES = ['python', 'secret garden', RARE_WORD, 'nonexistentword']
+
+
+class Command(BaseCommand):
+    help = 'Compare icontains (SearchFilter) vs database full-text search at 100k/1M books'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--books', type=int, default=100000, help='Masalan 100000 yoki 1000000')
+        parser.add_argument('--iterations', type=int, default=5)
+        parser.add_argument('--page-size', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--keep', action='store_true', help='Keep generated books')
+
+    def _seed(self, count, rng):
+        existing = Book.objects.filter(isbn_number__startswith=ISBN_PREFIX).count()
+        for start in range(existing, count, 10000):
+            books = []
+            for i in range(start, min(start + 10000, count)):
+                description = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(10, 30)))
+                if i % 1000 == 0:
+                    description += f' {RARE_WORD}'
+                books.append(Book(
+                    title=' '.join(rng.choice(WORDS) for _ in range(rng.randint(2, 6))).title(),
+                    description=description,
+                    isbn_number=f'{ISBN_PREFIX}{i:012d}',
+                    price=Decimal('10.00'),
+                ))
+            Book.objects.bulk_create(books)
+
+    def _time(self, fetch, iterations):
+        timings = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            fetch()
+            timings.append(time.perf_counter() - start)
+        return min(timings) * 1000
+
+    def _icontains(self, query, page_size):
+        """DRF SearchFilter: har bir so'z uchun ustunlar bo'yicha icontains OR"""
+        queryset = Book.objects.all()
+        for term in query.split():
+            queryset = queryset.filter(
+                Q(title__icontains=term) | Q(description__icontains=term) | Q(isbn_number__icontains=term)
+            )
+        return queryset.count(), list(queryset.order_by('-created_at')[:page_size])
+
+    def _fulltext(self, backend, query, page_size):
+        queryset = backend.search_books(query)
+        return queryset.count(), list(queryset[:page_size])
+
+    def handle(self, *args, **options):
+        backend = get_database_backend()
+        rng = random.Random(options['seed'])
+        self.stdout.write(f"Seeding {options['books']} books ({connection.vendor})...")
+        start = time.perf_counter()
+        self._seed(options['books'], rng)
+        self.stdout.write(f'Seeded in {time.perf_counter() - start:.1f}s (full-text index trigger\'lar bilan)')
+
+        page_size = options['page_size']
+        self.stdout.write(self.style.SUCCESS(
+            f"\nFull-text Search Benchmark ({Book.objects.count()} books, {type(backend).__name__}):"
+        ))
+        self.stdout.write(f'{"query":>18} {"matches":>9} {"icontains (ms)":>15} {"fulltext (ms)":>14} {"speedup":>8}')
+
+        try:
+            for query in QUERIES:
+                count, _ = self._fulltext(backend, query, page_size)
+                icontains = self._time(lambda: self._icontains(query, page_size), options['iterations'])
+                fulltext = self._time(lambda: self._fulltext(backend, query, page_size), options['iterations'])
+                self.stdout.write(
+                    f'{query:>18} {count:>9} {icontains:>15.1f} {fulltext:>14.1f} {icontains / fulltext:>7.1f}x'
+                )
+        finally:
+            if not options['keep']:
+                # Raw DELETE - signal'larsiz; full-text index trigger bilan tozalanadi
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f'DELETE FROM {Book._meta.db_table} WHERE isbn_number LIKE %s',
+                        [f'{ISBN_PREFIX}%']
+                    )
@@ -0,0 +1,138 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from books.cache_tags import tagged_cache, book_tag, BOOKS_LIST_TAG
+from books.hot_cache import BookCodec, hot_cache
+from books.models import Author, Book, Genre
+from decimal import Decimal
+from datetime import date
+import pickle
+import random
+import statistics
+import time
+import tracemalloc
+
+
+ISBN_PREFIX = 'H'  # benchmark kitoblari (tranzaksiya oxirida rollback)
+
+
+class Command(BaseCommand):
+    help = 'Hot book cache: pickled instances vs msgpack L2 vs per-worker L1 (hit latency, size, memory)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--books', type=int, default=5000)
+        parser.add_argument('--iterations', type=int, default=2000, help='Single-book lookups')
+        parser.add_argument('--catalog-iterations', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def _seed(self, count, rng):
+        authors = Author.objects.bulk_create(Author(name=f'Bench Author {i}') for i in range(max(count // 25, 1)))
+        genres = Genre.objects.bulk_create(Genre(name=f'Bench Genre {i}') for i in range(20))
+        books = Book.objects.bulk_create(
+            Book(
+                title=f'Bench Book {i}',
+                description='Lorem ipsum dolor sit amet ' * rng.randint(1, 8),
+                isbn_number=f'{ISBN_PREFIX}{i:012d}',
+                price=Decimal(rng.randint(500, 9000)) / 100,
+                published_date=date(rng.randint(1950, 2024), 1, 1),
+                author=rng.choice(authors),
+                stock=rng.randint(0, 20),
+            )
+            for i in range(count)
+        )
+        Through = Book.genres.through
+        Through.objects.bulk_create(
+            Through(book_id=book.pk, genre_id=genre.pk)
+            for book in books for genre in rng.sample(genres, rng.randint(1, 3))
+        )
+        return [book.pk for book in books]
+
+    def _time(self, lookup, iterations):
+        timings = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            lookup()
+            timings.append((time.perf_counter() - start) * 1e6)
+        return statistics.median(timings)
+
+    def _peak(self, lookup):
+        """Bitta hit'ning vaqtinchalik xotirasi (decode/unpickle)"""
+        tracemalloc.start()
+        result = lookup()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del result
+        return peak
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        with transaction.atomic():
+            book_ids = self._seed(options['books'], rng)
+            queryset = Book.objects.select_related('author').prefetch_related('genres')
+            try:
+                self._run(options, rng, book_ids, queryset)
+            finally:
+                transaction.set_rollback(True)
+                hot_cache.evict(None)
+
+    def _run(self, options, rng, book_ids, queryset):
+        hot_cache.evict(None)
+        sample = rng.sample(book_ids, min(200, len(book_ids)))
+        lookups = [rng.choice(sample) for _ in range(options['iterations'])]
+        catalog = list(queryset)
+
+        # Oldingi variant: pickled instance'lar, tagged_cache (LocMem/Redis)
+        def old_book(book_id):
+            return tagged_cache.get_or_set(
+                f'bench:pickled:{book_id}', lambda: queryset.get(pk=book_id), tags=[book_tag(book_id)]
+            )
+
+        def old_catalog():
+            return tagged_cache.get_or_set('bench:pickled:all', lambda: catalog, tags=[BOOKS_LIST_TAG])
+
+        # Yangi variant, faqat L2: L1'siz (boshqa worker yoki TTL'dan keyin)
+        def l2_book(book_id):
+            return BookCodec.decode(tagged_cache.get_or_set(
+                f'bench:packed:{book_id}', lambda: BookCodec.encode([queryset.get(pk=book_id)]), tags=[book_tag(book_id)]
+            ))[0]
+
+        def l2_catalog():
+            return BookCodec.decode(tagged_cache.get_or_set(
+                'bench:packed:all', lambda: BookCodec.encode(catalog), tags=[BOOKS_LIST_TAG]
+            ))
+
+        for warm in (old_book, l2_book, Book.get_cached):
+            for book_id in sample:
+                warm(book_id)
+        for warm in (old_catalog, l2_catalog, Book.get_all_cached):
+            warm()
+
+        def single(lookup):
+            it = iter(lookups)
+            return self._time(lambda: lookup(next(it)), len(lookups))
+
+        rows = [
+            ('pickled (before)', single(old_book), self._time(old_catalog, options['catalog_iterations']),
+             self._peak(old_catalog)),
+            ('msgpack L2', single(l2_book), self._time(l2_catalog, options['catalog_iterations']),
+             self._peak(l2_catalog)),
+            ('msgpack L1', single(Book.get_cached), self._time(Book.get_all_cached, options['catalog_iterations']),
+             self._peak(Book.get_all_cached)),
+        ]
+
+        single_pickle = statistics.mean(len(pickle.dumps(queryset.get(pk=pk))) for pk in sample[:50])
+        single_packed = statistics.mean(len(BookCodec.encode([queryset.get(pk=pk)])) for pk in sample[:50])
+        catalog_pickle = len(pickle.dumps(catalog))
+        catalog_packed = len(BookCodec.encode(catalog))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'\nHot Cache Benchmark ({len(book_ids)} books, {len(lookups)} single lookups over {len(sample)} hot ids):'
+        ))
+        self.stdout.write(f'{"":>18} {"book (us)":>10} {"catalog (ms)":>13} {"catalog peak (MB)":>18}')
+        for label, book_us, catalog_us, peak in rows:
+            self.stdout.write(f'{label:>18} {book_us:>10.1f} {catalog_us / 1000:>13.1f} {peak / 1024 / 1024:>18.1f}')
+
+        self.stdout.write(f'\nValue size: book {single_pickle:.0f} -> {single_packed:.0f} bytes, '
+                          f'catalog {catalog_pickle / 1024:.0f} -> {catalog_packed / 1024:.0f} KB '
+                          f'({catalog_pickle / catalog_packed:.1f}x smaller)')
+        self.stdout.write(f'L1 resident: {hot_cache.local.currbytes / 1024:.0f} KB in {len(hot_cache.local)} entries '
+                          f'(limit {hot_cache.local.maxbytes / 1024 / 1024:.0f} MB)')
@@ -0,0 +1,91 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from books.models import BookLog
+from books.pagination import BookLogKeysetPagination, StandardResultsSetPagination
+import time
+
+
+BENCHMARK_TITLE = 'Benchmark Keyset'
+
+
+class Command(BaseCommand):
+    help = 'Compare OFFSET vs keyset pagination latency on deep BookLog pages'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=200000)
+        parser.add_argument('--pages', type=str, default='1,10,100,1000,10000')
+        parser.add_argument('--page-size', type=int, default=20)
+        parser.add_argument('--iterations', type=int, default=5)
+        parser.add_argument('--keep', action='store_true', help='Keep generated logs')
+
+    def _seed(self, count):
+        existing = BookLog.objects.filter(book_title=BENCHMARK_TITLE).count()
+        for start in range(existing, count, 10000):
+            BookLog.objects.bulk_create([
+                BookLog(book_title=BENCHMARK_TITLE, book_id=i, action='updated')
+                for i in range(start, min(start + 10000, count))
+            ])
+
+    def _request(self, params):
+        return Request(APIRequestFactory().get('/api/logs/', params, HTTP_HOST='localhost'))
+
+    def _time(self, fetch, iterations):
+        timings = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            fetch()
+            timings.append(time.perf_counter() - start)
+        return min(timings) * 1000
+
+    def _cursor_for(self, page, page_size, queryset):
+        """page-1 sahifaning oxirgi qatoridan cursor (bir martalik setup)"""
+        if page == 1:
+            return {}
+        last = queryset.order_by('-timestamp', '-id')[(page - 1) * page_size - 1]
+        paginator = BookLogKeysetPagination()
+        paginator.base_url = 'http://localhost/api/logs/'
+        link = paginator.encode_cursor([last.timestamp, last.id])
+        return {'cursor': link.split('cursor=')[1]}
+
+    def handle(self, *args, **options):
+        page_size = options['page_size']
+        self.stdout.write(f"Seeding {options['rows']} book logs...")
+        self._seed(options['rows'])
+
+        # Butun jadval - filtrsiz, faqat (-timestamp, -id) index
+        queryset = BookLog.objects.all()
+        pages = [int(page) for page in options['pages'].split(',')]
+        pages = [page for page in pages if (page - 1) * page_size < options['rows']]
+
+        class OffsetPagination(StandardResultsSetPagination):
+            max_page_size = page_size
+
+        class KeysetPagination(BookLogKeysetPagination):
+            max_page_size = page_size
+
+        self.stdout.write(self.style.SUCCESS('\nKeyset Pagination Benchmark:'))
+        self.stdout.write(f'{"page":>8} {"offset (ms)":>12} {"keyset (ms)":>12}')
+
+        try:
+            for page in pages:
+                offset_request = self._request({'page': page, 'page_size': page_size})
+                keyset_request = self._request({'page_size': page_size, **self._cursor_for(page, page_size, queryset)})
+
+                offset = self._time(
+                    lambda: OffsetPagination().paginate_queryset(queryset.order_by('-timestamp', '-id'), offset_request),
+                    options['iterations'],
+                )
+                keyset = self._time(
+                    lambda: KeysetPagination().paginate_queryset(queryset, keyset_request),
+                    options['iterations'],
+                )
+                self.stdout.write(f'{page:>8} {offset:>12.2f} {keyset:>12.2f}')
+        finally:
+            if not options['keep']:
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f'DELETE FROM {BookLog._meta.db_table} WHERE book_title = %s',
+                        [BENCHMARK_TITLE]
+                    )
@@ -0,0 +1,96 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from books.reports import PDFReportGenerator
+from books.models import Book, Author
+from decimal import Decimal
+import multiprocessing
+import resource
+import tempfile
+import time
+
+
+BENCHMARK_PREFIX = 'Benchmark PDF'
+
+
+def _current_rss_kb():
+    with open('/proc/self/statm') as statm:
+        pages = int(statm.read().split()[1])
+    return pages * resource.getpagesize() // 1024
+
+
+def _run_report(chunk_size, queue):
+    """Alohida process: peak RSS faqat shu report uchun o'lchanadi"""
+    connection.close()
+    baseline = _current_rss_kb()
+    queryset = Book.objects.filter(title__startswith=BENCHMARK_PREFIX)
+
+    start = time.perf_counter()
+    with tempfile.TemporaryFile(suffix='.pdf') as output:
+        totals = PDFReportGenerator.build_books_report(queryset, output, chunk_size=chunk_size)
+        size = output.tell()
+    elapsed = time.perf_counter() - start
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put((totals['pages'], elapsed, max(peak - baseline, 0) / 1024, size / 1024 / 1024))
+
+
+class Command(BaseCommand):
+    help = 'Benchmark PDF books report: pages/sec and peak RSS'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=str, default='1000,10000,50000')
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--keep', action='store_true', help='Keep generated books')
+
+    def _seed(self, count):
+        author, _ = Author.objects.get_or_create(name=f'{BENCHMARK_PREFIX} Author')
+        existing = Book.objects.filter(title__startswith=BENCHMARK_PREFIX).count()
+        batch = []
+        for i in range(existing, count):
+            batch.append(Book(
+                title=f'{BENCHMARK_PREFIX} {i}',
+                isbn_number=f'P{i:012d}',
+                price=Decimal('19.99'),
+                stock=i % 20,
+                author=author,
+            ))
+            if len(batch) >= 5000:
+                Book.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            Book.objects.bulk_create(batch)
+
+    def _measure(self, chunk_size):
+        context = multiprocessing.get_context('fork')
+        queue = context.Queue()
+        connection.close()
+        process = context.Process(target=_run_report, args=(chunk_size, queue))
+        process.start()
+        result = queue.get()
+        process.join()
+        return result
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['rows'].split(',')]
+
+        self.stdout.write(self.style.SUCCESS('\nPDF Report Benchmark:'))
+        self.stdout.write(
+            f'{"rows":>8} {"pages":>7} {"time (s)":>10} {"pages/s":>9} {"peak RSS (MB)":>14} {"file (MB)":>10}'
+        )
+
+        try:
+            for size in sorted(sizes):
+                self._seed(size)
+                pages, elapsed, peak_mb, file_mb = self._measure(options['chunk_size'])
+                self.stdout.write(
+                    f'{size:>8} {pages:>7} {elapsed:>10.2f} {pages / elapsed:>9.1f} '
+                    f'{peak_mb:>14.1f} {file_mb:>10.2f}'
+                )
+        finally:
+            if not options['keep']:
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f'DELETE FROM {Book._meta.db_table} WHERE title LIKE %s',
+                        [f'{BENCHMARK_PREFIX}%']
+                    )
+                Author.objects.filter(name=f'{BENCHMARK_PREFIX} Author').delete()
@@ -0,0 +1,79 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from books.middleware import SentryUserContextMiddleware, sentry_event_processor
+import time
+
+
+class _LegacySentryMiddleware:
+    """Oldingi implementatsiya: har bir request'da import + eager context"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            import sentry_sdk
+            from django.conf import settings
+
+            if hasattr(settings, 'SENTRY_DSN') and settings.SENTRY_DSN:
+                if hasattr(request, 'user') and request.user.is_authenticated:
+                    sentry_sdk.set_user({
+                        "id": request.user.id,
+                        "username": request.user.username,
+                        "email": getattr(request.user, 'email', None),
+                    })
+                else:
+                    sentry_sdk.set_user({
+                        "ip_address": request.META.get('REMOTE_ADDR'),
+                    })
+
+                sentry_sdk.set_context("request", {
+                    "url": request.build_absolute_uri(),
+                    "method": request.method,
+                    "query_string": request.META.get('QUERY_STRING', ''),
+                })
+        except ImportError:
+            pass
+
+        return self.get_response(request)
+
+
+class Command(BaseCommand):
+    help = 'Per-request overhead of SentryUserContextMiddleware: eager context vs lazy event processor'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=20000)
+
+    def _run(self, handler, request, total):
+        start = time.perf_counter()
+        for _ in range(total):
+            handler(request)
+        return (time.perf_counter() - start) / total * 1e6
+
+    def handle(self, *args, **options):
+        total = options['requests']
+        request = RequestFactory().get('/api/v2/books/?page=2', HTTP_HOST='localhost')
+        request.user = User(id=1, username='benchmark', email='benchmark@example.com')
+        response = HttpResponse()
+
+        def get_response(request):
+            return response
+
+        with override_settings(SENTRY_DSN='https://key@sentry.example.com/1'):
+            baseline = self._run(get_response, request, total)
+            legacy = self._run(_LegacySentryMiddleware(get_response), request, total)
+            lazy = self._run(SentryUserContextMiddleware(get_response), request, total)
+
+            def get_response_with_event(request):
+                sentry_event_processor({}, {})
+                return response
+
+            event = self._run(SentryUserContextMiddleware(get_response_with_event), request, total // 10 or 1)
+
+        self.stdout.write(self.style.SUCCESS(f'\nSentry Middleware Benchmark ({total} requests):'))
+        self.stdout.write(f'{"variant":>22} {"overhead (us)":>14}')
+        self.stdout.write(f'{"legacy (eager)":>22} {legacy - baseline:>14.2f}')
+        self.stdout.write(f'{"lazy, no event":>22} {lazy - baseline:>14.2f}')
+        self.stdout.write(f'{"lazy, error event":>22} {event - baseline:>14.2f}')
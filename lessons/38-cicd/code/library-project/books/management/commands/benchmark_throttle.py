@@ -0,0 +1,71 @@
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from rest_framework.throttling import SimpleRateThrottle
+from books.throttle_engine import get_throttle_engine
+import time
+
+
+class _BenchmarkThrottle(SimpleRateThrottle):
+    rate = '1000/hour'
+
+    def get_cache_key(self, request, view):
+        return 'benchmark_throttle'
+
+
+class Command(BaseCommand):
+    help = 'Per-check latency: SimpleRateThrottle history list vs GCRA engine'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rate', type=str, default='1000/hour')
+        parser.add_argument('--checks', type=int, default=1000)
+        parser.add_argument('--alias', type=str, default='default')
+
+    def _legacy(self, rate, checks, alias):
+        throttle = _BenchmarkThrottle()
+        throttle.cache = caches[alias]
+        throttle.rate = rate
+        throttle.num_requests, throttle.duration = throttle.parse_rate(rate)
+        throttle.cache.delete('benchmark_throttle')
+
+        timings = []
+        for _ in range(checks):
+            start = time.perf_counter()
+            throttle.allow_request(None, None)
+            timings.append(time.perf_counter() - start)
+        throttle.cache.delete('benchmark_throttle')
+        return timings
+
+    def _gcra(self, rate, checks, alias):
+        engine = get_throttle_engine(alias)
+        num_requests, duration = SimpleRateThrottle.parse_rate(None, rate)
+        engine.reset('benchmark_throttle')
+
+        timings = []
+        for _ in range(checks):
+            start = time.perf_counter()
+            engine.hit('benchmark_throttle', num_requests, duration)
+            timings.append(time.perf_counter() - start)
+        engine.reset('benchmark_throttle')
+        return timings
+
+    def _window(self, timings, start, end):
+        window = timings[start:end]
+        return sum(window) / len(window) * 1e6 if window else 0.0
+
+    def handle(self, *args, **options):
+        rate, checks, alias = options['rate'], options['checks'], options['alias']
+        legacy = self._legacy(rate, checks, alias)
+        gcra = self._gcra(rate, checks, alias)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"\nThrottle Benchmark ({rate}, cache: {type(caches[alias]).__name__}, "
+            f"engine: {type(get_throttle_engine(alias)).__name__}):"
+        ))
+        self.stdout.write(f'{"checks":>14} {"legacy (us)":>12} {"gcra (us)":>10}')
+        step = max(checks // 5, 1)
+        for start in range(0, checks, step):
+            end = min(start + step, checks)
+            self.stdout.write(
+                f'{f"{start + 1}-{end}":>14} {self._window(legacy, start, end):>12.1f} '
+                f'{self._window(gcra, start, end):>10.1f}'
+            )
@@ -0,0 +1,114 @@
+from datetime import date
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.http import HttpResponse
+from django.test import RequestFactory
+from books.api_metrics import VersionMetricsRecorder, create_sink
+from books.middleware import APIVersionMetricsMiddleware
+import books.middleware
+import time
+
+
+class _BenchmarkUser:
+    is_authenticated = True
+
+    def __init__(self, user_id):
+        self.id = user_id
+
+
+class _LegacyMetricsMiddleware:
+    """Oldingi implementatsiya: har bir request'da cache get + set"""
+
+    def __init__(self, get_response, cache):
+        self.get_response = get_response
+        self.cache = cache
+
+    def __call__(self, request):
+        version = 'v2'
+        today = date.today()
+
+        cache_key = f'bench_api_usage:{version}:{today}'
+        current_count = self.cache.get(cache_key)
+        self.cache.set(cache_key, (current_count or 0) + 1, timeout=86400 * 7)
+
+        users_key = f'bench_api_users:{version}:{today}'
+        users_set = self.cache.get(users_key, set())
+        users_set.add(request.user.id)
+        self.cache.set(users_key, users_set, timeout=86400 * 7)
+
+        response = self.get_response(request)
+        response['X-API-Version'] = version
+        return response
+
+
+class Command(BaseCommand):
+    help = 'Per-request overhead: legacy get/set version metrics vs batched recorder'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=5000)
+        parser.add_argument('--users', type=int, default=2000)
+        parser.add_argument('--alias', type=str, default='default')
+
+    def _requests(self, total, users):
+        factory = RequestFactory()
+        requests = []
+        for i in range(total):
+            request = factory.get('/api/v2/books/', HTTP_HOST='localhost')
+            request.user = _BenchmarkUser(i % users) if users else AnonymousUser()
+            requests.append(request)
+        return requests
+
+    def _run(self, middleware, requests):
+        timings = []
+        for request in requests:
+            start = time.perf_counter()
+            middleware(request)
+            timings.append(time.perf_counter() - start)
+        return timings
+
+    def _window(self, timings, start, end):
+        window = timings[start:end]
+        return sum(window) / len(window) * 1e6 if window else 0.0
+
+    def handle(self, *args, **options):
+        total, users, alias = options['requests'], options['users'], options['alias']
+        cache = caches[alias]
+        requests = self._requests(total, users)
+
+        def get_response(request):
+            return HttpResponse()
+
+        cache.delete_many([f'bench_api_usage:v2:{date.today()}', f'bench_api_users:v2:{date.today()}'])
+        legacy = self._run(_LegacyMetricsMiddleware(get_response, cache), requests)
+        cache.delete_many([f'bench_api_usage:v2:{date.today()}', f'bench_api_users:v2:{date.today()}'])
+
+        # Benchmark uchun alohida recorder - global hisoblar buzilmaydi
+        sink = create_sink(alias)
+        bench_recorder = VersionMetricsRecorder(sink)
+        original = books.middleware.recorder
+        books.middleware.recorder = bench_recorder
+        try:
+            batched = self._run(APIVersionMetricsMiddleware(get_response), requests)
+            start = time.perf_counter()
+            bench_recorder.flush()
+            final_flush = (time.perf_counter() - start) * 1e6
+        finally:
+            books.middleware.recorder = original
+
+        self.stdout.write(self.style.SUCCESS(
+            f'\nVersion Metrics Benchmark ({total} requests, {users} users, '
+            f'cache: {type(cache).__name__}, sink: {type(sink).__name__}):'
+        ))
+        self.stdout.write(f'{"requests":>14} {"legacy (us)":>12} {"batched (us)":>13}')
+        step = max(total // 5, 1)
+        for start in range(0, total, step):
+            end = min(start + step, total)
+            self.stdout.write(
+                f'{f"{start + 1}-{end}":>14} {self._window(legacy, start, end):>12.1f} '
+                f'{self._window(batched, start, end):>13.1f}'
+            )
+        self.stdout.write(
+            f'\nflush every {bench_recorder.max_pending} requests / '
+            f'{bench_recorder.flush_interval}s, last flush: {final_flush:.1f} us'
+        )
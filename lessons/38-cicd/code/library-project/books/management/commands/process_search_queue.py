@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from books.indexing import process_index_queue, QUEUE_BATCH_SIZE
+import time
+
+
+class Command(BaseCommand):
+    help = 'Index queued Book changes into Elasticsearch (one bulk request per batch)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=QUEUE_BATCH_SIZE)
+        parser.add_argument('--loop', action='store_true', help='Keep polling the queue')
+        parser.add_argument('--interval', type=float, default=1.0, help='Poll interval for --loop (seconds)')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        totals = [0, 0, 0]
+
+        while True:
+            start = time.time()
+            indexed, deleted, failed = process_index_queue(batch_size=batch_size)
+            if indexed or deleted or failed:
+                totals = [totals[0] + indexed, totals[1] + deleted, totals[2] + failed]
+                self.stdout.write(
+                    f'Batch: {indexed} indexed, {deleted} deleted, {failed} failed '
+                    f'in {time.time() - start:.2f}s'
+                )
+            # To'liq batch - navbatda yana bor bo'lishi mumkin (xatolar keyingi poll'da)
+            if not failed and indexed + deleted >= batch_size:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Search queue drained: {totals[0]} indexed, {totals[1]} deleted, {totals[2]} failed'
+        ))
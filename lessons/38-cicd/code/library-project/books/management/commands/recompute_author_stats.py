@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from books.author_stats import recompute_author_stats
+import time
+
+
+class Command(BaseCommand):
+    help = 'Recompute Author.total_books/available_books with one grouped aggregate'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        start = time.time()
+        fixed = recompute_author_stats(batch_size=options['batch_size'])
+        elapsed = time.time() - start
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Author stats recomputed: {fixed} drifted authors fixed in {elapsed:.2f}s'
+        ))
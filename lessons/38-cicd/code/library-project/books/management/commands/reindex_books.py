@@ -0,0 +1,60 @@
+"""
+Management command to rebuild Elasticsearch index
+
+Yangi index + parallel_bulk + atomic alias swap (books/indexing.py).
+"""
+from datetime import datetime, time as dt_time
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from books.indexing import ReindexError, reindex_books, REINDEX_CHUNK_SIZE, REINDEX_THREADS
+
+
+class Command(BaseCommand):
+    help = 'Reindex books into a new Elasticsearch index and switch the alias (or --since for catch-up)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=REINDEX_CHUNK_SIZE)
+        parser.add_argument('--workers', type=int, default=REINDEX_THREADS)
+        parser.add_argument(
+            '--since', type=str, default=None,
+            help='ISO date/datetime: only books with updated_at >= since, into the live alias',
+        )
+        parser.add_argument('--keep-old', action='store_true', help='Keep the previous index after the swap')
+
+    def _parse_since(self, value):
+        since = parse_datetime(value)
+        if since is None:
+            day = parse_date(value)
+            if day is None:
+                raise CommandError(f"Invalid --since value '{value}'")
+            since = datetime.combine(day, dt_time.min)
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+        return since
+
+    def _progress(self, indexed, elapsed):
+        rate = indexed / elapsed if elapsed else 0
+        self.stdout.write(f'  {indexed} docs, {rate:.0f} docs/sec')
+
+    def handle(self, *args, **options):
+        since = self._parse_since(options['since']) if options['since'] else None
+        mode = f'changes since {since.isoformat()}' if since else 'full rebuild'
+        self.stdout.write(f'Reindexing books ({mode}, {options["workers"]} workers)...')
+
+        try:
+            result = reindex_books(
+                since=since,
+                chunk_size=options['chunk_size'],
+                thread_count=options['workers'],
+                keep_old=options['keep_old'],
+                progress=self._progress,
+            )
+        except ReindexError as e:
+            raise CommandError(str(e))
+
+        rate = result['indexed'] / result['seconds'] if result['seconds'] else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"Index {result['index']}: {result['indexed']} docs in {result['seconds']:.2f}s "
+            f"({rate:.0f} docs/sec), {result['failed']} failed"
+        ))
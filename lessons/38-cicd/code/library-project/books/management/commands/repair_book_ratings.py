@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from books.ratings import repair_book_ratings
+import time
+
+
+class Command(BaseCommand):
+    help = 'Recompute denormalized Book rating summaries from reviews (one grouped UPDATE)'
+
+    def handle(self, *args, **options):
+        start = time.time()
+        updated = repair_book_ratings()
+        elapsed = time.time() - start
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Rating summaries repaired: {updated} books in {elapsed:.2f}s'
+        ))
@@ -1,57 +1,99 @@
 """
 API Versioning Middleware
 """
-from datetime import datetime, date
+from contextvars import ContextVar
+from datetime import datetime
+import logging
+
 from django.conf import settings
-from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+
+from .api_metrics import recorder
+
+
+logger = logging.getLogger(__name__)
 
 # ============================================
 # SENTRY USER CONTEXT MIDDLEWARE
 # ============================================
 
+# Joriy request - event processor faqat xato event'ida o'qiydi
+_current_request = ContextVar('sentry_request', default=None)
+_processor_registered = False
+
+
+def _request_context(request):
+    """Sentry user va request context'i (faqat event yuborilganda hisoblanadi)"""
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        user_data = {
+            "id": user.id,
+            "username": user.username,
+            "email": getattr(user, 'email', None),
+        }
+    else:
+        user_data = {
+            "ip_address": request.META.get('REMOTE_ADDR'),
+        }
+
+    request_data = {
+        "url": request.build_absolute_uri(),
+        "method": request.method,
+        "query_string": request.META.get('QUERY_STRING', ''),
+    }
+    return user_data, request_data
+
+
+def sentry_event_processor(event, hint):
+    """Global event processor - request tashqarisidagi event'lar o'zgarmaydi"""
+    request = _current_request.get()
+    if request is None:
+        return event
+
+    try:
+        user_data, request_data = _request_context(request)
+    except Exception as e:
+        # Context xatosi event'ni yo'qotmasligi kerak
+        logger.warning(f"Sentry context error: {e}")
+        return event
+
+    event["user"] = {**(event.get("user") or {}), **user_data}
+    event.setdefault("contexts", {})["request"] = request_data
+    return event
+
+
 class SentryUserContextMiddleware:
     """
     Middleware to automatically set Sentry user context
+
+    Sentry mavjudligi startup'da bir marta tekshiriladi (sentry_sdk yoki
+    SENTRY_DSN yo'q bo'lsa middleware zanjirdan olib tashlanadi). Request
+    paytida faqat ContextVar o'rnatiladi - user va URL context'i event
+    processor ichida, xato event'i yuborilgandagina hisoblanadi.
     """
     
     def __init__(self, get_response):
+        global _processor_registered
+
+        if not getattr(settings, 'SENTRY_DSN', None):
+            raise MiddlewareNotUsed('SENTRY_DSN is not configured')
+        try:
+            from sentry_sdk.scope import add_global_event_processor
+        except ImportError:
+            raise MiddlewareNotUsed('sentry_sdk is not installed')
+
+        if not _processor_registered:
+            add_global_event_processor(sentry_event_processor)
+            _processor_registered = True
+
         self.get_response = get_response
     
     def __call__(self, request):
-        # Set user context for Sentry
+        token = _current_request.set(request)
         try:
-            import sentry_sdk
-            from django.conf import settings
-            
-            if hasattr(settings, 'SENTRY_DSN') and settings.SENTRY_DSN:
-                if hasattr(request, 'user') and request.user.is_authenticated:
-                    sentry_sdk.set_user({
-                        "id": request.user.id,
-                        "username": request.user.username,
-                        "email": getattr(request.user, 'email', None),
-                    })
-                else:
-                    sentry_sdk.set_user({
-                        "ip_address": request.META.get('REMOTE_ADDR'),
-                    })
-                
-                # Add request context
-                sentry_sdk.set_context("request", {
-                    "url": request.build_absolute_uri(),
-                    "method": request.method,
-                    "query_string": request.META.get('QUERY_STRING', ''),
-                })
-        except ImportError:
-            # Sentry not installed, skip
-            pass
-        except Exception as e:
-            # Log error but don't break the request
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.warning(f"Sentry middleware error: {e}")
-        
-        response = self.get_response(request)
-        return response
+            return self.get_response(request)
+        finally:
+            _current_request.reset(token)
 
 class APIVersionDeprecationMiddleware:
     """
@@ -92,6 +134,9 @@ class APIVersionDeprecationMiddleware:
 class APIVersionMetricsMiddleware:
     """
     Track API version usage for analytics
+
+    Request soni va unique user'lar worker ichida yig'iladi va davriy
+    ravishda bitta batch bilan yoziladi (books/api_metrics.py).
     """
     
     def __init__(self, get_response):
@@ -101,57 +146,19 @@ class APIVersionMetricsMiddleware:
         # Extract version from path
         version = self.get_version_from_path(request.path)
         
-        if version:
-            # Log version usage with safe caching
-            self._track_usage(version)
-            
-            # Track authenticated users
-            if hasattr(request, 'user') and request.user.is_authenticated:
-                self._track_user(version, request.user.id)
-        
         response = self.get_response(request)
         
-        # Add version to response header
         if version:
+            # DRF autentifikatsiyasi (JWT) view ichida - user response'dan keyin aniq
+            user = getattr(request, 'user', None)
+            user_id = user.id if user is not None and user.is_authenticated else None
+            recorder.record(version, user_id)
+            
+            # Add version to response header
             response['X-API-Version'] = version
         
         return response
     
-    def _track_usage(self, version):
-        """Safely track API usage count"""
-        try:
-            today = date.today()
-            cache_key = f'api_usage:{version}:{today}'
-            
-            # Get current count
-            current_count = cache.get(cache_key)
-            
-            if current_count is None:
-                # Initialize if doesn't exist
-                cache.set(cache_key, 1, timeout=86400 * 7)  # Keep for 7 days
-            else:
-                # Increment existing count
-                cache.set(cache_key, current_count + 1, timeout=86400 * 7)
-                
-        except Exception as e:
-            # Silently fail for metrics (not critical)
-            pass
-    
-    def _track_user(self, version, user_id):
-        """Track unique users per version"""
-        try:
-            today = date.today()
-            users_key = f'api_users:{version}:{today}'
-            
-            # Get existing set or create new
-            users_set = cache.get(users_key, set())
-            users_set.add(user_id)
-            cache.set(users_key, users_set, timeout=86400 * 7)
-            
-        except Exception as e:
-            # Silently fail for metrics (not critical)
-            pass
-    
     def get_version_from_path(self, path):
         """Extract version from URL path"""
         if '/api/v1/' in path:
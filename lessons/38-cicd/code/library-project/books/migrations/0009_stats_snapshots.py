@@ -0,0 +1,125 @@
+# Generated by Django 5.2.10 on 2026-10-16 23:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0008_alter_review_options_author_available_books_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AuthorStatsRollup",
+            fields=[
+                (
+                    "author",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="stats",
+                        serialize=False,
+                        to="books.author",
+                    ),
+                ),
+                ("book_count", models.IntegerField(default=0)),
+                (
+                    "price_sum",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=16),
+                ),
+                ("total_stock", models.IntegerField(default=0)),
+                ("total_pages", models.IntegerField(default=0)),
+                (
+                    "total_value",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=18),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="BookStatsSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("total_books", models.IntegerField(default=0)),
+                (
+                    "price_sum",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=16),
+                ),
+                (
+                    "min_price",
+                    models.DecimalField(decimal_places=2, max_digits=10, null=True),
+                ),
+                (
+                    "max_price",
+                    models.DecimalField(decimal_places=2, max_digits=10, null=True),
+                ),
+                ("total_stock", models.IntegerField(default=0)),
+                (
+                    "total_value",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=18),
+                ),
+                ("price_budget", models.IntegerField(default=0)),
+                ("price_moderate", models.IntegerField(default=0)),
+                ("price_premium", models.IntegerField(default=0)),
+                ("price_luxury", models.IntegerField(default=0)),
+                ("status_out_of_stock", models.IntegerField(default=0)),
+                ("status_low_stock", models.IntegerField(default=0)),
+                ("status_in_stock", models.IntegerField(default=0)),
+                ("analysis_out_of_stock", models.IntegerField(default=0)),
+                ("analysis_critical", models.IntegerField(default=0)),
+                ("analysis_low", models.IntegerField(default=0)),
+                ("analysis_normal", models.IntegerField(default=0)),
+                ("analysis_high", models.IntegerField(default=0)),
+                ("updated_at", models.DateTimeField()),
+                ("rebuilt_at", models.DateTimeField()),
+            ],
+            options={
+                "verbose_name": "Book Stats Snapshot",
+                "verbose_name_plural": "Book Stats Snapshots",
+            },
+        ),
+        migrations.CreateModel(
+            name="GenreStatsRollup",
+            fields=[
+                (
+                    "genre",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="stats",
+                        serialize=False,
+                        to="books.genre",
+                    ),
+                ),
+                ("book_count", models.IntegerField(default=0)),
+                (
+                    "price_sum",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=16),
+                ),
+                (
+                    "min_price",
+                    models.DecimalField(decimal_places=2, max_digits=10, null=True),
+                ),
+                (
+                    "max_price",
+                    models.DecimalField(decimal_places=2, max_digits=10, null=True),
+                ),
+                ("total_stock", models.IntegerField(default=0)),
+                (
+                    "total_value",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=18),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.10 on 2026-10-16 23:22
+
+from django.db import migrations, models
+from django.db.models import Avg, Count, FloatField, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Round
+
+
+def backfill_rating_summary(apps, schema_editor):
+    """Mavjud review'lardan bitta UPDATE (books.ratings.repair_book_ratings)"""
+    Book = apps.get_model("books", "Book")
+    Review = apps.get_model("books", "Review")
+    db_alias = schema_editor.connection.alias
+
+    def aggregate(expression, output_field):
+        reviews = (
+            Review.objects.using(db_alias)
+            .filter(book=OuterRef("pk"))
+            .order_by()
+            .values("book")
+            .annotate(value=expression)
+            .values("value")
+        )
+        return Subquery(reviews, output_field=output_field)
+
+    Book.objects.using(db_alias).update(
+        rating_sum=Coalesce(aggregate(Sum("rating"), IntegerField()), 0),
+        rating_count=Coalesce(aggregate(Count("id"), IntegerField()), 0),
+        rating_avg=Coalesce(
+            Round(aggregate(Avg("rating"), FloatField()), 2),
+            Value(0.0),
+            output_field=FloatField(),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0009_stats_snapshots"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="book",
+            name="rating_avg",
+            field=models.FloatField(db_index=True, default=0),
+        ),
+        migrations.AddField(
+            model_name="book",
+            name="rating_count",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="book",
+            name="rating_sum",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_rating_summary, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.10 on 2026-10-16 23:26
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0010_book_rating_summary"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="booklog",
+            index=models.Index(
+                fields=["-timestamp", "-id"], name="booklog_timestamp_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="borrowhistory",
+            index=models.Index(
+                fields=["-borrowed_at", "-id"], name="borrow_borrowed_at_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="borrowhistory",
+            index=models.Index(
+                fields=["user", "-borrowed_at", "-id"],
+                name="borrow_user_borrowed_at_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.10 on 2026-10-17 00:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0011_keyset_pagination_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SearchIndexQueue",
+            fields=[
+                ("book_id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("queued_at", models.DateTimeField(db_index=True)),
+            ],
+            options={
+                "verbose_name": "Search Index Queue Entry",
+                "verbose_name_plural": "Search Index Queue",
+            },
+        ),
+    ]
@@ -0,0 +1,199 @@
+# Generated by Django 5.2.10 on 2026-10-17 12:00
+"""
+Database full-text index (books/search_backends.py)
+
+PostgreSQL: books_book.search_vector (tsvector, title A / author B /
+description C) trigger bilan saqlanadi + GIN index; title ustida pg_trgm
+GIN index (fuzzy). Model'da maydon yo'q - har bir Book SELECT'i vektorni
+o'qimaydi.
+
+SQLite: books_fts FTS5 jadvali (rowid = book id), trigger'lar bilan sinxron.
+
+Boshqa DB'larda hech narsa qilinmaydi (BOOK_SEARCH_BACKEND='elasticsearch').
+Mavjud kitoblar shu migration ichida index'lanadi.
+"""
+
+from django.db import migrations, models
+import books.models
+import django.db.models.deletion
+
+
+POSTGRES_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "ALTER TABLE books_book ADD COLUMN search_vector tsvector",
+    """
+    CREATE FUNCTION books_book_search_vector() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('simple', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(
+                (SELECT name FROM authors WHERE id = NEW.author_id), '')), 'B') ||
+            setweight(to_tsvector('simple', coalesce(NEW.description, '')), 'C');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER books_book_search_vector_insert
+    BEFORE INSERT ON books_book
+    FOR EACH ROW EXECUTE FUNCTION books_book_search_vector()
+    """,
+    """
+    CREATE TRIGGER books_book_search_vector_update
+    BEFORE UPDATE OF title, description, author_id ON books_book
+    FOR EACH ROW
+    WHEN (OLD.title IS DISTINCT FROM NEW.title
+          OR OLD.description IS DISTINCT FROM NEW.description
+          OR OLD.author_id IS DISTINCT FROM NEW.author_id)
+    EXECUTE FUNCTION books_book_search_vector()
+    """,
+    """
+    CREATE FUNCTION authors_search_vector() RETURNS trigger AS $$
+    BEGIN
+        UPDATE books_book SET search_vector =
+            setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(NEW.name, '')), 'B') ||
+            setweight(to_tsvector('simple', coalesce(description, '')), 'C')
+        WHERE author_id = NEW.id;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER authors_search_vector_update
+    AFTER UPDATE OF name ON authors
+    FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name)
+    EXECUTE FUNCTION authors_search_vector()
+    """,
+    """
+    UPDATE books_book SET search_vector =
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(
+            (SELECT name FROM authors WHERE id = books_book.author_id), '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(description, '')), 'C')
+    """,
+    "CREATE INDEX books_book_search_vector_gin ON books_book USING gin (search_vector)",
+    "CREATE INDEX books_book_title_trgm ON books_book USING gin (title gin_trgm_ops)",
+]
+
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS books_book_title_trgm",
+    "DROP TRIGGER IF EXISTS authors_search_vector_update ON authors",
+    "DROP FUNCTION IF EXISTS authors_search_vector()",
+    "DROP TRIGGER IF EXISTS books_book_search_vector_update ON books_book",
+    "DROP TRIGGER IF EXISTS books_book_search_vector_insert ON books_book",
+    "DROP FUNCTION IF EXISTS books_book_search_vector()",
+    "ALTER TABLE books_book DROP COLUMN IF EXISTS search_vector",
+]
+
+SQLITE_FTS_ROW = """
+    INSERT INTO books_fts (rowid, title, author, description, isbn_number)
+    VALUES (new.id, new.title, (SELECT name FROM authors WHERE id = new.author_id),
+            new.description, new.isbn_number);
+"""
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE books_fts USING fts5(
+        title, author, description, isbn_number,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    # rank = bm25: title > author > description/isbn
+    "INSERT INTO books_fts (books_fts, rank) VALUES ('rank', 'bm25(10.0, 5.0, 1.0, 1.0)')",
+    f"""
+    CREATE TRIGGER books_fts_insert AFTER INSERT ON books_book BEGIN
+        {SQLITE_FTS_ROW}
+    END
+    """,
+    f"""
+    CREATE TRIGGER books_fts_update AFTER UPDATE OF title, description, isbn_number, author_id ON books_book
+    WHEN old.title IS NOT new.title OR old.description IS NOT new.description
+         OR old.isbn_number IS NOT new.isbn_number OR old.author_id IS NOT new.author_id
+    BEGIN
+        DELETE FROM books_fts WHERE rowid = old.id;
+        {SQLITE_FTS_ROW}
+    END
+    """,
+    """
+    CREATE TRIGGER books_fts_delete AFTER DELETE ON books_book BEGIN
+        DELETE FROM books_fts WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER books_fts_author_update AFTER UPDATE OF name ON authors
+    WHEN old.name IS NOT new.name
+    BEGIN
+        UPDATE books_fts SET author = new.name
+        WHERE rowid IN (SELECT id FROM books_book WHERE author_id = new.id);
+    END
+    """,
+    """
+    INSERT INTO books_fts (rowid, title, author, description, isbn_number)
+    SELECT b.id, b.title, a.name, b.description, b.isbn_number
+    FROM books_book b LEFT JOIN authors a ON a.id = b.author_id
+    """,
+]
+
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS books_fts_author_update",
+    "DROP TRIGGER IF EXISTS books_fts_delete",
+    "DROP TRIGGER IF EXISTS books_fts_update",
+    "DROP TRIGGER IF EXISTS books_fts_insert",
+    "DROP TABLE IF EXISTS books_fts",
+]
+
+STATEMENTS = {
+    'postgresql': (POSTGRES_FORWARD, POSTGRES_BACKWARD),
+    'sqlite': (SQLITE_FORWARD, SQLITE_BACKWARD),
+}
+
+
+def _run(schema_editor, forward):
+    statements = STATEMENTS.get(schema_editor.connection.vendor)
+    if statements is None:
+        return
+    for sql in statements[0 if forward else 1]:
+        schema_editor.execute(sql, params=None)
+
+
+def create_fulltext_index(apps, schema_editor):
+    _run(schema_editor, forward=True)
+
+
+def drop_fulltext_index(apps, schema_editor):
+    _run(schema_editor, forward=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0012_search_index_queue"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BookFullText",
+            fields=[
+                (
+                    "book",
+                    models.OneToOneField(
+                        db_column="rowid",
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        primary_key=True,
+                        related_name="fulltext",
+                        serialize=False,
+                        to="books.book",
+                    ),
+                ),
+                ("document", books.models.FullTextDocumentField(db_column="books_fts")),
+                ("rank", models.FloatField()),
+            ],
+            options={
+                "db_table": "books_fts",
+                "managed": False,
+            },
+        ),
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
@@ -1,6 +1,8 @@
 """
 Reusable mixins for query optimization
 """
+from .cache_tags import BOOKS_COLLECTION_TAG
+from .list_cache import list_cache_metrics, list_response_cache, view_cache_name
 
 
 class QueryOptimizationMixin:
@@ -31,4 +33,60 @@ class QueryOptimizationMixin:
         if self.prefetch_related_fields:
             queryset = queryset.prefetch_related(*self.prefetch_related_fields)
         
-        return queryset
\ No newline at end of file
+        return queryset
+
+class AnnotatedQuerysetMixin:
+    """
+    Mixin that annotates the queryset with the aggregates declared
+    by the serializer's AnnotatedField instances (books/api/v2/fields.py)
+
+    Usage:
+        class BookListAPIView(AnnotatedQuerysetMixin, generics.ListAPIView):
+            queryset = Book.objects.all()
+            serializer_class = BookListSerializerV2
+    """
+
+    def get_queryset(self):
+        """
+        Annotate queryset once - no per-row aggregate queries
+        """
+        queryset = super().get_queryset()
+        serializer_class = self.get_serializer_class()
+
+        if hasattr(serializer_class, 'annotate_queryset'):
+            # GROUP BY querylarda Meta.ordering ishlatilmaydi - aniq qo'yamiz
+            if not queryset.query.order_by and queryset.model._meta.ordering:
+                queryset = queryset.order_by(*queryset.model._meta.ordering)
+            queryset = serializer_class.annotate_queryset(queryset)
+
+        return queryset
+
+
+class CachedListMixin(QueryOptimizationMixin):
+    """
+    Read-through cache for list views - render qilingan JSON baytlari
+    (books/list_cache.py). Hit'da queryset, serializer va renderer ishlamaydi.
+
+    Usage:
+        class BookListAPIView(CachedListMixin, generics.ListAPIView):
+            queryset = Book.objects.all()
+            serializer_class = BookListSerializer
+            select_related_fields = ['author']
+            cache_timeout = 120
+            cache_per_user = True   # natija request.user'ga bog'liq bo'lsa
+    """
+    cache_name = None                     # metrika/key nomi (default: module.ClassName)
+    cache_timeout = 60
+    cache_per_user = False
+    cache_tags = (BOOKS_COLLECTION_TAG,)  # yozuvda oshadigan generation'lar
+    cache_refresh_beta = 1.0              # XFetch; 0 - early refresh yo'q
+    cache_lock_timeout = 10
+    cache_lock_wait = 2.0
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        list_cache_metrics.register(view_cache_name(cls))
+
+    def list(self, request, *args, **kwargs):
+        parent_list = super().list
+        return list_response_cache.respond(self, request, lambda: parent_list(request, *args, **kwargs))
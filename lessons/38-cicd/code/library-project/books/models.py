@@ -1,13 +1,16 @@
 from io import BytesIO
-from django.core.cache import cache
 import os
 from PIL import Image
-from django.db import models
+from django.db import models, router, transaction
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.core.files.uploadedfile import InMemoryUploadedFile
 from django.dispatch import receiver
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import post_save, post_delete, m2m_changed
+
+from .cache_tags import (
+    tagged_cache, book_tag, author_tag, BOOKS_COLLECTION_TAG, BOOKS_LIST_TAG, GENRES_TAG,
+)
 
 
 # ============================================================================
@@ -102,6 +105,12 @@ class Book(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    # Denormalized rating summary (books/ratings.py)
+    # Review yozuvlarida F() bilan yangilanadi
+    rating_sum = models.IntegerField(default=0)
+    rating_count = models.IntegerField(default=0)
+    rating_avg = models.FloatField(default=0, db_index=True)
+    
     # Foreign Keys
     author = models.ForeignKey(
         'Author',
@@ -137,49 +146,88 @@ class Book(models.Model):
     def __str__(self):
         return self.title
     
+    # ==========================================
+    # LOADED STATE TRACKING
+    # ==========================================
+
+    # DB'dan yuklangan qiymatlari eslab qolinadigan maydonlar
+    # (signal'lar eski va yangi qiymatni solishtirishi uchun)
+    TRACKED_FIELDS = ('author_id', 'is_available', 'price', 'stock', 'pages')
+
+    # Faqat Review yozuvlari F() bilan yangilaydi - Book.save() ularni
+    # eski in-memory qiymat bilan qayta yozmasligi kerak
+    RATING_FIELDS = ('rating_sum', 'rating_count', 'rating_avg')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._snapshot_tracked_fields()
+        return instance
+
+    def _snapshot_tracked_fields(self):
+        self._loaded_values = {
+            field: self.__dict__[field]
+            for field in self.TRACKED_FIELDS
+            if field in self.__dict__
+        }
+
+    def get_loaded_value(self, field, default=None):
+        """DB'dan yuklangan (save'dan oldingi) qiymat"""
+        return getattr(self, '_loaded_values', {}).get(field, default)
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.RATING_FIELDS
+                and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+        # post_save receiver'lar eski qiymatni ko'rib bo'ldi
+        self._snapshot_tracked_fields()
+
     # ==========================================
     # CACHED CLASS METHODS (from Lesson 24)
+    # Tag-based invalidation (books/cache_tags.py)
+    # Worker L1 + Redis, msgpack (books/hot_cache.py)
     # ==========================================
     
     @classmethod
     def get_cached(cls, book_id):
         """Bitta kitobni cache bilan olish"""
-        cache_key = f'book:optimized:{book_id}'
-        book = cache.get(cache_key)
-        
-        if book is None:
-            book = cls.objects.select_related('author').prefetch_related('genres').get(id=book_id)
-            cache.set(cache_key, book, timeout=300)
-        
-        return book
+        from .hot_cache import cached_books
+        return cached_books(
+            f'book:{book_id}',
+            lambda: [cls.objects.select_related('author').prefetch_related('genres').get(id=book_id)],
+            tags=[book_tag(book_id)],
+            timeout=300,
+        )[0]
     
     @classmethod
     def get_all_cached(cls):
         """Barcha kitoblarni cache bilan olish"""
-        cache_key = 'books:all:optimized'
-        books = cache.get(cache_key)
-        
-        if books is None:
-            books = list(cls.objects.select_related('author').prefetch_related('genres').all())
-            cache.set(cache_key, books, timeout=600)
-        
-        return books
+        from .hot_cache import cached_books
+        return cached_books(
+            'books:all',
+            lambda: cls.objects.select_related('author').prefetch_related('genres').all(),
+            tags=[BOOKS_LIST_TAG],
+            timeout=600,
+        )
     
     @classmethod
     def get_by_author_cached(cls, author_id):
         """Muallif bo'yicha kitoblarni cache bilan olish"""
-        cache_key = f'books:author:optimized:{author_id}'
-        books = cache.get(cache_key)
-        
-        if books is None:
-            books = list(
-                cls.objects.filter(author_id=author_id)
-                .select_related('author')
-                .prefetch_related('genres')
-            )
-            cache.set(cache_key, books, timeout=300)
-        
-        return books
+        from .hot_cache import cached_books
+        return cached_books(
+            f'books:author:{author_id}',
+            lambda: cls.objects.filter(author_id=author_id)
+            .select_related('author')
+            .prefetch_related('genres'),
+            tags=[author_tag(author_id)],
+            timeout=300,
+        )
 
 # ============================================================================
 # BOOK LOG MODEL - NEW for Lesson 28
@@ -207,6 +255,10 @@ class BookLog(models.Model):
 
     class Meta:
         ordering = ['-timestamp']
+        # Keyset pagination (BookLogKeysetPagination)
+        indexes = [
+            models.Index(fields=['-timestamp', '-id'], name='booklog_timestamp_idx'),
+        ]
         verbose_name = 'Book Log'
         verbose_name_plural = 'Book Logs'
 
@@ -245,6 +297,11 @@ class BorrowHistory(models.Model):
 
     class Meta:
         ordering = ['-borrowed_at']
+        # Keyset pagination (BorrowHistoryKeysetPagination) - admin va user bo'yicha
+        indexes = [
+            models.Index(fields=['-borrowed_at', '-id'], name='borrow_borrowed_at_idx'),
+            models.Index(fields=['user', '-borrowed_at', '-id'], name='borrow_user_borrowed_at_idx'),
+        ]
         verbose_name = 'Borrow History'
         verbose_name_plural = 'Borrow Histories'
 
@@ -267,59 +324,268 @@ class Review(models.Model):
     def __str__(self):
         return f'Review for {self.book.title} - Rating: {self.rating}'
 
+    # Book rating summary'si uchun eski qiymatlar (books/ratings.py)
+    TRACKED_FIELDS = ('book_id', 'rating')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._snapshot_tracked_fields()
+        return instance
+
+    def _snapshot_tracked_fields(self):
+        self._loaded_values = {
+            field: self.__dict__[field]
+            for field in self.TRACKED_FIELDS
+            if field in self.__dict__
+        }
+
+    def get_loaded_value(self, field, default=None):
+        """DB'dan yuklangan (save'dan oldingi) qiymat"""
+        return getattr(self, '_loaded_values', {}).get(field, default)
+
+    def save(self, *args, **kwargs):
+        """Review va Book rating summary bitta transaction'da"""
+        from .ratings import review_saved
+
+        using = kwargs.get('using') or router.db_for_write(Review, instance=self)
+        with transaction.atomic(using=using):
+            created = self._state.adding
+            super().save(*args, **kwargs)
+            review_saved(self, created, using=using)
+        self._snapshot_tracked_fields()
+
+    def delete(self, *args, **kwargs):
+        from .ratings import review_deleted
+
+        using = kwargs.get('using') or router.db_for_write(Review, instance=self)
+        with transaction.atomic(using=using):
+            review_deleted(self, using=using)
+            return super().delete(*args, **kwargs)
+
     class Meta:
         ordering = ['-created_at']
 
 
+# ============================================================================
+# ANALYTICS SNAPSHOT MODELS
+# Book yozuvlaridan delta bilan yangilanadi (books/stats_snapshot.py)
+# ============================================================================
+
+class BookStatsSnapshot(models.Model):
+    """
+    Butun katalog bo'yicha materialized statistika (bitta qator, pk=1)
+
+    Bucket ustunlari ``books.analytics`` dagi PRICE/STOCK bucket'lariga mos.
+    """
+    SINGLETON_ID = 1
+
+    total_books = models.IntegerField(default=0)
+    price_sum = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    min_price = models.DecimalField(max_digits=10, decimal_places=2, null=True)
+    max_price = models.DecimalField(max_digits=10, decimal_places=2, null=True)
+    total_stock = models.IntegerField(default=0)
+    total_value = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+
+    price_budget = models.IntegerField(default=0)
+    price_moderate = models.IntegerField(default=0)
+    price_premium = models.IntegerField(default=0)
+    price_luxury = models.IntegerField(default=0)
+
+    status_out_of_stock = models.IntegerField(default=0)
+    status_low_stock = models.IntegerField(default=0)
+    status_in_stock = models.IntegerField(default=0)
+
+    analysis_out_of_stock = models.IntegerField(default=0)
+    analysis_critical = models.IntegerField(default=0)
+    analysis_low = models.IntegerField(default=0)
+    analysis_normal = models.IntegerField(default=0)
+    analysis_high = models.IntegerField(default=0)
+
+    updated_at = models.DateTimeField()
+    rebuilt_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = 'Book Stats Snapshot'
+        verbose_name_plural = 'Book Stats Snapshots'
+
+    def __str__(self):
+        return f"Book stats ({self.total_books} books, updated {self.updated_at})"
+
+
+class GenreStatsRollup(models.Model):
+    """Janr bo'yicha materialized statistika"""
+    genre = models.OneToOneField(
+        Genre,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats'
+    )
+    book_count = models.IntegerField(default=0)
+    price_sum = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    min_price = models.DecimalField(max_digits=10, decimal_places=2, null=True)
+    max_price = models.DecimalField(max_digits=10, decimal_places=2, null=True)
+    total_stock = models.IntegerField(default=0)
+    total_value = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Stats for genre #{self.genre_id}"
+
+
+class AuthorStatsRollup(models.Model):
+    """Muallif bo'yicha materialized statistika"""
+    author = models.OneToOneField(
+        Author,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats'
+    )
+    book_count = models.IntegerField(default=0)
+    price_sum = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    total_stock = models.IntegerField(default=0)
+    total_pages = models.IntegerField(default=0)
+    total_value = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Stats for author #{self.author_id}"
+
+
+# ============================================================================
+# SEARCH INDEX QUEUE
+# O'zgargan kitoblar Elasticsearch'ga worker orqali yoziladi (books/indexing.py)
+# ============================================================================
+
+class SearchIndexQueue(models.Model):
+    """
+    Index'lanishi kerak bo'lgan kitob ID'lari
+
+    Bitta kitob uchun bitta qator - takroriy yozuvlar faqat ``queued_at`` ni
+    yangilaydi. FK emas: o'chirilgan kitob ham navbatda qoladi (ES'dan delete).
+    """
+    book_id = models.BigIntegerField(primary_key=True)
+    queued_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        verbose_name = 'Search Index Queue Entry'
+        verbose_name_plural = 'Search Index Queue'
+
+    def __str__(self):
+        return f"Book #{self.book_id} (queued {self.queued_at})"
+
+
+# ============================================================================
+# FULL-TEXT INDEX - SQLite FTS5 (books/search_backends.py)
+# ============================================================================
+
+class FullTextMatch(models.Lookup):
+    """``books_fts.books_fts MATCH '"python"*'``"""
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', (*lhs_params, *rhs_params)
+
+
+class FullTextDocumentField(models.TextField):
+    """FTS5 jadvalining o'z nomidagi yashirin ustuni - faqat ``match`` lookup uchun"""
+
+
+FullTextDocumentField.register_lookup(FullTextMatch)
+
+
+class BookFullText(models.Model):
+    """
+    ``books_fts`` FTS5 virtual jadvali (rowid = book id)
+
+    Migration (0013) faqat SQLite'da yaratadi va trigger'lar bilan
+    books_book/authors bilan sinxron saqlaydi - Django yozmaydi.
+    """
+    book = models.OneToOneField(
+        Book,
+        primary_key=True,
+        db_column='rowid',
+        db_constraint=False,
+        on_delete=models.DO_NOTHING,
+        related_name='fulltext',
+    )
+    document = FullTextDocumentField(db_column='books_fts')
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'books_fts'
+
+
 # ============================================================================
 # SIGNAL HANDLERS - Cache invalidation (from Lesson 24)
 # ============================================================================
 
+def get_book_cache_tags(instance):
+    """
+    Book yozilganda bekor qilinadigan tag'lar
+
+    Kitob boshqa muallifga o'tkazilgan bo'lsa, eski muallif ro'yxati ham
+    bekor qilinadi. ``instance.author`` emas, ``author_id`` ishlatiladi -
+    qo'shimcha query yo'q.
+    """
+    tags = {book_tag(instance.pk), BOOKS_LIST_TAG, BOOKS_COLLECTION_TAG}
+
+    for author_id in (instance.author_id, instance.get_loaded_value('author_id')):
+        if author_id:
+            tags.add(author_tag(author_id))
+
+    return tags
+
+
+def invalidate_on_commit(tags, using='default'):
+    """
+    Tag'lar commit'dan keyin bekor qilinadi: transaction ochiq paytda
+    versiya oshsa, parallel request eski (commit qilinmagan o'zgarishsiz)
+    qatorni yangi versiya/ETag bilan cache'lab qo'yadi
+    """
+    tags = set(tags)
+    transaction.on_commit(lambda: tagged_cache.invalidate(*tags), using=using)
+
+
 @receiver(post_save, sender=Book)
-def invalidate_book_cache_on_save(sender, instance, created, **kwargs):
-    """Book save qilinganda cache'ni tozalash"""
-    cache.delete(f'book:optimized:{instance.id}')
-    cache.delete('books:all:optimized')
-    
-    if hasattr(instance, 'author') and instance.author:
-        cache.delete(f'books:author:optimized:{instance.author.id}')
-    
-    try:
-        from django_redis import get_redis_connection
-        redis_conn = get_redis_connection("default")
-        
-        patterns = [
-            'books:list:optimized:*',
-            'books:page:optimized:*',
-            'books:statistics:optimized',
-            'books:search:optimized:*'
-        ]
-        
-        for pattern in patterns:
-            keys = redis_conn.keys(pattern)
-            if keys:
-                redis_conn.delete(*keys)
-    except:
-        pass
+def invalidate_book_cache_on_save(sender, instance, created, using='default', **kwargs):
+    """Book save qilinganda cache'ni tozalash (KEYS scan'siz)"""
+    invalidate_on_commit(get_book_cache_tags(instance), using=using)
 
 
 @receiver(post_delete, sender=Book)
-def invalidate_book_cache_on_delete(sender, instance, **kwargs):
-    """Book delete qilinganda cache'ni tozalash"""
-    cache.delete(f'book:optimized:{instance.id}')
-    cache.delete('books:all:optimized')
-    
-    if hasattr(instance, 'author') and instance.author:
-        cache.delete(f'books:author:optimized:{instance.author.id}')
-    
-    try:
-        from django_redis import get_redis_connection
-        redis_conn = get_redis_connection("default")
-        
-        patterns = ['books:list:optimized:*', 'books:page:optimized:*']
-        for pattern in patterns:
-            keys = redis_conn.keys(pattern)
-            if keys:
-                redis_conn.delete(*keys)
-    except:
-        pass
\ No newline at end of file
+def invalidate_book_cache_on_delete(sender, instance, using='default', **kwargs):
+    """Book delete qilinganda cache'ni tozalash (KEYS scan'siz)"""
+    invalidate_on_commit(get_book_cache_tags(instance), using=using)
+
+
+@receiver(m2m_changed, sender=Book.genres.through)
+def invalidate_book_cache_on_genres_change(sender, instance, action, reverse, pk_set, using='default', **kwargs):
+    """Janrlar o'zgardi - kitob detail'i (nested genres) va ro'yxatlar"""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    tags = {BOOKS_COLLECTION_TAG}
+    if not reverse:
+        tags.add(book_tag(instance.pk))
+    elif pk_set:
+        tags.update(book_tag(book_id) for book_id in pk_set)
+    else:
+        # genre.books.clear() - qaysi kitoblar ekani endi noma'lum, GENRES_TAG hammasini qamraydi
+        tags.add(GENRES_TAG)
+    invalidate_on_commit(tags, using=using)
+
+
+@receiver(post_save, sender=Author)
+@receiver(post_delete, sender=Author)
+def invalidate_author_cache(sender, instance, using='default', **kwargs):
+    """Muallif nomi/bio - nested author va author_name ko'rsatilgan joylar"""
+    invalidate_on_commit([author_tag(instance.pk), BOOKS_COLLECTION_TAG], using=using)
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def invalidate_genre_cache(sender, instance, using='default', **kwargs):
+    invalidate_on_commit([GENRES_TAG, BOOKS_COLLECTION_TAG], using=using)
@@ -4,12 +4,31 @@ Different pagination strategies for different use cases
 """
 
 from rest_framework.pagination import (
+    BasePagination,
     PageNumberPagination,
     LimitOffsetPagination,
     CursorPagination
 )
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import EmptyPage, Paginator as DjangoPaginator
+from django.utils.functional import cached_property
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Q
 from collections import OrderedDict
+from functools import partial
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import date, datetime, time
+import binascii
+import json
+
+from .counting import (
+    count_queryset,
+    COUNT_CACHE_TIMEOUT,
+    COUNT_ESTIMATE_THRESHOLD,
+)
 
 
 # ==================== PAGE NUMBER PAGINATION ====================
@@ -113,9 +132,317 @@ class AuthorFeedPagination(CursorPagination):
     cursor_query_param = 'cursor'
 
 
+# ==================== KEYSET (SEEK) PAGINATION ====================
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (seek) pagination - OFFSET va COUNT(*) yo'q
+
+    Sahifa oxirgi qatorning ordering qiymatlaridan keyingi qatorlar:
+        WHERE (created_at, id) < (:created_at, :id) ORDER BY created_at DESC, id DESC LIMIT n
+    Shuning uchun 1000-sahifa ham 1-sahifa kabi index bo'yicha o'qiladi.
+
+    Ordering ko'p ustunli bo'lishi mumkin; oxiriga har doim ``pk`` qo'shiladi
+    (barqaror tartib). View yoki OrderingFilter ordering bergan bo'lsa u
+    ishlatiladi, aks holda ``ordering``. Backing index ``books.checks`` da
+    startup paytida tekshiriladi.
+
+    Usage:
+    GET /api/logs/
+    GET /api/logs/?cursor=WyIyMDI2LTEwLTE2VDEwOjAwOjAwWiIsIDQyXQ
+    """
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    ordering = ('-pk',)
+    invalid_cursor_message = 'Invalid cursor'
+
+    # ---------- ordering ----------
+
+    def get_ordering(self, queryset):
+        """Queryset ordering'i (+ pk tie-breaker)"""
+        ordering = [
+            field for field in queryset.query.order_by
+            if isinstance(field, str) and field != '?'
+        ] or list(self.ordering)
+
+        names = {field.lstrip('-') for field in ordering}
+        if not names & {'pk', 'id', queryset.model._meta.pk.name}:
+            ordering.append('-pk' if ordering[-1].startswith('-') else 'pk')
+        return ordering
+
+    def _resolve_field(self, model, path):
+        field = None
+        for name in path.split('__'):
+            if name == 'pk':
+                field = model._meta.pk
+            else:
+                field = model._meta.get_field(name)
+            if field.is_relation and field.related_model is not None:
+                model = field.related_model
+        return field
+
+    def _keys(self, queryset, ordering):
+        keys = []
+        for item in ordering:
+            path = item.lstrip('-')
+            try:
+                field = self._resolve_field(queryset.model, path)
+            except FieldDoesNotExist:
+                field = None  # annotation
+            keys.append((path, item.startswith('-'), field))
+        return keys
+
+    def _order_by(self, keys, reverse):
+        """Oldinga: NULL'lar oxirida; reverse: teskari tartib, NULL'lar boshida"""
+        order_by = []
+        for path, desc, field in keys:
+            nulls = {}
+            if field is None or field.null:
+                nulls = {'nulls_first': True} if reverse else {'nulls_last': True}
+            expression = F(path)
+            if desc != reverse:
+                order_by.append(expression.desc(**nulls))
+            else:
+                order_by.append(expression.asc(**nulls))
+        return order_by
+
+    # ---------- seek condition ----------
+
+    def _equal(self, path, value):
+        if value is None:
+            return Q(**{f'{path}__isnull': True})
+        return Q(**{path: value})
+
+    def _beyond(self, path, desc, field, value, reverse):
+        """
+        ``path`` bo'yicha cursor'dan qat'iy keyingi (reverse: oldingi) qatorlar.
+        Oldinga tartibda NULL'lar oxirida.
+        """
+        nullable = field is None or field.null
+        if not reverse:
+            if value is None:
+                return None
+            lookup = 'lt' if desc else 'gt'
+            condition = Q(**{f'{path}__{lookup}': value})
+            if nullable:
+                condition |= Q(**{f'{path}__isnull': True})
+            return condition
+        if value is None:
+            return Q(**{f'{path}__isnull': False})
+        lookup = 'gt' if desc else 'lt'
+        return Q(**{f'{path}__{lookup}': value})
+
+    def _seek(self, keys, values, reverse):
+        """(a, b, c) > (x, y, z) - ustunlar bo'yicha leksikografik shart"""
+        condition = Q(pk__in=[])
+        prefix = Q()
+        for (path, desc, field), value in zip(keys, values):
+            beyond = self._beyond(path, desc, field, value, reverse)
+            if beyond is not None:
+                condition |= prefix & beyond
+            prefix &= self._equal(path, value)
+
+        # Birinchi ustun uchun oddiy range - OR shartida ham index range scan
+        path, desc, field = keys[0]
+        if values[0] is not None and field is not None and not field.null:
+            lookup = 'lte' if desc != reverse else 'gte'
+            condition &= Q(**{f'{path}__{lookup}': values[0]})
+        return condition
+
+    # ---------- cursor ----------
+
+    def encode_cursor(self, values, reverse=False):
+        # isoformat() - DjangoJSONEncoder mikrosekundlarni kesadi, seek esa aniq qiymat talab qiladi
+        values = [
+            value.isoformat() if isinstance(value, (datetime, date, time)) else value
+            for value in values
+        ]
+        payload = json.dumps({'v': values, 'r': int(reverse)}, cls=DjangoJSONEncoder)
+        cursor = urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request, keys):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+
+        try:
+            payload = json.loads(urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4)))
+            values = payload['v']
+            reverse = bool(payload.get('r'))
+            if len(values) != len(keys):
+                raise ValueError
+            values = [
+                field.to_python(value) if field is not None and value is not None else value
+                for (path, desc, field), value in zip(keys, values)
+            ]
+        except (binascii.Error, ValueError, KeyError, TypeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return values, reverse
+
+    def _row_values(self, instance, keys):
+        values = []
+        for path, desc, field in keys:
+            value = instance
+            for name in path.split('__'):
+                value = getattr(value, name, None)
+                if value is None:
+                    break
+            if hasattr(value, '_meta'):
+                value = value.pk
+            values.append(value)
+        return values
+
+    # ---------- BasePagination API ----------
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = remove_query_param(request.build_absolute_uri(), self.cursor_query_param)
+        self.page_size_value = self.get_page_size(request)
+
+        keys = self._keys(queryset, self.get_ordering(queryset))
+        values, reverse = self.decode_cursor(request, keys)
+
+        queryset = queryset.order_by(*self._order_by(keys, reverse))
+        if values is not None:
+            queryset = queryset.filter(self._seek(keys, values, reverse))
+
+        # +1 qator: keyingi sahifa bormi (COUNT'siz)
+        rows = list(queryset[:self.page_size_value + 1])
+        has_more = len(rows) > self.page_size_value
+        rows = rows[:self.page_size_value]
+        if reverse:
+            rows.reverse()
+
+        self.next_values = self.previous_values = None
+        if rows:
+            if has_more or reverse:
+                self.next_values = self._row_values(rows[-1], keys)
+            if (has_more and reverse) or (values is not None and not reverse):
+                self.previous_values = self._row_values(rows[0], keys)
+        return rows
+
+    def get_next_link(self):
+        if self.next_values is None:
+            return None
+        return self.encode_cursor(self.next_values)
+
+    def get_previous_link(self):
+        if self.previous_values is None:
+            return None
+        return self.encode_cursor(self.previous_values, reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class BookKeysetPagination(KeysetPagination):
+    """Book list - eng yangi kitoblar birinchi"""
+    ordering = ('-created_at', '-id')
+
+
+class BookLogKeysetPagination(KeysetPagination):
+    """Book log - har bir yozuvda o'sadigan jadval"""
+    page_size = 20
+    ordering = ('-timestamp', '-id')
+
+
+class BorrowHistoryKeysetPagination(KeysetPagination):
+    """Borrow history - har bir borrow/return'da o'sadi"""
+    page_size = 20
+    ordering = ('-borrowed_at', '-id')
+
+
+# ==================== COUNT STRATEGIES ====================
+
+class CountingPaginator(DjangoPaginator):
+    """
+    Django Paginator - ``count`` books.counting strategiyasidan
+
+    Baho (estimate) bo'lsa oxirgi sahifa chegarasi tekshirilmaydi:
+    baho haqiqiydan kichik bo'lsa ham keyingi sahifalar ochiladi.
+    """
+
+    def __init__(self, object_list, per_page, count_strategy='exact',
+                 count_threshold=COUNT_ESTIMATE_THRESHOLD, count_timeout=COUNT_CACHE_TIMEOUT, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_strategy = count_strategy
+        self.count_threshold = count_threshold
+        self.count_timeout = count_timeout
+        self.count_is_exact = True
+
+    @cached_property
+    def count(self):
+        if not hasattr(self.object_list, 'query'):
+            return super().count
+        count, self.count_is_exact = count_queryset(
+            self.object_list,
+            strategy=self.count_strategy,
+            threshold=self.count_threshold,
+            timeout=self.count_timeout,
+        )
+        return count
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            if self.count_is_exact or int(number) < 1:
+                raise
+            return int(number)
+
+
+class CountStrategyMixin:
+    """
+    PageNumberPagination uchun count strategiyasi
+
+    count_strategy: 'exact' | 'cached' | 'estimated' (books/counting.py)
+    """
+    count_strategy = 'exact'
+    count_estimate_threshold = COUNT_ESTIMATE_THRESHOLD
+    count_cache_timeout = COUNT_CACHE_TIMEOUT
+
+    @property
+    def django_paginator_class(self):
+        return partial(
+            CountingPaginator,
+            count_strategy=self.count_strategy,
+            count_threshold=self.count_estimate_threshold,
+            count_timeout=self.count_cache_timeout,
+        )
+
+    @property
+    def count_is_exact(self):
+        return self.page.paginator.count_is_exact
+
+
 # ==================== CUSTOM RESPONSE FORMAT ====================
 
-class CustomResponsePagination(PageNumberPagination):
+class CustomResponsePagination(CountStrategyMixin, PageNumberPagination):
     """
     Custom response format with detailed pagination info
     
@@ -123,6 +450,7 @@ class CustomResponsePagination(PageNumberPagination):
     {
         "pagination": {
             "total_items": 100,
+            "total_items_exact": true,
             "total_pages": 10,
             "current_page": 1,
             "page_size": 10,
@@ -139,11 +467,13 @@ class CustomResponsePagination(PageNumberPagination):
     page_size = 10
     page_size_query_param = 'page_size'
     max_page_size = 100
+    count_strategy = 'cached'
     
     def get_paginated_response(self, data):
         return Response(OrderedDict([
             ('pagination', OrderedDict([
                 ('total_items', self.page.paginator.count),
+                ('total_items_exact', self.count_is_exact),
                 ('total_pages', self.page.paginator.num_pages),
                 ('current_page', self.page.number),
                 ('page_size', len(data)),
@@ -160,24 +490,28 @@ class CustomResponsePagination(PageNumberPagination):
 
 # ==================== MOBILE-FRIENDLY PAGINATION ====================
 
-class MobileFriendlyPagination(PageNumberPagination):
+class MobileFriendlyPagination(CountStrategyMixin, PageNumberPagination):
     """
     Mobile-optimized pagination
     Smaller page size, simpler response
+    Katta jadvalda total - baho ("about N results")
     
     Response:
     {
         "hasMore": true,
         "total": 100,
+        "totalIsExact": true,
         "items": [...]
     }
     """
     page_size = 15
     max_page_size = 50
+    count_strategy = 'estimated'
     
     def get_paginated_response(self, data):
         return Response(OrderedDict([
             ('hasMore', self.page.has_next()),
             ('total', self.page.paginator.count),
+            ('totalIsExact', self.count_is_exact),
             ('items', data)
         ]))
\ No newline at end of file
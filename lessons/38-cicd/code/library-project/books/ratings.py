@@ -0,0 +1,112 @@
+"""
+Denormalized Book rating summary
+
+Book.rating_sum, rating_count va rating_avg Review yozuvlarida yangilanadi -
+v2 list/detail/statistics va rating bo'yicha saralash reviews jadvalini
+o'qimaydi (rating_avg index'li).
+
+Yangilash bitta ``F()`` UPDATE: parallel review'lar bir-birining
+qiymatini yo'qotmaydi, rating_avg ham shu UPDATE ichida yangi sum/count
+dan hisoblanadi. Review.save()/delete() uni Review yozuvi bilan bitta
+transaction'da chaqiradi; cache tag'lari commit'dan keyin bekor qilinadi.
+
+queryset.update()/delete() kabi signal'siz yozuvlar uchun:
+``python manage.py repair_book_ratings`` (bitta grouped UPDATE).
+"""
+from django.db import transaction
+from django.db.models import Avg, Count, F, FloatField, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Cast, Coalesce, NullIf, Round
+
+from .cache_tags import tagged_cache, book_tag, BOOKS_COLLECTION_TAG
+from .models import Book, Review
+
+
+AVG_PRECISION = 2
+
+
+def rating_avg_expression(rating_sum, rating_count):
+    """sum / count, 2 xonagacha; review'siz kitob uchun 0"""
+    return Coalesce(
+        Round(
+            Cast(rating_sum, FloatField()) / Cast(NullIf(rating_count, 0), FloatField()),
+            AVG_PRECISION,
+        ),
+        Value(0.0),
+        output_field=FloatField(),
+    )
+
+
+def apply_rating_delta(book_id, sum_delta, count_delta, using='default'):
+    """Bitta kitob summary'siga delta qo'shish (atomic F() UPDATE)"""
+    if not book_id or (not sum_delta and not count_delta):
+        return
+
+    rating_sum = F('rating_sum') + sum_delta
+    rating_count = F('rating_count') + count_delta
+    Book.objects.using(using).filter(pk=book_id).update(
+        rating_sum=rating_sum,
+        rating_count=rating_count,
+        rating_avg=rating_avg_expression(rating_sum, rating_count),
+    )
+    # Commit'dan keyin: aks holda parallel o'qish eski qatorni yangi versiya bilan cache'laydi
+    transaction.on_commit(
+        lambda: tagged_cache.invalidate(book_tag(book_id), BOOKS_COLLECTION_TAG), using=using
+    )
+
+
+def review_saved(instance, created, using='default'):
+    if created:
+        apply_rating_delta(instance.book_id, instance.rating, 1, using=using)
+        return
+
+    old_book_id = instance.get_loaded_value('book_id', instance.book_id)
+    old_rating = instance.get_loaded_value('rating', instance.rating)
+
+    if old_book_id != instance.book_id:
+        # Review boshqa kitobga o'tkazildi
+        apply_rating_delta(old_book_id, -old_rating, -1, using=using)
+        apply_rating_delta(instance.book_id, instance.rating, 1, using=using)
+    else:
+        apply_rating_delta(instance.book_id, instance.rating - old_rating, 0, using=using)
+
+
+def review_deleted(instance, using='default'):
+    # DB'dagi qiymat ayiriladi (in-memory o'zgarishlar emas)
+    apply_rating_delta(
+        instance.get_loaded_value('book_id', instance.book_id),
+        -instance.get_loaded_value('rating', instance.rating),
+        -1,
+        using=using,
+    )
+
+
+def _review_aggregate(aggregate, output_field):
+    reviews = (
+        Review.objects.filter(book=OuterRef('pk'))
+        .order_by()
+        .values('book')
+        .annotate(value=aggregate)
+        .values('value')
+    )
+    return Subquery(reviews, output_field=output_field)
+
+
+def repair_book_ratings(queryset=None):
+    """
+    Summary'larni reviews jadvalidan qayta hisoblash
+
+    Bitta UPDATE (correlated grouped subquery'lar), Book qatorlari
+    Python'ga yuklanmaydi. Yangilangan kitoblar sonini qaytaradi.
+    """
+    if queryset is None:
+        queryset = Book.objects.all()
+
+    return queryset.order_by().update(
+        rating_sum=Coalesce(_review_aggregate(Sum('rating'), IntegerField()), 0),
+        rating_count=Coalesce(_review_aggregate(Count('id'), IntegerField()), 0),
+        rating_avg=Coalesce(
+            Round(_review_aggregate(Avg('rating'), FloatField()), AVG_PRECISION),
+            Value(0.0),
+            output_field=FloatField(),
+        ),
+    )
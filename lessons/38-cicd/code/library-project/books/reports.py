@@ -1,5 +1,13 @@
 """
 PDF Report Generation
+
+Katta hisobotlar:
+- qatorlar DB'dan chunk'lab o'qiladi (values_list + iterator)
+- jadval sahifa sig'imiga teng bo'laklarga bo'linadi (header har sahifada)
+- story generator'dan kerak bo'lganda olinadi - barcha Table'lar bir vaqtda
+  xotirada bo'lmaydi
+- jami qiymatlar qatorlar bilan bitta o'tishda hisoblanadi (count() yo'q)
+- PDF SpooledTemporaryFile'ga yoziladi va FileResponse bilan qaytariladi
 """
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter, A4
@@ -7,143 +15,263 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
 from reportlab.lib.enums import TA_CENTER, TA_RIGHT, TA_LEFT
-from django.http import HttpResponse
+from django.http import HttpResponse, FileResponse
 from datetime import datetime
+from decimal import Decimal
+from functools import lru_cache
 from io import BytesIO
+import tempfile
 
+from .exports import iter_chunks
 
-class PDFReportGenerator:
-    """PDF report generation utility"""
+
+# Shu hajmgacha PDF xotirada, undan keyin diskda
+SPOOL_MAX_SIZE = 5 * 1024 * 1024
+
+REPORT_HEADERS = ['Title', 'Author', 'Price', 'Stock']
+REPORT_COL_WIDTHS = [3.5*inch, 2*inch, 1*inch, 0.8*inch]
+
+# Qat'iy balandlik: sahifaga sig'adigan qatorlar sonini oldindan hisoblash mumkin
+HEADER_ROW_HEIGHT = 24
+ROW_HEIGHT = 18
+
+
+@lru_cache(maxsize=None)
+def report_styles():
+    """
+    Oldindan tayyorlangan ParagraphStyle/TableStyle obyektlari
+
+    getSampleStyleSheet() va TableStyle har bir so'rovda qayta qurilmaydi.
+    """
+    styles = getSampleStyleSheet()
     
-    @staticmethod
-    def generate_books_report(queryset, filename="books_report.pdf"):
-        """
-        Generate PDF report with books list
-        
-        Args:
-            queryset: Book queryset
-            filename: Output filename
-            
-        Returns:
-            HttpResponse with PDF file
-        """
-        # Create response
-        response = HttpResponse(content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        
-        # Create PDF
-        doc = SimpleDocTemplate(response, pagesize=letter)
-        story = []
-        styles = getSampleStyleSheet()
-        
-        # Title
-        title_style = ParagraphStyle(
+    return {
+        'title': ParagraphStyle(
             'CustomTitle',
             parent=styles['Heading1'],
             fontSize=24,
             textColor=colors.HexColor('#366092'),
             spaceAfter=30,
             alignment=TA_CENTER
-        )
-        title = Paragraph("Library Books Report", title_style)
-        story.append(title)
-        
-        # Subtitle
-        subtitle_style = ParagraphStyle(
+        ),
+        'subtitle': ParagraphStyle(
             'Subtitle',
             parent=styles['Normal'],
             fontSize=12,
             textColor=colors.grey,
             alignment=TA_CENTER,
             spaceAfter=20
-        )
-        subtitle = Paragraph(f"Generated on {datetime.now().strftime('%B %d, %Y at %H:%M')}", subtitle_style)
-        story.append(subtitle)
-        story.append(Spacer(1, 0.3*inch))
-        
-        # Books table
-        data = [['Title', 'Author', 'Price', 'Stock']]
-        
-        for book in queryset.select_related('author')[:50]:  # Limit to 50 for PDF
-            author_name = book.author.name if book.author else 'N/A'
-            data.append([
-                book.title[:40],  # Truncate long titles
-                author_name[:25],
-                f'${book.price:.2f}',
-                str(book.stock)
-            ])
-        
-        # Create table
-        table = Table(data, colWidths=[3.5*inch, 2*inch, 1*inch, 0.8*inch])
-        table.setStyle(TableStyle([
+        ),
+        'footer': ParagraphStyle(
+            'Footer',
+            parent=styles['Normal'],
+            fontSize=9,
+            textColor=colors.grey,
+            alignment=TA_CENTER
+        ),
+        'doc_title': styles['Title'],
+        'heading3': styles['Heading3'],
+        'normal': styles['Normal'],
+        'books_table': TableStyle([
             # Header
             ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#366092')),
             ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
             ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
             ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
             ('FONTSIZE', (0, 0), (-1, 0), 11),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
             
             # Data
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
             ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
             ('ALIGN', (0, 1), (0, -1), 'LEFT'),
             ('ALIGN', (2, 1), (-1, -1), 'CENTER'),
             ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
             ('FONTSIZE', (0, 1), (-1, -1), 9),
-            ('TOPPADDING', (0, 1), (-1, -1), 6),
-            ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
             
             # Grid
             ('GRID', (0, 0), (-1, -1), 1, colors.black),
             ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
-        ]))
+        ]),
+        'detail_table': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTNAME', (0, 1), (0, -1), 'Helvetica-Bold'),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+        ]),
+        'invoice_table': TableStyle([
+            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+            ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
+        ]),
+        'invoice_items': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('GRID', (0, 0), (-1, -2), 1, colors.black),
+            ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+            ('LINEABOVE', (0, -1), (-1, -1), 2, colors.black),
+        ]),
+    }
+
+
+class _LazyStory(list):
+    """
+    Flowable'lar generator'dan kerak bo'lganda olinadigan story
+
+    doc.build() ro'yxatni boshidan o'qib o'chirib boradi (flowables[0],
+    del flowables[0]) - ro'yxatda har doim kamida ``lookahead`` ta element
+    bo'lsa yetarli (keepWithNext uchun 2).
+    """
+    
+    def __init__(self, flowables, lookahead=2):
+        super().__init__()
+        self._source = iter(flowables)
+        self._lookahead = lookahead
+    
+    def _fill(self):
+        while list.__len__(self) < self._lookahead:
+            flowable = next(self._source, None)
+            if flowable is None:
+                break
+            self.append(flowable)
+    
+    def __len__(self):
+        self._fill()
+        return list.__len__(self)
+    
+    def __getitem__(self, index):
+        self._fill()
+        return list.__getitem__(self, index)
+
+
+def _draw_page_number(canvas, doc):
+    canvas.saveState()
+    canvas.setFont('Helvetica', 8)
+    canvas.setFillColor(colors.grey)
+    canvas.drawRightString(doc.pagesize[0] - doc.rightMargin, doc.bottomMargin / 2, f"Page {doc.page}")
+    canvas.restoreState()
+
+
+def _pdf_file_response(output, filename):
+    output.seek(0)
+    return FileResponse(
+        output,
+        as_attachment=True,
+        filename=filename,
+        content_type='application/pdf',
+    )
+
+
+class PDFReportGenerator:
+    """PDF report generation utility"""
+    
+    @staticmethod
+    def generate_books_report(queryset, filename="books_report.pdf", chunk_size=1000):
+        """
+        Generate PDF report with books list (barcha kitoblar, ko'p sahifali)
         
-        story.append(table)
-        story.append(Spacer(1, 0.3*inch))
+        Args:
+            queryset: Book queryset
+            filename: Output filename
+            chunk_size: DB'dan bir martada o'qiladigan qatorlar soni
+            
+        Returns:
+            FileResponse with PDF file
+        """
+        output = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE, suffix='.pdf')
+        PDFReportGenerator.build_books_report(queryset, output, chunk_size=chunk_size)
+        return _pdf_file_response(output, filename)
+    
+    @staticmethod
+    def build_books_report(queryset, output, chunk_size=1000):
+        """
+        Books report'ni file-like ``output`` ga yozish
         
-        # Footer
-        footer_style = ParagraphStyle(
-            'Footer',
-            parent=styles['Normal'],
-            fontSize=9,
-            textColor=colors.grey,
-            alignment=TA_CENTER
-        )
-        footer = Paragraph(
-            f"Total Books: {queryset.count()} | Report generated by Library Management System",
-            footer_style
-        )
-        story.append(footer)
+        Returns:
+            dict: rows, pages, total_stock, total_value
+        """
+        doc = SimpleDocTemplate(output, pagesize=letter)
+        totals = {'rows': 0, 'total_stock': 0, 'total_value': Decimal('0')}
         
-        # Build PDF
-        doc.build(story)
-        return response
+        story = _LazyStory(PDFReportGenerator._iter_books_story(queryset, doc, totals, chunk_size))
+        doc.build(story, onFirstPage=_draw_page_number, onLaterPages=_draw_page_number)
+        
+        totals['pages'] = doc.page
+        return totals
+    
+    @staticmethod
+    def _iter_books_story(queryset, doc, totals, chunk_size):
+        """Title, sahifa-sig'imli jadvallar va footer - generator"""
+        styles = report_styles()
+        
+        yield Paragraph("Library Books Report", styles['title'])
+        yield Paragraph(f"Generated on {datetime.now().strftime('%B %d, %Y at %H:%M')}", styles['subtitle'])
+        yield Spacer(1, 0.3*inch)
+        
+        # Frame padding (6pt * 2) va header qatoridan keyin qolgan joy
+        rows_per_page = max(int((doc.height - 12 - HEADER_ROW_HEIGHT) // ROW_HEIGHT), 1)
+        
+        rows = queryset.order_by('id').values_list(
+            'id', 'title', 'author__name', 'price', 'stock'
+        ).distinct()
+        
+        def table_rows():
+            for _, title, author_name, price, stock in rows.iterator(chunk_size=chunk_size):
+                totals['rows'] += 1
+                totals['total_stock'] += stock
+                totals['total_value'] += price * stock
+                yield [
+                    title[:40],  # Truncate long titles
+                    (author_name or 'N/A')[:25],
+                    f'${price:.2f}',
+                    str(stock)
+                ]
+        
+        for page_rows in iter_chunks(table_rows(), rows_per_page):
+            yield Table(
+                [REPORT_HEADERS] + page_rows,
+                colWidths=REPORT_COL_WIDTHS,
+                rowHeights=[HEADER_ROW_HEIGHT] + [ROW_HEIGHT] * len(page_rows),
+                style=styles['books_table'],
+                repeatRows=1,
+            )
+        
+        # Footer - jami qiymatlar qatorlar bilan bir o'tishda yig'ilgan
+        yield Spacer(1, 0.3*inch)
+        yield Paragraph(
+            f"Total Books: {totals['rows']} | Total Stock: {totals['total_stock']} | "
+            f"Inventory Value: ${totals['total_value']:,.2f} | "
+            f"Report generated by Library Management System",
+            styles['footer']
+        )
     
     @staticmethod
     def generate_book_detail_report(book, filename=None):
         """
         Generate detailed PDF report for a single book
         
+        ``book`` select_related('author').prefetch_related('genres') bilan
+        olingan bo'lsa qo'shimcha query bo'lmaydi.
+        
         Args:
             book: Book instance
             filename: Output filename
             
         Returns:
-            HttpResponse with PDF file
+            FileResponse with PDF file
         """
         if not filename:
             filename = f"book_{book.id}_report.pdf"
         
-        response = HttpResponse(content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        
-        doc = SimpleDocTemplate(response, pagesize=A4)
+        output = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE, suffix='.pdf')
+        doc = SimpleDocTemplate(output, pagesize=A4)
         story = []
-        styles = getSampleStyleSheet()
+        styles = report_styles()
         
         # Title
-        title = Paragraph(f"<b>{book.title}</b>", styles['Title'])
+        title = Paragraph(f"<b>{book.title}</b>", styles['doc_title'])
         story.append(title)
         story.append(Spacer(1, 0.2*inch))
         
@@ -157,32 +285,24 @@ class PDFReportGenerator:
             ['Pages', str(book.pages)],
             ['Language', book.language],
             ['Published', book.published_date.strftime('%Y-%m-%d') if book.published_date else 'N/A'],
-            ['Genres', ', '.join([g.name for g in book.genres.all()]) or 'N/A'],
+            ['Genres', ', '.join(sorted(g.name for g in book.genres.all())) or 'N/A'],
         ]
         
-        details_table = Table(details_data, colWidths=[2*inch, 4*inch])
-        details_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTNAME', (0, 1), (0, -1), 'Helvetica-Bold'),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-        ]))
+        details_table = Table(details_data, colWidths=[2*inch, 4*inch], style=styles['detail_table'])
         
         story.append(details_table)
         story.append(Spacer(1, 0.3*inch))
         
         # Description
         if book.description:
-            desc_title = Paragraph("<b>Description:</b>", styles['Heading3'])
+            desc_title = Paragraph("<b>Description:</b>", styles['heading3'])
             story.append(desc_title)
-            desc = Paragraph(book.description, styles['Normal'])
+            desc = Paragraph(book.description, styles['normal'])
             story.append(desc)
         
         # Build
         doc.build(story)
-        return response
+        return _pdf_file_response(output, filename)
     
     @staticmethod
     def generate_invoice(borrow_history, filename=None):
@@ -204,10 +324,10 @@ class PDFReportGenerator:
         
         doc = SimpleDocTemplate(response, pagesize=A4)
         story = []
-        styles = getSampleStyleSheet()
+        styles = report_styles()
         
         # Header
-        header = Paragraph("LIBRARY INVOICE", styles['Title'])
+        header = Paragraph("LIBRARY INVOICE", styles['doc_title'])
         story.append(header)
         story.append(Spacer(1, 0.3*inch))
         
@@ -221,11 +341,7 @@ class PDFReportGenerator:
             ['Email:', borrow_history.user.email],
         ]
         
-        invoice_table = Table(invoice_data, colWidths=[2*inch, 4*inch])
-        invoice_table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
-        ]))
+        invoice_table = Table(invoice_data, colWidths=[2*inch, 4*inch], style=styles['invoice_table'])
         
         story.append(invoice_table)
         story.append(Spacer(1, 0.3*inch))
@@ -238,16 +354,7 @@ class PDFReportGenerator:
             ['Total:', '$5.00'],
         ]
         
-        items_table = Table(items_data, colWidths=[5*inch, 1.5*inch])
-        items_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('GRID', (0, 0), (-1, -2), 1, colors.black),
-            ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-            ('LINEABOVE', (0, -1), (-1, -1), 2, colors.black),
-        ]))
+        items_table = Table(items_data, colWidths=[5*inch, 1.5*inch], style=styles['invoice_items'])
         
         story.append(items_table)
         story.append(Spacer(1, 0.5*inch))
@@ -255,7 +362,7 @@ class PDFReportGenerator:
         # Footer
         footer = Paragraph(
             "Thank you for using our library services!",
-            styles['Normal']
+            styles['normal']
         )
         story.append(footer)
         
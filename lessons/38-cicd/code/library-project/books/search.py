@@ -1,15 +1,52 @@
 """
-Elasticsearch search functionality
+Book search functionality
+
+BookSearch backend'i ``BOOK_SEARCH_BACKEND`` bilan tanlanadi:
+'elasticsearch' (ElasticsearchBackend) yoki 'database' - PostgreSQL/SQLite
+full-text index (books/search_backends.py). Ikkalasi ham
+``search_books(query, filters)`` va ``fetch(...)`` beradi.
+
+BookSearchService - BookSearch ustidagi service qatlami:
+
+- normalizatsiya qilingan query + filter natijasi (id, score, _source)
+  qisqa TTL bilan cache'da; BookDocument.update() (index/delete) har safar
+  ``books:search`` tag'ini bekor qiladi
+- ``from/size`` (page) va ``search_after`` (cursor) pagination
+- ES'dan faqat javobda qaytariladigan ``_source`` maydonlari so'raladi
+- ixtiyoriy hydration: Book obyektlari bitta ``in_bulk`` bilan (cache'dan
+  keyin - DB ma'lumoti doim yangi)
 """
+import base64
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
 from elasticsearch_dsl import Q
+
+from .cache_tags import tagged_cache, BOOKS_SEARCH_TAG
 from .documents import BookDocument
+from .models import Book
 
 
-class BookSearch:
-    """Book search using Elasticsearch"""
-    
-    @staticmethod
-    def search_books(query, filters=None):
+SEARCH_CACHE_TIMEOUT = 30
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+MAX_RESULT_WINDOW = 10000  # ES index.max_result_window - undan keyin search_after
+
+# Javobdagi maydonlar (hydrate=False)
+RESULT_SOURCE = ['title', 'author.name', 'price']
+
+# search_after uchun barqaror tartib: score, keyin id (tie-breaker)
+SEARCH_SORT = [{'_score': {'order': 'desc'}}, {'id': {'order': 'asc'}}]
+
+
+class ElasticsearchBackend:
+    """multi_match (fuzzy) + filtrlar - BookDocument index'i"""
+
+    is_database = False
+
+    def search_books(self, query, filters=None):
         """Full-text search with filters"""
         search = BookDocument.search()
         
@@ -41,6 +78,33 @@ class BookSearch:
         
         return search
     
+    def fetch(self, query, filters, size, offset=0, search_after=None, source=RESULT_SOURCE):
+        search = BookSearchService.build_search(
+            query, filters, size, offset=offset, search_after=search_after, source=source,
+        )
+        return BookSearchService.execute(search, size)
+
+
+def get_search_backend():
+    """``BOOK_SEARCH_BACKEND`` bo'yicha backend obyekti"""
+    name = getattr(settings, 'BOOK_SEARCH_BACKEND', 'elasticsearch')
+    if name == 'elasticsearch':
+        return ElasticsearchBackend()
+    if name == 'database':
+        # search_backends BookSearchService'ni import qiladi - shu yerda yuklanadi
+        from .search_backends import get_database_backend
+        return get_database_backend()
+    raise ImproperlyConfigured(f"Unknown BOOK_SEARCH_BACKEND '{name}'")
+
+
+class BookSearch:
+    """Book search - tanlangan backend orqali (autocomplete/aggregation - ES)"""
+    
+    @staticmethod
+    def search_books(query, filters=None):
+        """Full-text search with filters"""
+        return get_search_backend().search_books(query, filters)
+    
     @staticmethod
     def autocomplete(query):
         """Autocomplete suggestions"""
@@ -64,4 +128,131 @@ class BookSearch:
         search = BookDocument.search()
         search.aggs.bucket('genres', 'terms', field='genres.name.keyword', size=10)
         search.aggs['genres'].metric('avg_price', 'avg', field='price')
-        return search.execute()
\ No newline at end of file
+        return search.execute()
+
+
+class BookSearchService:
+    """Cached, paginated Book search"""
+
+    @staticmethod
+    def normalize(query='', filters=None):
+        """
+        (query, filters) - bo'sh joylar va registr bir xil (ES analyzer'i
+        ham lowercase qiladi), narxlar float. Noto'g'ri narx - ValueError.
+        """
+        query = ' '.join((query or '').split()).lower()
+        filters = filters or {}
+
+        normalized = {}
+        for key in ('price_min', 'price_max'):
+            value = filters.get(key)
+            if value not in (None, ''):
+                try:
+                    normalized[key] = float(value)
+                except (TypeError, ValueError):
+                    raise ValueError(f'{key} must be a number')
+        for key in ('genre', 'author'):
+            value = ' '.join(str(filters.get(key) or '').split()).lower()
+            if value:
+                normalized[key] = value
+        return query, normalized
+
+    @staticmethod
+    def encode_cursor(values):
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor):
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except (ValueError, TypeError):
+            raise ValueError('Invalid cursor')
+        if not isinstance(values, list) or len(values) != len(SEARCH_SORT):
+            raise ValueError('Invalid cursor')
+        return values
+
+    @staticmethod
+    def build_search(query, filters, size, offset=0, search_after=None, source=RESULT_SOURCE):
+        search = ElasticsearchBackend().search_books(query, filters).sort(*SEARCH_SORT).source(source)
+        if search_after is not None:
+            return search.extra(search_after=search_after)[:size]
+        return search[offset:offset + size]
+
+    @staticmethod
+    def execute(search, size):
+        """ES javobini cache'lanadigan oddiy dict'ga aylantirish"""
+        response = search.execute()
+        raw_hits = [hit.to_dict() for hit in response.hits.hits]
+        hits = []
+        for hit in raw_hits:
+            hits.append({
+                'id': int(hit['_id']),
+                'score': hit['sort'][0],
+                'source': hit.get('_source', {}),
+            })
+
+        next_cursor = None
+        if len(hits) == size:
+            next_cursor = BookSearchService.encode_cursor(raw_hits[-1]['sort'])
+
+        return {
+            'total': response.hits.total.value,
+            'total_relation': response.hits.total.relation,
+            'hits': hits,
+            'next': next_cursor,
+        }
+
+    @staticmethod
+    def hydrate(hits):
+        """ES tartibidagi Book obyektlari - bitta in_bulk (+ genres prefetch)"""
+        ids = [hit['id'] for hit in hits]
+        books = (
+            Book.objects.select_related('author')
+            .prefetch_related('genres')
+            .in_bulk(ids)
+        )
+        # Index'da bor, lekin DB'dan o'chirilgan kitoblar tashlab yuboriladi
+        return [books[book_id] for book_id in ids if book_id in books]
+
+    @staticmethod
+    def search(query='', filters=None, page=1, page_size=DEFAULT_PAGE_SIZE,
+               cursor=None, hydrate=False, timeout=SEARCH_CACHE_TIMEOUT):
+        """
+        {'total', 'total_relation', 'hits': [{'id', 'score', 'source'}], 'next'}
+
+        hydrate=True bo'lsa ``_source`` so'ralmaydi va natijaga ``books``
+        (hits tartibida) qo'shiladi.
+        """
+        query, filters = BookSearchService.normalize(query, filters)
+        page_size = min(max(int(page_size), 1), MAX_PAGE_SIZE)
+        page = max(int(page), 1)
+
+        search_after = BookSearchService.decode_cursor(cursor) if cursor else None
+        offset = (page - 1) * page_size
+        if search_after is None and offset + page_size > MAX_RESULT_WINDOW:
+            raise ValueError(f'Page is beyond {MAX_RESULT_WINDOW} results, use the cursor instead')
+
+        source = False if hydrate else RESULT_SOURCE
+        backend = get_search_backend()
+        params = {
+            'backend': type(backend).__name__,
+            'q': query,
+            'filters': filters,
+            'size': page_size,
+            'from': None if search_after is not None else offset,
+            'after': search_after,
+            'source': source,
+        }
+        digest = hashlib.sha1(json.dumps(params, sort_keys=True).encode()).hexdigest()
+
+        def run():
+            return backend.fetch(
+                query, filters, page_size, offset=offset, search_after=search_after, source=source,
+            )
+
+        results = tagged_cache.get_or_set(
+            f'search:books:{digest}', run, tags=[BOOKS_SEARCH_TAG], timeout=timeout,
+        )
+        if hydrate:
+            results = {**results, 'books': BookSearchService.hydrate(results['hits'])}
+        return results
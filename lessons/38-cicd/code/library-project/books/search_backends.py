@@ -0,0 +1,190 @@
+"""
+Database full-text search backends
+
+Elasticsearch'siz o'rnatishlar uchun BookSearch backend'i
+(``BOOK_SEARCH_BACKEND = 'database'``). ``ILIKE '%q%'`` OR'lari index
+ishlata olmaydi - bu yerda so'rov DB'ning o'z full-text index'iga boradi:
+
+- PostgreSQL: trigger bilan saqlanadigan ``search_vector`` tsvector ustuni
+  (GIN index) ``websearch_to_tsquery`` bilan + ``title % q`` (pg_trgm GIN
+  index) - xato yozilgan so'zlar uchun. Score = ts_rank + similarity.
+- SQLite (development/test): ``books_fts`` FTS5 jadvali, har bir so'z
+  prefix sifatida (``"pyth"*``), score = -bm25.
+
+Ikkalasi ham ES backend'i bilan bir xil interfeys: ``search_books(query,
+filters)`` (queryset, score bo'yicha tartiblangan) va ``fetch(...)`` -
+BookSearchService cache'laydigan natija dict'i. Index migration 0013'da.
+"""
+import re
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+from django.db.models import BooleanField, Exists, F, FloatField, Func, OuterRef, Q, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from .cache_tags import tagged_cache, BOOKS_SEARCH_TAG
+from .models import Author, Book
+from .search import BookSearchService
+
+
+SEARCH_CONFIG = 'simple'  # o'zbek/ingliz aralash matn - stemming'siz
+
+
+def fts5_query(query):
+    """'Python  cr!' -> '"python"* "cr"*' (barcha so'zlar, prefix)"""
+    return ' '.join(f'"{token}"*' for token in re.findall(r'\w+', query.lower()))
+
+
+class TrigramMatch(Func):
+    """``title % 'pyhton'`` - similarity >= pg_trgm.similarity_threshold (0.3), GIN index bilan"""
+    arg_joiner = ' %% '
+    template = '%(expressions)s'
+    output_field = BooleanField()
+
+
+class DatabaseSearchBackend:
+    """
+    Filtrlar, (score desc, id asc) tartibi, from/size va search_after
+
+    ``search_score`` double precision'ga cast qilinadi: PostgreSQL'da
+    ts_rank/similarity ``real`` - cursor'dagi Python float bilan ``=``
+    solishtirish teng score'li kitoblarni o'tkazib yuborardi.
+    """
+
+    is_database = True
+
+    def match(self, queryset, query):
+        """query'ga mos kitoblar, ``search_score`` annotation bilan"""
+        raise NotImplementedError
+
+    def apply_filters(self, queryset, filters):
+        if 'price_min' in filters:
+            queryset = queryset.filter(price__gte=filters['price_min'])
+        if 'price_max' in filters:
+            queryset = queryset.filter(price__lte=filters['price_max'])
+        # ES ``match`` kabi - nom ichida qidiriladi (kichik jadvallar)
+        if 'genre' in filters:
+            queryset = queryset.filter(Exists(
+                Book.genres.through.objects.filter(
+                    book_id=OuterRef('pk'), genre__name__icontains=filters['genre'],
+                )
+            ))
+        if 'author' in filters:
+            queryset = queryset.filter(author__name__icontains=filters['author'])
+        return queryset
+
+    def search_books(self, query, filters=None):
+        queryset = self.apply_filters(Book.objects.all(), filters or {})
+        if query:
+            queryset = self.match(queryset, query)
+        else:
+            queryset = queryset.annotate(search_score=Value(1.0, output_field=FloatField()))
+        return queryset.order_by('-search_score', 'pk')
+
+    def fetch(self, query, filters, size, offset=0, search_after=None, source=True):
+        """BookSearchService natijasi: {'total', 'total_relation', 'hits', 'next'}"""
+        queryset = self.search_books(query, filters)
+        if search_after is not None:
+            score, last_id = search_after
+            page = queryset.filter(Q(search_score__lt=score) | Q(search_score=score, pk__gt=last_id))[:size]
+        else:
+            page = queryset[offset:offset + size]
+
+        fields = ['pk', 'search_score']
+        if source:
+            fields += ['title', 'author__name', 'price']
+        hits = [
+            {
+                'id': row['pk'],
+                'score': row['search_score'],
+                'source': {
+                    'title': row['title'],
+                    'author': {'name': row['author__name']},
+                    'price': float(row['price']),
+                } if source else {},
+            }
+            for row in page.values(*fields)
+        ]
+
+        next_cursor = None
+        if len(hits) == size:
+            next_cursor = BookSearchService.encode_cursor([hits[-1]['score'], hits[-1]['id']])
+
+        return {
+            'total': queryset.count(),
+            'total_relation': 'eq',
+            'hits': hits,
+            'next': next_cursor,
+        }
+
+    def filter_queryset(self, queryset, query):
+        """Tayyor queryset'ni (v2 list) full-text bo'yicha toraytirish"""
+        return self.match(queryset, query)
+
+
+class PostgresSearchBackend(DatabaseSearchBackend):
+    """tsvector (GIN) + pg_trgm similarity"""
+
+    def match(self, queryset, query):
+        from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVectorField, TrigramSimilarity
+
+        search_query = SearchQuery(query, config=SEARCH_CONFIG, search_type='websearch')
+        vector = RawSQL(f'{Book._meta.db_table}.search_vector', [], output_field=SearchVectorField())
+        return (
+            queryset.alias(search_vector=vector)
+            .filter(
+                Q(search_vector=search_query)
+                | Q(TrigramMatch(F('title'), Value(query)))
+                | Q(isbn_number=query)
+            )
+            .annotate(search_score=Cast(
+                SearchRank(F('search_vector'), search_query) + TrigramSimilarity('title', query),
+                FloatField(),
+            ))
+        )
+
+
+class SQLiteSearchBackend(DatabaseSearchBackend):
+    """FTS5 (books_fts) - development va test"""
+
+    def match(self, queryset, query):
+        expression = fts5_query(query)
+        if not expression:
+            return queryset.none().annotate(search_score=Value(0.0, output_field=FloatField()))
+        return (
+            queryset.filter(fulltext__document__match=expression)
+            .annotate(search_score=Cast(-F('fulltext__rank'), FloatField()))
+        )
+
+
+DATABASE_BACKENDS = {
+    'postgresql': PostgresSearchBackend(),
+    'sqlite': SQLiteSearchBackend(),
+}
+
+
+def get_database_backend(using='default'):
+    """Ulanish turiga mos backend; qo'llab-quvvatlanmasa - ImproperlyConfigured"""
+    vendor = connections[using].vendor
+    try:
+        return DATABASE_BACKENDS[vendor]
+    except KeyError:
+        raise ImproperlyConfigured(f"No full-text search backend for database vendor '{vendor}'")
+
+
+# ============================================================================
+# CACHE INVALIDATION - DB backend'da index yozuv bilan birga yangilanadi
+# ============================================================================
+
+def _invalidate_search_cache(sender, **kwargs):
+    if getattr(settings, 'BOOK_SEARCH_BACKEND', 'elasticsearch') == 'database':
+        tagged_cache.invalidate(BOOKS_SEARCH_TAG)
+
+
+post_save.connect(_invalidate_search_cache, sender=Book, dispatch_uid='search_backends_book_saved')
+post_delete.connect(_invalidate_search_cache, sender=Book, dispatch_uid='search_backends_book_deleted')
+post_save.connect(_invalidate_search_cache, sender=Author, dispatch_uid='search_backends_author_saved')
+m2m_changed.connect(_invalidate_search_cache, sender=Book.genres.through, dispatch_uid='search_backends_book_genres')
@@ -2,12 +2,15 @@
 Books app signals - Uses accounts.Profile instead of books.UserProfile
 """
 
-from django.db.models.signals import post_save, pre_delete, post_delete
+from django.db.models.signals import post_save, pre_delete, post_delete, m2m_changed
 from django.dispatch import receiver, Signal
 from django.contrib.auth.models import User
 from django.utils import timezone
 from django.db import transaction
-from .models import Book, Author, BookLog, BorrowHistory
+from django.db.models import F, Case, When, Value
+from .models import Book, Author, BookLog, BorrowHistory, get_book_cache_tags
+from .cache_tags import tagged_cache
+from . import author_stats, indexing, stats_snapshot
 
 # Import Profile from accounts app
 from accounts.models import Profile
@@ -100,157 +103,208 @@ def log_book_delete(sender, instance, **kwargs):
 # ============================================================================
 
 @receiver(post_save, sender=Book)
-def update_author_stats_on_save(sender, instance, created, **kwargs):
-    """Book yaratilganda yoki o'zgarganda author statistikasini yangilash"""
-    if not instance.author:
-        return
-        
-    author = instance.author
-    
-    # Total books count
-    author.total_books = Book.objects.filter(author=author).count()
-    
-    # Available books count
-    author.available_books = Book.objects.filter(
-        author=author,
-        is_available=True
-    ).count()
-    
-    author.save()
-    
-    print(f"📊 Author stats updated: {author.name} - Total: {author.total_books}, Available: {author.available_books}")
+def update_author_stats_on_save(sender, instance, created, update_fields=None, using='default', **kwargs):
+    """
+    Book yaratilganda yoki o'zgarganda author statistikasini yangilash
+
+    COUNT(*) o'rniga eski/yangi qiymatlardan F() delta (books/author_stats.py)
+    """
+    author_stats.book_saved(instance, created, update_fields=update_fields, using=using)
 
 
 @receiver(post_delete, sender=Book)
-def update_author_stats_on_delete(sender, instance, **kwargs):
+def update_author_stats_on_delete(sender, instance, using='default', **kwargs):
     """Book o'chirilganda author statistikasini yangilash"""
-    if not instance.author:
-        return
-        
-    author = instance.author
-    
-    # Total books count
-    author.total_books = Book.objects.filter(author=author).count()
-    
-    # Available books count
-    author.available_books = Book.objects.filter(
-        author=author,
-        is_available=True
-    ).count()
-    
-    author.save()
-    
-    print(f"📊 Author stats updated after deletion: {author.name}")
+    author_stats.book_deleted(instance, using=using)
+
+
+# ============================================================================
+# ANALYTICS SNAPSHOT SIGNALS
+# Materialized statistika delta bilan (books/stats_snapshot.py)
+# ============================================================================
+
+@receiver(post_save, sender=Book)
+def update_stats_snapshot_on_save(sender, instance, created, update_fields=None, using='default', **kwargs):
+    stats_snapshot.book_saved(instance, created, update_fields=update_fields, using=using)
+
+
+@receiver(pre_delete, sender=Book)
+def capture_stats_snapshot_genres(sender, instance, using='default', **kwargs):
+    stats_snapshot.book_deleting(instance, using=using)
+
+
+@receiver(post_delete, sender=Book)
+def update_stats_snapshot_on_delete(sender, instance, using='default', **kwargs):
+    stats_snapshot.book_deleted(instance, using=using)
+
+
+@receiver(m2m_changed, sender=Book.genres.through)
+def update_stats_snapshot_on_genres_change(sender, instance, action, reverse, pk_set, using='default', **kwargs):
+    stats_snapshot.book_genres_changed(instance, action, reverse, pk_set, using=using)
 
 
 # ============================================================================
 # CUSTOM SIGNAL FUNCTIONS
 # ============================================================================
 
+def _book_unavailable_error(book_id):
+    """Conditional UPDATE 0 qator qaytarganda sababini aniqlash"""
+    book = Book.objects.filter(pk=book_id).only('title', 'stock', 'is_available').first()
+
+    if book is None:
+        return ValueError(f"Book with ID {book_id} not found")
+    if not book.is_available:
+        return ValueError(f"Book '{book.title}' is not available")
+    return ValueError(f"Book '{book.title}' is out of stock")
+
+
+def _after_stock_change(book):
+    """Commit'dan keyin: cache invalidation (Book.save chaqirilmaydi)"""
+    tagged_cache.invalidate(*get_book_cache_tags(book))
+
+
 def borrow_book(book_id, user, days=14):
-    """Book borrow qilish va signal yuborish"""
-    try:
-        book = Book.objects.get(id=book_id)
-        
-        # Validation
+    """
+    Book borrow qilish va signal yuborish
+
+    Race-free: stock ``UPDATE ... SET stock = stock - 1 WHERE stock > 0``
+    bilan kamaytiriladi, shuning uchun parallel so'rovlar stock'ni manfiy
+    qila olmaydi. BorrowHistory, BookLog va Profile hisoblagichi bitta
+    atomic blokda yoziladi; signal (email va h.k.) faqat commit'dan keyin.
+    """
+    now = timezone.now()
+    due_date = now + timezone.timedelta(days=days)
+
+    with transaction.atomic():
+        updated = Book.objects.filter(
+            pk=book_id, is_available=True, stock__gt=0
+        ).update(
+            stock=F('stock') - 1,
+            # Oxirgi nusxa olinsa - mavjud emas
+            is_available=Case(When(stock__gt=1, then=Value(True)), default=Value(False)),
+            updated_at=now,
+        )
+        if not updated:
+            raise _book_unavailable_error(book_id)
+
+        book = Book.objects.get(pk=book_id)
+
+        # Oldin is_available=True edi (WHERE sharti)
         if not book.is_available:
-            raise ValueError(f"Book '{book.title}' is not available")
-        
-        if book.stock < 1:
-            raise ValueError(f"Book '{book.title}' is out of stock")
-        
-        # Update book
-        book.is_available = False
-        book.stock -= 1
-        book.save()
-        
-        # Create history
-        due_date = timezone.now() + timezone.timedelta(days=days)
+            author_stats.record_author_stats_delta(book.author_id, available=-1)
+        stats_snapshot.book_stock_changed(book, old_stock=book.stock + 1)
+
         history = BorrowHistory.objects.create(
             book=book,
             user=user,
             due_date=due_date
         )
-        
-        # Send signal
-        book_borrowed.send(
+
+        Profile.objects.filter(user=user).update(books_borrowed=F('books_borrowed') + 1)
+
+        BookLog.objects.create(
+            book_title=book.title,
+            book_id=book.id,
+            action='borrowed',
+            user=user,
+            details={
+                'due_date': due_date.isoformat(),
+                'borrowed_at': now.isoformat(),
+            }
+        )
+
+        # queryset.update() post_save yubormaydi - ES'dagi stock/is_available (o'zi on_commit)
+        indexing.enqueue_books([book.pk])
+
+        # Side effect'lar - faqat commit bo'lsa
+        transaction.on_commit(lambda: _after_stock_change(book))
+        transaction.on_commit(lambda: book_borrowed.send(
             sender=Book,
             book=book,
             user=user,
-            due_date=due_date
-        )
-        
-        print(f"✅ Book '{book.title}' borrowed by {user.username}")
-        return history
-        
-    except Book.DoesNotExist:
-        raise ValueError(f"Book with ID {book_id} not found")
+            due_date=due_date,
+            history=history,
+        ))
+
+    return history
 
 
 def return_book(book_id, user):
-    """Book return qilish va signal yuborish"""
-    try:
-        book = Book.objects.get(id=book_id)
-        
-        # Find active borrow history
+    """
+    Book return qilish va signal yuborish
+
+    BorrowHistory ``returned_at IS NULL`` sharti bilan yangilanadi -
+    bitta borrow ikki marta qaytarilmaydi.
+    """
+    return_date = timezone.now()
+
+    with transaction.atomic():
         history = BorrowHistory.objects.filter(
-            book=book,
+            book_id=book_id,
             user=user,
             returned_at__isnull=True
-        ).first()
-        
-        if not history:
+        ).order_by('borrowed_at').first()
+
+        if not history or not BorrowHistory.objects.filter(
+            pk=history.pk, returned_at__isnull=True
+        ).update(returned_at=return_date):
+            book = Book.objects.filter(pk=book_id).only('title').first()
+            if book is None:
+                raise ValueError(f"Book with ID {book_id} not found")
             raise ValueError(f"Book '{book.title}' is not borrowed by {user.username}")
-        
-        # Update book
-        book.is_available = True
-        book.stock += 1
-        book.save()
-        
-        # Update history
-        return_date = timezone.now()
+
         history.returned_at = return_date
-        history.save()
-        
-        # Send signal
-        book_returned.send(
+
+        # is_available False -> True o'tishi alohida sanaladi (author stats)
+        became_available = Book.objects.filter(pk=book_id, is_available=False).update(
+            stock=F('stock') + 1, is_available=True, updated_at=return_date
+        )
+        if not became_available:
+            Book.objects.filter(pk=book_id).update(
+                stock=F('stock') + 1, updated_at=return_date
+            )
+
+        book = Book.objects.get(pk=book_id)
+        history.book = book
+
+        if became_available:
+            author_stats.record_author_stats_delta(book.author_id, available=1)
+        stats_snapshot.book_stock_changed(book, old_stock=book.stock - 1)
+
+        Profile.objects.filter(user=user).update(books_returned=F('books_returned') + 1)
+
+        BookLog.objects.create(
+            book_title=book.title,
+            book_id=book.id,
+            action='returned',
+            user=user,
+            details={
+                'returned_at': return_date.isoformat(),
+            }
+        )
+
+        indexing.enqueue_books([book.pk])
+
+        transaction.on_commit(lambda: _after_stock_change(book))
+        transaction.on_commit(lambda: book_returned.send(
             sender=Book,
             book=book,
             user=user,
-            return_date=return_date
-        )
-        
-        print(f"✅ Book '{book.title}' returned by {user.username}")
-        return history
-        
-    except Book.DoesNotExist:
-        raise ValueError(f"Book with ID {book_id} not found")
+            return_date=return_date,
+            history=history,
+        ))
+
+    return history
 
 
 # ============================================================================
 # BOOK BORROW/RETURN SIGNAL RECEIVERS
+# Signal commit'dan keyin yuboriladi; DB yozuvlari borrow_book/return_book da
 # ============================================================================
 
 @receiver(book_borrowed)
 def on_book_borrowed(sender, book, user, due_date, **kwargs):
     """Book borrow qilinganda"""
-    # Update user profile (from accounts app)
-    profile = user.profile
-    profile.books_borrowed += 1
-    profile.save()
-    
-    # Create log
-    BookLog.objects.create(
-        book_title=book.title,
-        book_id=book.id,
-        action='borrowed',
-        user=user,
-        details={
-            'due_date': due_date.isoformat(),
-            'borrowed_at': timezone.now().isoformat(),
-        }
-    )
-    
     print(f"📚 Book borrowed:")
     print(f"   Book: {book.title}")
     print(f"   User: {user.username}")
@@ -260,22 +314,6 @@ def on_book_borrowed(sender, book, user, due_date, **kwargs):
 @receiver(book_returned)
 def on_book_returned(sender, book, user, return_date, **kwargs):
     """Book return qilinganda"""
-    # Update user profile (from accounts app)
-    profile = user.profile
-    profile.books_returned += 1
-    profile.save()
-    
-    # Create log
-    BookLog.objects.create(
-        book_title=book.title,
-        book_id=book.id,
-        action='returned',
-        user=user,
-        details={
-            'returned_at': return_date.isoformat(),
-        }
-    )
-    
     print(f"📚 Book returned:")
     print(f"   Book: {book.title}")
     print(f"   User: {user.username}")
@@ -300,9 +338,10 @@ def on_books_imported(sender, count, user, **kwargs):
 
 
 @receiver(book_borrowed)
-def send_borrow_confirmation_email(sender, book, user, due_date, **kwargs):
+def send_borrow_confirmation_email(sender, book, user, due_date, history=None, **kwargs):
     """Send email when book is borrowed"""
     try:
-        EmailService.send_book_borrowed_email(user, book, due_date)
+        borrow_date = history.borrowed_at if history else timezone.now()
+        EmailService.send_book_borrowed_email(user, book, borrow_date, due_date)
     except Exception as e:
         print(f"❌ Email error: {e}")
\ No newline at end of file
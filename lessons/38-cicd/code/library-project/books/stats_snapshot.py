@@ -0,0 +1,459 @@
+"""
+Materialized analytics snapshots
+
+BookStatsSnapshot (butun katalog), GenreStatsRollup va AuthorStatsRollup
+Book yozuvlaridan delta bilan yangilanadi - analytics endpoint'lari Book
+jadvalini skan qilmaydi (books.analytics.SnapshotAnalyticsResult).
+
+Har bir kitobning "hissasi" (contribution): 1 ta kitob, narx, stock,
+sahifalar, qiymat va tegishli bucket'lar. Save/delete/genre o'zgarishida
+eski hissa ayiriladi, yangisi qo'shiladi. Delta'lar transaction davomida
+yig'iladi va commit'da har bir scope uchun bitta ``F()`` UPDATE
+(books/author_stats.py bilan bir xil).
+
+min/max narxni delta bilan saqlab bo'lmaydi: qo'shilganda ``Least``/``Greatest``,
+chetki narx olib tashlansa faqat shu scope qayta hisoblanadi (UPDATE ichidagi
+subquery). Snapshot qatori ``select_for_update`` bilan qulflanmaydi - har bir
+Book yozuvi commit'i bitta global qatorni kutib qolmasin.
+
+Snapshot hali qurilmagan bo'lsa delta'lar yozilmaydi - birinchi o'qish
+uni to'liq quradi. Drift (queryset.update() kabi signal'siz yozuvlar):
+``python manage.py rebuild_stats_snapshots`` (periodic reconciliation).
+"""
+from collections import defaultdict
+from contextlib import contextmanager
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import (
+    Case, Count, DecimalField, ExpressionWrapper, F, Max, Min, Q, Subquery, Sum, Value, When,
+)
+from django.db.models.functions import Coalesce, Greatest, Least
+from django.utils import timezone
+
+from .analytics import AnalyticsResult, BOOK_BUCKETS, in_bucket
+from .author_stats import transaction_batch
+from .models import Book, BookStatsSnapshot, GenreStatsRollup, AuthorStatsRollup
+
+
+SNAPSHOT_ID = BookStatsSnapshot.SINGLETON_ID
+
+BUCKET_FIELDS = [
+    f"{prefix}{name}"
+    for prefix, _, buckets in BOOK_BUCKETS
+    for name in buckets
+]
+
+# contribution kaliti -> scope ustuni
+SNAPSHOT_FIELDS = {
+    'book_count': 'total_books',
+    'price_sum': 'price_sum',
+    'total_stock': 'total_stock',
+    'total_value': 'total_value',
+    **{field: field for field in BUCKET_FIELDS},
+}
+GENRE_FIELDS = {
+    field: field for field in ('book_count', 'price_sum', 'total_stock', 'total_value')
+}
+AUTHOR_FIELDS = {
+    field: field for field in ('book_count', 'price_sum', 'total_stock', 'total_pages', 'total_value')
+}
+
+
+def book_contribution(price, stock, pages):
+    """Bitta kitobning snapshot ustunlariga hissasi"""
+    price = Decimal(str(price))
+    stock = int(stock or 0)
+    contribution = {
+        'book_count': 1,
+        'price_sum': price,
+        'total_stock': stock,
+        'total_pages': int(pages or 0),
+        'total_value': price * stock,
+    }
+    values = {'price': price, 'stock': stock}
+    for prefix, field, buckets in BOOK_BUCKETS:
+        for name, bounds in buckets.items():
+            if in_bucket(values[field], bounds):
+                contribution[f"{prefix}{name}"] = 1
+    return contribution
+
+
+# ============================================================================
+# DELTA BATCH
+# ============================================================================
+
+class ScopeDelta:
+    """Bitta scope (katalog, janr yoki muallif) uchun yig'ilgan o'zgarish"""
+
+    def __init__(self):
+        self.values = defaultdict(int)
+        self.added_prices = []
+        self.removed_prices = []
+
+    def apply(self, contribution, sign):
+        for key, value in contribution.items():
+            self.values[key] += sign * value
+        prices = self.added_prices if sign > 0 else self.removed_prices
+        prices.append(contribution['price_sum'])
+
+    def updates(self, fields):
+        """``F()`` delta'lar - faqat nolga teng bo'lmaganlari"""
+        return {
+            column: F(column) + self.values[key]
+            for key, column in fields.items()
+            if self.values.get(key)
+        }
+
+    def extreme_updates(self, books):
+        """
+        min/max uchun UPDATE ifodalari (lock'siz, SQL ichida)
+
+        Qo'shilgan narx - ``Least``/``Greatest``; olib tashlangan narx chetki
+        bo'lsa (yoki ustun NULL) - ``books`` subquery'si bilan qayta hisoblanadi.
+        Chetki narx o'zgarmasa subquery ishlamaydi.
+        """
+        if not self.added_prices and not self.removed_prices:
+            return {}
+        field = BookStatsSnapshot._meta.get_field('min_price')
+        min_price, max_price = F('min_price'), F('max_price')
+        if self.added_prices:
+            added_min, added_max = Value(min(self.added_prices)), Value(max(self.added_prices))
+            min_price = Least(Coalesce('min_price', added_min), added_min, output_field=field)
+            max_price = Greatest(Coalesce('max_price', added_max), added_max, output_field=field)
+        if not self.removed_prices:
+            return {'min_price': min_price, 'max_price': max_price}
+
+        moved = (
+            Q(min_price__isnull=True)
+            | Q(min_price__gte=min(self.removed_prices))
+            | Q(max_price__lte=max(self.removed_prices))
+        )
+        books = books.order_by().values('price')
+        return {
+            'min_price': Case(
+                When(moved, then=Subquery(books.order_by('price')[:1])),
+                default=min_price, output_field=field,
+            ),
+            'max_price': Case(
+                When(moved, then=Subquery(books.order_by('-price')[:1])),
+                default=max_price, output_field=field,
+            ),
+        }
+
+
+class SnapshotBatch:
+    """Bitta transaction davomida yig'ilgan snapshot delta'lari"""
+
+    def __init__(self, using):
+        self.using = using
+        self.catalog = ScopeDelta()
+        self.authors = defaultdict(ScopeDelta)
+        self.genres = defaultdict(ScopeDelta)
+        self.flushed = False
+
+    def apply(self, contribution, sign, author_id=None, genre_ids=(), catalog=True):
+        if catalog:
+            self.catalog.apply(contribution, sign)
+        if author_id:
+            self.authors[author_id].apply(contribution, sign)
+        for genre_id in genre_ids:
+            self.genres[genre_id].apply(contribution, sign)
+
+    def flush(self):
+        """
+        Katalog, janrlar va mualliflar - har bir scope uchun bitta UPDATE
+
+        Row lock yo'q: ``F()`` delta'lar va min/max ifodalari kommutativ,
+        parallel commit'lar bir-birini kutmaydi.
+        """
+        self.flushed = True
+        now = timezone.now()
+
+        snapshots = BookStatsSnapshot.objects.using(self.using).filter(pk=SNAPSHOT_ID)
+        if not snapshots.exists():
+            # Snapshot hali qurilmagan - birinchi o'qishda to'liq quriladi
+            return
+
+        with transaction.atomic(using=self.using):
+            updates = self.catalog.updates(SNAPSHOT_FIELDS)
+            updates.update(self.catalog.extreme_updates(Book.objects.using(self.using)))
+            snapshots.update(updated_at=now, **updates)
+
+            self._flush_genres(now)
+            self._flush_authors(now)
+
+    def _ensure_rows(self, model, key, deltas):
+        """Yangi kitob olgan scope'lar uchun bo'sh rollup qatori"""
+        ids = [scope_id for scope_id, delta in deltas.items() if delta.added_prices]
+        if ids:
+            model.objects.using(self.using).bulk_create(
+                [model(**{key: scope_id}) for scope_id in ids],
+                ignore_conflicts=True,
+            )
+
+    def _flush_genres(self, now):
+        if not self.genres:
+            return
+        self._ensure_rows(GenreStatsRollup, 'genre_id', self.genres)
+
+        rollups = GenreStatsRollup.objects.using(self.using)
+        for genre_id, delta in self.genres.items():
+            updates = delta.updates(GENRE_FIELDS)
+            updates.update(delta.extreme_updates(
+                Book.objects.using(self.using).filter(genres__id=genre_id)
+            ))
+            if updates:
+                rollups.filter(genre_id=genre_id).update(updated_at=now, **updates)
+
+    def _flush_authors(self, now):
+        if not self.authors:
+            return
+        self._ensure_rows(AuthorStatsRollup, 'author_id', self.authors)
+
+        rollups = AuthorStatsRollup.objects.using(self.using)
+        for author_id, delta in self.authors.items():
+            updates = delta.updates(AUTHOR_FIELDS)
+            if updates:
+                rollups.filter(author_id=author_id).update(updated_at=now, **updates)
+
+
+@contextmanager
+def _recording(using):
+    """Transaction ichida - commit'da flush, autocommit'da - darhol"""
+    connection = transaction.get_connection(using)
+    if connection.in_atomic_block:
+        yield transaction_batch(using, SnapshotBatch, '_stats_snapshot_batch')
+        return
+
+    batch = SnapshotBatch(using)
+    yield batch
+    batch.flush()
+
+
+# ============================================================================
+# WRITE HOOKS (books/signals.py, books/importers.py)
+# ============================================================================
+
+def _genre_ids(book_id, using):
+    return list(
+        Book.genres.through.objects.using(using)
+        .filter(book_id=book_id)
+        .values_list('genre_id', flat=True)
+    )
+
+
+def _loaded_state(instance):
+    """DB'dagi (save'dan oldingi) holat: (contribution, author_id)"""
+    contribution = book_contribution(
+        instance.get_loaded_value('price', instance.price),
+        instance.get_loaded_value('stock', instance.stock),
+        instance.get_loaded_value('pages', instance.pages),
+    )
+    return contribution, instance.get_loaded_value('author_id', instance.author_id)
+
+
+def book_saved(instance, created, update_fields=None, using='default'):
+    """Book post_save"""
+    if created:
+        contribution = book_contribution(instance.price, instance.stock, instance.pages)
+        with _recording(using) as batch:
+            batch.apply(contribution, 1, author_id=instance.author_id)
+        return
+
+    old, old_author = _loaded_state(instance)
+
+    # update_fields da yo'q maydonlar DB'da o'zgarmaydi
+    def new_value(field, attname=None):
+        attname = attname or field
+        if update_fields is not None and field not in update_fields and attname not in update_fields:
+            return instance.get_loaded_value(attname, getattr(instance, attname))
+        return getattr(instance, attname)
+
+    new = book_contribution(new_value('price'), new_value('stock'), new_value('pages'))
+    new_author = new_value('author', 'author_id')
+
+    if old == new and old_author == new_author:
+        return
+
+    genre_ids = _genre_ids(instance.pk, using)
+    with _recording(using) as batch:
+        batch.apply(old, -1, author_id=old_author, genre_ids=genre_ids)
+        batch.apply(new, 1, author_id=new_author, genre_ids=genre_ids)
+
+
+def book_deleting(instance, using='default'):
+    """Book pre_delete - M2M qatorlari o'chishidan oldin janrlarni eslab qolish"""
+    instance._stats_genre_ids = _genre_ids(instance.pk, using)
+
+
+def book_deleted(instance, using='default'):
+    """Book post_delete"""
+    contribution, author_id = _loaded_state(instance)
+    with _recording(using) as batch:
+        batch.apply(
+            contribution, -1,
+            author_id=author_id,
+            genre_ids=getattr(instance, '_stats_genre_ids', []),
+        )
+
+
+def _link_contributions(instance, reverse, pk_set, using):
+    """
+    Mavjud Book-Genre bog'lanishlari: [(genre_id, contribution)] - bitta query
+
+    reverse=False: instance - Book, pk_set - genre id'lar
+    reverse=True: instance - Genre, pk_set - book id'lar
+    """
+    links = Book.genres.through.objects.using(using)
+    if reverse:
+        links = links.filter(genre_id=instance.pk)
+        if pk_set is not None:
+            links = links.filter(book_id__in=pk_set)
+    else:
+        links = links.filter(book_id=instance.pk)
+        if pk_set is not None:
+            links = links.filter(genre_id__in=pk_set)
+
+    return [
+        (genre_id, book_contribution(price, stock, pages))
+        for genre_id, price, stock, pages in links.values_list(
+            'genre_id', 'book__price', 'book__stock', 'book__pages'
+        )
+    ]
+
+
+def book_genres_changed(instance, action, reverse, pk_set, using='default'):
+    """Book.genres m2m_changed - faqat janr rollup'lariga ta'sir qiladi"""
+    if action in ('pre_remove', 'pre_clear'):
+        instance._stats_removed_links = _link_contributions(
+            instance, reverse, pk_set if action == 'pre_remove' else None, using
+        )
+        return
+
+    if action == 'post_add' and pk_set:
+        links, sign = _link_contributions(instance, reverse, pk_set, using), 1
+    elif action in ('post_remove', 'post_clear'):
+        links, sign = getattr(instance, '_stats_removed_links', []), -1
+        instance._stats_removed_links = []
+    else:
+        return
+
+    if not links:
+        return
+    with _recording(using) as batch:
+        for genre_id, contribution in links:
+            batch.apply(contribution, sign, genre_ids=[genre_id], catalog=False)
+
+
+def books_created(books_with_genres, using='default'):
+    """bulk_create (signal'siz) - [(book, genre_ids)]"""
+    with _recording(using) as batch:
+        for book, genre_ids in books_with_genres:
+            batch.apply(
+                book_contribution(book.price, book.stock, book.pages), 1,
+                author_id=book.author_id,
+                genre_ids=set(genre_ids),
+            )
+
+
+def book_stock_changed(book, old_stock, using='default'):
+    """Borrow/return (queryset.update) - ``book`` yangi qiymatlar bilan"""
+    genre_ids = _genre_ids(book.pk, using)
+    with _recording(using) as batch:
+        batch.apply(
+            book_contribution(book.price, old_stock, book.pages), -1,
+            author_id=book.author_id, genre_ids=genre_ids,
+        )
+        batch.apply(
+            book_contribution(book.price, book.stock, book.pages), 1,
+            author_id=book.author_id, genre_ids=genre_ids,
+        )
+
+
+# ============================================================================
+# READ / REBUILD
+# ============================================================================
+
+def get_snapshot(using='default'):
+    """Katalog snapshot'i - yo'q bo'lsa to'liq quriladi"""
+    snapshot = BookStatsSnapshot.objects.using(using).filter(pk=SNAPSHOT_ID).first()
+    if snapshot is None:
+        rebuild_stats_snapshots(using=using)
+        snapshot = BookStatsSnapshot.objects.using(using).get(pk=SNAPSHOT_ID)
+    return snapshot
+
+
+def _value_expression(price, stock):
+    return ExpressionWrapper(
+        Sum(F(price) * F(stock)),
+        output_field=DecimalField(max_digits=18, decimal_places=2),
+    )
+
+
+def rebuild_stats_snapshots(batch_size=1000, using='default'):
+    """
+    Barcha snapshot jadvallarini qayta qurish (reconciliation)
+
+    Katalog - bitta conditional aggregation, janrlar va mualliflar - bittadan
+    grouped query. Returns: {'books': ..., 'genres': ..., 'authors': ...}
+    """
+    now = timezone.now()
+    catalog = AnalyticsResult().books
+
+    genre_rows = [
+        GenreStatsRollup(updated_at=now, **row)
+        for row in Book.genres.through.objects.using(using)
+        .order_by()
+        .values('genre_id')
+        .annotate(
+            book_count=Count('book_id'),
+            price_sum=Sum('book__price'),
+            min_price=Min('book__price'),
+            max_price=Max('book__price'),
+            total_stock=Sum('book__stock'),
+            total_value=_value_expression('book__price', 'book__stock'),
+        )
+    ]
+
+    author_rows = [
+        AuthorStatsRollup(updated_at=now, **row)
+        for row in Book.objects.using(using)
+        .filter(author__isnull=False)
+        .order_by()
+        .values('author_id')
+        .annotate(
+            book_count=Count('id'),
+            price_sum=Sum('price'),
+            total_stock=Sum('stock'),
+            total_pages=Sum('pages'),
+            total_value=_value_expression('price', 'stock'),
+        )
+    ]
+
+    snapshot_values = {
+        'total_books': catalog['total_books'],
+        'price_sum': catalog['price_sum'] or 0,
+        'min_price': catalog['min_price'],
+        'max_price': catalog['max_price'],
+        'total_stock': catalog['total_stock'] or 0,
+        'total_value': catalog['total_value'] or 0,
+        'updated_at': now,
+        'rebuilt_at': now,
+        **{field: catalog[field] for field in BUCKET_FIELDS},
+    }
+
+    with transaction.atomic(using=using):
+        BookStatsSnapshot.objects.using(using).update_or_create(
+            pk=SNAPSHOT_ID, defaults=snapshot_values
+        )
+        GenreStatsRollup.objects.using(using).all().delete()
+        GenreStatsRollup.objects.using(using).bulk_create(genre_rows, batch_size=batch_size)
+        AuthorStatsRollup.objects.using(using).all().delete()
+        AuthorStatsRollup.objects.using(using).bulk_create(author_rows, batch_size=batch_size)
+
+    return {
+        'books': catalog['total_books'],
+        'genres': len(genre_rows),
+        'authors': len(author_rows),
+    }
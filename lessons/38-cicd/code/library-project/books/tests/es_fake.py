@@ -0,0 +1,215 @@
+"""
+Fake Elasticsearch
+==================
+
+Elasticsearch client'ining haqiqiy transport qatlami ostida ishlaydigan
+xotiradagi node: bulk index/delete, ``_search`` (from/size, search_after,
+_source filter), index yaratish/o'chirish, settings va alias'lar.
+Query'lar baholanmaydi - barcha hujjatlar ``id`` bo'yicha tartibda,
+score 1.0.
+
+Usage:
+    class MyTest(FakeElasticsearchMixin, TestCase):
+        def test_x(self):
+            ...
+            self.es.requests  # [(method, path, body), ...]
+"""
+
+from urllib.parse import urlsplit
+import json
+
+from elastic_transport import ApiResponseMeta, BaseNode, HttpHeaders
+from elastic_transport._node import NodeApiResponse
+from elasticsearch import Elasticsearch
+from elasticsearch_dsl.connections import connections
+
+
+class FakeCluster:
+    def __init__(self):
+        self.indices = {}
+        self.settings = {}
+        self.aliases = {}
+        self.requests = []
+
+    def resolve(self, name):
+        """Alias -> uning (yagona) index'i"""
+        indices = self.aliases.get(name)
+        return next(iter(indices)) if indices else name
+
+    def docs(self, index='books'):
+        return self.indices.setdefault(self.resolve(index), {})
+
+    def search_requests(self):
+        return [json.loads(body) for method, path, body in self.requests if path.endswith('/_search')]
+
+    # ------------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------------
+
+    def handle(self, method, path, body):
+        parts = path.strip('/').split('/')
+        data = json.loads(body) if body and not path.endswith('/_bulk') else {}
+
+        if path.endswith('/_bulk'):
+            return self.bulk(path, body)
+        if path.endswith('/_search'):
+            return self.search(parts[0], data)
+        if parts[0] == '_aliases':
+            return self.update_aliases(data['actions'])
+        if parts[0] == '_alias':
+            indices = {index: {'aliases': {parts[1]: {}}} for index in self.aliases.get(parts[1], ())}
+            return (200, indices) if indices else _not_found(parts[1])
+        if len(parts) == 2 and parts[1] == '_settings':
+            self.settings[parts[0]].update(data.get('index', data))
+            return 200, {'acknowledged': True}
+        if len(parts) == 2 and parts[1] == '_refresh':
+            return 200, {'_shards': {'total': 1, 'successful': 1, 'failed': 0}}
+        if len(parts) == 1:
+            return self.index_api(method, parts[0], data)
+        return 400, {'error': {'type': 'unsupported', 'reason': f'{method} {path}'}, 'status': 400}
+
+    def index_api(self, method, name, data):
+        exists = name in self.indices or name in self.aliases
+        if method == 'HEAD':
+            return (200, {}) if exists else (404, {})
+        if method == 'PUT':
+            self.indices[name] = {}
+            self.settings[name] = dict(data.get('settings', {}))
+            return 200, {'acknowledged': True, 'index': name}
+        if method == 'DELETE':
+            for index in name.split(','):
+                self.indices.pop(index, None)
+                self.settings.pop(index, None)
+                for indices in self.aliases.values():
+                    indices.discard(index)
+            return 200, {'acknowledged': True}
+        return 400, {'error': {'type': 'unsupported', 'reason': f'{method} {name}'}, 'status': 400}
+
+    def update_aliases(self, actions):
+        for action in actions:
+            op, params = next(iter(action.items()))
+            if op == 'add':
+                self.aliases.setdefault(params['alias'], set()).add(params['index'])
+            elif op == 'remove':
+                self.aliases.get(params['alias'], set()).discard(params['index'])
+            elif op == 'remove_index':
+                self.indices.pop(params['index'], None)
+        return 200, {'acknowledged': True}
+
+    def bulk(self, path, body):
+        lines = [json.loads(line) for line in body.decode().splitlines() if line.strip()]
+        default_index = path.split('/')[1] if path != '/_bulk' else None
+        if not lines:
+            return 200, {'took': 1, 'errors': False, 'items': []}
+        items = []
+        position = 0
+        while position < len(lines):
+            op, meta = next(iter(lines[position].items()))
+            position += 1
+            index = self.resolve(meta.get('_index', default_index))
+            doc_id = str(meta['_id'])
+            if op == 'delete':
+                found = self.docs(index).pop(doc_id, None) is not None
+                items.append({op: {'_index': index, '_id': doc_id, 'status': 200 if found else 404}})
+                continue
+            self.docs(index)[doc_id] = lines[position]
+            position += 1
+            items.append({op: {'_index': index, '_id': doc_id, 'status': 201}})
+        return 200, {'took': 1, 'errors': False, 'items': items}
+
+    def search(self, index, body):
+        docs = sorted(self.docs(index).items(), key=lambda item: int(item[0]))
+        hits = [
+            {'_index': index, '_id': doc_id, '_score': 1.0, '_source': source, 'sort': [1.0, int(doc_id)]}
+            for doc_id, source in docs
+        ]
+
+        if 'search_after' in body:
+            after_id = body['search_after'][-1]
+            hits = [hit for hit in hits if hit['sort'][-1] > after_id]
+        start = body.get('from', 0)
+        hits = hits[start:start + body.get('size', 10)]
+
+        source = body.get('_source', True)
+        for hit in hits:
+            if source is False:
+                del hit['_source']
+            elif isinstance(source, list):
+                hit['_source'] = _select(hit['_source'], source)
+
+        return 200, {
+            'took': 1,
+            'timed_out': False,
+            '_shards': {'total': 1, 'successful': 1, 'skipped': 0, 'failed': 0},
+            'hits': {
+                'total': {'value': len(docs), 'relation': 'eq'},
+                'max_score': 1.0,
+                'hits': hits,
+            },
+        }
+
+
+def _not_found(name):
+    return 404, {
+        'error': {'type': 'index_not_found_exception', 'reason': f'no such index [{name}]'},
+        'status': 404,
+    }
+
+
+def _select(source, fields):
+    """_source filter: 'author.name' kabi nuqtali yo'llar"""
+    selected = {}
+    for field in fields:
+        value, parts = source, field.split('.')
+        for part in parts:
+            if not isinstance(value, dict) or part not in value:
+                break
+            value = value[part]
+        else:
+            target = selected
+            for part in parts[:-1]:
+                target = target.setdefault(part, {})
+            target[parts[-1]] = value
+    return selected
+
+
+class FakeNode(BaseNode):
+    cluster = None
+
+    def perform_request(self, method, target, body=None, headers=None, request_timeout=None):
+        path = urlsplit(target).path
+        self.cluster.requests.append((method, path, body))
+        status, data = self.cluster.handle(method, path, body)
+        meta = ApiResponseMeta(
+            status=status,
+            http_version='1.1',
+            headers=HttpHeaders({
+                'content-type': 'application/json',
+                'x-elastic-product': 'Elasticsearch',
+            }),
+            duration=0.0,
+            node=self.config,
+        )
+        return NodeApiResponse(meta, json.dumps(data).encode())
+
+
+def fake_client(cluster):
+    node_class = type('FakeNode', (FakeNode,), {'cluster': cluster})
+    return Elasticsearch('http://fake-es:9200', node_class=node_class)
+
+
+class FakeElasticsearchMixin:
+    """``default`` elasticsearch_dsl connection'ini fake cluster bilan almashtiradi"""
+
+    def setUp(self):
+        super().setUp()
+        self.es = FakeCluster()
+        self._previous_connection = connections._conns.get('default')
+        connections.add_connection('default', fake_client(self.es))
+
+    def tearDown(self):
+        if self._previous_connection is None:
+            connections.remove_connection('default')
+        else:
+            connections.add_connection('default', self._previous_connection)
+        super().tearDown()
@@ -0,0 +1,302 @@
+"""
+Analytics Tests
+===============
+
+AnalyticsResult: bitta conditional aggregation va grouped querylar,
+complete_analytics query soni, materialized snapshot'lar delta bilan
+"""
+
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from books.analytics import BookAnalytics, AnalyticsResult, SnapshotAnalyticsResult
+from books.models import Book, Author, Genre, BookStatsSnapshot
+from books.importers import BookBulkImporter
+from books.signals import borrow_book
+from books.stats_snapshot import rebuild_stats_snapshots
+from decimal import Decimal
+
+
+class AnalyticsDataMixin:
+    def create_books(self):
+        self.tolkien = Author.objects.create(name='Tolkien')
+        self.orwell = Author.objects.create(name='Orwell')
+        Author.objects.create(name='No Books')
+        self.fantasy = Genre.objects.create(name='Fantasy')
+        self.dystopia = Genre.objects.create(name='Dystopia')
+
+        books = [
+            # (author, price, stock, pages, genre)
+            (self.tolkien, '20.00', 0, 300, self.fantasy),
+            (self.tolkien, '45.00', 3, 500, self.fantasy),
+            (self.tolkien, '80.00', 12, 900, self.fantasy),
+            (self.orwell, '60.00', 7, 250, self.dystopia),
+        ]
+        for i, (author, price, stock, pages, genre) in enumerate(books):
+            book = Book.objects.create(
+                title=f'Book {i}',
+                isbn_number=f'950000000000{i}',
+                price=Decimal(price),
+                stock=stock,
+                pages=pages,
+                author=author,
+            )
+            book.genres.add(genre)
+
+
+class AnalyticsResultTest(AnalyticsDataMixin, TestCase):
+    """Bo'limlar natijalari"""
+
+    def setUp(self):
+        self.create_books()
+
+    def test_buckets(self):
+        result = AnalyticsResult()
+
+        self.assertEqual(
+            BookAnalytics.get_price_distribution(result),
+            {'budget': 1, 'moderate': 1, 'premium': 1, 'luxury': 1},
+        )
+        self.assertEqual(
+            BookAnalytics.get_stock_analysis(result)['status'],
+            {'out_of_stock': 1, 'critical': 0, 'low': 1, 'normal': 1, 'high': 1},
+        )
+
+        dashboard = BookAnalytics.get_dashboard_stats(result)
+        self.assertEqual(dashboard['overview']['total_books'], 4)
+        self.assertEqual(dashboard['stock_status'], {'out_of_stock': 1, 'low_stock': 1, 'in_stock': 2})
+        self.assertEqual(dashboard['authors'], {'total': 3, 'with_books': 2})
+        self.assertEqual(dashboard['genres'], {'total': 2, 'with_books': 2})
+
+    def test_performance_top_n(self):
+        """Top-N bitta grouped natijadan"""
+        genres = BookAnalytics.get_genre_performance()
+        authors = BookAnalytics.get_author_performance()
+
+        self.assertEqual(genres['most_books'].name, 'Fantasy')
+        self.assertEqual(genres['most_expensive'].name, 'Dystopia')
+        self.assertEqual(authors['most_pages'].name, 'Tolkien')
+        self.assertEqual(authors['most_expensive'].name, 'Orwell')
+
+    def test_empty_database(self):
+        Book.objects.all().delete()
+        self.assertIsNone(BookAnalytics.get_genre_performance()['most_books'])
+        self.assertEqual(len(BookAnalytics.get_recommendations()), 0)
+
+    def test_sections_share_queries(self):
+        """Bitta natija obyekti - har bir query bir marta"""
+        result = AnalyticsResult()
+        with self.assertNumQueries(5):
+            BookAnalytics.get_dashboard_stats(result)
+            BookAnalytics.get_price_distribution(result)
+            BookAnalytics.get_genre_performance(result)
+            BookAnalytics.get_author_performance(result)
+            BookAnalytics.get_recommendations(result)
+
+
+class CompleteAnalyticsViewTest(AnalyticsDataMixin, APITestCase):
+    """GET /api/analytics/complete/"""
+
+    def setUp(self):
+        self.create_books()
+        rebuild_stats_snapshots()
+        user = User.objects.create_user(username='analyst', password='pass12345')
+        self.client.force_authenticate(user=user)
+
+    def test_query_count(self):
+        """
+        Snapshot qatori + Author/Genre aggregate + 2 ta rollup query.
+        Kitoblar soni oshsa ham o'zgarmaydi.
+        """
+        with self.assertNumQueries(5):
+            response = self.client.get('/api/analytics/complete/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['dashboard']['overview']['total_books'], 4)
+        self.assertEqual(response.data['genre_performance']['most_books']['name'], 'Fantasy')
+        self.assertEqual(len(response.data['recommendations']), 4)
+        self.assertIn('generated_at', response.data)
+
+    def test_by_genre_from_rollups(self):
+        response = self.client.get('/api/analytics/by-genre/')
+        fantasy = response.data['by_genre'][0]
+        self.assertEqual(fantasy['genre'], 'Fantasy')
+        self.assertEqual(fantasy['book_count'], 3)
+        self.assertEqual(fantasy['min_price'], 20.0)
+        self.assertEqual(fantasy['avg_price'], 48.33)
+
+
+class StatsSnapshotTest(AnalyticsDataMixin, TestCase):
+    """Snapshot'lar Book yozuvlaridan delta bilan yangilanadi"""
+
+    def setUp(self):
+        # setUp dagi on_commit batch'lari test ichidagi yozuvlarga aralashmasin
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_books()
+        rebuild_stats_snapshots()
+
+    def assertMatchesLive(self):
+        """Delta bilan yangilangan snapshot == to'liq qayta hisoblash"""
+        snapshot = SnapshotAnalyticsResult()
+        live = AnalyticsResult()
+
+        for key, value in live.books.items():
+            if key == 'avg_price':
+                continue
+            self.assertEqual(snapshot.books[key] or 0, value or 0, key)
+
+        snapshot_genres = {g.name: (g.book_count, g.total_stock, g.total_value, g.min_price, g.max_price)
+                           for g in snapshot.genre_rows}
+        live_genres = {g.name: (g.book_count, g.total_stock, g.total_value, g.min_price, g.max_price)
+                       for g in live.genre_rows}
+        self.assertEqual(snapshot_genres, live_genres)
+
+        snapshot_authors = {a.name: (a.book_count, a.total_stock, a.total_pages, a.total_value)
+                            for a in snapshot.author_rows}
+        live_authors = {a.name: (a.book_count, a.total_stock, a.total_pages, a.total_value)
+                        for a in live.author_rows}
+        self.assertEqual(snapshot_authors, live_authors)
+
+    def test_create_update_delete(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            book = Book.objects.create(
+                title='New', isbn_number='9600000000001', price=Decimal('5.00'),
+                stock=1, pages=100, author=self.orwell,
+            )
+            book.genres.add(self.fantasy)
+        self.assertMatchesLive()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            book.price = Decimal('95.00')
+            book.stock = 20
+            book.author = self.tolkien
+            book.save()
+        self.assertMatchesLive()
+
+        # Eng arzon kitob o'chirildi - min_price qayta hisoblanadi
+        with self.captureOnCommitCallbacks(execute=True):
+            Book.objects.get(title='Book 0').delete()
+        self.assertMatchesLive()
+        self.assertEqual(BookStatsSnapshot.objects.get().min_price, Decimal('45.00'))
+
+    def test_genre_changes(self):
+        book = Book.objects.get(title='Book 3')
+        with self.captureOnCommitCallbacks(execute=True):
+            book.genres.add(self.fantasy)
+            self.dystopia.books.remove(book)
+        self.assertMatchesLive()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.fantasy.books.clear()
+        self.assertMatchesLive()
+
+    def test_bulk_import_and_borrow(self):
+        user = User.objects.create_user(username='reader', password='pass12345')
+        with self.captureOnCommitCallbacks(execute=True):
+            BookBulkImporter().run([{
+                'title': 'Imported', 'author': self.orwell.id, 'isbn_number': '9600000000002',
+                'price': '35.00', 'stock': 1, 'genres': [self.dystopia.id],
+            }])
+        self.assertMatchesLive()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            borrow_book(Book.objects.get(title='Imported').id, user)
+        self.assertMatchesLive()
+
+    def test_rollback_discards_deltas(self):
+        before = BookStatsSnapshot.objects.get().total_books
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    Book.objects.create(title='Tmp', isbn_number='9600000000003', price=Decimal('1.00'))
+                    raise ValueError
+            except ValueError:
+                pass
+        self.assertEqual(BookStatsSnapshot.objects.get().total_books, before)
+
+    def test_flush_without_row_lock(self):
+        """Flush - lock'siz UPDATE; chetki bo'lmagan narx olib tashlansa subquery yo'q"""
+        with CaptureQueriesContext(connection) as queries:
+            with self.captureOnCommitCallbacks(execute=True):
+                book = Book.objects.get(title='Book 1')  # 45.00 - min ham max ham emas
+                book.price = Decimal('50.00')
+                book.save()
+        self.assertMatchesLive()
+        self.assertFalse(any('FOR UPDATE' in q['sql'] for q in queries.captured_queries))
+
+        # Rollback qilingan savepoint'dagi chetki narx snapshot'ga tushmaydi
+        with self.captureOnCommitCallbacks(execute=True):
+            Book.objects.create(title='Kept', isbn_number='9600000000004', price=Decimal('30.00'))
+            try:
+                with transaction.atomic():
+                    Book.objects.create(title='Tmp', isbn_number='9600000000005', price=Decimal('1.00'))
+                    raise ValueError
+            except ValueError:
+                pass
+        self.assertMatchesLive()
+        self.assertEqual(BookStatsSnapshot.objects.get().min_price, Decimal('20.00'))
+
+    def test_snapshot_read_is_constant(self):
+        """Snapshot o'qish - katalog hajmiga bog'liq bo'lmagan querylar"""
+        with self.assertNumQueries(5):
+            result = SnapshotAnalyticsResult()
+            BookAnalytics.get_dashboard_stats(result)
+            BookAnalytics.get_genre_performance(result)
+            BookAnalytics.get_author_performance(result)
+
+
+class HistogramTest(AnalyticsDataMixin, APITestCase):
+    """GET /api/analytics/histogram/"""
+
+    url = '/api/analytics/histogram/'
+
+    def setUp(self):
+        self.create_books()
+        user = User.objects.create_user(username='analyst', password='pass12345')
+        self.client.force_authenticate(user=user)
+
+    def counts(self, data):
+        return [bucket['count'] for bucket in data['buckets']]
+
+    def test_explicit_edges_one_query(self):
+        """Prices 20, 45, 60, 80 - barcha bucket'lar bitta grouped query"""
+        with self.assertNumQueries(1):
+            data = BookAnalytics.get_histogram('price', '0,30,50,70')
+
+        self.assertEqual(data['strategy'], 'edges')
+        self.assertEqual(self.counts(data), [1, 1, 1])
+        self.assertEqual(data['overflow'], 1)
+        self.assertEqual(data['underflow'], 0)
+
+    def test_equal_width_integer_field(self):
+        """Stock 0, 3, 7, 12 - kasr chegaralar integer maydonda to'g'ri"""
+        data = BookAnalytics.get_histogram('stock', '5')
+        self.assertEqual(data['buckets'][0]['min'], 0.0)
+        self.assertEqual(data['buckets'][-1]['max'], 12.0)
+        self.assertEqual(self.counts(data), [1, 1, 1, 0, 1])
+        self.assertEqual(data['total'], 4)
+
+    def test_quantile(self):
+        data = BookAnalytics.get_histogram('pages', '2', strategy='quantile')
+        self.assertEqual(sum(self.counts(data)), 4)
+        self.assertEqual(len(data['buckets']), 2)
+
+    def test_cached_until_book_write(self):
+        """Natija cache'da; Book yozuvi uni bekor qiladi"""
+        first = self.client.get(self.url, {'field': 'price', 'bins': '0,100'}).data
+        with self.assertNumQueries(0):
+            BookAnalytics.get_histogram('price', '0,100')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Book.objects.create(title='Extra', isbn_number='9700000000001', price=Decimal('10.00'))
+        second = self.client.get(self.url, {'field': 'price', 'bins': '0,100'}).data
+
+        self.assertEqual(first['buckets'][0]['count'], 4)
+        self.assertEqual(second['buckets'][0]['count'], 5)
+
+    def test_invalid_params(self):
+        for params in ({'field': 'title'}, {'bins': '10,5'}, {'bins': '0'}, {'strategy': 'log'}):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, 400, params)
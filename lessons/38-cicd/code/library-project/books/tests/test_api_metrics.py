@@ -0,0 +1,119 @@
+"""
+API Version Metrics Tests
+=========================
+
+Recorder: request'lar buffer'da yig'iladi va interval/limit bo'yicha bitta
+batch bilan yoziladi; parallel request'larda hisob yo'qolmaydi; usage
+endpoint'i
+"""
+
+from datetime import date
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APITestCase
+from books.api_metrics import LocalMetricsSink, VersionMetricsRecorder, recorder, usage_key, users_key
+from concurrent.futures import ThreadPoolExecutor
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class RecordingSink:
+    def __init__(self):
+        self.writes = []
+
+    def write(self, counts, users):
+        self.writes.append((dict(counts), {key: set(ids) for key, ids in users.items()}))
+
+
+class BrokenSink:
+    def write(self, counts, users):
+        raise ConnectionError('redis down')
+
+
+class VersionMetricsRecorderTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.today = date.today()
+
+    def test_buffers_until_max_pending(self):
+        sink = RecordingSink()
+        metrics = VersionMetricsRecorder(sink, flush_interval=60, max_pending=5, clock=FakeClock())
+
+        for user_id in (1, 2, 1, None):
+            metrics.record('v1', user_id)
+        self.assertEqual(sink.writes, [])
+
+        metrics.record('v2', 3)
+        self.assertEqual(sink.writes, [(
+            {usage_key('v1', self.today): 4, usage_key('v2', self.today): 1},
+            {users_key('v1', self.today): {1, 2}, users_key('v2', self.today): {3}},
+        )])
+
+    def test_flushes_on_interval(self):
+        sink = RecordingSink()
+        clock = FakeClock()
+        metrics = VersionMetricsRecorder(sink, flush_interval=10, max_pending=1000, clock=clock)
+
+        metrics.record('v2')
+        clock.now += 10
+        metrics.record('v2')
+
+        self.assertEqual(len(sink.writes), 1)
+        self.assertEqual(sink.writes[0][0], {usage_key('v2', self.today): 2})
+
+        # Buffer bo'shatildi - bo'sh flush sink'ga yozmaydi
+        metrics.flush()
+        self.assertEqual(len(sink.writes), 1)
+
+    def test_sink_errors_are_swallowed(self):
+        metrics = VersionMetricsRecorder(BrokenSink(), flush_interval=60, max_pending=1)
+        with self.assertLogs('books.api_metrics', level='WARNING'):
+            metrics.record('v1', 1)
+
+    def test_concurrent_requests_are_not_lost(self):
+        sink = LocalMetricsSink()
+        metrics = VersionMetricsRecorder(sink, flush_interval=60, max_pending=37)
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda i: metrics.record('v1', i % 50), range(2000)))
+
+        usage = metrics.usage(days=1, versions=['v1'])
+        self.assertEqual(usage[str(self.today)]['v1'], {'requests': 2000, 'unique_users': 50})
+
+
+class VersionUsageEndpointTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        recorder.flush()
+        self.before = recorder.usage(days=1)[str(date.today())]
+        self.admin = User.objects.create_superuser('admin', 'admin@example.com', 'pass12345')
+
+    def test_reports_requests_and_unique_users(self):
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get('/api/v2/books/')
+        self.assertEqual(response['X-API-Version'], 'v2')
+        self.client.get('/api/v2/books/')
+
+        response = self.client.get('/api/v2/metrics/versions/', {'days': 1})
+        self.assertEqual(response.status_code, 200)
+
+        today = response.data['usage'][str(date.today())]
+        self.assertEqual(today['v2']['requests'] - self.before['v2']['requests'], 2)
+        self.assertGreaterEqual(today['v2']['unique_users'], 1)
+        self.assertEqual(response.data['totals']['v2']['requests'], today['v2']['requests'])
+
+        legacy = self.client.get('/api/v2/metrics/')
+        self.assertEqual(legacy.data['metrics'][str(date.today())]['v2'], today['v2']['requests'] + 1)
+
+    def test_admin_only(self):
+        user = User.objects.create_user(username='reader', password='pass12345')
+        self.client.force_authenticate(user=user)
+        response = self.client.get('/api/v2/metrics/versions/')
+        self.assertEqual(response.status_code, 403)
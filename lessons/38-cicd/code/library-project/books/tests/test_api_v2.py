@@ -0,0 +1,160 @@
+"""
+API v2 Tests
+============
+
+AnnotatedField: book_count queryset annotation'idan, rating summary
+denormalized ustunlardan - sahifa hajmidan qat'i nazar o'zgarmas query soni
+"""
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from books.models import Book, Author, Genre, Review
+from books.api.v2.serializers import BookListSerializerV2
+from books.ratings import repair_book_ratings
+from accounts.membership import get_tier
+from decimal import Decimal
+
+
+class AnnotatedFieldsTest(APITestCase):
+    """GET /api/v2/books/ va /api/v2/authors/"""
+
+    def setUp(self):
+        user = User.objects.create_user(username='reader', password='pass12345')
+        self.client.force_authenticate(user=user)
+        # MembershipThrottle tier'i birinchi request'da cache'ga olinadi
+        get_tier(user.id)
+        genres = [Genre.objects.create(name='Fiction'), Genre.objects.create(name='Drama')]
+
+        for a in range(12):
+            author = Author.objects.create(name=f'Author {a}')
+            for b in range(3):
+                book = Book.objects.create(
+                    title=f'Book {a}-{b}',
+                    isbn_number=f'98{a:05d}{b:06d}',
+                    price=Decimal('10.00'),
+                    author=author,
+                )
+                book.genres.add(*genres)
+                for rating in range(1, b + 2):
+                    Review.objects.create(book=book, rating=rating, comment='ok')
+
+    def count_queries(self, url, page_size):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, {'page_size': page_size})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), page_size)
+        return len(context.captured_queries), response.data['results']
+
+    def test_books_constant_queries(self):
+        """count + sahifa + genres prefetch - page_size'ga bog'liq emas"""
+        small, _ = self.count_queries('/api/v2/books/', 2)
+        large, results = self.count_queries('/api/v2/books/', 36)
+
+        self.assertEqual(small, large)
+        self.assertLessEqual(large, 3)
+
+        # Ikki genre join'i review'larni ko'paytirmaydi
+        book = next(r for r in results if r['title'] == 'Book 0-2')
+        self.assertEqual(book['review_count'], 3)
+        self.assertEqual(book['average_rating'], 2.0)
+
+    def test_authors_constant_queries(self):
+        small, _ = self.count_queries('/api/v2/authors/', 2)
+        large, results = self.count_queries('/api/v2/authors/', 12)
+
+        self.assertEqual(small, large)
+        self.assertEqual({r['book_count'] for r in results}, {3})
+
+    def test_filtered_by_genre(self):
+        genre = Genre.objects.get(name='Drama')
+        response = self.client.get('/api/v2/books/', {'genres': genre.id, 'page_size': 50})
+        counts = {r['title']: r['review_count'] for r in response.data['results']}
+        self.assertEqual(counts['Book 3-1'], 2)
+
+    def test_fallback_without_annotation(self):
+        """Nested author annotation'siz - aggregate alohida hisoblanadi"""
+        book = Book.objects.get(title='Book 1-1')
+        data = BookListSerializerV2(book).data
+
+        self.assertEqual(data['review_count'], 2)
+        self.assertEqual(data['average_rating'], 1.5)
+
+        response = self.client.get(f'/api/v2/books/{book.id}/')
+        self.assertEqual(response.data['data']['review_count'], 2)
+        self.assertEqual(response.data['data']['author']['book_count'], 3)
+
+
+class RatingSummaryTest(APITestCase):
+    """Book.rating_sum/rating_count/rating_avg Review yozuvlaridan"""
+
+    def setUp(self):
+        user = User.objects.create_user(username='reader', password='pass12345')
+        self.client.force_authenticate(user=user)
+        self.book = Book.objects.create(title='Rated', isbn_number='9810000000001', price=Decimal('10.00'))
+        self.other = Book.objects.create(title='Other', isbn_number='9810000000002', price=Decimal('10.00'))
+
+    def assertSummary(self, book, rating_sum, rating_count, rating_avg):
+        book.refresh_from_db()
+        self.assertEqual(
+            (book.rating_sum, book.rating_count, book.rating_avg),
+            (rating_sum, rating_count, rating_avg),
+        )
+
+    def test_review_create_update_delete(self):
+        review = Review.objects.create(book=self.book, rating=5, comment='a')
+        Review.objects.create(book=self.book, rating=2, comment='b')
+        self.assertSummary(self.book, 7, 2, 3.5)
+
+        review.rating = 4
+        review.save()
+        self.assertSummary(self.book, 6, 2, 3.0)
+
+        review.book = self.other
+        review.save()
+        self.assertSummary(self.book, 2, 1, 2.0)
+        self.assertSummary(self.other, 4, 1, 4.0)
+
+        review.delete()
+        self.assertSummary(self.other, 0, 0, 0.0)
+
+    def test_stale_book_save_keeps_summary(self):
+        """Eski Book obyekti save() qilinsa summary qayta yozilmaydi"""
+        stale = Book.objects.get(pk=self.book.pk)
+        Review.objects.create(book=self.book, rating=4, comment='a')
+
+        stale.title = 'Renamed'
+        stale.save()
+        self.assertSummary(self.book, 4, 1, 4.0)
+
+    def test_v2_review_endpoint(self):
+        response = self.client.post(
+            f'/api/v2/books/{self.book.id}/reviews/',
+            {'book': self.book.id, 'rating': 3, 'comment': 'ok'},
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertSummary(self.book, 3, 1, 3.0)
+
+    def test_ordering_and_statistics(self):
+        Review.objects.create(book=self.book, rating=2, comment='a')
+        Review.objects.create(book=self.other, rating=5, comment='b')
+        Review.objects.create(book=self.other, rating=4, comment='c')
+
+        response = self.client.get('/api/v2/books/', {'ordering': '-rating_avg'})
+        self.assertEqual([r['title'] for r in response.data['results']], ['Other', 'Rated'])
+
+        reviews = self.client.get('/api/v2/books/statistics/').data['statistics']['reviews']
+        self.assertEqual(reviews['total'], 3)
+        self.assertEqual(reviews['average_rating'], 3.67)
+
+    def test_repair(self):
+        Review.objects.create(book=self.book, rating=5, comment='a')
+        # Signal'siz yozuvlar - summary eskiradi
+        Review.objects.filter(book=self.book).update(rating=1)
+        Book.objects.filter(pk=self.other.pk).update(rating_sum=10, rating_count=3)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(repair_book_ratings(), 2)
+        self.assertSummary(self.book, 1, 1, 1.0)
+        self.assertSummary(self.other, 0, 0, 0.0)
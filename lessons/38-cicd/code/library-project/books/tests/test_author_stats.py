@@ -0,0 +1,200 @@
+"""
+Author statistics tests
+=======================
+
+Incremental (F() delta) author statistikasi va recompute_author_stats
+"""
+
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase
+from books.author_stats import AuthorStatsBatch
+from books.models import Book, Author
+from decimal import Decimal
+from io import StringIO
+
+
+def stats_callbacks(callbacks):
+    """on_commit callback'lar ichidan AuthorStatsBatch.flush lar"""
+    return [
+        callback for callback in callbacks
+        if isinstance(getattr(callback, '__self__', None), AuthorStatsBatch)
+    ]
+
+
+class AuthorStatsTest(TestCase):
+    """Book yozuvlari author statistikasini yangilashi"""
+
+    def setUp(self):
+        self.author = Author.objects.create(name='Author One')
+        self.other_author = Author.objects.create(name='Author Two')
+
+    def create_book(self, isbn, author=None, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Book.objects.create(
+                title=f'Book {isbn}',
+                isbn_number=isbn,
+                price=Decimal('10.00'),
+                author=author or self.author,
+                **kwargs
+            )
+
+    def assertStats(self, author, total, available):
+        author.refresh_from_db()
+        self.assertEqual(author.total_books, total)
+        self.assertEqual(author.available_books, available)
+
+    def test_create_increments(self):
+        """Yangi kitob - total va available +1"""
+        self.create_book('1000000000001')
+        self.create_book('1000000000002', is_available=False)
+        self.assertStats(self.author, 2, 1)
+
+    def test_availability_change(self):
+        """is_available o'zgarsa faqat available o'zgaradi"""
+        book = self.create_book('1000000000001')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            book.is_available = False
+            book.save()
+        self.assertStats(self.author, 1, 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            book.is_available = True
+            book.save()
+        self.assertStats(self.author, 1, 1)
+
+    def test_save_without_changes_no_update(self):
+        """O'zgarishsiz save - author UPDATE yo'q"""
+        book = self.create_book('1000000000001')
+        book = Book.objects.get(pk=book.pk)
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            book.title = 'Renamed'
+            book.save()
+
+        self.assertEqual(stats_callbacks(callbacks), [])
+        self.assertStats(self.author, 1, 1)
+
+    def test_author_change_moves_counts(self):
+        """Muallif o'zgarsa eski -1, yangi +1"""
+        book = self.create_book('1000000000001')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            book.author = self.other_author
+            book.save()
+
+        self.assertStats(self.author, 0, 0)
+        self.assertStats(self.other_author, 1, 1)
+
+    def test_delete_decrements(self):
+        """Book delete - total va available -1"""
+        book = self.create_book('1000000000001')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            book.delete()
+        self.assertStats(self.author, 0, 0)
+
+    def test_deltas_coalesced_per_transaction(self):
+        """Bitta transaction - bitta muallif uchun bitta UPDATE"""
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            with transaction.atomic():
+                for i in range(5):
+                    Book.objects.create(
+                        title=f'Book {i}',
+                        isbn_number=f'200000000000{i}',
+                        price=Decimal('10.00'),
+                        author=self.author,
+                    )
+
+        flushes = stats_callbacks(callbacks)
+        self.assertEqual(len(flushes), 1)
+
+        with self.assertNumQueries(1):
+            flushes[0]()
+        self.assertStats(self.author, 5, 5)
+
+    def test_rolled_back_savepoint_discards_deltas(self):
+        """Savepoint rollback - delta'lar hisobga olinmaydi"""
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                try:
+                    with transaction.atomic():
+                        Book.objects.create(
+                            title='Rolled back',
+                            isbn_number='3000000000001',
+                            price=Decimal('10.00'),
+                            author=self.author,
+                        )
+                        raise ValueError
+                except ValueError:
+                    pass
+
+                Book.objects.create(
+                    title='Kept',
+                    isbn_number='3000000000002',
+                    price=Decimal('10.00'),
+                    author=self.author,
+                )
+
+        self.assertStats(self.author, 1, 1)
+
+    def test_rolled_back_savepoint_with_existing_batch(self):
+        """Batch savepoint'dan oldin yaratilgan - rollback delta'lari baribir tashlanadi"""
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                Book.objects.create(
+                    title='Kept',
+                    isbn_number='3000000000001',
+                    price=Decimal('10.00'),
+                    author=self.author,
+                )
+                try:
+                    with transaction.atomic():
+                        Book.objects.create(
+                            title='Rolled back',
+                            isbn_number='3000000000002',
+                            price=Decimal('10.00'),
+                            author=self.author,
+                        )
+                        raise ValueError
+                except ValueError:
+                    pass
+
+                with transaction.atomic():
+                    # Release qilingan savepoint - delta'lar commit'da yoziladi
+                    Book.objects.create(
+                        title='Released',
+                        isbn_number='3000000000003',
+                        price=Decimal('10.00'),
+                        author=self.other_author,
+                        is_available=False,
+                    )
+
+        self.assertStats(self.author, 1, 1)
+        self.assertStats(self.other_author, 1, 0)
+
+
+class RecomputeAuthorStatsCommandTest(TestCase):
+    """recompute_author_stats management command"""
+
+    def test_repairs_drift(self):
+        """Drift bo'lgan mualliflar tuzatiladi"""
+        author = Author.objects.create(name='Drifted')
+        empty_author = Author.objects.create(name='Empty', total_books=3, available_books=3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Book.objects.create(
+                title='Book', isbn_number='4000000000001',
+                price=Decimal('10.00'), author=author, is_available=False,
+            )
+        Author.objects.filter(pk=author.pk).update(total_books=10, available_books=10)
+
+        out = StringIO()
+        call_command('recompute_author_stats', stdout=out)
+
+        author.refresh_from_db()
+        empty_author.refresh_from_db()
+        self.assertEqual((author.total_books, author.available_books), (1, 0))
+        self.assertEqual((empty_author.total_books, empty_author.available_books), (0, 0))
+        self.assertIn('2 drifted authors fixed', out.getvalue())
@@ -0,0 +1,121 @@
+"""
+Autocomplete Tests
+==================
+
+Prefix indeks: normalizatsiya, borrow soni bo'yicha tartib, memo
+invalidation, Book/BorrowHistory signal'lari, ES fuzzy fallback
+"""
+
+from unittest import mock
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APITestCase
+from books.autocomplete import AutocompleteIndex, autocomplete_index, normalize_title
+from books.models import Author, Book, BorrowHistory
+from books.signals import borrow_book
+from decimal import Decimal
+
+
+class AutocompleteIndexTest(TestCase):
+    def setUp(self):
+        self.index = AutocompleteIndex()
+        self.index.build([
+            (1, 'Python Crash Course', 3),
+            (2, 'Python Tricks', 10),
+            (3, 'Pyramids of Egypt', 1),
+            (4, 'Ōliy  Matematika', 0),
+            (5, 'python tricks', 2),
+        ])
+
+    def test_normalize(self):
+        self.assertEqual(normalize_title('  Ōliy  MATEMATIKA '), 'oliy matematika')
+
+    def test_ranked_by_weight_without_duplicates(self):
+        self.assertEqual(self.index.suggest('PY'), ['Python Tricks', 'Python Crash Course', 'Pyramids of Egypt'])
+        self.assertEqual(self.index.suggest('pyth', limit=1), ['Python Tricks'])
+        self.assertEqual(self.index.suggest('oliy m'), ['Ōliy  Matematika'])
+        self.assertEqual(self.index.suggest('java'), [])
+        self.assertEqual(self.index.suggest('   '), [])
+
+    def test_updates_invalidate_memo(self):
+        with mock.patch('books.autocomplete.MEMO_SCAN_THRESHOLD', 0):
+            self.assertEqual(self.index.suggest('py', limit=1), ['Python Tricks'])
+            self.assertTrue(self.index._memo)
+
+            self.index.add_weight(3, 20)
+            self.assertEqual(self.index.suggest('py', limit=1), ['Pyramids of Egypt'])
+
+            self.index.upsert(3, 'Egypt')
+            self.assertEqual(self.index.suggest('py', limit=1), ['Python Tricks'])
+            self.assertEqual(self.index.suggest('egy'), ['Egypt'])
+
+            self.index.remove(2)
+            self.index.remove(5)
+            self.assertEqual(self.index.suggest('py', limit=1), ['Python Crash Course'])
+        self.assertEqual(len(self.index), 3)
+
+    def test_background_refresh_closes_connection(self):
+        """Fon thread'i xato bo'lsa ham o'z DB connection'ini yopadi va lock'ni bo'shatadi"""
+        self.index._refresh_lock.acquire()
+        with mock.patch.object(self.index, 'build_from_db', side_effect=RuntimeError('db down')), \
+                mock.patch('books.autocomplete.connection') as connection:
+            self.index._background_refresh()
+        connection.close.assert_called_once_with()
+        self.assertTrue(self.index._refresh_lock.acquire(blocking=False))
+
+
+class AutocompleteEndpointTest(APITestCase):
+    def setUp(self):
+        autocomplete_index.clear()
+        self.user = User.objects.create_user(username='reader', password='pass12345')
+        self.client.force_authenticate(user=self.user)
+        author = Author.objects.create(name='Author')
+        self.books = [
+            Book.objects.create(
+                title=title, isbn_number=f'97820000000{i:02d}', price=Decimal('10.00'),
+                author=author, stock=5,
+            )
+            for i, title in enumerate(['Django for APIs', 'Django Unleashed'])
+        ]
+
+    def tearDown(self):
+        autocomplete_index.clear()
+        super().tearDown()
+
+    def suggest(self, query):
+        response = self.client.get('/api/books/autocomplete/', {'q': query})
+        self.assertEqual(response.status_code, 200)
+        return response.data['suggestions']
+
+    def test_built_from_db_with_borrow_weights(self):
+        BorrowHistory.objects.create(book=self.books[1], user=self.user, due_date='2030-01-01T00:00Z')
+
+        with mock.patch('books.views.BookSearch.autocomplete') as fuzzy:
+            self.assertEqual(self.suggest('djan'), ['Django Unleashed', 'Django for APIs'])
+        fuzzy.assert_not_called()
+
+    def test_signals_update_built_index(self):
+        self.suggest('django')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            borrow_book(self.books[0].id, self.user)
+        self.assertEqual(self.suggest('django')[0], 'Django for APIs')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.books[1].title = 'Flask Web Development'
+            self.books[1].save()
+        self.assertEqual(self.suggest('django'), ['Django for APIs'])
+        self.assertEqual(self.suggest('flask'), ['Flask Web Development'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.books[0].delete()
+        with mock.patch('books.views.BookSearch.autocomplete', side_effect=ConnectionError):
+            self.assertEqual(self.suggest('django'), [])
+
+    def test_fuzzy_fallback(self):
+        results = mock.Mock()
+        results.suggest = {'title_suggestions': [{'options': [{'text': 'Django Unleashed'}]}]}
+
+        with mock.patch('books.views.BookSearch.autocomplete', return_value=results) as fuzzy:
+            self.assertEqual(self.suggest('djnago'), ['Django Unleashed'])
+        fuzzy.assert_called_once_with('djnago')
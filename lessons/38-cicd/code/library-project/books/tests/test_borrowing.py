@@ -0,0 +1,173 @@
+"""
+Borrow/Return tests
+===================
+
+borrow_book / return_book: atomic yozuvlar, on_commit side effect'lar va
+parallel borrow'da oversell yo'qligi
+"""
+
+from django.contrib.auth.models import User
+from django.db import OperationalError, connection
+from django.test import TestCase, TransactionTestCase
+from books.models import Book, Author, BookLog, BorrowHistory, SearchIndexQueue
+from books.signals import borrow_book, return_book, book_borrowed
+from decimal import Decimal
+import threading
+
+
+class BorrowReturnTest(TestCase):
+    """borrow_book va return_book testlari"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='reader', password='pass12345')
+        self.author = Author.objects.create(name='Author')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book = Book.objects.create(
+                title='Borrowable',
+                isbn_number='5000000000001',
+                price=Decimal('10.00'),
+                stock=2,
+                author=self.author,
+            )
+
+    def test_borrow_updates_everything(self):
+        """Stock, history, log va profile bitta chaqiruvda"""
+        with self.captureOnCommitCallbacks(execute=True):
+            history = borrow_book(self.book.id, self.user)
+
+        self.book.refresh_from_db()
+        self.user.profile.refresh_from_db()
+        self.assertEqual(self.book.stock, 1)
+        self.assertTrue(self.book.is_available)
+        self.assertIsNone(history.returned_at)
+        self.assertEqual(self.user.profile.books_borrowed, 1)
+        self.assertTrue(BookLog.objects.filter(book_id=self.book.id, action='borrowed').exists())
+
+    def test_last_copy_makes_unavailable(self):
+        """Oxirgi nusxa olinsa kitob mavjud emas"""
+        other = User.objects.create_user(username='other', password='pass12345')
+        with self.captureOnCommitCallbacks(execute=True):
+            borrow_book(self.book.id, self.user)
+            borrow_book(self.book.id, other)
+
+        self.book.refresh_from_db()
+        self.author.refresh_from_db()
+        self.assertEqual(self.book.stock, 0)
+        self.assertFalse(self.book.is_available)
+        self.assertEqual(self.author.available_books, 0)
+
+        with self.assertRaisesMessage(ValueError, 'is not available'):
+            borrow_book(self.book.id, self.user)
+
+    def test_signal_sent_on_commit(self):
+        """book_borrowed signal commit'dan keyin yuboriladi"""
+        received = []
+
+        def receiver(sender, **kwargs):
+            received.append(kwargs['book'].id)
+
+        book_borrowed.connect(receiver)
+        try:
+            with self.captureOnCommitCallbacks(execute=False) as callbacks:
+                borrow_book(self.book.id, self.user)
+            self.assertEqual(received, [])
+
+            for callback in callbacks:
+                callback()
+            self.assertEqual(received, [self.book.id])
+        finally:
+            book_borrowed.disconnect(receiver)
+
+    def test_return_book(self):
+        """Return - stock qaytadi, history yopiladi"""
+        with self.captureOnCommitCallbacks(execute=True):
+            borrow_book(self.book.id, self.user)
+            history = return_book(self.book.id, self.user)
+
+        self.book.refresh_from_db()
+        self.user.profile.refresh_from_db()
+        self.assertEqual(self.book.stock, 2)
+        self.assertIsNotNone(history.returned_at)
+        self.assertEqual(self.user.profile.books_returned, 1)
+
+    def test_borrow_and_return_queue_search_reindex(self):
+        """queryset.update() post_save'siz - stock/is_available ES'ga navbat orqali"""
+        SearchIndexQueue.objects.all().delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            borrow_book(self.book.id, self.user)
+        self.assertTrue(SearchIndexQueue.objects.filter(book_id=self.book.id).exists())
+
+        SearchIndexQueue.objects.all().delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            return_book(self.book.id, self.user)
+        self.assertTrue(SearchIndexQueue.objects.filter(book_id=self.book.id).exists())
+
+    def test_double_return_fails(self):
+        """Bitta borrow ikki marta qaytarilmaydi"""
+        with self.captureOnCommitCallbacks(execute=True):
+            borrow_book(self.book.id, self.user)
+            return_book(self.book.id, self.user)
+
+        with self.assertRaisesMessage(ValueError, 'is not borrowed'):
+            return_book(self.book.id, self.user)
+
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.stock, 2)
+
+    def test_missing_book(self):
+        """Mavjud bo'lmagan kitob"""
+        with self.assertRaisesMessage(ValueError, 'not found'):
+            borrow_book(999999, self.user)
+
+
+class ConcurrentBorrowTest(TransactionTestCase):
+    """Parallel borrow - stock manfiy bo'lmasligi"""
+
+    THREADS = 20
+    STOCK = 5
+
+    def test_no_oversell(self):
+        author = Author.objects.create(name='Author')
+        book = Book.objects.create(
+            title='Hot Book',
+            isbn_number='6000000000001',
+            price=Decimal('10.00'),
+            stock=self.STOCK,
+            author=author,
+        )
+        users = [
+            User.objects.create(username=f'user{i}')
+            for i in range(self.THREADS)
+        ]
+
+        barrier = threading.Barrier(self.THREADS)
+        successes = []
+        errors = []
+
+        def worker(user):
+            barrier.wait()
+            try:
+                for _ in range(20):
+                    try:
+                        borrow_book(book.id, user)
+                        successes.append(user.id)
+                        return
+                    except OperationalError:
+                        # SQLite: "database table is locked" - qayta urinish
+                        continue
+            except ValueError as e:
+                errors.append(str(e))
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(user,)) for user in users]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        book.refresh_from_db()
+        self.assertLessEqual(len(successes), self.STOCK)
+        self.assertGreaterEqual(book.stock, 0)
+        self.assertEqual(book.stock, self.STOCK - len(successes))
+        self.assertEqual(BorrowHistory.objects.filter(book=book).count(), len(successes))
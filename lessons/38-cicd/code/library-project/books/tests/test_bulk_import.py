@@ -0,0 +1,182 @@
+"""
+Bulk Import Tests
+=================
+
+BulkImportBooksView: batched import, per-row xatolar va CSV/NDJSON streaming
+"""
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import DataError, connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+from books.cache_tags import BOOKS_SEARCH_TAG
+from books.importers import BookBulkImporter
+from books.models import Book, Author, Genre, BookLog, SearchIndexQueue
+from unittest import mock
+import json
+
+
+class BookBulkImporterTest(APITestCase):
+    """BookBulkImporter testlari"""
+
+    def setUp(self):
+        self.author = Author.objects.create(name='Author')
+        self.genre = Genre.objects.create(name='Fiction')
+
+    def make_rows(self, count, start=0):
+        return [
+            {
+                'title': f'Book {i}',
+                'author': self.author.id,
+                'isbn_number': f'{7000000000000 + i}',
+                'price': '9.99',
+                'stock': 3,
+                'genres': [self.genre.id],
+            }
+            for i in range(start, start + count)
+        ]
+
+    def test_query_count_independent_of_rows(self):
+        """Querylar soni qatorlar soniga emas, chunk'lar soniga bog'liq"""
+        with CaptureQueriesContext(connection) as small:
+            BookBulkImporter(chunk_size=100).run(self.make_rows(10))
+        with CaptureQueriesContext(connection) as large:
+            BookBulkImporter(chunk_size=100).run(self.make_rows(50, start=10))
+
+        self.assertEqual(len(small), len(large))
+        self.assertEqual(Book.objects.count(), 60)
+        self.assertEqual(self.genre.books.count(), 60)
+        self.assertEqual(BookLog.objects.filter(action='created').count(), 60)
+
+    def test_author_stats_updated(self):
+        """Author stats bulk import'dan keyin yangilanadi"""
+        with self.captureOnCommitCallbacks(execute=True):
+            BookBulkImporter().run(self.make_rows(5))
+
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.total_books, 5)
+        self.assertEqual(self.author.available_books, 5)
+
+    def test_per_row_errors(self):
+        """Xato qatorlar o'tkazib yuboriladi, qolganlari import qilinadi"""
+        Book.objects.create(title='Existing', isbn_number='7000000000001', price='1.00')
+        rows = self.make_rows(3)
+        rows[0]['author'] = 999999
+        rows.append(dict(rows[2]))  # payload ichida dublikat ISBN
+        rows.append({'title': 'No price', 'author': self.author.id, 'isbn_number': '7100000000000'})
+
+        importer = BookBulkImporter().run(rows)
+
+        self.assertEqual(importer.imported, 1)
+        self.assertEqual(len(importer.errors), 4)
+        self.assertIn('Book #1: Author with ID 999999 not found', importer.errors)
+        self.assertIn('Book #2: Book with ISBN 7000000000001 already exists', importer.errors)
+        self.assertIn('Book #4: Book with ISBN 7000000000002 already exists', importer.errors)
+        self.assertIn('Book #5: Missing required fields: price', importer.errors)
+
+    def test_invalid_lengths_are_row_errors(self):
+        """max_length / max_digits - DB'ga yetmasdan qator xatosi"""
+        rows = self.make_rows(3)
+        rows[0]['title'] = 'x' * 201
+        rows[1]['price'] = '123456789.00'
+
+        importer = BookBulkImporter().run(rows)
+
+        self.assertEqual(importer.imported, 1)
+        self.assertTrue(importer.errors[0].startswith('Book #1: title:'))
+        self.assertTrue(importer.errors[1].startswith('Book #2: price:'))
+
+    def test_database_error_falls_back_to_rows(self):
+        """bulk_create DatabaseError - qatorma-qator, faqat yomon qator xato"""
+        real_bulk_create = Book.objects.bulk_create
+
+        def bulk_create(books, *args, **kwargs):
+            if any(book.title == 'Book 1' for book in books):
+                raise DataError('value too long')
+            return real_bulk_create(books, *args, **kwargs)
+
+        with mock.patch.object(Book.objects, 'bulk_create', side_effect=bulk_create):
+            importer = BookBulkImporter().run(self.make_rows(3))
+
+        self.assertEqual(importer.imported, 2)
+        self.assertEqual(importer.errors, ['Book #2: value too long'])
+
+    def test_imported_books_queued_for_search(self):
+        """bulk_create post_save'siz - ES navbati va search cache commit'da"""
+        with mock.patch('books.importers.tagged_cache.invalidate') as invalidate:
+            with self.captureOnCommitCallbacks(execute=True):
+                importer = BookBulkImporter().run(self.make_rows(3))
+
+        self.assertEqual(
+            set(SearchIndexQueue.objects.values_list('book_id', flat=True)),
+            set(importer.created_ids),
+        )
+        self.assertIn(BOOKS_SEARCH_TAG, invalidate.call_args.args)
+
+
+class BulkImportViewTest(APITestCase):
+    """POST /api/books/bulk-import/"""
+
+    url = '/api/books/bulk-import/'
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser('admin', 'admin@example.com', 'pass12345')
+        self.client.force_authenticate(user=self.admin)
+        self.author = Author.objects.create(name='Author')
+        self.genre = Genre.objects.create(name='Fiction')
+
+    def test_json_import(self):
+        """JSON payload (eski format)"""
+        response = self.client.post(self.url, {
+            'books': [{
+                'title': 'JSON Book',
+                'author': self.author.id,
+                'isbn_number': '8000000000001',
+                'price': 19.99,
+                'genres': [self.genre.id],
+            }]
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['imported'], 1)
+        self.assertEqual(response.data['books'][0]['title'], 'JSON Book')
+        self.assertEqual(response.data['books'][0]['genres'], [self.genre.id])
+
+    def test_csv_stream_import(self):
+        """CSV fayl upload"""
+        content = (
+            'title,author,isbn_number,price,stock,genres\n'
+            f'CSV Book 1,{self.author.id},8000000000011,10.00,2,{self.genre.id}\n'
+            f'CSV Book 2,{self.author.id},8000000000012,abc,2,\n'
+        ).encode()
+        upload = SimpleUploadedFile('books.csv', content, content_type='text/csv')
+
+        response = self.client.post(self.url, {'file': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['imported'], 1)
+        self.assertEqual(response.data['errors'], ['Book #2: Invalid price, stock or pages value'])
+        self.assertTrue(Book.objects.get(isbn_number='8000000000011').genres.exists())
+
+    def test_ndjson_stream_import(self):
+        """NDJSON fayl upload"""
+        lines = [
+            json.dumps({'title': 'NDJSON Book', 'author': self.author.id,
+                        'isbn_number': '8000000000021', 'price': 5}),
+            '{broken',
+        ]
+        upload = SimpleUploadedFile('books.ndjson', '\n'.join(lines).encode())
+
+        response = self.client.post(self.url, {'file': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['imported'], 1)
+        self.assertEqual(response.data['failed'], 1)
+
+    def test_unsupported_format(self):
+        """Noma'lum format - 400"""
+        upload = SimpleUploadedFile('books.xml', b'<books/>')
+        response = self.client.post(self.url, {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,115 @@
+"""
+Tag-based cache invalidation tests
+==================================
+
+books/cache_tags.py va Book cached metodlarini test qilish
+"""
+
+from django.core.cache import cache
+from django.test import TestCase
+from books.cache_tags import TaggedCache, BOOKS_COLLECTION_TAG, BOOKS_LIST_TAG, book_tag, author_tag
+from books.models import Book, Author
+from decimal import Decimal
+
+
+class TaggedCacheTest(TestCase):
+    """TaggedCache testlari"""
+
+    def setUp(self):
+        cache.clear()
+        self.tagged = TaggedCache()
+
+    def test_get_or_set_caches_value(self):
+        """Ikkinchi chaqiruvda factory ishlamaydi"""
+        calls = []
+
+        def factory():
+            calls.append(1)
+            return 'value'
+
+        self.assertEqual(self.tagged.get_or_set('k', factory, tags=['t']), 'value')
+        self.assertEqual(self.tagged.get_or_set('k', factory, tags=['t']), 'value')
+        self.assertEqual(len(calls), 1)
+
+    def test_invalidate_tag(self):
+        """Tag bekor qilinganda yozuv o'qilmaydi"""
+        self.tagged.set('k', 'value', tags=['a', 'b'])
+        self.assertEqual(self.tagged.get('k', tags=['a', 'b']), 'value')
+
+        self.tagged.invalidate('b')
+        self.assertIsNone(self.tagged.get('k', tags=['a', 'b']))
+
+    def test_invalidate_other_tag_keeps_value(self):
+        """Boshqa tag bekor qilinsa yozuv saqlanadi"""
+        self.tagged.set('k', 'value', tags=['a'])
+        self.tagged.invalidate('c')
+        self.assertEqual(self.tagged.get('k', tags=['a']), 'value')
+
+    def test_invalidate_after_version_eviction(self):
+        """Version key yo'qolsa ham eski yozuv qaytmaydi"""
+        self.tagged.set('k', 'value', tags=['a'])
+        cache.delete('tagver:a')
+        self.tagged.invalidate('a')
+        self.assertIsNone(self.tagged.get('k', tags=['a']))
+
+
+class BookCacheInvalidationTest(TestCase):
+    """Book cached metodlari va signal invalidation"""
+
+    def setUp(self):
+        cache.clear()
+        self.author = Author.objects.create(name='Author One')
+        self.other_author = Author.objects.create(name='Author Two')
+        self.book = Book.objects.create(
+            title='Cached Book',
+            isbn_number='1111111111111',
+            price=Decimal('10.00'),
+            author=self.author,
+        )
+
+    def test_get_cached_hits_cache(self):
+        """Ikkinchi get_cached query bajarmaydi"""
+        Book.get_cached(self.book.id)
+        with self.assertNumQueries(0):
+            Book.get_cached(self.book.id)
+
+    def test_save_invalidates_book_and_lists(self):
+        """Book save - kitob va ro'yxatlar yangilanadi"""
+        Book.get_cached(self.book.id)
+        Book.get_all_cached()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book.title = 'Renamed'
+            self.book.save()
+
+        self.assertEqual(Book.get_cached(self.book.id).title, 'Renamed')
+        self.assertEqual(Book.get_all_cached()[0].title, 'Renamed')
+
+    def test_author_change_invalidates_both_authors(self):
+        """Muallif o'zgarsa eski va yangi muallif ro'yxatlari yangilanadi"""
+        book = Book.objects.get(pk=self.book.pk)
+        self.assertEqual(len(Book.get_by_author_cached(self.author.id)), 1)
+        self.assertEqual(len(Book.get_by_author_cached(self.other_author.id)), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            book.author = self.other_author
+            book.save()
+
+        self.assertEqual(len(Book.get_by_author_cached(self.author.id)), 0)
+        self.assertEqual(len(Book.get_by_author_cached(self.other_author.id)), 1)
+
+    def test_delete_invalidates(self):
+        """Book delete - ro'yxatdan chiqadi"""
+        Book.get_all_cached()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book.delete()
+        self.assertEqual(Book.get_all_cached(), [])
+
+    def test_invalidation_is_constant(self):
+        """Invalidation tag'lar soni key'lar soniga bog'liq emas"""
+        from books.models import get_book_cache_tags
+        tags = get_book_cache_tags(self.book)
+        self.assertEqual(
+            tags,
+            {book_tag(self.book.id), BOOKS_LIST_TAG, BOOKS_COLLECTION_TAG, author_tag(self.author.id)}
+        )
@@ -0,0 +1,127 @@
+"""
+Conditional GET Tests
+=====================
+
+ETag/304: detail - bitta PK lookup, serializer chaqirilmaydi; book,
+author, genre, review yozuvlari versiyani o'zgartiradi; body ETag bo'yicha
+cache'da. List - books:collection versiyasi, query'siz 304.
+"""
+
+from unittest import mock
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+from books.cache_tags import tagged_cache, book_tag, BOOKS_COLLECTION_TAG
+from books.models import Author, Book, Genre, Review
+from decimal import Decimal
+
+
+class ConditionalGetTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='reader', password='pass12345')
+        self.client.force_authenticate(user=self.user)
+        self.author = Author.objects.create(name='Author')
+        self.genre = Genre.objects.create(name='Drama')
+        self.book = Book.objects.create(
+            title='Book', isbn_number='9780000000001', price=Decimal('10.00'),
+            author=self.author, stock=3,
+        )
+        self.url = f'/api/v2/books/{self.book.pk}/'
+
+    def get(self, url, etag=None):
+        headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        return self.client.get(url, **headers)
+
+    def assertModified(self, etag, url=None):
+        response = self.get(url or self.url, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        return response['ETag']
+
+    def test_detail_not_modified_with_single_query(self):
+        response = self.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Last-Modified', response)
+        etag = response['ETag']
+
+        with mock.patch('books.api.v2.views.BookDetailSerializerV2.to_representation') as serialize:
+            with self.assertNumQueries(1):
+                response = self.get(self.url, etag)
+        serialize.assert_not_called()
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(self.get(self.url, f'W/{etag}').status_code, 304)
+
+    def test_body_cached_by_version(self):
+        first = self.get(self.url)
+        with mock.patch('books.api.v2.views.BookDetailSerializerV2.to_representation') as serialize:
+            second = self.get(self.url)
+        serialize.assert_not_called()
+        self.assertEqual(second.data, first.data)
+
+    def test_related_writes_change_etag(self):
+        etag = self.get(self.url)['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book.genres.add(self.genre)
+        etag = self.assertModified(etag)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.genre.name = 'Tragedy'
+            self.genre.save()
+        etag = self.assertModified(etag)
+        self.assertEqual(self.get(self.url).data['data']['genres'][0]['name'], 'Tragedy')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.author.name = 'Renamed'
+            self.author.save()
+        etag = self.assertModified(etag)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Review.objects.create(book=self.book, rating=5, comment='Great')
+        etag = self.assertModified(etag)
+        self.assertEqual(self.get(self.url).data['data']['review_count'], 1)
+
+    def test_rating_change_in_open_transaction(self):
+        """Versiya commit'dan keyin oshadi - eski body yangi ETag'ga bog'lanmaydi"""
+        etag = self.get(self.url)['ETag']
+        versions = tagged_cache.get_versions([book_tag(self.book.pk), BOOKS_COLLECTION_TAG])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Review.objects.create(book=self.book, rating=4, comment='Good')
+            # Boshqa worker hali eski qatorni ko'radi - versiya o'zgarmagan bo'lishi kerak
+            self.assertEqual(
+                tagged_cache.get_versions([book_tag(self.book.pk), BOOKS_COLLECTION_TAG]), versions
+            )
+
+        etag = self.assertModified(etag)
+        self.assertEqual(self.get(self.url, etag).status_code, 304)
+        self.assertEqual(self.get(self.url).data['data']['review_count'], 1)
+
+    def test_missing_book_is_404(self):
+        self.assertEqual(self.get('/api/v2/books/999999/').status_code, 404)
+
+    def test_list_uses_collection_version(self):
+        for url in ('/api/v2/books/', '/api/v1/books/', '/api/books/'):
+            etag = self.get(url)['ETag']
+            with self.assertNumQueries(0):
+                self.assertEqual(self.get(url, etag).status_code, 304)
+
+        etag = self.get('/api/v2/books/?page_size=1')['ETag']
+        self.assertNotEqual(etag, self.get('/api/v2/books/?page_size=2')['ETag'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book.title = 'Renamed'
+            self.book.save()
+        self.assertModified(etag, '/api/v2/books/?page_size=1')
+
+    def test_other_detail_endpoints(self):
+        for url in (f'/api/v1/books/{self.book.pk}/', f'/api/books/{self.book.pk}/'):
+            etag = self.get(url)['ETag']
+            self.assertEqual(self.get(url, etag).status_code, 304)
+
+            with self.captureOnCommitCallbacks(execute=True):
+                self.book.stock += 1
+                self.book.save()
+            self.assertModified(etag, url)
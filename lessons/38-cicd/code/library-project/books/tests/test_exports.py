@@ -0,0 +1,142 @@
+"""
+Export Tests
+============
+
+ExcelExporter streaming export va CSV/NDJSON bulk export testlari
+"""
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from books.exports import ExcelExporter, BOOK_HEADERS
+from books.models import Book, Author, Genre
+from decimal import Decimal
+from datetime import timedelta
+from io import BytesIO
+from openpyxl import load_workbook
+import csv
+import gzip
+import io
+import json
+
+
+class StreamingExcelExportTest(TestCase):
+    """ExcelExporter.export_books_streaming"""
+
+    def setUp(self):
+        author = Author.objects.create(name='Author')
+        self.genres = [Genre.objects.create(name='Fiction'), Genre.objects.create(name='Drama')]
+        for i in range(5):
+            book = Book.objects.create(
+                title=f'Book {i}',
+                isbn_number=f'900000000000{i}',
+                price=Decimal('12.50'),
+                stock=i,
+                author=author if i else None,
+            )
+            book.genres.set(self.genres if i % 2 else [])
+
+    def load(self, response):
+        content = b''.join(response.streaming_content)
+        response.close()
+        return load_workbook(BytesIO(content))
+
+    def test_rows_and_formatting(self):
+        """Barcha qatorlar, janrlar va narx formati"""
+        response = ExcelExporter.export_books_streaming(Book.objects.all(), chunk_size=2)
+        self.assertIn('books_export.xlsx', response['Content-Disposition'])
+
+        ws = self.load(response)['Books']
+        rows = list(ws.iter_rows(values_only=True))
+
+        self.assertEqual(list(rows[0]), BOOK_HEADERS)
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[1][2], 'N/A')
+        self.assertEqual(rows[2][9], 'Drama, Fiction')
+        self.assertEqual(ws['E2'].number_format, '$#,##0.00')
+        self.assertEqual(ws.freeze_panes, 'A2')
+
+    def test_query_count_per_chunk(self):
+        """Qatorlar bitta cursor'dan, janrlar har bir chunk uchun bitta query"""
+        # 1 rows cursor + 3 chunk * genres + 1 summary aggregate
+        with self.assertNumQueries(5):
+            response = ExcelExporter.export_books_streaming(Book.objects.all(), chunk_size=2)
+        response.close()
+
+    def test_summary_sheet(self):
+        """Summary sheet statistikasi"""
+        ws = self.load(ExcelExporter.export_books_streaming(Book.objects.all()))['Summary']
+        self.assertEqual(ws['B4'].value, 5)
+
+
+class BulkExportViewTest(APITestCase):
+    """GET /api/export/csv/ va /api/export/ndjson/"""
+
+    def setUp(self):
+        user = User.objects.create_user(username='reader', password='pass12345')
+        self.client.force_authenticate(user=user)
+        self.author = Author.objects.create(name='John Writer')
+        genre = Genre.objects.create(name='Fiction')
+        self.books = []
+        for i in range(3):
+            book = Book.objects.create(
+                title=f'Book {i}',
+                isbn_number=f'910000000000{i}',
+                price=Decimal('10.00') + i,
+                author=self.author if i < 2 else None,
+            )
+            book.genres.add(genre)
+            self.books.append(book)
+
+    def content(self, response):
+        return b''.join(response.streaming_content)
+
+    def test_csv_export(self):
+        """CSV: header + barcha qatorlar"""
+        response = self.client.get('/api/export/csv/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+
+        rows = list(csv.DictReader(io.StringIO(self.content(response).decode())))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0]['genres'], 'Fiction')
+        self.assertIn('X-Export-Cursor', response)
+
+    def test_ndjson_gzip_with_filters(self):
+        """NDJSON + gzip + author filter"""
+        response = self.client.get('/api/export/ndjson/?compress=gzip&author=john')
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+
+        lines = gzip.decompress(self.content(response)).decode().splitlines()
+        records = [json.loads(line) for line in lines]
+        self.assertEqual(len(records), 2)
+        self.assertEqual(records[0]['author_name'], 'John Writer')
+        self.assertEqual(records[0]['genres'], ['Fiction'])
+
+    @override_settings(EXPORT_SAFETY_WINDOW=0)
+    def test_updated_since_incremental(self):
+        """updated_since - faqat o'zgargan qatorlar"""
+        cursor = self.client.get('/api/export/ndjson/')['X-Export-Cursor']
+        Book.objects.filter(pk=self.books[0].pk).update(
+            updated_at=timezone.now() + timedelta(seconds=5)
+        )
+
+        response = self.client.get('/api/export/ndjson/', {'updated_since': cursor})
+        records = [json.loads(line) for line in self.content(response).decode().splitlines()]
+        self.assertEqual([r['id'] for r in records], [self.books[0].id])
+
+    def test_updated_since_rereads_safety_window(self):
+        """Cursor'dan oldingi updated_at bilan kech commit qilingan qator ham keladi"""
+        cursor = self.client.get('/api/export/ndjson/')['X-Export-Cursor']
+        late = timezone.now() - timedelta(seconds=10)
+        Book.objects.filter(pk=self.books[1].pk).update(updated_at=late)
+        Book.objects.exclude(pk=self.books[1].pk).update(updated_at=late - timedelta(hours=1))
+
+        response = self.client.get('/api/export/ndjson/', {'updated_since': cursor})
+        records = [json.loads(line) for line in self.content(response).decode().splitlines()]
+        self.assertEqual([r['id'] for r in records], [self.books[1].id])
+
+    def test_invalid_updated_since(self):
+        response = self.client.get('/api/export/csv/', {'updated_since': 'yesterday'})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,153 @@
+"""
+Hot Cache Tests
+===============
+
+books/hot_cache.py: msgpack codec (tiplar, author/genres query'siz),
+L1 hit (Redis/L2'siz), yozuvda L1 tozalanishi, fill paytidagi invalidation,
+Redis pub/sub subscriber, LocalLRUCache bayt chegarasi
+"""
+
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+from django.core.cache import cache
+from django.test import TestCase
+from books.cache_tags import book_tag
+from books.hot_cache import BookCodec, INVALIDATION_CHANNEL, RedisInvalidationBus, hot_cache
+from books.models import Author, Book, Genre
+from utils.cache import LocalLRUCache
+import threading
+import time
+
+
+class HotCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        hot_cache.evict(None)
+        self.author = Author.objects.create(name='Author', birth_date=date(1970, 1, 2))
+        self.genres = [Genre.objects.create(name='Drama'), Genre.objects.create(name='Poetry')]
+        self.book = Book.objects.create(
+            title='Book', isbn_number='9780000000001', price=Decimal('12.50'),
+            author=self.author, published_date=date(2001, 5, 6),
+        )
+        self.book.genres.add(*self.genres)
+
+    def test_codec_round_trip(self):
+        original = Book.objects.select_related('author').prefetch_related('genres').get(pk=self.book.pk)
+        data = BookCodec.encode([original])
+
+        with self.assertNumQueries(0):
+            book, = BookCodec.decode(data)
+            self.assertEqual(book.author.birth_date, date(1970, 1, 2))
+            self.assertEqual([genre.name for genre in book.genres.all()], ['Drama', 'Poetry'])
+        self.assertEqual(book.price, Decimal('12.50'))
+        self.assertEqual(book.published_date, date(2001, 5, 6))
+        self.assertEqual(book.created_at, original.created_at)
+        self.assertFalse(book._state.adding)
+        # prefetch kabi: filter DB'ga boradi
+        self.assertEqual(list(book.genres.filter(name='Poetry')), [self.genres[1]])
+
+    def test_catalog_is_smaller_than_pickle(self):
+        import pickle
+        books = list(Book.objects.select_related('author').prefetch_related('genres'))
+        self.assertLess(len(BookCodec.encode(books)), len(pickle.dumps(books)) / 3)
+
+    def test_local_tier_serves_without_shared_cache(self):
+        Book.get_cached(self.book.pk)
+        Book.get_all_cached()
+        with mock.patch.object(hot_cache.tagged, 'get_or_set') as shared, self.assertNumQueries(0):
+            self.assertEqual(Book.get_cached(self.book.pk).title, 'Book')
+            self.assertEqual(len(Book.get_all_cached()), 1)
+        shared.assert_not_called()
+        # Har chaqiruvda yangi instance - caller o'zgartirsa cache buzilmaydi
+        self.assertIsNot(Book.get_cached(self.book.pk), Book.get_cached(self.book.pk))
+
+    def test_writes_evict_local_tier(self):
+        Book.get_cached(self.book.pk)
+        Book.get_all_cached()
+        Book.objects.filter(pk=self.book.pk).update(stock=7)  # signal'siz - L1 eski
+        self.assertEqual(Book.get_cached(self.book.pk).stock, 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book.title = 'Renamed'
+            self.book.save()
+        self.assertEqual(Book.get_cached(self.book.pk).title, 'Renamed')
+        self.assertEqual(Book.get_all_cached()[0].title, 'Renamed')
+
+    def test_invalidation_during_fill_skips_local_tier(self):
+        def factory():
+            hot_cache.evict({book_tag(self.book.pk)})  # boshqa worker yozdi
+            return b'stale'
+
+        hot_cache.get_or_set('race', factory, tags=[book_tag(self.book.pk)])
+        self.assertIsNone(hot_cache.local.get('race'))
+        hot_cache.get_or_set('race', factory, tags=[book_tag(self.book.pk)])
+        self.assertEqual(hot_cache.local.get('race'), b'stale')
+
+    def test_publishes_invalidation(self):
+        with mock.patch.object(hot_cache.bus, 'publish') as publish, \
+                self.captureOnCommitCallbacks(execute=True):
+            self.book.save()
+        self.assertTrue(any(book_tag(self.book.pk) in call.args[0] for call in publish.call_args_list))
+
+
+class FakePubSub:
+    def __init__(self, channel):
+        self.messages = [
+            {'type': 'subscribe', 'data': 1},
+            {'type': 'message', 'data': f'{book_tag(1)}\nbooks:list'.encode()},
+        ]
+        self.channel = channel
+
+    def subscribe(self, channel):
+        assert channel == self.channel
+
+    def get_message(self, timeout):
+        if self.messages:
+            return self.messages.pop(0)
+        time.sleep(timeout)
+
+    def close(self):
+        pass
+
+
+class RedisInvalidationBusTest(TestCase):
+    def test_subscriber_evicts_and_becomes_ready(self):
+        received = []
+        done = threading.Event()
+        client = mock.Mock()
+        client.pubsub.side_effect = lambda: FakePubSub(cache.make_key(INVALIDATION_CHANNEL))
+
+        def on_message(tags):
+            received.append(tags)
+            if tags:
+                done.set()
+
+        with mock.patch('django_redis.get_redis_connection', return_value=client):
+            bus = RedisInvalidationBus(on_message)
+        self.assertTrue(done.wait(5))
+        # subscribe - hammasi tozalanadi (None), keyin tag'lar
+        self.assertEqual(received, [None, {book_tag(1), 'books:list'}])
+        self.assertTrue(bus.ready)
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            bus.publish({'books:list', book_tag(1)})
+            client.publish.assert_not_called()  # commit'dan keyin
+        self.assertEqual(len(callbacks), 1)
+        client.publish.assert_called_once_with(bus.channel, f'{book_tag(1)}\nbooks:list')
+
+
+class LocalLRUCacheBytesTest(TestCase):
+    def test_evicts_by_size(self):
+        lru = LocalLRUCache(maxsize=100, ttl=60, maxbytes=10)
+        lru.set('a', b'1234')
+        lru.set('b', b'1234')
+        lru.get('a')
+        lru.set('c', b'1234')
+        self.assertIsNone(lru.get('b'))
+        self.assertEqual((lru.get('a'), lru.currbytes), (b'1234', 8))
+
+        lru.set('a', b'12')
+        self.assertEqual(lru.currbytes, 6)
+        lru.set('huge', b'x' * 11)
+        self.assertEqual((len(lru), lru.currbytes), (2, 6))
@@ -0,0 +1,166 @@
+"""
+Indexing Tests
+==============
+
+Reindex: yangi index + atomic alias swap, --since catch-up.
+Queue: signal'lar faqat ID yozadi (takrorlar birlashadi), worker bitta
+bulk request bilan index'laydi/o'chiradi. Fake ES transport ustida.
+"""
+
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from books.indexing import QueuedSignalProcessor, process_index_queue, reindex_books
+from books.models import Author, Book, Genre, SearchIndexQueue
+from books.search import BookSearchService
+from books.tests.es_fake import FakeElasticsearchMixin
+from decimal import Decimal
+
+
+def create_books(author, count, genre=None, start=0):
+    books = []
+    for i in range(start, start + count):
+        book = Book.objects.create(
+            title=f'Book {i}',
+            isbn_number=f'97810000000{i:02d}',
+            price=Decimal('10.00'),
+            author=author,
+        )
+        if genre is not None:
+            book.genres.add(genre)
+        books.append(book)
+    return books
+
+
+class ReindexTest(FakeElasticsearchMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.author = Author.objects.create(name='Author')
+        self.books = create_books(self.author, 7, Genre.objects.create(name='Drama'))
+
+    def test_builds_new_index_and_switches_alias(self):
+        # Alias'siz eski o'rnatish: ``books`` - oddiy index
+        self.es.docs('books')['999'] = {'title': 'stale'}
+
+        result = reindex_books(chunk_size=2, thread_count=2)
+
+        new_index = result['index']
+        self.assertEqual((result['indexed'], result['failed']), (7, 0))
+        self.assertEqual(self.es.aliases['books'], {new_index})
+        self.assertEqual(set(self.es.indices), {new_index})
+        self.assertEqual(len(self.es.docs(new_index)), 7)
+        self.assertIsNone(self.es.settings[new_index]['refresh_interval'])
+        self.assertEqual(self.es.docs('books')[str(self.books[0].pk)]['genres'][0]['name'], 'Drama')
+
+        # Search alias orqali
+        results = BookSearchService.search('book')
+        self.assertEqual(results['total'], 7)
+
+    def test_second_rebuild_drops_previous_index(self):
+        first = reindex_books()['index']
+        second = reindex_books()['index']
+
+        self.assertEqual(self.es.aliases['books'], {second})
+        self.assertNotIn(first, self.es.indices)
+
+        third = reindex_books(keep_old=True)['index']
+        self.assertEqual(self.es.aliases['books'], {third})
+        self.assertIn(second, self.es.indices)
+
+    def test_since_writes_changed_books_into_live_index(self):
+        live = reindex_books()['index']
+        Book.objects.exclude(pk=self.books[0].pk).update(updated_at=timezone.now() - timedelta(days=2))
+        book = self.books[0]
+        book.title = 'Renamed'
+        book.save()
+
+        result = reindex_books(since=timezone.now() - timedelta(days=1))
+
+        self.assertEqual((result['index'], result['indexed']), ('books', 1))
+        self.assertEqual(set(self.es.indices), {live})
+        self.assertEqual(self.es.docs(live)[str(book.pk)]['title'], 'Renamed')
+
+    def test_command_reports_rate(self):
+        out = StringIO()
+        call_command('reindex_books', '--workers', '2', '--chunk-size', '3', stdout=out)
+        self.assertIn('7 docs', out.getvalue())
+        self.assertIn('docs/sec', out.getvalue())
+
+
+class SearchIndexQueueTest(FakeElasticsearchMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.processor = QueuedSignalProcessor(connections=None)
+        self.genre = Genre.objects.create(name='Drama')
+        self.author = Author.objects.create(name='Prolific')
+
+    def tearDown(self):
+        self.processor.teardown()
+        super().tearDown()
+
+    def queued(self):
+        return set(SearchIndexQueue.objects.values_list('book_id', flat=True))
+
+    def test_saves_are_queued_and_coalesced(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            book = create_books(self.author, 1, self.genre)[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            book.price = Decimal('12.00')
+            book.save()
+            book.save()
+
+        self.assertEqual(self.queued(), {book.pk})
+        self.assertEqual(self.es.requests, [])
+
+    def test_author_rename_queues_ids_without_indexing(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            books = create_books(self.author, 6)
+        SearchIndexQueue.objects.all().delete()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertNumQueries(2):  # author UPDATE + book id'lari
+                self.author.name = 'Renamed'
+                self.author.save()
+
+        self.assertEqual(self.queued(), {book.pk for book in books})
+        self.assertEqual(self.es.requests, [])
+
+    def test_worker_indexes_batch_with_one_bulk(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            books = create_books(self.author, 5, self.genre)
+
+        # queue, books + genres prefetch, queue delete (signal'lar ulangan - select + delete)
+        with self.assertNumQueries(5):
+            self.assertEqual(process_index_queue(batch_size=3), (3, 0, 0))
+        self.assertEqual(len([r for r in self.es.requests if r[1].endswith('/_bulk')]), 1)
+        self.assertEqual(self.queued(), {book.pk for book in books[3:]})
+
+        process_index_queue(batch_size=3)
+        self.assertEqual(self.queued(), set())
+        self.assertEqual(self.es.docs('books')[str(books[0].pk)]['author']['name'], 'Prolific')
+
+    def test_deleted_books_are_removed_from_index(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            book, other = create_books(self.author, 2, self.genre)
+        process_index_queue()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            book_id = book.pk
+            book.delete()
+            self.genre.delete()
+
+        self.assertEqual(self.queued(), {book_id, other.pk})
+        self.assertEqual(process_index_queue(), (1, 1, 0))
+        self.assertEqual(set(self.es.docs('books')), {str(other.pk)})
+        self.assertEqual(self.es.docs('books')[str(other.pk)]['genres'], [])
+
+    def test_command_drains_queue(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            create_books(self.author, 5)
+
+        out = StringIO()
+        call_command('process_search_queue', '--batch-size', '2', stdout=out)
+        self.assertEqual(self.queued(), set())
+        self.assertIn('5 indexed', out.getvalue())
@@ -0,0 +1,133 @@
+"""
+List Cache Tests
+================
+
+CachedListMixin: canonical key (param tartibi), hit'da serializer va DB
+ishlamaydi, yozuvlar key'ni o'zgartiradi, cache_per_user, XFetch early
+refresh, recompute lock va metrikalar
+"""
+
+from unittest import mock
+from django.contrib.auth.models import User
+from django.core.cache import cache, caches
+from rest_framework.test import APITestCase
+from books.list_cache import list_cache_metrics, list_response_cache
+from books.models import Author, Book
+from books.throttle_engine import get_throttle_engine
+from decimal import Decimal
+import json
+
+V2_VIEW = 'books.api.v2.views.BookListAPIView'
+
+
+class CachedListMixinTest(APITestCase):
+    url = '/api/v2/books/'
+
+    def setUp(self):
+        cache.clear()
+        list_cache_metrics.flush()  # oldingi testlar counter'lari tozalangan cache'ga tushmasin
+        cache.clear()
+        # pytest'da throttle yoqilgan - bu testlar ko'p request qiladi
+        get_throttle_engine().reset()
+        self.addCleanup(get_throttle_engine().reset)
+        self.user = User.objects.create_user(username='reader', password='pass12345')
+        self.client.force_authenticate(user=self.user)
+        self.author = Author.objects.create(name='Author')
+        self.book = Book.objects.create(
+            title='Book', isbn_number='9780000000001', price=Decimal('10.00'),
+            author=self.author, stock=3,
+        )
+
+    def test_hit_skips_queryset_and_serializer(self):
+        first = self.client.get(self.url, {'ordering': 'title', 'page_size': 5})
+        self.assertEqual(first['X-Cache'], 'MISS')
+
+        with mock.patch('books.api.v2.views.BookListSerializerV2.to_representation') as serialize:
+            with self.assertNumQueries(0):
+                # parametrlar boshqa tartibda - bitta canonical key
+                second = self.client.get(f'{self.url}?page_size=5&ordering=title')
+        serialize.assert_not_called()
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.assertEqual(json.loads(second.content), json.loads(first.content))
+
+    def test_writes_change_key(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book.title = 'Renamed'
+            self.book.save()
+
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.data['results'][0]['title'], 'Renamed')
+
+    def test_browsable_api_not_cached(self):
+        response = self.client.get(self.url, HTTP_ACCEPT='text/html')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Cache', response)
+
+    def test_per_user_scope(self):
+        from books.api.v2.views import BookListAPIView
+        self.client.get(self.url)
+        other = User.objects.create_user(username='other', password='pass12345')
+        self.client.force_authenticate(user=other)
+        self.assertEqual(self.client.get(self.url)['X-Cache'], 'HIT')
+
+        with mock.patch.object(BookListAPIView, 'cache_per_user', True):
+            self.assertEqual(self.client.get(self.url)['X-Cache'], 'MISS')
+            self.client.force_authenticate(user=self.user)
+            self.assertEqual(self.client.get(self.url)['X-Cache'], 'MISS')
+            self.assertEqual(self.client.get(self.url)['X-Cache'], 'HIT')
+
+    def test_early_refresh_near_expiry(self):
+        with mock.patch.object(caches['default'], 'set', wraps=caches['default'].set) as cache_set:
+            self.client.get(self.url)
+        _, _, expires_at, _ = next(
+            call.args[1] for call in cache_set.call_args_list if call.args[0].startswith('list_cache:')
+        )
+        # Expiry'ga bir mikrosekund qolgan - -ln(1 - rand) > 0 bo'lsa refresh
+        with mock.patch.object(list_response_cache, 'clock', return_value=expires_at - 1e-6):
+            with mock.patch.object(list_response_cache, 'rand', return_value=0.0):
+                self.assertEqual(self.client.get(self.url)['X-Cache'], 'HIT')
+            with mock.patch.object(list_response_cache, 'rand', return_value=0.99):
+                self.assertEqual(self.client.get(self.url)['X-Cache'], 'REFRESH')
+
+    def test_lock_loser_waits_for_entry(self):
+        self.client.get(self.url)
+        backend = caches['default']
+        real_get, calls = backend.get, []
+
+        def get(key, *args, **kwargs):
+            # Birinchi o'qish - miss; boshqa worker lock ushlab hisoblab qo'ygan
+            if key.startswith('list_cache:') and not calls:
+                calls.append(key)
+                return None
+            return real_get(key, *args, **kwargs)
+
+        with mock.patch.object(list_response_cache, 'sleep') as sleep, \
+                mock.patch.object(list_response_cache, '_acquire', return_value=False), \
+                mock.patch.object(backend, 'get', side_effect=get), \
+                mock.patch('books.api.v2.views.BookListSerializerV2.to_representation') as serialize:
+            response = self.client.get(self.url)
+        serialize.assert_not_called()
+        sleep.assert_called_once()
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+    def test_lock_loser_computes_after_timeout(self):
+        with mock.patch.object(list_response_cache, 'sleep'), \
+                mock.patch.object(list_response_cache, '_acquire', return_value=False), \
+                mock.patch.object(list_response_cache, 'clock', side_effect=[0, 0, 5, 5, 5, 5]):
+            response = self.client.get(self.url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['pagination']['count'], 1)
+
+    def test_metrics_report(self):
+        etag = self.client.get(self.url)['ETag']
+        self.client.get(self.url)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.client.force_authenticate(user=User.objects.create_superuser('admin', 'a@a.com', 'pass12345'))
+        counts = self.client.get('/api/v2/metrics/list-cache/').data['views'][V2_VIEW]
+        self.assertEqual((counts['miss'], counts['hit'], counts['not_modified']), (1, 1, 1))
+        self.assertEqual(counts['hit_ratio'], round(2 / 3, 4))
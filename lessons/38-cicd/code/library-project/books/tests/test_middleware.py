@@ -0,0 +1,76 @@
+"""
+Middleware Tests
+================
+
+SentryUserContextMiddleware: DSN'siz zanjirdan chiqariladi; request
+paytida context hisoblanmaydi, faqat event processor ichida
+"""
+
+from unittest import mock
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from books import middleware
+from books.middleware import SentryUserContextMiddleware, sentry_event_processor
+
+
+@override_settings(SENTRY_DSN='https://key@sentry.example.com/1')
+class SentryUserContextMiddlewareTest(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def run_request(self, request, event=None):
+        """View ichida xato event'i yuborilgandek processor'ni chaqiradi"""
+        captured = {}
+
+        def get_response(request):
+            captured['event'] = sentry_event_processor(event or {}, {})
+            return HttpResponse()
+
+        SentryUserContextMiddleware(get_response)(request)
+        return captured['event']
+
+    @override_settings(SENTRY_DSN=None)
+    def test_removed_without_dsn(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            SentryUserContextMiddleware(lambda request: HttpResponse())
+
+    def test_authenticated_user_context(self):
+        user = User.objects.create_user(username='reader', email='reader@example.com', password='pass12345')
+        request = self.factory.get('/api/v2/books/?page=2', HTTP_HOST='testserver')
+        request.user = user
+
+        event = self.run_request(request, {'user': {'ip_address': '10.0.0.1'}})
+
+        self.assertEqual(event['user'], {
+            'ip_address': '10.0.0.1',
+            'id': user.id,
+            'username': 'reader',
+            'email': 'reader@example.com',
+        })
+        self.assertEqual(event['contexts']['request'], {
+            'url': 'http://testserver/api/v2/books/?page=2',
+            'method': 'GET',
+            'query_string': 'page=2',
+        })
+
+    def test_anonymous_user_context(self):
+        request = self.factory.post('/api/v2/books/', REMOTE_ADDR='192.0.2.7')
+        request.user = AnonymousUser()
+
+        event = self.run_request(request)
+        self.assertEqual(event['user'], {'ip_address': '192.0.2.7'})
+        self.assertEqual(event['contexts']['request']['method'], 'POST')
+
+    def test_no_work_without_event(self):
+        request = self.factory.get('/api/v2/books/')
+        request.user = AnonymousUser()
+
+        with mock.patch.object(middleware, '_request_context') as context:
+            SentryUserContextMiddleware(lambda request: HttpResponse())(request)
+        context.assert_not_called()
+
+    def test_events_outside_request_untouched(self):
+        event = {'message': 'worker error'}
+        self.assertEqual(sentry_event_processor(event, {}), {'message': 'worker error'})
@@ -0,0 +1,183 @@
+"""
+Keyset Pagination Tests
+=======================
+
+KeysetPagination: OFFSET'siz seek, ko'p ustunli barqaror tartib,
+NULL qiymatlar, oldinga/orqaga cursor'lar va backing index check.
+Count strategiyalari: exact, cached, estimated
+"""
+
+from unittest import skipUnless
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
+from books.cache_tags import tagged_cache, model_tag
+from books.checks import check_keyset_pagination_indexes, has_backing_index
+from books.counting import cached_count, count_queryset, estimate_rows
+from books.models import Book, BookLog, BorrowHistory
+from books.pagination import CustomResponsePagination, MobileFriendlyPagination
+from decimal import Decimal
+from datetime import date
+from urllib.parse import urlsplit
+
+
+class KeysetPaginationTest(APITestCase):
+    """GET /api/logs/ va /api/books/"""
+
+    def setUp(self):
+        admin = User.objects.create_superuser(username='admin', password='pass12345')
+        self.client.force_authenticate(user=admin)
+
+        # Bir xil timestamp'lar - tartib id tie-breaker bilan barqaror
+        BookLog.objects.bulk_create([
+            BookLog(book_title=f'Log {i}', book_id=i, action='created') for i in range(45)
+        ])
+        BookLog.objects.filter(book_id__lt=20).update(timestamp=timezone.now())
+
+    def walk(self, url, params=None):
+        pages, response = [], self.client.get(url, params or {})
+        while True:
+            self.assertEqual(response.status_code, 200)
+            pages.append(response.data)
+            if not response.data['next']:
+                return pages
+            parts = urlsplit(response.data['next'])
+            response = self.client.get(f'{parts.path}?{parts.query}')
+
+    def test_walk_all_logs_stable(self):
+        pages = self.walk('/api/logs/')
+        ids = [row['id'] for page in pages for row in page['results']]
+
+        self.assertEqual(len(pages), 3)
+        self.assertEqual(len(ids), 45)
+        self.assertEqual(len(set(ids)), 45)
+        expected = list(BookLog.objects.order_by('-timestamp', '-id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+        self.assertIsNone(pages[0]['previous'])
+        self.assertNotIn('count', pages[0])
+
+    def test_previous_link(self):
+        pages = self.walk('/api/logs/')
+        parts = urlsplit(pages[2]['previous'])
+        response = self.client.get(f'{parts.path}?{parts.query}')
+        self.assertEqual(response.data['results'], pages[1]['results'])
+
+    def test_no_offset_or_count(self):
+        first = self.client.get('/api/logs/')
+        parts = urlsplit(first.data['next'])
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(f'{parts.path}?{parts.query}')
+
+        sql = ' '.join(query['sql'] for query in context.captured_queries).upper()
+        self.assertNotIn('OFFSET', sql)
+        self.assertNotIn('COUNT(', sql)
+
+    def test_nullable_ordering_field(self):
+        """OrderingFilter bilan nullable ustun - NULL'lar oxirida, hech biri tushib qolmaydi"""
+        for i in range(12):
+            Book.objects.create(
+                title=f'Book {i}',
+                isbn_number=f'991000000{i:04d}',
+                price=Decimal('10.00'),
+                published_date=date(2000 + i % 4, 1, 1) if i % 3 else None,
+            )
+        pages = self.walk('/api/books/', {'ordering': 'published_date', 'page_size': 5})
+        titles = [row['title'] for page in pages for row in page['results']]
+
+        self.assertEqual(len(titles), 12)
+        self.assertEqual(len(set(titles)), 12)
+        dates = [row['published_date'] for page in pages for row in page['results']]
+        self.assertEqual(dates[-4:], [None] * 4)
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/logs/', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+
+class BackingIndexCheckTest(TestCase):
+    """books.checks - keyset ordering index bilan qoplangan"""
+
+    def test_project_views_pass(self):
+        self.assertEqual(check_keyset_pagination_indexes(), [])
+
+    def test_index_matching(self):
+        self.assertTrue(has_backing_index(BookLog, ('-timestamp', '-id')))
+        self.assertTrue(has_backing_index(BorrowHistory, ('borrowed_at', 'id')))
+        self.assertTrue(has_backing_index(Book, ('-created_at', '-pk')))
+        self.assertFalse(has_backing_index(Book, ('-updated_at', '-id')))
+        self.assertFalse(has_backing_index(BookLog, ('-timestamp', 'action')))
+
+
+class CountStrategyTest(TestCase):
+    """books.counting + CustomResponsePagination / MobileFriendlyPagination"""
+
+    def setUp(self):
+        Book.objects.bulk_create([
+            Book(title=f'Count {i}', isbn_number=f'992000000{i:04d}', price=Decimal('10.00'), stock=i % 3)
+            for i in range(30)
+        ])
+        self.factory = APIRequestFactory()
+
+    def paginate(self, pagination, queryset, params=None):
+        request = Request(self.factory.get('/api/books/', params or {}))
+        page = pagination.paginate_queryset(queryset, request)
+        return pagination.get_paginated_response([book.id for book in page]).data
+
+    def test_cached_count_invalidated_by_write(self):
+        queryset = Book.objects.filter(stock=0)
+        self.assertEqual(cached_count(queryset), (10, True))
+
+        with self.assertNumQueries(0):
+            self.assertEqual(cached_count(Book.objects.filter(stock=0)), (10, True))
+        # Boshqa filtr - boshqa key
+        self.assertEqual(cached_count(Book.objects.filter(stock=1)), (10, True))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Book.objects.create(title='New', isbn_number='9930000000001', price=Decimal('1.00'), stock=0)
+        self.assertEqual(cached_count(queryset), (11, True))
+
+    def test_receivers_connected_at_startup(self):
+        """Bu worker hali count qilmagan bo'lsa ham yozuv tag'ni bekor qiladi (commit'dan keyin)"""
+        version = tagged_cache.get_versions([model_tag(BookLog)])
+        with self.captureOnCommitCallbacks(execute=True):
+            BookLog.objects.create(book_title='Log', book_id=1, action='created')
+            self.assertEqual(tagged_cache.get_versions([model_tag(BookLog)]), version)
+        self.assertNotEqual(tagged_cache.get_versions([model_tag(BookLog)]), version)
+
+    def test_custom_response_flag(self):
+        data = self.paginate(CustomResponsePagination(), Book.objects.order_by('id'))
+        self.assertEqual(data['pagination']['total_items'], 30)
+        self.assertTrue(data['pagination']['total_items_exact'])
+
+    @skipUnless(connection.vendor == 'sqlite', 'sqlite_stat1; PostgreSQL filtrlangan query uchun ham baho beradi')
+    def test_estimated_above_threshold(self):
+        """SQLite: ANALYZE'dan keyin sqlite_stat1 bahosi"""
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+        estimate = estimate_rows(Book.objects.all())
+        self.assertIsNotNone(estimate)
+
+        pagination = MobileFriendlyPagination()
+        pagination.count_estimate_threshold = 1
+        data = self.paginate(pagination, Book.objects.order_by('id'))
+        self.assertEqual(data['total'], estimate)
+        self.assertFalse(data['totalIsExact'])
+
+        # Filtrlangan query - SQLite'da baho yo'q, aniq son
+        data = self.paginate(pagination, Book.objects.filter(stock=2).order_by('id'))
+        self.assertEqual(data['total'], 10)
+        self.assertTrue(data['totalIsExact'])
+
+    def test_estimated_below_threshold_is_exact(self):
+        data = self.paginate(MobileFriendlyPagination(), Book.objects.order_by('id'))
+        self.assertEqual(data['total'], 30)
+        self.assertTrue(data['totalIsExact'])
+
+    def test_unknown_strategy(self):
+        with self.assertRaises(ValueError):
+            count_queryset(Book.objects.all(), strategy='fuzzy')
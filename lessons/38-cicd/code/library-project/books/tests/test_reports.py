@@ -0,0 +1,87 @@
+"""
+PDF Report Tests
+================
+
+PDFReportGenerator: ko'p sahifali books report, bitta o'tishdagi jami
+qiymatlar va detail report query soni
+"""
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APITestCase
+from books.models import Book, Author, Genre
+from books.reports import PDFReportGenerator, report_styles
+from decimal import Decimal
+from io import BytesIO
+
+
+class BooksReportTest(TestCase):
+    """PDFReportGenerator.build_books_report"""
+
+    def setUp(self):
+        author = Author.objects.create(name='Author')
+        Book.objects.bulk_create([
+            Book(
+                title=f'Report Book {i}',
+                isbn_number=f'930000000{i:04d}',
+                price=Decimal('10.00'),
+                stock=2,
+                author=author if i % 2 else None,
+            )
+            for i in range(120)
+        ])
+
+    def test_all_rows_multi_page(self):
+        """50 qatorlik cheklov yo'q - barcha kitoblar, bir necha sahifa"""
+        totals = PDFReportGenerator.build_books_report(Book.objects.all(), BytesIO(), chunk_size=50)
+
+        self.assertEqual(totals['rows'], 120)
+        self.assertEqual(totals['total_stock'], 240)
+        self.assertEqual(totals['total_value'], Decimal('2400.00'))
+        self.assertGreater(totals['pages'], 2)
+
+    def test_single_query(self):
+        """Qatorlar va jami qiymatlar bitta cursor'dan (alohida count() yo'q)"""
+        with self.assertNumQueries(1):
+            PDFReportGenerator.build_books_report(Book.objects.all(), BytesIO(), chunk_size=50)
+
+    def test_styles_reused(self):
+        """Uslublar har chaqiruvda qayta qurilmaydi"""
+        self.assertIs(report_styles(), report_styles())
+
+    def test_response_is_pdf(self):
+        response = PDFReportGenerator.generate_books_report(Book.objects.none())
+        content = b''.join(response.streaming_content)
+        response.close()
+
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertTrue(content.startswith(b'%PDF'))
+
+
+class PDFExportViewTest(APITestCase):
+    """PDF endpoint'lari"""
+
+    def setUp(self):
+        user = User.objects.create_user(username='reader', password='pass12345')
+        self.client.force_authenticate(user=user)
+        author = Author.objects.create(name='Author')
+        self.book = Book.objects.create(
+            title='Detail Book',
+            isbn_number='9400000000001',
+            price=Decimal('15.00'),
+            author=author,
+        )
+        self.book.genres.add(Genre.objects.create(name='Fiction'), Genre.objects.create(name='Drama'))
+
+    def test_detail_report_queries(self):
+        """Detail report: book + genres, author select_related bilan"""
+        # auth/session querylari yo'q (force_authenticate) - 2 ta query
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/api/{self.book.id}/export/pdf/')
+        self.assertEqual(response.status_code, 200)
+        response.close()
+
+    def test_books_report_filters(self):
+        response = self.client.get('/api/export/pdf/', {'author': 'auth'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'%PDF'))
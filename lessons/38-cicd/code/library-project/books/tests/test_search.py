@@ -0,0 +1,128 @@
+"""
+Search Tests
+============
+
+BookSearchService fake ES transport ustida: normalizatsiya qilingan
+query cache'i va index yozuvida invalidation, from/size va search_after,
+faqat kerakli _source maydonlari, in_bulk hydration
+"""
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APITestCase
+from books.documents import BookDocument
+from books.models import Author, Book, Genre
+from books.search import BookSearchService, RESULT_SOURCE
+from books.tests.es_fake import FakeElasticsearchMixin
+from decimal import Decimal
+
+
+class SearchDataMixin(FakeElasticsearchMixin):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        author = Author.objects.create(name='Guido van Rossum')
+        genre = Genre.objects.create(name='Programming')
+        for i in range(5):
+            book = Book.objects.create(
+                title=f'Python {i}',
+                isbn_number=f'97800000000{i:02d}',
+                price=Decimal('10.00') + i,
+                author=author,
+            )
+            book.genres.add(genre)
+        self.books = list(Book.objects.order_by('id'))
+        BookDocument().update(Book.objects.all())
+
+
+class BookSearchServiceTest(SearchDataMixin, TestCase):
+    def test_requests_only_returned_source_fields(self):
+        results = BookSearchService.search('python', page_size=2)
+
+        body = self.es.search_requests()[-1]
+        self.assertEqual(body['_source'], RESULT_SOURCE)
+        self.assertEqual(results['hits'][0]['source'], {
+            'title': 'Python 0',
+            'author': {'name': 'Guido van Rossum'},
+            'price': 10.0,
+        })
+
+    def test_normalized_queries_share_cache(self):
+        BookSearchService.search('Python', {'genre': 'Programming', 'price_min': '10'})
+        BookSearchService.search('  python ', {'genre': 'programming ', 'price_min': 10.0, 'author': ''})
+
+        self.assertEqual(len(self.es.search_requests()), 1)
+
+    def test_document_update_invalidates_cache(self):
+        BookSearchService.search('python')
+        book = self.books[0]
+        book.title = 'Python Tricks'
+        book.save()
+        BookDocument().update(book)
+
+        results = BookSearchService.search('python')
+        self.assertEqual(len(self.es.search_requests()), 2)
+        self.assertEqual(results['hits'][0]['source']['title'], 'Python Tricks')
+
+    def test_from_size_pagination(self):
+        results = BookSearchService.search('python', page=2, page_size=2)
+
+        body = self.es.search_requests()[-1]
+        self.assertEqual((body['from'], body['size']), (2, 2))
+        self.assertEqual([hit['id'] for hit in results['hits']], [b.id for b in self.books[2:4]])
+
+    def test_search_after_pagination(self):
+        seen, cursor = [], None
+        while True:
+            results = BookSearchService.search('python', page_size=2, cursor=cursor)
+            seen.extend(hit['id'] for hit in results['hits'])
+            cursor = results['next']
+            if cursor is None:
+                break
+
+        self.assertEqual(seen, [b.id for b in self.books])
+        self.assertNotIn('from', self.es.search_requests()[-1])
+
+    def test_hydrate_with_single_in_bulk(self):
+        with self.assertNumQueries(2):  # in_bulk + genres prefetch
+            results = BookSearchService.search('python', page_size=3, hydrate=True)
+            titles = [(book.title, book.author.name, len(book.genres.all())) for book in results['books']]
+
+        self.assertIs(self.es.search_requests()[-1]['_source'], False)
+        self.assertEqual(titles, [(f'Python {i}', 'Guido van Rossum', 1) for i in range(3)])
+
+    def test_invalid_params(self):
+        with self.assertRaises(ValueError):
+            BookSearchService.search('python', {'price_min': 'cheap'})
+        with self.assertRaises(ValueError):
+            BookSearchService.search('python', cursor='not-a-cursor')
+        with self.assertRaises(ValueError):
+            BookSearchService.search('python', page=1000, page_size=100)
+
+
+class BookSearchEndpointTest(SearchDataMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        user = User.objects.create_user(username='reader', password='pass12345')
+        self.client.force_authenticate(user=user)
+
+    def test_search_with_cursor(self):
+        response = self.client.get('/api/books/search/', {'q': 'python', 'page_size': 3})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total'], 5)
+        self.assertEqual(response.data['results'][0]['author'], 'Guido van Rossum')
+
+        response = self.client.get('/api/books/search/', {'q': 'python', 'page_size': 3, 'cursor': response.data['next']})
+        self.assertEqual([r['title'] for r in response.data['results']], ['Python 3', 'Python 4'])
+        self.assertIsNone(response.data['next'])
+
+    def test_hydrated_results(self):
+        response = self.client.get('/api/books/search/', {'q': 'python', 'hydrate': 'true', 'page_size': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['author_name'], 'Guido van Rossum')
+        self.assertEqual(response.data['results'][0]['score'], 1.0)
+
+    def test_invalid_price(self):
+        response = self.client.get('/api/books/search/', {'q': 'python', 'price_min': 'cheap'})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,138 @@
+"""
+Search Backend Tests
+====================
+
+DB full-text backend (test DB'ga mos: SQLite FTS5 yoki PostgreSQL
+tsvector): trigger'lar index'ni yozuvlar bilan sinxron saqlaydi, score
+tartibi, filtrlar, BookSearchService pagination/cursor va cache, v2 list
+?search= parametri
+"""
+
+from unittest import skipUnless
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from rest_framework.test import APITestCase
+from books.models import Author, Book, Genre
+from books.search import BookSearchService
+from books.search_backends import fts5_query, get_database_backend
+from decimal import Decimal
+
+
+class FullTextDataMixin:
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.backend = get_database_backend()
+        self.author = Author.objects.create(name='Eric Matthes')
+        self.genre = Genre.objects.create(name='Programming')
+        self.crash = self.create('Python Crash Course', 'Hands-on introduction', '9781593279288', 30)
+        self.django = self.create('Django for APIs', 'Build web APIs with python', '9781735467207', 20)
+        self.garden = self.create('The Secret Garden', 'Classic novel', '9780141321066', 10)
+        self.crash.genres.add(self.genre)
+
+    def create(self, title, description, isbn, price):
+        return Book.objects.create(
+            title=title, description=description, isbn_number=isbn,
+            price=Decimal(price), author=self.author,
+        )
+
+    def ids(self, query, filters=None):
+        return list(self.backend.search_books(query, filters).values_list('pk', flat=True))
+
+
+class DatabaseSearchBackendTest(FullTextDataMixin, TestCase):
+    def test_title_match_ranks_above_description(self):
+        self.assertEqual(self.ids('python'), [self.crash.pk, self.django.pk])
+        self.assertEqual(self.ids('secret garden'), [self.garden.pk])
+        self.assertCountEqual(self.ids('matthes'), [self.crash.pk, self.django.pk, self.garden.pk])
+        self.assertEqual(self.ids('!!!'), [])
+
+    def test_index_follows_writes(self):
+        self.garden.title = 'Python Cookbook'
+        self.garden.save()
+        self.assertIn(self.garden.pk, self.ids('python'))
+        self.assertEqual(self.ids('garden'), [])
+
+        self.author.name = 'Luciano Ramalho'
+        self.author.save()
+        self.assertEqual(len(self.ids('ramalho')), 3)
+        self.assertEqual(self.ids('matthes'), [])
+
+        self.crash.delete()
+        self.assertEqual(self.ids('crash'), [])
+
+    def test_filters(self):
+        self.assertEqual(self.ids('python', {'genre': 'program'}), [self.crash.pk])
+        self.assertEqual(self.ids('python', {'price_max': 25.0}), [self.django.pk])
+        self.assertEqual(self.ids('', {'author': 'matthes', 'price_min': 15.0}), [self.crash.pk, self.django.pk])
+
+    @skipUnless(connection.vendor == 'sqlite', 'FTS5')
+    def test_sqlite_prefix_and_diacritics(self):
+        self.assertEqual(fts5_query('Pyth  cr!'), '"pyth"* "cr"*')
+        self.create('Ōliy Matematika', '', '9780000000001', 5)
+        self.assertEqual(len(self.ids('oliy mat')), 1)
+        self.assertEqual(self.ids('pyth cr'), [self.crash.pk])
+
+    @skipUnless(connection.vendor == 'postgresql', 'pg_trgm')
+    def test_postgres_trigram_fuzziness(self):
+        self.assertEqual(self.ids('pyhton crash course')[0], self.crash.pk)
+
+
+@override_settings(BOOK_SEARCH_BACKEND='database')
+class DatabaseSearchServiceTest(FullTextDataMixin, TestCase):
+    def test_pages_and_cursor(self):
+        first = BookSearchService.search('python', page_size=1)
+        self.assertEqual((first['total'], first['total_relation']), (2, 'eq'))
+        self.assertEqual(first['hits'][0]['id'], self.crash.pk)
+        self.assertEqual(first['hits'][0]['source'], {
+            'title': 'Python Crash Course',
+            'author': {'name': 'Eric Matthes'},
+            'price': 30.0,
+        })
+
+        second = BookSearchService.search('python', page_size=1, cursor=first['next'])
+        self.assertEqual([hit['id'] for hit in second['hits']], [self.django.pk])
+        self.assertEqual(BookSearchService.search('python', page=2, page_size=1)['hits'], second['hits'])
+
+        hydrated = BookSearchService.search('python', hydrate=True)
+        self.assertEqual(hydrated['books'], [self.crash, self.django])
+
+    def test_cursor_through_equal_scores(self):
+        """Bir xil score'li kitoblar - cursor hech birini o'tkazib yubormaydi"""
+        ties = [self.create('Fluent Python', 'Same text', f'97814919462{i:02d}', 40).pk for i in range(4)]
+        seen, cursor = [], None
+        for _ in range(len(ties) + 1):
+            page = BookSearchService.search('fluent', page_size=1, cursor=cursor)
+            seen += [hit['id'] for hit in page['hits']]
+            cursor = page['next']
+            if not page['hits']:
+                break
+        self.assertEqual(seen, sorted(ties))
+
+    def test_writes_invalidate_cached_results(self):
+        self.assertEqual(BookSearchService.search('cookbook')['total'], 0)
+        self.create('Python Cookbook', '', '9781449340377', 40)
+        self.assertEqual(BookSearchService.search('cookbook')['total'], 1)
+
+
+class BookListFullTextSearchTest(FullTextDataMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(User.objects.create_user(username='reader', password='pass12345'))
+
+    def titles(self, search):
+        response = self.client.get('/api/v2/books/', {'search': search, 'ordering': 'title'})
+        self.assertEqual(response.status_code, 200)
+        return [book['title'] for book in response.data['results']]
+
+    def test_uses_fulltext_index_when_configured(self):
+        # icontains: so'z ichidagi qism ham mos keladi
+        self.assertEqual(self.titles('ytho'), ['Django for APIs', 'Python Crash Course'])
+
+        cache.clear()  # list body ETag bo'yicha cache'da - backend almashishi yozuv emas
+        with override_settings(BOOK_SEARCH_BACKEND='database'):
+            self.assertEqual(self.titles('ytho'), [])
+            self.assertEqual(self.titles('python'), ['Django for APIs', 'Python Crash Course'])
+            self.assertEqual(self.titles('garden'), ['The Secret Garden'])
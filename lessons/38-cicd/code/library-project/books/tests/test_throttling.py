@@ -0,0 +1,141 @@
+"""
+Throttling Tests
+================
+
+GCRA engine: limitgacha burst, keyin wait; parallel thread'larda aniq
+limit; mavjud throttle class'lar engine ustida; membership tier cache
+"""
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, force_authenticate
+from books.throttle_engine import LocalGCRAEngine, get_throttle_engine
+from books.throttling import BorrowThrottle, MembershipThrottle, SearchThrottle
+from accounts.membership import _local_tiers
+from accounts.models import Profile
+from accounts.views import CustomJWTSerializer
+from concurrent.futures import ThreadPoolExecutor
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class GCRAEngineTest(TestCase):
+    def test_burst_then_wait(self):
+        clock = FakeClock()
+        engine = LocalGCRAEngine(clock=clock)
+
+        results = [engine.hit('k', 10, 60)[0] for _ in range(11)]
+        self.assertEqual(results, [True] * 10 + [False])
+
+        allowed, wait = engine.hit('k', 10, 60)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(wait, 6.0)
+
+        # Bitta interval (60/10 s) o'tdi - bitta request
+        clock.now += 6
+        self.assertTrue(engine.hit('k', 10, 60)[0])
+        self.assertFalse(engine.hit('k', 10, 60)[0])
+
+    def test_concurrent_hits_exact_limit(self):
+        """Read-modify-write yo'q - parallel hit'lar limitdan oshmaydi"""
+        engine = LocalGCRAEngine()
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: engine.hit('shared', 100, 3600)[0], range(400)))
+        self.assertEqual(sum(results), 100)
+
+    def test_lru_eviction(self):
+        engine = LocalGCRAEngine(max_entries=2)
+        for key in ('a', 'b', 'c'):
+            engine.hit(key, 1, 60)
+        self.assertTrue(engine.hit('a', 1, 60)[0])
+        self.assertFalse(engine.hit('c', 1, 60)[0])
+
+
+class ThrottleClassTest(TestCase):
+    def setUp(self):
+        get_throttle_engine().reset()
+        self.user = User.objects.create_user(username='reader', password='pass12345')
+        self.factory = APIRequestFactory()
+
+    def request(self):
+        request = self.factory.get('/api/books/search/', REMOTE_ADDR='10.0.0.1')
+        force_authenticate(request, user=self.user)
+        request = Request(request)
+        request.user
+        return request
+
+    def test_borrow_limit(self):
+        throttle = BorrowThrottle()
+        results = [throttle.allow_request(self.request(), None) for _ in range(6)]
+        self.assertEqual(results, [True] * 5 + [False])
+        self.assertGreater(throttle.wait(), 0)
+
+    def test_constant_storage(self):
+        """Cache'da timestamp ro'yxati saqlanmaydi"""
+        throttle = SearchThrottle()
+        throttle.rate = '1000/hour'
+        throttle.num_requests, throttle.duration = throttle.parse_rate(throttle.rate)
+        for _ in range(50):
+            self.assertTrue(throttle.allow_request(self.request(), None))
+        self.assertIsNone(throttle.cache.get(throttle.key))
+
+
+class MembershipTierTest(TestCase):
+    """MembershipThrottle.get_rate - Profile har request'da o'qilmaydi"""
+
+    def setUp(self):
+        get_throttle_engine().reset()
+        cache.clear()
+        _local_tiers.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user = User.objects.create_user(username='member', password='pass12345')
+        self.factory = APIRequestFactory()
+
+    def rate_for(self, token=None):
+        request = self.factory.get('/api/books/')
+        force_authenticate(request, user=self.user, token=token)
+        request = Request(request)
+        request.user
+        throttle = MembershipThrottle()
+        throttle.request = request
+        return throttle.get_rate()
+
+    def test_cached_after_first_lookup(self):
+        self.assertEqual(self.rate_for(), '100/hour')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.rate_for(), '100/hour')
+
+        # Shared cache'dan (boshqa worker)
+        _local_tiers.clear()
+        with self.assertNumQueries(0):
+            self.rate_for()
+
+    def test_profile_save_invalidates(self):
+        self.rate_for()
+        with self.captureOnCommitCallbacks(execute=True):
+            Profile.objects.filter(user=self.user).update(is_premium=True)
+            Profile.objects.get(user=self.user).save()
+        self.assertEqual(self.rate_for(), '1000/hour')
+
+    def test_downgrade_applies_to_issued_token(self):
+        """Token'da tier yo'q - downgrade token muddati tugashini kutmaydi"""
+        with self.captureOnCommitCallbacks(execute=True):
+            Profile.objects.filter(user=self.user).update(is_premium=True)
+            Profile.objects.get(user=self.user).save()
+        token = CustomJWTSerializer.get_token(self.user).access_token
+        self.assertNotIn('tier', token.payload)
+        self.assertEqual(self.rate_for(token=token), '1000/hour')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            profile = Profile.objects.get(user=self.user)
+            profile.is_premium = False
+            profile.save()
+        self.assertEqual(self.rate_for(token=token), '100/hour')
@@ -0,0 +1,121 @@
+"""
+Throttle engine - GCRA (Generic Cell Rate Algorithm)
+
+DRF SimpleRateThrottle har bir client uchun timestamp'lar ro'yxatini
+saqlaydi: ``cache.get`` -> Python'da filtrlash -> ``cache.set``. Bu
+limitga proporsional (1000/hour = 1000 ta element) va parallel
+worker'larda yangilanishlarni yo'qotadi.
+
+GCRA har bir key uchun bitta son saqlaydi - TAT (theoretical arrival
+time). ``N/period`` limitda har bir request TAT ni ``period / N`` ga
+suradi; TAT ``now + period`` dan oshsa request rad etiladi. Tekshiruv
+O(1) va bitta atomic operatsiya:
+
+- Redis (django-redis): bitta Lua script (EVALSHA), vaqt Redis ``TIME``
+  dan - worker'lar soatlari farqi ta'sir qilmaydi.
+- Boshqa cache backend'lar (test, development LocMemCache): process
+  ichidagi lock bilan himoyalangan lokal jadval.
+"""
+from collections import OrderedDict
+from threading import Lock
+import time
+
+from django.core.cache import caches
+
+
+GCRA_LUA = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local interval = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+
+local tat = tonumber(redis.call('GET', KEYS[1]))
+if not tat or tat < now then
+    tat = now
+end
+
+local new_tat = tat + interval
+local excess = new_tat - now - period
+if excess > 0 then
+    return {0, tostring(excess)}
+end
+
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000))
+return {1, '0'}
+"""
+
+
+class LocalGCRAEngine:
+    """
+    Process ichidagi GCRA - test va bitta worker uchun
+
+    Eng eski key'lar ``max_entries`` dan oshganda o'chiriladi (LRU).
+    """
+
+    def __init__(self, max_entries=100000, clock=time.time):
+        self.max_entries = max_entries
+        self.clock = clock
+        self._tats = OrderedDict()
+        self._lock = Lock()
+
+    def hit(self, key, num_requests, duration):
+        """(allowed, wait_seconds)"""
+        interval = duration / num_requests
+        with self._lock:
+            now = self.clock()
+            tat = max(self._tats.get(key, now), now)
+            new_tat = tat + interval
+            excess = new_tat - now - duration
+            if excess > 0:
+                return False, excess
+
+            self._tats[key] = new_tat
+            self._tats.move_to_end(key)
+            while len(self._tats) > self.max_entries:
+                self._tats.popitem(last=False)
+        return True, 0.0
+
+    def reset(self, key=None):
+        with self._lock:
+            if key is None:
+                self._tats.clear()
+            else:
+                self._tats.pop(key, None)
+
+
+class RedisGCRAEngine:
+    """GCRA - bitta atomic Lua script (barcha worker'lar uchun umumiy)"""
+
+    def __init__(self, alias='default'):
+        from django_redis import get_redis_connection
+
+        self.cache = caches[alias]
+        self.client = get_redis_connection(alias)
+        self.script = self.client.register_script(GCRA_LUA)
+
+    def hit(self, key, num_requests, duration):
+        allowed, wait = self.script(
+            keys=[self.cache.make_key(f'gcra:{key}')],
+            args=[duration / num_requests, duration],
+        )
+        return bool(int(allowed)), float(wait)
+
+    def reset(self, key=None):
+        if key is not None:
+            self.client.delete(self.cache.make_key(f'gcra:{key}'))
+
+
+_engines = {}
+
+
+def get_throttle_engine(alias='default'):
+    """Cache backend'iga mos engine (har bir alias uchun bitta)"""
+    engine = _engines.get(alias)
+    if engine is None:
+        cache = caches[alias]
+        if type(cache).__module__.startswith('django_redis'):
+            engine = RedisGCRAEngine(alias)
+        else:
+            engine = LocalGCRAEngine()
+        _engines[alias] = engine
+    return engine
@@ -3,15 +3,51 @@ from django.core.cache import cache
 from datetime import datetime
 import logging
 
+from accounts.membership import get_request_tier, TIER_PREMIUM
+from .throttle_engine import get_throttle_engine
+
 logger = logging.getLogger(__name__)
 
 
-class MembershipThrottle(SimpleRateThrottle):
+class GCRAThrottleMixin:
+    """
+    SimpleRateThrottle uchun atomic GCRA tekshiruvi (books/throttle_engine.py)
+
+    Timestamp ro'yxati (get -> filter -> set) o'rniga bitta atomic hit:
+    har bir request uchun O(1), parallel worker'larda yangilanish yo'qolmaydi.
+    get_rate() / get_cache_key() subclass'larda o'zgarishsiz qoladi.
+    """
+    cache_alias = 'default'
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        # rate allow_request ichida o'zgargan bo'lishi mumkin (MembershipThrottle)
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        allowed, self._wait = get_throttle_engine(self.cache_alias).hit(
+            self.key, self.num_requests, self.duration
+        )
+        return allowed
+
+    def wait(self):
+        return getattr(self, '_wait', None)
+
+
+class MembershipThrottle(GCRAThrottleMixin, SimpleRateThrottle):
     """
     Foydalanuvchi membership darajasiga qarab throttling
     """
     # Default scope qo'shamiz
     scope = 'membership'
+    DEFAULT_RATE = '100/hour'
+    TIER_RATES = {
+        TIER_PREMIUM: '1000/hour',
+    }
     
     def get_cache_key(self, request, view):
         if not request.user.is_authenticated:
@@ -37,10 +73,13 @@ class MembershipThrottle(SimpleRateThrottle):
     def get_rate(self):
         """
         Membership darajasiga qarab limit
+
+        Tier JWT claim'dan yoki cache'dan (accounts/membership.py) -
+        Profile qatori har request'da o'qilmaydi.
         """
         # Agar request hali yo'q bo'lsa (initialization paytida)
         if not hasattr(self, 'request'):
-            return '100/hour'  # Default
+            return self.DEFAULT_RATE
         
         user = self.request.user
         
@@ -51,16 +90,10 @@ class MembershipThrottle(SimpleRateThrottle):
         if user.is_staff:
             return None
         
-        # Premium member (Books app uses books_profile related_name)
-        books_profile = getattr(user, 'books_profile', None)
-        if books_profile and getattr(books_profile, 'is_premium', False):
-            return '1000/hour'
-        
-        # Oddiy user
-        return '100/hour'
+        return self.TIER_RATES.get(get_request_tier(self.request), self.DEFAULT_RATE)
 
 
-class BorrowThrottle(SimpleRateThrottle):
+class BorrowThrottle(GCRAThrottleMixin, SimpleRateThrottle):
     """
     Kitob olish uchun maxsus throttle
     Kuniga 5 tadan ko'p kitob olib bo'lmaydi
@@ -79,7 +112,7 @@ class BorrowThrottle(SimpleRateThrottle):
         return '5/day'
 
 
-class MonitoredBookThrottle(SimpleRateThrottle):
+class MonitoredBookThrottle(GCRAThrottleMixin, SimpleRateThrottle):
     """
     Kitoblar uchun monitoring bilan throttle
     """
@@ -106,10 +139,13 @@ class MonitoredBookThrottle(SimpleRateThrottle):
                 f'method={request.method}'
             )
             
-            # Metrics
+            # Metrics (atomic incr - parallel worker'larda yo'qolmaydi)
             cache_key = f'book_throttle_violations_{datetime.now().date()}'
-            violations = cache.get(cache_key, 0)
-            cache.set(cache_key, violations + 1, 86400)
+            cache.add(cache_key, 0, 86400)
+            try:
+                cache.incr(cache_key)
+            except ValueError:
+                cache.set(cache_key, 1, 86400)
         
         return allowed
     
@@ -117,7 +153,7 @@ class MonitoredBookThrottle(SimpleRateThrottle):
         return '100/hour'
 
 
-class SearchThrottle(SimpleRateThrottle):
+class SearchThrottle(GCRAThrottleMixin, SimpleRateThrottle):
     """
     Qidiruv uchun alohida throttle
     """
@@ -6,6 +6,7 @@ from .views import (
     BorrowHistoryListView, MyBorrowHistoryView,
     BulkImportBooksView, ReviewViewSet,
     export_books_excel,
+    export_books_bulk,
     export_books_pdf,
     export_book_detail_pdf,
     generate_borrow_invoice,
@@ -15,6 +16,7 @@ from .views import (
     popular_books,
     price_distribution,
     stock_analysis,
+    histogram,
     recommendations,
     complete_analytics,
 )
@@ -39,6 +41,8 @@ urlpatterns = [
     # ============================================================================
     path('export/excel/', export_books_excel, name='export-books-excel'),
     path('export/pdf/', export_books_pdf, name='export-books-pdf'),
+    path('export/csv/', export_books_bulk, {'file_format': 'csv'}, name='export-books-csv'),
+    path('export/ndjson/', export_books_bulk, {'file_format': 'ndjson'}, name='export-books-ndjson'),
     path('<int:pk>/export/pdf/', export_book_detail_pdf, name='export-book-detail-pdf'),
     
     # ============================================================================
@@ -50,6 +54,7 @@ urlpatterns = [
     path('analytics/popular/', popular_books, name='analytics-popular'),
     path('analytics/price-distribution/', price_distribution, name='analytics-price-distribution'),
     path('analytics/stock-analysis/', stock_analysis, name='analytics-stock-analysis'),
+    path('analytics/histogram/', histogram, name='analytics-histogram'),
     path('analytics/recommendations/', recommendations, name='analytics-recommendations'),
     path('analytics/complete/', complete_analytics, name='analytics-complete'),
 
@@ -1,9 +1,14 @@
+import logging
 from rest_framework import viewsets, generics, status
 from rest_framework.decorators import action,api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.views import APIView
+from django.conf import settings
 from django.shortcuts import get_object_or_404
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 
 from .models import Book, Author, Genre, BookLog, BorrowHistory, Review
 from accounts.models import Profile
@@ -13,16 +18,23 @@ from .serializers import (
     ReviewSerializer, BulkImportBookSerializer
 )
 from .signals import borrow_book, return_book, books_bulk_imported
-from .search import BookSearch
+from .search import BookSearch, BookSearchService, DEFAULT_PAGE_SIZE
+from .autocomplete import autocomplete_index
+from .conditional import book_response
+from .importers import BookBulkImporter, STREAM_READERS
+from .mixins import CachedListMixin
+from .pagination import BookKeysetPagination, BookLogKeysetPagination, BorrowHistoryKeysetPagination
 
 # ============================================================================
 # ANALYTICS & REPORTING VIEWS Lesson 34.
 # ============================================================================
 
-from .exports import ExcelExporter
+from .exports import ExcelExporter, BulkExporter
 from .reports import PDFReportGenerator
 from .analytics import BookAnalytics
 
+logger = logging.getLogger(__name__)
+
 
 class AuthorViewSet(viewsets.ModelViewSet):
     """Author CRUD endpoints"""
@@ -38,11 +50,18 @@ class GenreViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
 
 
-class BookViewSet(viewsets.ModelViewSet):
-    """Book CRUD endpoints"""
-    queryset = Book.objects.select_related('author').prefetch_related('genres').all()
+class BookViewSet(CachedListMixin, viewsets.ModelViewSet):
+    """Book CRUD endpoints (list - render qilingan body cache'da, books/list_cache.py)"""
+    queryset = Book.objects.all()
+    select_related_fields = ['author']
+    prefetch_related_fields = ['genres']
     serializer_class = BookSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = BookKeysetPagination
+    
+    def retrieve(self, request, *args, **kwargs):
+        """ETag/304 - bitta PK lookup, body ETag bo'yicha cache'da"""
+        return book_response(request, kwargs['pk'], lambda: self.get_serializer(self.get_object()).data)
     
     @action(detail=True, methods=['post'])
     def borrow(self, request, pk=None):
@@ -97,34 +116,56 @@ class BookViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def search(self, request):
         """
-        Elasticsearch full-text search
+        Full-text search (BOOK_SEARCH_BACKEND: Elasticsearch yoki DB full-text index)
         GET /api/books/search/?q=python&price_min=10&price_max=50&genre=Fiction
+        
+        Pagination: ?page=2&page_size=20 yoki ?cursor=<next> (search_after)
+        ?hydrate=true - to'liq Book obyektlari (BookSerializer)
         """
-        query = request.query_params.get('q', '')
+        params = request.query_params
         filters = {
-            'price_min': request.query_params.get('price_min'),
-            'price_max': request.query_params.get('price_max'),
-            'genre': request.query_params.get('genre'),
-            'author': request.query_params.get('author'),
+            'price_min': params.get('price_min'),
+            'price_max': params.get('price_max'),
+            'genre': params.get('genre'),
+            'author': params.get('author'),
         }
-        # Remove None values
-        filters = {k: v for k, v in filters.items() if v is not None}
+        hydrate = params.get('hydrate', '').lower() in ('1', 'true', 'yes')
         
-        search = BookSearch.search_books(query, filters)
-        results = search.execute()
+        try:
+            results = BookSearchService.search(
+                params.get('q', ''),
+                filters,
+                page=params.get('page', 1),
+                page_size=params.get('page_size', DEFAULT_PAGE_SIZE),
+                cursor=params.get('cursor'),
+                hydrate=hydrate,
+            )
+        except ValueError as e:
+            return Response({
+                'error': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
         
-        return Response({
-            'total': results.hits.total.value,
-            'results': [
+        scores = {hit['id']: hit['score'] for hit in results['hits']}
+        if hydrate:
+            books = self.get_serializer(results['books'], many=True).data
+            items = [{**book, 'score': scores[book['id']]} for book in books]
+        else:
+            items = [
                 {
-                    'id': hit.meta.id,
-                    'title': hit.title,
-                    'author': hit.author.name if hasattr(hit, 'author') else None,
-                    'price': hit.price,
-                    'score': hit.meta.score,
+                    'id': hit['id'],
+                    'title': hit['source'].get('title'),
+                    'author': (hit['source'].get('author') or {}).get('name'),
+                    'price': hit['source'].get('price'),
+                    'score': hit['score'],
                 }
-                for hit in results
+                for hit in results['hits']
             ]
+        
+        return Response({
+            'total': results['total'],
+            'total_relation': results['total_relation'],
+            'next': results['next'],
+            'results': items,
         })
     
     @action(detail=False, methods=['get'])
@@ -132,16 +173,32 @@ class BookViewSet(viewsets.ModelViewSet):
         """
         Autocomplete suggestions
         GET /api/books/autocomplete/?q=pyth
+        
+        Worker xotirasidagi prefix indeks (books/autocomplete.py); prefix
+        topilmasa - Elasticsearch fuzzy suggester.
         """
         query = request.query_params.get('q', '')
-        results = BookSearch.autocomplete(query)
+        autocomplete_index.ensure_built()
+        suggestions = autocomplete_index.suggest(query)
+        
+        if not suggestions and query.strip():
+            suggestions = self._fuzzy_suggestions(query)
+        
+        return Response({'suggestions': suggestions})
+    
+    def _fuzzy_suggestions(self, query):
+        """ES completion suggester (xato yozilgan so'rovlar uchun)"""
+        try:
+            results = BookSearch.autocomplete(query)
+        except Exception as e:
+            logger.warning(f"Autocomplete fuzzy fallback failed: {e}")
+            return []
         
         suggestions = []
         if hasattr(results, 'suggest') and 'title_suggestions' in results.suggest:
             for suggestion in results.suggest['title_suggestions'][0]['options']:
                 suggestions.append(suggestion['text'])
-        
-        return Response({'suggestions': suggestions})
+        return suggestions
 
 
 class UserProfileViewSet(viewsets.ReadOnlyModelViewSet):
@@ -166,6 +223,7 @@ class BookLogListView(generics.ListAPIView):
     queryset = BookLog.objects.select_related('user').all()
     serializer_class = BookLogSerializer
     permission_classes = [IsAdminUser]
+    pagination_class = BookLogKeysetPagination
 
 
 class BorrowHistoryListView(generics.ListAPIView):
@@ -177,6 +235,7 @@ class BorrowHistoryListView(generics.ListAPIView):
     queryset = BorrowHistory.objects.select_related('book', 'user').all()
     serializer_class = BorrowHistorySerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = BorrowHistoryKeysetPagination
     
     def get_queryset(self):
         """Filter by current user if not admin"""
@@ -203,7 +262,7 @@ class MyBorrowHistoryView(generics.ListAPIView):
 
 class BulkImportBooksView(APIView):
     """
-    Bulk import books
+    Bulk import books (batched: in_bulk lookups + bulk_create)
     
     POST /api/books/bulk-import/
     Body: {
@@ -218,10 +277,20 @@ class BulkImportBooksView(APIView):
             ...
         ]
     }
+    
+    Streaming mode (multipart upload, fayl xotiraga to'liq yuklanmaydi):
+    POST /api/books/bulk-import/
+    file=@books.csv        (yoki books.ndjson)
+    format=csv|ndjson      (optional, default - fayl kengaytmasi)
     """
     permission_classes = [IsAdminUser]
+    chunk_size = 500
     
     def post(self, request):
+        uploaded_file = request.FILES.get('file')
+        if uploaded_file is not None:
+            return self._import_stream(request, uploaded_file)
+        
         serializer = BulkImportBookSerializer(data=request.data)
         
         if not serializer.is_valid():
@@ -230,64 +299,52 @@ class BulkImportBooksView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        books_data = serializer.validated_data['books']
-        created_books = []
-        errors = []
+        importer = BookBulkImporter(chunk_size=self.chunk_size)
+        importer.run(serializer.validated_data['books'])
+        
+        created_books = Book.objects.filter(
+            pk__in=importer.created_ids
+        ).select_related('author').prefetch_related('genres')
+        
+        response_data = self._summary(request, importer)
+        response_data['books'] = BookSerializer(created_books, many=True).data
+        
+        return Response(response_data, status=status.HTTP_201_CREATED)
+    
+    def _import_stream(self, request, uploaded_file):
+        """CSV/NDJSON faylni chunk'lab import qilish"""
+        file_format = request.data.get('format') or uploaded_file.name.rsplit('.', 1)[-1]
+        reader = STREAM_READERS.get(file_format.lower())
+        
+        if reader is None:
+            return Response(
+                {'error': f"Unsupported format '{file_format}'. Use csv or ndjson."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        for idx, book_data in enumerate(books_data):
-            try:
-                # Get author
-                author_id = book_data.get('author')
-                author = Author.objects.get(id=author_id)
-                
-                # Get genres (optional)
-                genre_ids = book_data.get('genres', [])
-                
-                # Create book
-                book = Book.objects.create(
-                    title=book_data['title'],
-                    author=author,
-                    isbn_number=book_data['isbn_number'],
-                    description=book_data.get('description', ''),
-                    price=book_data['price'],
-                    stock=book_data.get('stock', 0),
-                    pages=book_data.get('pages', 0),
-                    language=book_data.get('language', 'English'),
-                    published_date=book_data.get('published_date', None)
-                )
-                
-                # Add genres if provided
-                if genre_ids:
-                    book.genres.set(genre_ids)
-                
-                created_books.append(book)
-                
-            except Author.DoesNotExist:
-                errors.append(f"Book #{idx + 1}: Author with ID {author_id} not found")
-            except Genre.DoesNotExist:
-                errors.append(f"Book #{idx + 1}: Genre not found")
-            except Exception as e:
-                errors.append(f"Book #{idx + 1}: {str(e)}")
+        importer = BookBulkImporter(chunk_size=self.chunk_size)
+        importer.run(reader(uploaded_file))
         
+        return Response(self._summary(request, importer), status=status.HTTP_201_CREATED)
+    
+    def _summary(self, request, importer):
         # Send signal
-        if created_books:
+        if importer.imported:
             books_bulk_imported.send(
                 sender=Book,
-                count=len(created_books),
+                count=importer.imported,
                 user=request.user
             )
         
-        # Prepare response
         response_data = {
-            'imported': len(created_books),
-            'failed': len(errors),
-            'books': BookSerializer(created_books, many=True).data
+            'imported': importer.imported,
+            'failed': len(importer.errors),
         }
         
-        if errors:
-            response_data['errors'] = errors
+        if importer.errors:
+            response_data['errors'] = importer.errors
         
-        return Response(response_data, status=status.HTTP_201_CREATED)
+        return response_data
 
 
 class ReviewViewSet(viewsets.ModelViewSet):
@@ -301,18 +358,8 @@ class ReviewViewSet(viewsets.ModelViewSet):
 # EXCEL EXPORT
 # ============================================================================
 
-@api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def export_books_excel(request):
-    """
-    Export books to Excel
-    
-    GET /api/books/export/excel/
-    GET /api/books/export/excel/?author=John&genre=Programming&price_min=20
-    """
-    queryset = Book.objects.all()
-    
-    # Apply filters
+def filter_export_queryset(request, queryset):
+    """Export endpoint'lari uchun umumiy filterlar"""
     author = request.query_params.get('author')
     genre = request.query_params.get('genre')
     price_min = request.query_params.get('price_min')
@@ -330,8 +377,72 @@ def export_books_excel(request):
     if price_max:
         queryset = queryset.filter(price__lte=price_max)
     
-    # Generate Excel
-    return ExcelExporter.export_books(queryset, filename="books_export.xlsx")
+    return queryset
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_books_excel(request):
+    """
+    Export books to Excel (streaming)
+    
+    GET /api/books/export/excel/
+    GET /api/books/export/excel/?author=John&genre=Programming&price_min=20
+    """
+    queryset = filter_export_queryset(request, Book.objects.all())
+    
+    # Generate Excel (write-only workbook, constant memory)
+    return ExcelExporter.export_books_streaming(queryset, filename="books_export.xlsx")
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_books_bulk(request, file_format='csv'):
+    """
+    High-throughput CSV/NDJSON export (BI jobs, nightly sync)
+    
+    GET /api/export/csv/
+    GET /api/export/ndjson/?compress=gzip
+    GET /api/export/csv/?updated_since=2025-01-01T00:00:00Z&author=John
+    
+    Response header ``X-Export-Cursor`` - keyingi incremental export uchun
+    ``updated_since`` qiymati.
+    
+    ``updated_at`` save paytida qo'yiladi, commit esa keyinroq bo'lishi
+    mumkin: cursor'dan oldingi vaqt bilan kech commit qilingan qator
+    o'tkazib yuborilmasin deb ``updated_since - EXPORT_SAFETY_WINDOW``
+    dan qayta o'qiladi. Qatorlar takrorlanishi mumkin - consumer ``id``
+    bo'yicha upsert/de-dup qiladi. O'chirilgan kitoblar export qilinmaydi
+    (tombstone yo'q) - ularni vaqti-vaqti bilan to'liq export bilan solishtiring.
+    """
+    queryset = filter_export_queryset(request, Book.objects.all())
+    
+    updated_since = request.query_params.get('updated_since')
+    if updated_since:
+        since = parse_datetime(updated_since)
+        if since is None:
+            return Response(
+                {'error': 'updated_since must be an ISO 8601 datetime'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+        window = timezone.timedelta(seconds=getattr(settings, 'EXPORT_SAFETY_WINDOW', 300))
+        queryset = queryset.filter(updated_at__gt=since - window)
+    
+    # Cursor export boshlanishida belgilanadi: keyingi sync aynan shu nuqtadan
+    cursor = Book.objects.aggregate(cursor=Max('updated_at'))['cursor']
+    if cursor is not None:
+        queryset = queryset.filter(updated_at__lte=cursor)
+    
+    response = BulkExporter.export(
+        queryset.order_by('updated_at', 'id'),
+        file_format=file_format,
+        compress=request.query_params.get('compress') == 'gzip',
+    )
+    if cursor is not None:
+        response['X-Export-Cursor'] = cursor.isoformat()
+    return response
 
 
 # ============================================================================
@@ -346,17 +457,8 @@ def export_books_pdf(request):
     
     GET /api/books/export/pdf/
     """
-    queryset = Book.objects.all()
-    
     # Apply filters (same as Excel)
-    author = request.query_params.get('author')
-    genre = request.query_params.get('genre')
-    
-    if author:
-        queryset = queryset.filter(author__name__icontains=author)
-    
-    if genre:
-        queryset = queryset.filter(genres__name__icontains=genre)
+    queryset = filter_export_queryset(request, Book.objects.all())
     
     return PDFReportGenerator.generate_books_report(queryset, filename="books_report.pdf")
 
@@ -370,7 +472,7 @@ def export_book_detail_pdf(request, pk):
     GET /api/books/{id}/export/pdf/
     """
     try:
-        book = Book.objects.get(pk=pk)
+        book = Book.objects.select_related('author').prefetch_related('genres').get(pk=pk)
         return PDFReportGenerator.generate_book_detail_report(book)
     except Book.DoesNotExist:
         return Response({'error': 'Book not found'}, status=404)
@@ -385,7 +487,7 @@ def generate_borrow_invoice(request, pk):
     GET /api/borrows/{id}/invoice/
     """
     try:
-        borrow = BorrowHistory.objects.get(pk=pk)
+        borrow = BorrowHistory.objects.select_related('book', 'user').get(pk=pk)
         
         # Check permission (admin or owner)
         if not request.user.is_staff and borrow.user != request.user:
@@ -408,8 +510,9 @@ def dashboard_stats(request):
     
     GET /api/analytics/dashboard/
     """
-    stats = BookAnalytics.get_dashboard_stats()
-    return Response(stats)
+    result = BookAnalytics.result()
+    stats = BookAnalytics.get_dashboard_stats(result)
+    return Response({**stats, 'generated_at': result.generated_at})
 
 
 @api_view(['GET'])
@@ -420,7 +523,8 @@ def books_by_genre(request):
     
     GET /api/analytics/by-genre/
     """
-    genres = BookAnalytics.get_books_by_genre()
+    result = BookAnalytics.result()
+    genres = result.genre_rows
     
     data = [{
         'genre': g.name,
@@ -432,7 +536,7 @@ def books_by_genre(request):
         'total_value': float(g.total_value),
     } for g in genres]
     
-    return Response({'by_genre': data})
+    return Response({'by_genre': data, 'generated_at': result.generated_at})
 
 
 @api_view(['GET'])
@@ -443,7 +547,8 @@ def books_by_author(request):
     
     GET /api/analytics/by-author/
     """
-    authors = BookAnalytics.get_books_by_author()
+    result = BookAnalytics.result()
+    authors = result.author_rows
     
     data = [{
         'author': a.name,
@@ -455,7 +560,7 @@ def books_by_author(request):
         'total_value': float(a.total_value),
     } for a in authors]
     
-    return Response({'by_author': data})
+    return Response({'by_author': data, 'generated_at': result.generated_at})
 
 
 @api_view(['GET'])
@@ -488,8 +593,31 @@ def price_distribution(request):
     
     GET /api/analytics/price-distribution/
     """
-    distribution = BookAnalytics.get_price_distribution()
-    return Response(distribution)
+    result = BookAnalytics.result()
+    distribution = BookAnalytics.get_price_distribution(result)
+    return Response({**distribution, 'generated_at': result.generated_at})
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def histogram(request):
+    """
+    Histogram for price, stock or pages
+    
+    GET /api/analytics/histogram/?field=price&bins=0,30,50,70,100
+    GET /api/analytics/histogram/?field=pages&bins=10
+    GET /api/analytics/histogram/?field=stock&bins=4&strategy=quantile
+    """
+    try:
+        data = BookAnalytics.get_histogram(
+            field=request.query_params.get('field', 'price'),
+            bins=request.query_params.get('bins', '10'),
+            strategy=request.query_params.get('strategy', 'width'),
+        )
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    return Response(data)
 
 
 @api_view(['GET'])
@@ -500,7 +628,8 @@ def stock_analysis(request):
     
     GET /api/analytics/stock-analysis/
     """
-    analysis = BookAnalytics.get_stock_analysis()
+    result = BookAnalytics.result()
+    analysis = BookAnalytics.get_stock_analysis(result)
     
     # Serialize queryset fields
     needs_restock = [{
@@ -521,6 +650,7 @@ def stock_analysis(request):
         'status': analysis['status'],
         'needs_restock': needs_restock,
         'highest_stock': highest_stock,
+        'generated_at': result.generated_at,
     })
 
 
@@ -532,8 +662,9 @@ def recommendations(request):
     
     GET /api/analytics/recommendations/
     """
-    recs = BookAnalytics.get_recommendations()
-    return Response({'recommendations': recs})
+    result = BookAnalytics.result()
+    recs = BookAnalytics.get_recommendations(result)
+    return Response({'recommendations': recs, 'generated_at': result.generated_at})
 
 
 @api_view(['GET'])
@@ -544,16 +675,19 @@ def complete_analytics(request):
     
     GET /api/analytics/complete/
     """
+    # Barcha bo'limlar bitta natija obyektidan (snapshot'lardan 5 ta query)
+    result = BookAnalytics.result()
+    
     return Response({
-        'dashboard': BookAnalytics.get_dashboard_stats(),
-        'price_distribution': BookAnalytics.get_price_distribution(),
+        'dashboard': BookAnalytics.get_dashboard_stats(result),
+        'price_distribution': BookAnalytics.get_price_distribution(result),
         'genre_performance': {
             k: {
                 'name': v.name,
                 'book_count': v.book_count,
                 'avg_price': float(v.avg_price),
             } if v else None
-            for k, v in BookAnalytics.get_genre_performance().items()
+            for k, v in BookAnalytics.get_genre_performance(result).items()
         },
         'author_performance': {
             k: {
@@ -561,7 +695,8 @@ def complete_analytics(request):
                 'book_count': v.book_count,
                 'avg_price': float(v.avg_price),
             } if v else None
-            for k, v in BookAnalytics.get_author_performance().items()
+            for k, v in BookAnalytics.get_author_performance(result).items()
         },
-        'recommendations': BookAnalytics.get_recommendations(),
+        'recommendations': BookAnalytics.get_recommendations(result),
+        'generated_at': result.generated_at,
     })
\ No newline at end of file
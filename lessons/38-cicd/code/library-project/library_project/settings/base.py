@@ -376,6 +376,31 @@ ELASTICSEARCH_DSL = {
     },
 }
 
+# BookSearch backend: 'elasticsearch' yoki 'database' (PostgreSQL tsvector +
+# pg_trgm / SQLite FTS5 - books/search_backends.py)
+BOOK_SEARCH_BACKEND = config("BOOK_SEARCH_BACKEND", default="elasticsearch")
+
+# Book/Author/Genre o'zgarishlari navbatga yoziladi, index'lash -
+# ``python manage.py process_search_queue`` worker'ida (books/indexing.py)
+ELASTICSEARCH_DSL_SIGNAL_PROCESSOR = 'books.indexing.QueuedSignalProcessor'
+
+# Autocomplete prefix indeksi har bir worker'da shuncha soniyada qayta quriladi (books/autocomplete.py)
+AUTOCOMPLETE_REFRESH_INTERVAL = config("AUTOCOMPLETE_REFRESH_INTERVAL", default=300, cast=int)
+
+# Analytics endpoint'lari materialized snapshot'lardan o'qiydi (books/stats_snapshot.py)
+ANALYTICS_USE_SNAPSHOTS = config("ANALYTICS_USE_SNAPSHOTS", default=True, cast=bool)
+
+# Incremental export (updated_since) - kech commit qilingan qatorlar uchun qayta o'qish oynasi, sekund (books/views.py)
+EXPORT_SAFETY_WINDOW = config("EXPORT_SAFETY_WINDOW", default=300, cast=int)
+
+# API version metrics - worker buffer'i flush oralig'i (books/api_metrics.py)
+API_METRICS_FLUSH_INTERVAL = config("API_METRICS_FLUSH_INTERVAL", default=10, cast=int)
+API_METRICS_FLUSH_MAX_PENDING = config("API_METRICS_FLUSH_MAX_PENDING", default=1000, cast=int)
+
+# Hot book cache - worker ichidagi L1 (encoded bayt) hajmi va TTL'i (books/hot_cache.py)
+HOT_CACHE_MAX_BYTES = config("HOT_CACHE_MAX_BYTES", default=32 * 1024 * 1024, cast=int)
+HOT_CACHE_TTL = config("HOT_CACHE_TTL", default=60, cast=int)
+
 # Email defaults
 DEFAULT_FROM_EMAIL = config("DEFAULT_FROM_EMAIL", default="Library System <noreply@library.com>")
 EMAIL_TIMEOUT = 10
@@ -0,0 +1,14 @@
+"""
+Notifications Pagination
+========================
+
+NotificationLog har bir yuborilgan xabarda o'sadi - OFFSET o'rniga keyset.
+"""
+
+from books.pagination import KeysetPagination
+
+
+class NotificationLogPagination(KeysetPagination):
+    """Notification tarixi - (user, -sent_at) index bo'yicha seek"""
+    page_size = 20
+    ordering = ('-sent_at', '-id')
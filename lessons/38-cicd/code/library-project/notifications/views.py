@@ -32,6 +32,7 @@ from .serializers import (
     NotificationStatsSerializer,
 )
 from .services import notification_manager
+from .pagination import NotificationLogPagination
 
 
 class NotificationLogViewSet(viewsets.ReadOnlyModelViewSet):
@@ -48,6 +49,9 @@ class NotificationLogViewSet(viewsets.ReadOnlyModelViewSet):
     """
     
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = NotificationLogPagination
+    # get_queryset() user bo'yicha filtrlaydi; bu yerda faqat model (index check)
+    queryset = NotificationLog.objects.all()
     
     def get_serializer_class(self):
         """Serializer tanlash"""
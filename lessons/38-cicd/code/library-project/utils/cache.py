@@ -0,0 +1,87 @@
+"""
+In-process cache helpers
+"""
+
+from collections import OrderedDict
+from threading import Lock
+import time
+
+
+_MISSING = object()
+
+
+class LocalLRUCache:
+    """
+    Process ichidagi LRU cache (TTL bilan)
+
+    Har bir gunicorn worker'da alohida - shared cache (Redis) oldidagi
+    birinchi daraja. TTL qisqa bo'lishi kerak: boshqa worker'dagi
+    invalidation bu yerga yetib kelmaydi.
+
+    ``maxbytes`` berilsa qiymatlar hajmi (``sizeof``, default ``len`` -
+    bytes uchun) bo'yicha ham chegaralanadi: eng eski yozuvlar chiqariladi.
+
+    Usage:
+        tiers = LocalLRUCache(maxsize=10000, ttl=30)
+        tiers.set(user_id, 'premium')
+        tiers.get(user_id)
+
+        blobs = LocalLRUCache(maxsize=100000, ttl=60, maxbytes=32 * 1024 * 1024)
+        blobs.set('book:5', encoded)
+    """
+
+    def __init__(self, maxsize=1000, ttl=30, clock=time.monotonic, maxbytes=None, sizeof=len):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.maxbytes = maxbytes
+        self.sizeof = sizeof
+        self.currbytes = 0
+        self._data = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            value, expires, _ = entry
+            if expires <= self.clock():
+                self._pop(key)
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires = self.clock() + (self.ttl if ttl is None else ttl)
+        size = self.sizeof(value) if self.maxbytes is not None else 0
+        if self.maxbytes is not None and size > self.maxbytes:
+            # Butun cache'ni bitta qiymat uchun bo'shatmaymiz
+            self.delete(key)
+            return
+        with self._lock:
+            self._pop(key)
+            self._data[key] = (value, expires, size)
+            self.currbytes += size
+            while len(self._data) > self.maxsize or (
+                self.maxbytes is not None and self.currbytes > self.maxbytes
+            ):
+                _, (_, _, evicted) = self._data.popitem(last=False)
+                self.currbytes -= evicted
+
+    def _pop(self, key):
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self.currbytes -= entry[2]
+
+    def delete(self, key):
+        with self._lock:
+            self._pop(key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.currbytes = 0
+
+    def __len__(self):
+        return len(self._data)